@@ -76,6 +76,9 @@ from src.adaptive_routing import (
     SafetyAuditModule
 )
 from src.adaptive_routing.modules.legal_retrieval.utils import legal_indexing
+from src.adaptive_routing.core.transport import HTTPTransport
+from src.adaptive_routing.core.telemetry import Telemetry
+from src.adaptive_routing.modules.legal_retrieval.embedding_cache import EmbeddingCache, QueryEmbeddingCache
 
 from rich.console import Console
 from rich.panel import Panel
@@ -446,6 +449,7 @@ def print_help():
     table.add_row("-help", "Show this help message")
     table.add_row("-config", "Enter configuration menu")
     table.add_row("-reindex", "Rebuild the legal FAISS index")
+    table.add_row("-stats", "Show token usage and latency per stage and route")
     table.add_row("-clear", "Clear console and conversation history")
     table.add_row("-exit", "Exit the assistant")
     console.print()
@@ -467,6 +471,37 @@ def print_active_config():
     console.print(table)
     console.print()
 
+def print_telemetry_stats():
+    telemetry = Telemetry._for_config_()
+    if telemetry is None:
+        console.print("  [yellow]Telemetry is disabled (TELEMETRY_ENABLED=False).[/yellow]")
+        return
+    stats = telemetry._stats_()
+    print_section_header(f"CALL TELEMETRY ({stats['records']} calls)")
+    table = Table(box=None, header_style="bold magenta")
+    for column in ("Group", "Calls", "Err", "Cache", "Retries", "Prompt Tok", "Compl Tok", "Reason Tok", "Cost", "Queue", "TTFB p50/p95", "Total p50/p95"):
+        table.add_column(column)
+
+    def fmt(value):
+        return "-" if value is None else f"{value:.2f}s"
+
+    for label, groups in (("stage", stats["by_stage"]), ("route", stats["by_route"])):
+        for key, agg in groups.items():
+            table.add_row(
+                f"{label}:{key}", str(agg["calls"]), str(agg["errors"]), str(agg["cache_hits"]), str(agg["retries"]),
+                str(agg["prompt_tokens"]), str(agg["completion_tokens"]), str(agg["reasoning_tokens"]),
+                f"${agg['cost']:.4f}", f"{agg['avg_queue_wait']:.2f}s",
+                f"{fmt(agg['ttfb_p50'])} / {fmt(agg['ttfb_p95'])}", f"{fmt(agg['total_p50'])} / {fmt(agg['total_p95'])}"
+            )
+    console.print(table)
+
+    ## @logic_ Embedding-cache hits never reach the engines, so they are reported separately
+    for label, cache in (("Query embeddings", QueryEmbeddingCache._for_config_()), ("Chunk embeddings", EmbeddingCache._for_config_())):
+        if cache is not None:
+            cstats = cache._stats_()
+            console.print(f"  [dim]{label}: {cstats['hits']} hits / {cstats['misses']} misses ({cstats['hit_rate']:.0%})[/dim]")
+    console.print()
+
 # ═══════════════════════════════════════════════════════════════
 # 4. MAIN APPLICATION
 # ═══════════════════════════════════════════════════════════════
@@ -486,27 +521,35 @@ def main():
     
     try:
         with console.status("[dim]Loading Modules...[/dim]", spinner="dots"):
+            if FrameworkConfig._HTTP_PRECONNECT:
+                HTTPTransport._get_shared_()._preconnect_()
+
             triage = TriageModule()
             print_status_box("Triage Module", "Loaded", "green")
 
             router = SemanticRouterModule()
             print_status_box("Semantic Router", "Loaded", "green")
 
+            if FrameworkConfig._RETRIEVAL_SHARDED and not os.path.isdir(os.path.join(legal_indexing.resolve_index_dir("localfiles/legal-basis"), legal_indexing.SHARDS_DIRNAME)):
+                legal_indexing.publish_index(corpus_dir="legal-corpus", index_dir="localfiles/legal-basis", sharded=True)
+            serving_dir = legal_indexing.resolve_index_dir("localfiles/legal-basis")
             retrieval = LegalRetrievalModule(
-                index_path="localfiles/legal-basis/combined_index.faiss",
-                chunks_path="localfiles/legal-basis/combined_index.json"
+                index_path=os.path.join(serving_dir, "combined_index.faiss"),
+                chunks_path=os.path.join(serving_dir, "combined_index.chunks")
             )
+            if FrameworkConfig._RETRIEVAL_SHARDED:
+                retrieval._load_shards_(os.path.join(serving_dir, legal_indexing.SHARDS_DIRNAME))
             print_status_box("Legal Retrieval", "Loaded", "green")
 
             # Check sync status
             sync_info = legal_indexing.verify_index_integrity(
                 corpus_dir="legal-corpus",
-                chunks_path="localfiles/legal-basis/combined_index.json"
+                index_dir="localfiles/legal-basis"
             )
             if not sync_info["is_synced"]:
                 print_status_box(
                     "Index Sync", 
-                    f"Out of Sync ({sync_info['missing_count']} missing)", 
+                    f"Out of Sync ({sync_info['missing_count']} files changed)", 
                     "yellow"
                 )
                 console.print(f"    [yellow]Tip: Run [bold]-reindex[/bold] to update the knowledge base.[/yellow]")
@@ -574,6 +617,10 @@ def main():
                 console.print("  [green]✓ Conversation history cleared.[/green]\n")
                 continue
 
+            if user_input.lower() == '-stats':
+                print_telemetry_stats()
+                continue
+
             if user_input.lower() == '-config':
                 interactive_config()
                 clear_screen()
@@ -582,17 +629,23 @@ def main():
                 continue
 
             if user_input.lower() == '-reindex':
-                with console.status("[bold yellow]Rebuilding Index... (This will take a while)[/]", spinner="bouncingBar"):
+                with console.status("[bold yellow]Rebuilding Index... (This will take a while)[/]", spinner="bouncingBar") as reindex_status:
                     try:
-                        legal_indexing.rebuild_index(
+                        # Publishes a new snapshot; a running web server swaps to it on its next poll
+                        diff = legal_indexing.publish_index(
                             corpus_dir="legal-corpus",
-                            output_dir="localfiles/legal-basis"
+                            index_dir="localfiles/legal-basis",
+                            sharded=FrameworkConfig._RETRIEVAL_SHARDED,
+                            progress_callback=lambda done, total: reindex_status.update(f"[bold yellow]Rebuilding Index... embedded {done}/{total} chunks[/]")
                         )
+                        console.print(f"  [dim]{diff['added']} added, {diff['updated']} updated, {diff['removed']} removed (snapshot {diff['version']}).[/dim]")
                         # Reload retrieval module with new index
                         retrieval = LegalRetrievalModule(
-                            index_path="localfiles/legal-basis/combined_index.faiss",
-                            chunks_path="localfiles/legal-basis/combined_index.json"
+                            index_path=os.path.join(diff["snapshot_dir"], "combined_index.faiss"),
+                            chunks_path=os.path.join(diff["snapshot_dir"], "combined_index.chunks")
                         )
+                        if FrameworkConfig._RETRIEVAL_SHARDED:
+                            retrieval._load_shards_(os.path.join(diff["snapshot_dir"], legal_indexing.SHARDS_DIRNAME))
                         console.print("  [green]✓ Index rebuilt and reloaded successfully.[/green]")
                     except Exception as reindex_err:
                         print_error_box("Re-indexing Failed", str(reindex_err))
@@ -3,11 +3,10 @@
 ## @file WEB.py
 ## @project_ LLM Legal Adaptive Routing Framework
 ## @desc_ AI Studio web interface (Flask) for the Legal Adaptive Routing Framework.
-## @deps os, json, time, uuid, datetime, logging, queue, threading, flask, dotenv, src.adaptive_routing
+## @deps os, json, uuid, datetime, logging, queue, threading, flask, dotenv, src.adaptive_routing
 
 import os
 import json
-import time
 import uuid
 import logging
 import queue
@@ -17,6 +16,10 @@ from flask import Flask, render_template, request, Response, stream_with_context
 from dotenv import load_dotenv
 from src.adaptive_routing import FrameworkConfig, TriageModule, SemanticRouterModule, LegalRetrievalModule, SafetyAuditModule
 from src.adaptive_routing.modules.legal_retrieval.utils import legal_indexing
+from src.adaptive_routing.modules.legal_retrieval.snapshots import SnapshotLoader
+from src.adaptive_routing.core.transport import HTTPTransport
+from src.adaptive_routing.core.rate_limiter import RateLimiter
+from src.adaptive_routing.core.telemetry import Telemetry
 import platform
 
 def get_config_dir():
@@ -74,14 +77,16 @@ root_logger.addHandler(log_handler)
 app_logger = logging.getLogger("agapay.studio")
 app_logger.setLevel(logging.DEBUG)
 
-# --- Retry Configuration ---
-MAX_RETRIES = 5
-BASE_DELAY = 2  # seconds
-
-def _is_rate_limited_(error):
-    """Check if an exception is a 429 rate-limit error."""
-    err_str = str(error).lower()
-    return "429" in err_str or "rate" in err_str or "rate-limited" in err_str or "too many requests" in err_str
+# --- Rate Limiting ---
+# 429s are absorbed by the engines' shared RateLimiter (queue + Retry-After); the
+# handler only reports how long this request spent queued.
+def _rate_limit_step_(stage):
+    """Return an NDJSON step event if the current request was queued by the rate limiter."""
+    waited = RateLimiter._pop_thread_wait_()
+    if waited < 0.05:
+        return None
+    app_logger.info(f"{stage} waited {waited:.2f}s for rate-limit capacity")
+    return json.dumps({"type": "step", "content": f"Rate-limited — queued {waited:.1f}s for {stage.lower()} capacity..."}) + "\n"
 
 app = Flask(__name__)
 
@@ -94,11 +99,25 @@ FrameworkConfig._update_settings_(
         api_key=os.getenv("OPENROUTER_API_KEY", "")
     )
 
+# Warm the shared keep-alive pool in the background so the first chat turn skips the TLS handshake
+if FrameworkConfig._HTTP_PRECONNECT:
+    threading.Thread(target=HTTPTransport._get_shared_()._preconnect_, daemon=True).start()
+
+def _load_retrieval_(snapshot_dir):
+    """Load a LegalRetrievalModule from an index snapshot and page it in before it serves."""
+    module = LegalRetrievalModule(
+        index_path=os.path.join(snapshot_dir, "combined_index.faiss"),
+        chunks_path=os.path.join(snapshot_dir, "combined_index.chunks")
+    )
+    if FrameworkConfig._RETRIEVAL_SHARDED:
+        module._load_shards_(os.path.join(snapshot_dir, legal_indexing.SHARDS_DIRNAME))
+    module._warm_up_()
+    return module
+
 # Initialize Modules
 try:
     triage_module = TriageModule()
     router_module = SemanticRouterModule()
-    retrieval_module = LegalRetrievalModule()
     
     # Detect corpus path - prioritize local project directory for development
     local_corpus = os.path.join(os.getcwd(), "legal-corpus")
@@ -121,12 +140,14 @@ try:
         index_dir = os.path.join(CONFIG_DIR, "localfiles", "legal-basis")
         app_logger.info(f"Falling back to system corpus path: {corpus_path}")
 
-    index_file = os.path.join(index_dir, "combined_index.faiss")
-    chunks_file = os.path.join(index_dir, "combined_index.json")
+    serving_dir = legal_indexing.resolve_index_dir(index_dir)
+    index_file = os.path.join(serving_dir, "combined_index.faiss")
+    chunks_file = legal_indexing.resolve_chunks_path(os.path.join(serving_dir, "combined_index.chunks"))
     
     if os.path.exists(index_file) and os.path.exists(chunks_file):
-        app_logger.info("Loading existing FAISS index...")
-        retrieval_module._load_index_(index_file, chunks_file)
+        # Sharded retrieval: publish a snapshot with the per-corpus shards if it has none yet
+        if FrameworkConfig._RETRIEVAL_SHARDED and not os.path.isdir(os.path.join(serving_dir, legal_indexing.SHARDS_DIRNAME)) and os.path.exists(corpus_path):
+            legal_indexing.publish_index(corpus_dir=corpus_path, index_dir=index_dir, sharded=True)
     else:
         if not os.path.exists(corpus_path):
             msg = f"Missing 'legal-corpus' folder. Please place it inside: {CONFIG_DIR}"
@@ -135,12 +156,17 @@ try:
             
         app_logger.info("Building initial FAISS index for all jurisdictions (this may take a while)...")
         os.makedirs(index_dir, exist_ok=True)
-        retrieval_module.build_and_save_index(
+        legal_indexing.publish_index(
             corpus_dir=corpus_path,
-            output_dir=index_dir,
-            index_prefix="combined_index"
+            index_dir=index_dir,
+            sharded=FrameworkConfig._RETRIEVAL_SHARDED
         )
         app_logger.info("FAISS index built and saved successfully.")
+
+    # Serve the published snapshot; newer snapshots (e.g. from CLI -reindex) are hot-swapped in the background
+    app_logger.info("Loading FAISS index snapshot...")
+    retrieval_snapshots = SnapshotLoader(index_dir, _load_retrieval_)
+    retrieval_snapshots._load_now_()
         
     # Initialize Safety Audit Module
     safety_audit = None
@@ -158,10 +184,10 @@ try:
     # Check sync status on startup
     sync_info = legal_indexing.verify_index_integrity(
         corpus_dir=corpus_path,
-        chunks_path=chunks_file
+        index_dir=index_dir
     )
     if not sync_info["is_synced"]:
-        app_logger.warning(f"Index is out of sync. {sync_info['missing_count']} documents missing.")
+        app_logger.warning(f"Index is out of sync: {len(sync_info['added'])} added, {len(sync_info['changed'])} changed, {len(sync_info['removed'])} removed files.")
     else:
         app_logger.info("Index is fully synced with corpus.")
 
@@ -169,7 +195,7 @@ except Exception as e:
     app_logger.error(f"Error initializing modules: {e}")
     triage_module = None
     router_module = None
-    retrieval_module = None
+    retrieval_snapshots = None
     safety_audit = None
 
 # In-memory session storage
@@ -189,14 +215,14 @@ def get_sync_status():
     """Check if the vector index is up to date with the legal corpus."""
     try:
         index_dir = os.path.join(os.getcwd(), "localfiles", "legal-basis")
-        chunks_file = os.path.join(index_dir, "combined_index.json")
         
-        logging.info(f"Sync status requested. Checking integrity: {chunks_file}")
+        logging.info(f"Sync status requested. Checking integrity: {index_dir}")
         sync_info = legal_indexing.verify_index_integrity(
             corpus_dir="legal-corpus",
-            chunks_path=chunks_file
+            index_dir=index_dir
         )
-        logging.info(f"Sync status result: {sync_info['is_synced']} ({sync_info['corpus_count']} docs)")
+        sync_info["snapshot"] = retrieval_snapshots._status_() if retrieval_snapshots else None
+        logging.info(f"Sync status result: {sync_info['is_synced']} ({sync_info['indexed_count']} indexed of {sync_info['corpus_count']} files)")
         return jsonify(sync_info)
     except Exception as e:
         logging.error(f"Sync status error: {str(e)}")
@@ -215,10 +241,15 @@ def chat():
     if not user_input:
         return Response("Message is required", status=400)
 
+    # The request keeps this snapshot even if a newer one is swapped in meanwhile
+    retrieval_module = retrieval_snapshots._get_() if retrieval_snapshots else None
+
     def generate():
         nonlocal session_id
         
         try:
+            RateLimiter._pop_thread_wait_()
+
             # 1. Session Retrieval
             is_new_session = False
             if not session_id or session_id not in SESSIONS:
@@ -230,34 +261,29 @@ def chat():
                 is_new_session = True
                 
             history = SESSIONS[session_id]["history"]
+            Telemetry._bind_session_(session_id)
             
             yield json.dumps({"type": "meta", "sessionId": session_id}) + "\n"
             if not is_new_session:
                 yield json.dumps({"type": "step", "content": "Resuming session..."}) + "\n"
 
-            # 2. Triage Step (with persistence for rate-limits)
+            # 2. Triage Step (rate-limit queueing handled by the engine)
             yield json.dumps({"type": "step", "content": "Normalizing input and detecting language..."}) + "\n"
             normalized_text = user_input
             detected_language = "Unknown"
             
             if triage_module:
-                for attempt in range(1, MAX_RETRIES + 1):
-                    try:
-                        triaged_data = triage_module._process_request_(user_input)
-                        if triaged_data and triaged_data.get("normalized_text"):
-                            normalized_text = triaged_data.get("normalized_text", user_input)
-                        detected_language = triaged_data.get("detected_language", "Unknown")
-                        break
-                    except Exception as triage_err:
-                        if _is_rate_limited_(triage_err) and attempt < MAX_RETRIES:
-                            delay = BASE_DELAY * attempt
-                            app_logger.warning(f"Triage rate-limited (attempt {attempt}/{MAX_RETRIES}), retrying in {delay}s...")
-                            yield json.dumps({"type": "step", "content": f"Rate-limited — retrying triage ({attempt}/{MAX_RETRIES})..."}) + "\n"
-                            time.sleep(delay)
-                        else:
-                            app_logger.error(f"Triage failed after {attempt} attempt(s): {triage_err}")
-                            yield json.dumps({"type": "step", "content": "Triage failed — using raw input as fallback..."}) + "\n"
-                            break
+                try:
+                    triaged_data = triage_module._process_request_(user_input)
+                    if triaged_data and triaged_data.get("normalized_text"):
+                        normalized_text = triaged_data.get("normalized_text", user_input)
+                    detected_language = triaged_data.get("detected_language", "Unknown")
+                except Exception as triage_err:
+                    app_logger.error(f"Triage failed: {triage_err}")
+                    yield json.dumps({"type": "step", "content": "Triage failed — using raw input as fallback..."}) + "\n"
+                wait_step = _rate_limit_step_("Triage")
+                if wait_step:
+                    yield wait_step
             
             yield json.dumps({
                 "type": "data", 
@@ -273,7 +299,7 @@ def chat():
                 yield json.dumps({"type": "error", "content": "Normalization failed. Input text unclear."}) + "\n"
                 return
 
-            # 3. Classification Step (with persistence for rate-limits)
+            # 3. Classification Step (rate-limit queueing handled by the engine)
             yield json.dumps({"type": "step", "content": "Routing query to appropriate model..."}) + "\n"
             classification = {"route": "General-LLM", "confidence": 0.0, "search_signals": None}
             
@@ -281,30 +307,24 @@ def chat():
                 # Pass recent history (last 5 turns) for context-aware routing
                 routing_history = history[-5:] if history else None
                 
-                for attempt in range(1, MAX_RETRIES + 1):
-                    try:
-                        classification = router_module._process_routing_(
-                            normalized_text, 
-                            history=routing_history,
-                            threshold=0.1
-                        )
-                        if classification.get("error") == "LLMEngine failed to acknowledge the input.":
-                            yield json.dumps({"type": "step", "content": "Confidence below threshold — falling back to Casual conversation..."}) + "\n"
-                            classification = {
-                                "route": "Casual-LLM",
-                                "confidence": 1.0,
-                                "search_signals": None
-                            }
-                        break
-                    except Exception as classify_err:
-                        if _is_rate_limited_(classify_err) and attempt < MAX_RETRIES:
-                            delay = BASE_DELAY * attempt
-                            app_logger.warning(f"Classification rate-limited (attempt {attempt}/{MAX_RETRIES}), retrying in {delay}s...")
-                            yield json.dumps({"type": "step", "content": f"Rate-limited — retrying classification ({attempt}/{MAX_RETRIES})..."}) + "\n"
-                            time.sleep(delay)
-                        else:
-                            app_logger.error(f"Classification failed after {attempt} attempt(s): {classify_err}")
-                            break
+                try:
+                    classification = router_module._process_routing_(
+                        normalized_text, 
+                        history=routing_history,
+                        threshold=0.1
+                    )
+                    if classification.get("error") == "LLMEngine failed to acknowledge the input.":
+                        yield json.dumps({"type": "step", "content": "Confidence below threshold — falling back to Casual conversation..."}) + "\n"
+                        classification = {
+                            "route": "Casual-LLM",
+                            "confidence": 1.0,
+                            "search_signals": None
+                        }
+                except Exception as classify_err:
+                    app_logger.error(f"Classification failed: {classify_err}")
+                wait_step = _rate_limit_step_("Classification")
+                if wait_step:
+                    yield wait_step
             
             route = classification.get("route") or "General-LLM"
             confidence = classification.get("confidence", 0.0)
@@ -379,33 +399,39 @@ def chat():
             is_follow_up = (signals is None and route != "Casual-LLM")
 
             for audit_attempt in range(1, persistence_limit + 1):
-                # 5a. Generate (with existing rate-limit retries)
+                # 5a. Generate (rate-limit queueing handled by the engine)
                 if router_module:
-                    for attempt in range(1, MAX_RETRIES + 1):
-                        try:
-                            result = router_module._generate_conversation_(
-                                classification=classification,
-                                messages=history,
-                                context=context_str,
-                                is_follow_up=is_follow_up,
-                                detected_language=detected_language
-                            )
-                            response_text = result.get("response_text", "")
-                            accepted = result.get("accepted", False)
-                            
-                            if not accepted:
-                                yield json.dumps({"type": "step", "content": "Confidence below threshold — requesting clarification..."}) + "\n"
-                            break
-                        except Exception as gen_err:
-                            if _is_rate_limited_(gen_err) and attempt < MAX_RETRIES:
-                                delay = BASE_DELAY * attempt
-                                app_logger.warning(f"Generation rate-limited (attempt {attempt}/{MAX_RETRIES}), retrying in {delay}s...")
-                                yield json.dumps({"type": "step", "content": f"Rate-limited — retrying generation ({attempt}/{MAX_RETRIES})..."}) + "\n"
-                                time.sleep(delay)
+                    streamed_any = False
+                    try:
+                        # Stream deltas to the browser as they arrive; the final 'done' event carries the full text
+                        result = {}
+                        for event in router_module._generate_conversation_stream_(
+                            classification=classification,
+                            messages=history,
+                            context=context_str,
+                            is_follow_up=is_follow_up,
+                            detected_language=detected_language
+                        ):
+                            if event["type"] == "done":
+                                result = event
                             else:
-                                app_logger.error(f"Generation failed after {attempt} attempt(s): {gen_err}")
-                                response_text = "I am currently unable to process your query due to a technical error. Please try again."
-                                break
+                                if not streamed_any:
+                                    wait_step = _rate_limit_step_("Generation")
+                                    if wait_step:
+                                        yield wait_step
+                                streamed_any = True
+                                yield json.dumps({"type": "delta", "channel": event["type"], "content": event["delta"], "attempt": audit_attempt}) + "\n"
+                        response_text = result.get("response_text", "")
+                        accepted = result.get("accepted", False)
+                        
+                        if not accepted:
+                            yield json.dumps({"type": "step", "content": "Confidence below threshold — requesting clarification..."}) + "\n"
+                    except Exception as gen_err:
+                        if streamed_any:
+                            # Discard the partial answer the browser has rendered so far
+                            yield json.dumps({"type": "delta_reset"}) + "\n"
+                        app_logger.error(f"Generation failed: {gen_err}")
+                        response_text = "I am currently unable to process your query due to a technical error. Please try again."
                 else:
                     response_text = "I am currently unable to process your query due to a technical error."
 
@@ -453,6 +479,7 @@ def chat():
                     if history and history[-1].get("role") == "assistant":
                         history.pop()
                     
+                    yield json.dumps({"type": "delta_reset"}) + "\n"
                     if audit_attempt < persistence_limit:
                         app_logger.warning(
                             f"Safety audit NON_COMPLIANT (attempt {audit_attempt}/{persistence_limit}, "
@@ -488,6 +515,24 @@ def chat():
 
     return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
+@app.route('/api/telemetry', methods=['GET'])
+def get_telemetry():
+    """Per-call usage/latency aggregates. Optional ?session=<id> and ?by=stage|route|model|session."""
+    telemetry = Telemetry._for_config_()
+    if telemetry is None:
+        return jsonify({"enabled": False})
+    session_filter = request.args.get('session')
+    filters = {"session": session_filter} if session_filter else {}
+    by = request.args.get('by')
+    if by:
+        if by not in ("stage", "route", "model", "session"):
+            return jsonify({"error": f"Unsupported grouping: {by}"}), 400
+        return jsonify({"enabled": True, "by": by, "groups": telemetry._aggregate_(by, **filters)})
+    limit = request.args.get('records', type=int)
+    if limit:
+        return jsonify({"enabled": True, "records": telemetry._records_(**filters)[-limit:]})
+    return jsonify(dict(telemetry._stats_(**filters), enabled=True))
+
 # =============================================
 # Conversation Persistence API
 # =============================================
@@ -659,7 +704,7 @@ def get_config():
 
 @app.route('/api/config', methods=['POST'])
 def save_config():
-    global triage_module, router_module, retrieval_module, safety_audit
+    global triage_module, router_module, safety_audit
     data = request.json
     
     try:
@@ -776,14 +821,9 @@ def save_config():
         triage_module = TriageModule()
         router_module = SemanticRouterModule()
         
-        # Retrieval module reload (re-use existing index if possible to avoid rebuild delay)
-        index_dir = os.path.join(os.getcwd(), "localfiles", "legal-basis")
-        index_file = os.path.join(index_dir, "combined_index.faiss")
-        chunks_file = os.path.join(index_dir, "combined_index.json")
-        
-        retrieval_module = LegalRetrievalModule()
-        if os.path.exists(index_file) and os.path.exists(chunks_file):
-            retrieval_module._load_index_(index_file, chunks_file)
+        # Retrieval module reload in the background; requests keep the current snapshot until it is swapped
+        if retrieval_snapshots:
+            retrieval_snapshots._reload_async_()
         
         # Re-initialize Safety Audit Module with new settings
         if FrameworkConfig._VERIFICATION_ENABLED:
@@ -1066,6 +1106,7 @@ def api_test_retrieval():
     top_k = int(data.get('top_k', 5))
     if not query:
         return jsonify({"error": "query is required"}), 400
+    retrieval_module = retrieval_snapshots._get_() if retrieval_snapshots else None
     if not retrieval_module:
         return jsonify({"error": "Retrieval module is not initialized"}), 500
     try:
@@ -118,17 +118,19 @@ def initialize_ai_modules(status_callback=None):
         
         # Check and Build Initial FAISS Index if missing
         index_dir = os.path.join(CONFIG_DIR, "localfiles", "legal-basis")
-        index_file = os.path.join(index_dir, "combined_index.faiss")
-        chunks_file = os.path.join(index_dir, "combined_index.json")
+        serving_dir = legal_indexing.resolve_index_dir(index_dir)
+        index_file = os.path.join(serving_dir, "combined_index.faiss")
+        chunks_file = legal_indexing.resolve_chunks_path(os.path.join(serving_dir, "combined_index.chunks"))
         corpus_path = os.path.join(CONFIG_DIR, "legal-corpus")
         
         os.makedirs(index_dir, exist_ok=True)
         os.makedirs(corpus_path, exist_ok=True)
         
         if os.path.exists(index_file) and os.path.exists(chunks_file):
-            app_logger.info("Loading existing FAISS index...")
-            if status_callback: status_callback("Loading FAISS Index...")
-            retrieval_module._load_index_(index_file, chunks_file)
+            # Sharded retrieval: publish a snapshot with the per-corpus shards if it has none yet
+            if FrameworkConfig._RETRIEVAL_SHARDED and not os.path.isdir(os.path.join(serving_dir, legal_indexing.SHARDS_DIRNAME)) and os.listdir(corpus_path):
+                if status_callback: status_callback("Building Index Shards...")
+                serving_dir = legal_indexing.publish_index(corpus_dir=corpus_path, index_dir=index_dir, sharded=True)["snapshot_dir"]
         else:
             if not os.listdir(corpus_path):
                 msg = f"Empty 'legal-corpus' folder. Please download the pre-built 'combined_index.faiss' and 'combined_index.json' legal-basis files and place them inside {index_dir}, or place your documents inside {corpus_path} to build the index from scratch."
@@ -138,13 +140,22 @@ def initialize_ai_modules(status_callback=None):
                 
             app_logger.info("Building initial FAISS index for all jurisdictions (this may take a while)...")
             if status_callback: status_callback("Building FAISS Index (This may take several minutes)...")
-            os.makedirs(index_dir, exist_ok=True)
-            retrieval_module.build_and_save_index(
+            serving_dir = legal_indexing.publish_index(
                 corpus_dir=corpus_path,
-                output_dir=index_dir,
-                index_prefix="combined_index"
-            )
+                index_dir=index_dir,
+                sharded=FrameworkConfig._RETRIEVAL_SHARDED
+            )["snapshot_dir"]
             app_logger.info("FAISS index built and saved successfully.")
+
+        # Serve the published snapshot (flat pre-snapshot directories are served as they are)
+        app_logger.info("Loading FAISS index...")
+        if status_callback: status_callback("Loading FAISS Index...")
+        retrieval_module._load_index_(
+            os.path.join(serving_dir, "combined_index.faiss"),
+            legal_indexing.resolve_chunks_path(os.path.join(serving_dir, "combined_index.chunks"))
+        )
+        if FrameworkConfig._RETRIEVAL_SHARDED:
+            retrieval_module._load_shards_(os.path.join(serving_dir, legal_indexing.SHARDS_DIRNAME))
             
         # Initialize Safety Audit Module
         if status_callback: status_callback("Initializing Safety Audit Module...")
@@ -163,10 +174,10 @@ def initialize_ai_modules(status_callback=None):
         if status_callback: status_callback("Verifying Index Integrity...")
         sync_info = legal_indexing.verify_index_integrity(
             corpus_dir=corpus_path,
-            chunks_path=chunks_file
+            index_dir=index_dir
         )
         if not sync_info["is_synced"]:
-            app_logger.warning(f"Index is out of sync. {sync_info['missing_count']} documents missing.")
+            app_logger.warning(f"Index is out of sync: {len(sync_info['added'])} added, {len(sync_info['changed'])} changed, {len(sync_info['removed'])} removed files.")
         else:
             app_logger.info("Index is fully synced with corpus.")
 
@@ -192,14 +203,13 @@ def get_sync_status():
     """Check if the vector index is up to date with the legal corpus."""
     try:
         index_dir = os.path.join(os.getcwd(), "localfiles", "legal-basis")
-        chunks_file = os.path.join(index_dir, "combined_index.json")
         
-        logging.info(f"Sync status requested. Checking integrity: {chunks_file}")
+        logging.info(f"Sync status requested. Checking integrity: {index_dir}")
         sync_info = legal_indexing.verify_index_integrity(
             corpus_dir="legal-corpus",
-            chunks_path=chunks_file
+            index_dir=index_dir
         )
-        logging.info(f"Sync status result: {sync_info['is_synced']} ({sync_info['corpus_count']} docs)")
+        logging.info(f"Sync status result: {sync_info['is_synced']} ({sync_info['indexed_count']} indexed of {sync_info['corpus_count']} files)")
         return jsonify(sync_info)
     except Exception as e:
         logging.error(f"Sync status error: {str(e)}")
@@ -780,13 +790,15 @@ def save_config():
         router_module = SemanticRouterModule()
         
         # Retrieval module reload (re-use existing index if possible to avoid rebuild delay)
-        index_dir = os.path.join(os.getcwd(), "localfiles", "legal-basis")
+        index_dir = legal_indexing.resolve_index_dir(os.path.join(os.getcwd(), "localfiles", "legal-basis"))
         index_file = os.path.join(index_dir, "combined_index.faiss")
-        chunks_file = os.path.join(index_dir, "combined_index.json")
+        chunks_file = legal_indexing.resolve_chunks_path(os.path.join(index_dir, "combined_index.chunks"))
         
         retrieval_module = LegalRetrievalModule()
         if os.path.exists(index_file) and os.path.exists(chunks_file):
             retrieval_module._load_index_(index_file, chunks_file)
+        if FrameworkConfig._RETRIEVAL_SHARDED:
+            retrieval_module._load_shards_(os.path.join(index_dir, legal_indexing.SHARDS_DIRNAME))
         
         # Re-initialize Safety Audit Module with new settings
         if FrameworkConfig._VERIFICATION_ENABLED:
@@ -288,6 +288,67 @@ NO explanation.""")
     _RETRY_COUNT = int(os.getenv("RETRY_COUNT", "2"))
     _RETRY_BACKOFF = float(os.getenv("RETRY_BACKOFF", "1.0"))
 
+    ## @const_ _HTTP_POOL : Shared keep-alive transport settings.
+    _API_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
+    _HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+    _HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+    _HTTP_PRECONNECT = os.getenv("HTTP_PRECONNECT", "True").lower() == "true"
+    _ASYNC_MAX_CONCURRENCY_PER_MODEL = int(os.getenv("ASYNC_MAX_CONCURRENCY_PER_MODEL", "64"))
+
+    ## @const_ _RESPONSE_CACHE : Opt-in cache for deterministic router/triage/audit calls.
+    _RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "False").lower() == "true"
+    _RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2048"))
+    _RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "86400"))
+    _RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", None)
+    _RESPONSE_CACHE_MAX_DISK_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_DISK_ENTRIES", "50000"))
+
+    ## @const_ _RATE_LIMIT : Adaptive per-(key, model) token bucket shared by all engines.
+    _RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True").lower() == "true"
+    _RATE_LIMIT_INITIAL_RPS = float(os.getenv("RATE_LIMIT_INITIAL_RPS", "5.0"))
+    _RATE_LIMIT_MIN_RPS = float(os.getenv("RATE_LIMIT_MIN_RPS", "0.2"))
+    _RATE_LIMIT_MAX_RPS = float(os.getenv("RATE_LIMIT_MAX_RPS", "50.0"))
+    _RATE_LIMIT_BURST = int(os.getenv("RATE_LIMIT_BURST", "10"))
+    _RATE_LIMIT_DECREASE_FACTOR = float(os.getenv("RATE_LIMIT_DECREASE_FACTOR", "0.5"))
+    _RATE_LIMIT_INCREASE_STEP = float(os.getenv("RATE_LIMIT_INCREASE_STEP", "0.25"))
+    _RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "120"))
+    _RATE_LIMIT_MAX_REQUEUES = int(os.getenv("RATE_LIMIT_MAX_REQUEUES", "5"))
+
+    ## @const_ _CIRCUIT : Per-model circuit breaker (rolling error / slow-call rate).
+    _CIRCUIT_BREAKER_ENABLED = os.getenv("CIRCUIT_BREAKER_ENABLED", "True").lower() == "true"
+    _CIRCUIT_WINDOW_SEC = float(os.getenv("CIRCUIT_WINDOW_SEC", "60"))
+    _CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "4"))
+    _CIRCUIT_ERROR_RATE = float(os.getenv("CIRCUIT_ERROR_RATE", "0.5"))
+    _CIRCUIT_SLOW_CALL_SEC = float(os.getenv("CIRCUIT_SLOW_CALL_SEC", "25"))
+    ## @const_ _CIRCUIT_SLOW_CALL_SEC_BY : "key:seconds" overrides by model, route or stage (checked in
+    ##         that order); the last ":" separates the seconds, so model ids like "x/y:free" work.
+    _CIRCUIT_SLOW_CALL_SEC_BY = {
+        key.strip(): float(seconds)
+        for key, _, seconds in (pair.rpartition(":") for pair in os.getenv("CIRCUIT_SLOW_CALL_SEC_BY", "Reasoning-LLM:120,audit:120").split(","))
+        if key.strip()
+    }
+    _CIRCUIT_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8"))
+    _CIRCUIT_COOLDOWN_SEC = float(os.getenv("CIRCUIT_COOLDOWN_SEC", "30"))
+    _CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1"))
+
+    ## @const_ _COALESCE : Single-flight sharing of identical concurrent requests.
+    _COALESCE_DETERMINISTIC = os.getenv("COALESCE_DETERMINISTIC", "True").lower() == "true"
+    _COALESCE_GENERATION = os.getenv("COALESCE_GENERATION", "False").lower() == "true"
+
+    ## @const_ _HEDGE : Optional request hedging driven by per-model latency histograms.
+    _HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "False").lower() == "true"
+    _HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+    _HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    _HEDGE_MIN_DELAY_SEC = float(os.getenv("HEDGE_MIN_DELAY_SEC", "1.0"))
+    _HEDGE_BURST = float(os.getenv("HEDGE_BURST", "3"))
+    _HEDGE_USE_FALLBACK = os.getenv("HEDGE_USE_FALLBACK", "False").lower() == "true"
+    _HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", "16"))
+    _HEDGE_MAX_PRIMARY_WORKERS = int(os.getenv("HEDGE_MAX_PRIMARY_WORKERS", "64"))
+
+    ## @const_ _TELEMETRY : Per-call usage / latency records (ring buffer + optional JSONL file).
+    _TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "True").lower() == "true"
+    _TELEMETRY_BUFFER_SIZE = int(os.getenv("TELEMETRY_BUFFER_SIZE", "5000"))
+    _TELEMETRY_JSONL_PATH = os.getenv("TELEMETRY_JSONL_PATH", None)
+
     @classmethod
     def _update_settings_(cls, **kwargs):
         """
@@ -562,17 +623,73 @@ STRICT CONSTRAINTS
         "- You may respond in the same language the user uses (English, Tagalog, etc.)."
     ))
 
+    ## @const_ _FALLBACK_ROUTES : Ordered failover routes per generation route (comma-separated).
+    _GENERAL_FALLBACK_ROUTES = [r.strip() for r in os.getenv("GENERAL_FALLBACK_ROUTES", "").split(",") if r.strip()]
+    _REASONING_FALLBACK_ROUTES = [r.strip() for r in os.getenv("REASONING_FALLBACK_ROUTES", "General-LLM").split(",") if r.strip()]
+    _CASUAL_FALLBACK_ROUTES = [r.strip() for r in os.getenv("CASUAL_FALLBACK_ROUTES", "").split(",") if r.strip()]
+
+    ## @const_ _HEDGE_BUDGET : Max fraction of calls per route that may be hedged (0 disables).
+    _GENERAL_HEDGE_BUDGET = float(os.getenv("GENERAL_HEDGE_BUDGET", "0.1"))
+    _REASONING_HEDGE_BUDGET = float(os.getenv("REASONING_HEDGE_BUDGET", "0.1"))
+    _CASUAL_HEDGE_BUDGET = float(os.getenv("CASUAL_HEDGE_BUDGET", "0.05"))
+
     ## @const_ _RETRIEVAL_MODEL : Legal Retrieval (RAG) settings.
     _RETRIEVAL_MODEL = os.getenv("RETRIEVAL_MODEL", "sentence-transformers/all-mpnet-base-v2")
     _RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "5"))
     _RETRIEVAL_CHUNK_SIZE = int(os.getenv("RETRIEVAL_CHUNK_SIZE", "10000"))
     _RETRIEVAL_CHUNK_OVERLAP = int(os.getenv("RETRIEVAL_CHUNK_OVERLAP", "300"))
     _RETRIEVAL_SCORE_THRESHOLD = float(os.getenv("RETRIEVAL_SCORE_THRESHOLD", "0.0"))
+
+    ## @const_ _RETRIEVAL_FUSION : Hybrid score fusion. "convex" = weighted mean of calibrated signals
+    ##         (cosine, BM25 / query ceiling), all in [0, 1]; "rrf" = reciprocal rank fusion scaled to [0, 1].
+    _RETRIEVAL_FUSION = os.getenv("RETRIEVAL_FUSION", "convex").lower()
+    _RETRIEVAL_FUSION_WEIGHTS = {
+        name.strip(): float(weight)
+        for name, _, weight in (pair.partition(":") for pair in os.getenv("RETRIEVAL_FUSION_WEIGHTS", "vector:0.7,bm25:0.3").split(","))
+        if name.strip()
+    }
+    _RETRIEVAL_RRF_K = int(os.getenv("RETRIEVAL_RRF_K", "60"))
     
+    ## @const_ _RETRIEVAL_INDEX_FACTORY : FAISS index_factory string for the vector index ("Flat", "HNSW32",
+    ##         "IVF1024,PQ64", "IVF,SQ8" — a bare "IVF" gets ~4*sqrt(N) lists). Trained at build time.
+    _RETRIEVAL_INDEX_FACTORY = os.getenv("RETRIEVAL_INDEX_FACTORY", "Flat")
+    _RETRIEVAL_EF_SEARCH = int(os.getenv("RETRIEVAL_EF_SEARCH", "64"))
+    _RETRIEVAL_NPROBE = int(os.getenv("RETRIEVAL_NPROBE", "16"))
+
+    ## @const_ _RETRIEVAL_SHARDED : Serve one FAISS+BM25 shard per corpus directory (PH, HK, DMW, ...) from
+    ##         <index dir>/shards/<name>/ instead of combined_index. Shards are searched concurrently on
+    ##         _RETRIEVAL_SHARD_WORKERS threads and update / reload independently.
+    _RETRIEVAL_SHARDED = os.getenv("RETRIEVAL_SHARDED", "False").lower() == "true"
+    _RETRIEVAL_SHARD_WORKERS = int(os.getenv("RETRIEVAL_SHARD_WORKERS", "4"))
+
+    ## @const_ _RETRIEVAL_SNAPSHOT : Index updates publish versioned snapshots (<index dir>/snapshots/<version>/ +
+    ##         CURRENT pointer). Servers poll CURRENT every _RETRIEVAL_SNAPSHOT_POLL_SECONDS (0 = never) and
+    ##         hot-swap in the background; the newest _RETRIEVAL_SNAPSHOT_KEEP versions stay on disk.
+    _RETRIEVAL_SNAPSHOT_POLL_SECONDS = float(os.getenv("RETRIEVAL_SNAPSHOT_POLL_SECONDS", "5"))
+    _RETRIEVAL_SNAPSHOT_KEEP = int(os.getenv("RETRIEVAL_SNAPSHOT_KEEP", "3"))
+
     ## @const_ _RETRIEVAL_INDEX_PATH : Paths for vector store persistence.
     _RETRIEVAL_INDEX_PATH = os.getenv("RETRIEVAL_INDEX_PATH", None)
     _RETRIEVAL_CHUNKS_PATH = os.getenv("RETRIEVAL_CHUNKS_PATH", None)
 
+    ## @const_ _EMBEDDING_CACHE : Persistent content-addressed embedding cache (model + normalized text -> vector).
+    _EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "True").lower() == "true"
+    _EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join("localfiles", "legal-basis", "embedding_cache.bin"))
+    _EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+    ## @const_ _QUERY_EMBEDDING_CACHE : LRU of search-query embeddings keyed by model + exact query string.
+    _QUERY_EMBEDDING_CACHE_ENABLED = os.getenv("QUERY_EMBEDDING_CACHE_ENABLED", "True").lower() == "true"
+    _QUERY_EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_ENTRIES", "1024"))
+    _QUERY_EMBEDDING_CACHE_PATH = os.getenv("QUERY_EMBEDDING_CACHE_PATH", None)
+    _QUERY_EMBEDDING_CACHE_MAX_DISK_ENTRIES = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_DISK_ENTRIES", "20000"))
+
+    ## @const_ _EMBEDDING_BATCH : Concurrent ingestion — batches are packed by item count and character
+    ##         budget, pipelined through a bounded worker pool (still subject to the shared rate limiter).
+    _EMBEDDING_MAX_WORKERS = int(os.getenv("EMBEDDING_MAX_WORKERS", "4"))
+    _EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "100"))
+    _EMBEDDING_BATCH_MAX_CHARS = int(os.getenv("EMBEDDING_BATCH_MAX_CHARS", "120000"))
+    _EMBEDDING_BATCH_RETRIES = int(os.getenv("EMBEDDING_BATCH_RETRIES", "2"))
+
     ## @const_ _RETRIEVAL_RERANK_MODEL : Two-stage cascade reranker settings.
     _RETRIEVAL_RERANK_MODEL = os.getenv("RETRIEVAL_RERANK_MODEL", "cohere/rerank-4-pro")
     _RETRIEVAL_DOMAIN_CONFIDENCE = float(os.getenv("RETRIEVAL_DOMAIN_CONFIDENCE", "0.35"))
@@ -0,0 +1,286 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/core/api_client.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Request plumbing shared by LLMRequestEngine and RerankEngine: headers, the pooled
+##        transport, rate-limiter queueing, circuit-breaker permits, per-call traces and the
+##        sync retry loop. Each engine keeps only its payloads, parsing and status mapping.
+## @deps requests, json, time, logging, src.adaptive_routing.config, src.adaptive_routing.core.transport, src.adaptive_routing.core.circuit_breaker, src.adaptive_routing.core.exceptions
+
+import requests
+import json
+import time
+import logging
+from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.transport import HTTPTransport
+from src.adaptive_routing.core.circuit_breaker import CircuitBreaker
+from src.adaptive_routing.core.exceptions import (
+    APIConnectionError,
+    APIResponseError
+)
+
+logger = logging.getLogger(__name__)
+
+class APIClientMixin:
+    """
+    @class APIClientMixin
+    @desc_ Mixed into the OpenRouter engines. The host class sets the attributes below and
+           implements _raise_http_error_ (status -> framework exception).
+    @attr_ _url : (str) Endpoint the engine posts to.
+    @attr_ _api_key : (str) Credential for the OpenRouter API.
+    @attr_ _model : (str) Model the engine targets.
+    @attr_ _transport : (HTTPTransport | None) Pooled keep-alive transport; None until _get_transport_
+                        resolves the process-wide one.
+    @attr_ _limiter : (RateLimiter | None) Shared adaptive rate limiter; None disables queueing.
+    @attr_ _breaker : (CircuitBreaker | None) Shared per-model circuit breaker; None disables it.
+    @attr_ _latency : (LatencyTracker | None) Shared latency histograms fed by successful attempts.
+    @attr_ _telemetry : (Telemetry | None) Shared per-call telemetry hub; None disables records.
+    @attr_ _stage : (str) Pipeline stage tag on telemetry records and slow-call thresholds.
+    @attr_ _route : (str | None) Generation route tag on telemetry records and slow-call thresholds.
+    """
+    def _get_transport_(self):
+        """
+        @func_ _get_transport_
+        @returns (HTTPTransport) The injected transport, else the process-wide one.
+        @desc_ Resolved on first use, so the async engines, which send through their own
+               aiohttp transport, never create a requests session.
+        """
+        if self._transport is None:
+            self._transport = HTTPTransport._get_shared_()
+        return self._transport
+
+    def _build_headers_(self):
+        """
+        @func_ _build_headers_
+        @returns (dict) HTTP headers for OpenRouter API requests.
+        @desc_ Centralized header construction used by all API methods.
+        """
+        return {
+            "Authorization": f"Bearer {self._api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/404FoundUs",
+            "X-Title": "LLM Legal Adaptive Routing Framework"
+        }
+
+    def _handle_request_error_(self, error, context="API request"):
+        """
+        @func_ _handle_request_error_
+        @params error : (Exception) The caught exception.
+        @params context : (str) Description of the operation for error messages.
+        @desc_ Unified error handler that maps HTTP status codes to framework exceptions.
+        """
+        if isinstance(error, requests.exceptions.HTTPError):
+            self._raise_http_error_(error.response.status_code, error.response.text, error)
+
+        elif isinstance(error, requests.exceptions.ConnectionError):
+            raise APIConnectionError(
+                f"{context} failed: Could not connect to OpenRouter API. Check your internet connection. Details: {str(error)}"
+            ) from error
+
+        elif isinstance(error, requests.exceptions.Timeout):
+            raise APIConnectionError(
+                f"{context} timed out after {FrameworkConfig._REQUEST_TIMEOUT} seconds. Details: {str(error)}"
+            ) from error
+
+        elif isinstance(error, requests.exceptions.RequestException):
+            raise APIConnectionError(
+                f"{context} failed unexpectedly: {str(error)}"
+            ) from error
+
+        elif isinstance(error, json.JSONDecodeError):
+            raise APIResponseError(
+                f"Failed to decode API response JSON. Details: {str(error)}"
+            ) from error
+
+    def _begin_trace_(self, streamed=False):
+        """
+        @func_ _begin_trace_
+        @params streamed : (bool) Whether the call is a streamed completion.
+        @returns (CallTrace | None) A fresh trace, or None when telemetry is disabled.
+        """
+        if self._telemetry is None:
+            return None
+        endpoint = self._url.rsplit("/", 1)[-1]
+        return self._telemetry._begin_(self._stage, self._model, route=self._route, endpoint=endpoint, streamed=streamed)
+
+    def _trace_usage_(self, trace, response_json):
+        """
+        @func_ _trace_usage_
+        @params trace : (CallTrace | None) Trace of the current call.
+        @params response_json : (dict) Response that carries the `usage` block.
+        @desc_ A caller that was served by another caller's flight sent nothing (no attempt was
+               traced), so it is marked coalesced and not billed the shared usage.
+        """
+        if trace is None:
+            return
+        if trace.ttfb is None:
+            trace.coalesced = True
+            return
+        trace._add_usage_(response_json.get("usage") if isinstance(response_json, dict) else None)
+
+    def _send_with_retry_(self, payload, timeout=None, trace=None, context="Completion", stream=False):
+        """
+        @func_ _send_with_retry_
+        @params payload : (dict) The JSON request payload.
+        @params timeout : (int) Request timeout in seconds.
+        @params trace : (CallTrace, optional) Receives queue wait, retries and timings.
+        @params context : (str) Description of the operation for logs and error messages.
+        @params stream : (bool) Return the open response (SSE body unread) instead of its JSON.
+        @returns (dict | requests.Response) Parsed JSON, or the open response when streaming.
+        @desc_ Performs the HTTP round trip with retry logic (no caching). Every attempt waits
+               for a rate-limiter token and a circuit permit; timeouts and connection errors
+               back off exponentially, 429 responses are re-queued rather than raised, and
+               other HTTP errors fail immediately. A stream is only retried before its first
+               byte, so no partial output is ever duplicated.
+        """
+        headers = self._build_headers_()
+        transport = self._get_transport_()
+        timeout = timeout or FrameworkConfig._REQUEST_TIMEOUT
+        retries = FrameworkConfig._RETRY_COUNT
+        backoff = FrameworkConfig._RETRY_BACKOFF
+        requeues = 0
+        attempt = 0
+
+        ## @iter_ while : Retrying the API call based on backoff logic (429 re-queues do not count)
+        while True:
+            started = None
+            permit = None
+            try:
+                waited = self._wait_for_capacity_()
+                permit = self._check_circuit_()
+                started = time.monotonic()
+                response = transport._post_(self._url, headers=headers, json=payload, timeout=timeout, stream=stream)
+                self._trace_attempt_(trace, waited, attempt + requeues, response.elapsed.total_seconds())
+                self._record_response_(permit, started, response.status_code)
+                if self._observe_rate_limit_(response) and requeues < FrameworkConfig._RATE_LIMIT_MAX_REQUEUES:
+                    requeues += 1
+                    continue
+                response.raise_for_status()
+                if stream:
+                    self._record_latency_("ttfb", started)
+                    return response
+                response_json = response.json()
+                self._record_latency_("call", started)
+                return response_json
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                self._record_outcome_(permit, started, failed=True)
+                if attempt < retries:
+                    wait_time = backoff * (2 ** attempt)
+                    attempt += 1
+                    logger.warning(f"{context} attempt {attempt} failed ({type(e).__name__}). Retrying in {wait_time:.1f}s...")
+                    time.sleep(wait_time)
+                    continue
+                self._handle_request_error_(e, context=context)
+            except (requests.exceptions.RequestException, json.JSONDecodeError) as e:
+                ## @logic_ Non-retryable errors (auth, model not found, etc.) — fail immediately;
+                ##         transport failures without a response still count against the circuit
+                self._record_outcome_(permit, started, failed=True)
+                try:
+                    self._handle_request_error_(e, context=context)
+                finally:
+                    ## @logic_ The error body has been read; an open streaming response pins its pooled connection
+                    if stream and getattr(e, "response", None) is not None:
+                        e.response.close()
+            finally:
+                self._release_circuit_(permit)
+
+    def _trace_attempt_(self, trace, waited, retries, ttfb):
+        """
+        @func_ _trace_attempt_
+        @params trace : (CallTrace | None) Trace of the current call.
+        @params waited : (float) Rate-limiter queueing before this attempt.
+        @params retries : (int) Backoff retries plus 429 re-queues so far.
+        @params ttfb : (float) Send -> response headers for this attempt.
+        @desc_ Timings describe the latest attempt; queue wait accumulates over all of them.
+        """
+        transport = self._get_transport_()
+        connect = transport._pop_connect_time_() if hasattr(transport, "_pop_connect_time_") else None
+        if trace is None:
+            return
+        trace.queue_wait += waited or 0.0
+        trace.retries = retries
+        trace.connect = connect
+        trace.ttfb = ttfb
+        if self._model != trace.model:
+            trace.model = self._model
+
+    def _record_latency_(self, kind, started):
+        """
+        @func_ _record_latency_
+        @params kind : (str) "call" (full round trip) or "ttfb" (first byte of a stream).
+        @params started : (float) time.monotonic() when the attempt was sent.
+        @desc_ Feeds the shared latency histograms that hedge delays are derived from.
+        """
+        if self._latency is not None:
+            self._latency._record_(self._model, kind, time.monotonic() - started)
+
+    def _wait_for_capacity_(self):
+        """
+        @func_ _wait_for_capacity_
+        @returns (float) Seconds spent queued by the rate limiter.
+        @desc_ Blocks until the (api key, model) bucket grants a token.
+        """
+        if self._limiter is None:
+            return 0.0
+        return self._limiter._acquire_(self._api_key, self._model)
+
+    def _observe_rate_limit_(self, response):
+        """
+        @func_ _observe_rate_limit_
+        @params response : (requests.Response) The raw HTTP response.
+        @returns (bool) True if the response was a 429 that the limiter has absorbed.
+        @desc_ Feeds status and X-RateLimit-* / Retry-After headers back to the limiter.
+        """
+        if self._limiter is None:
+            return False
+        throttled = self._limiter._record_(self._api_key, self._model, response.status_code, response.headers)
+        if throttled:
+            response.close()
+        return throttled
+
+    def _check_circuit_(self):
+        """
+        @func_ _check_circuit_
+        @returns (CircuitPermit | None) Permit for this attempt; None when no breaker is attached.
+        @raises CircuitOpenError if this engine's model is currently failing fast.
+        """
+        if self._breaker is not None:
+            return self._breaker._before_call_(self._model)
+        return None
+
+    def _record_outcome_(self, permit, started, failed):
+        """
+        @func_ _record_outcome_
+        @params permit : (CircuitPermit | None) Permit returned by _check_circuit_.
+        @params started : (float | None) time.monotonic() when the attempt was sent.
+        @params failed : (bool) Timeout, connection error, 5xx or another transport failure.
+        @desc_ Feeds one attempt into the model's circuit breaker, judged slow against the
+               threshold of this engine's model / route / stage.
+        """
+        if permit is not None and started is not None:
+            permit._record_(failed, time.monotonic() - started, CircuitBreaker._slow_call_sec_(self._model, self._route, self._stage))
+
+    def _record_response_(self, permit, started, status_code):
+        """
+        @func_ _record_response_
+        @params permit : (CircuitPermit | None) Permit returned by _check_circuit_.
+        @params started : (float) time.monotonic() when the attempt was sent.
+        @params status_code : (int) HTTP status of the response.
+        @desc_ A 429 settles the permit without a sample: throttling says nothing about the
+               model's health, so it must not close a half-open circuit. 5xx is a failure,
+               anything else a success.
+        """
+        if status_code == 429:
+            self._release_circuit_(permit)
+        else:
+            self._record_outcome_(permit, started, failed=status_code >= 500)
+
+    def _release_circuit_(self, permit):
+        """
+        @func_ _release_circuit_
+        @params permit : (CircuitPermit | None) Permit returned by _check_circuit_.
+        @desc_ Called in a finally on every attempt; frees a half-open probe slot the attempt
+               never recorded (interrupted, cancelled). No-op once the outcome was recorded.
+        """
+        if permit is not None:
+            permit._release_()
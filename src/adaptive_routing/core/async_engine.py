@@ -0,0 +1,362 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/core/async_engine.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Native asyncio counterparts of LLMRequestEngine and RerankEngine with per-model
+##        concurrency limits and non-blocking retry backoff.
+## @deps aiohttp, asyncio, json, logging, time, weakref, src.adaptive_routing.config, src.adaptive_routing.core.engine, src.adaptive_routing.core.reranker, src.adaptive_routing.core.cache, src.adaptive_routing.core.exceptions
+
+import asyncio
+import json
+import logging
+import time
+import weakref
+import aiohttp
+from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.engine import LLMRequestEngine
+from src.adaptive_routing.core.reranker import RerankEngine
+from src.adaptive_routing.core.cache import ResponseCache
+from src.adaptive_routing.core.exceptions import (
+    APIConnectionError,
+    APIResponseError
+)
+
+logger = logging.getLogger(__name__)
+
+class AsyncHTTPTransport:
+    """
+    @class AsyncHTTPTransport
+    @desc_ Pooled keep-alive aiohttp session. aiohttp sessions are bound to an event loop,
+           so one shared transport is kept per running loop.
+    @attr_ _session : (aiohttp.ClientSession) Session owning the connection pool.
+    """
+    _by_loop = weakref.WeakKeyDictionary()
+
+    def __init__(self, pool_maxsize=None):
+        limit = pool_maxsize if pool_maxsize is not None else FrameworkConfig._HTTP_POOL_MAXSIZE
+        ## @logic_ limit=0 lets the semaphores, not the connector, decide overall concurrency
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=max(limit, FrameworkConfig._ASYNC_MAX_CONCURRENCY_PER_MODEL))
+        ## @logic_ Connection-creation hooks report handshake cost to per-call telemetry
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_start.append(_on_connection_create_start_)
+        trace_config.on_connection_create_end.append(_on_connection_create_end_)
+        self._session = aiohttp.ClientSession(connector=connector, trace_configs=[trace_config])
+
+    @classmethod
+    def _get_shared_(cls):
+        """
+        @func_ _get_shared_
+        @returns (AsyncHTTPTransport) The transport bound to the running event loop.
+        @desc_ Must be called from inside a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        transport = cls._by_loop.get(loop)
+        if transport is None or transport._session.closed:
+            transport = cls()
+            cls._by_loop[loop] = transport
+        return transport
+
+    @classmethod
+    async def _close_shared_(cls):
+        """
+        @func_ _close_shared_
+        @desc_ Closes the running loop's shared transport. Call before the loop shuts down.
+        """
+        transport = cls._by_loop.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport._close_()
+
+    async def _post_(self, url, headers=None, json=None, timeout=None, timing=None):
+        """
+        @func_ _post_
+        @params url : (str) Target endpoint.
+        @params headers : (dict) HTTP headers.
+        @params json : (dict) JSON request body.
+        @params timeout : (int) Total request timeout in seconds.
+        @params timing : (dict, optional) Receives "connect" and "ttfb" in seconds.
+        @returns (tuple) (status_code: int, body: str, headers: Mapping)
+        @desc_ Issues a POST and reads the full body so the connection returns to the pool.
+        """
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        started = time.monotonic()
+        async with self._session.post(url, headers=headers, json=json, timeout=client_timeout, trace_request_ctx=timing) as response:
+            if timing is not None:
+                timing["ttfb"] = time.monotonic() - started
+                timing.setdefault("connect", 0.0)
+            return response.status, await response.text(), response.headers
+
+    async def _close_(self):
+        """
+        @func_ _close_
+        @desc_ Releases all pooled connections.
+        """
+        await self._session.close()
+
+
+async def _on_connection_create_start_(session, context, params):
+    context.connect_started = time.monotonic()
+
+async def _on_connection_create_end_(session, context, params):
+    if isinstance(context.trace_request_ctx, dict):
+        context.trace_request_ctx["connect"] = time.monotonic() - context.connect_started
+
+
+## @const_ _MODEL_SEMAPHORES : loop -> {model: asyncio.Semaphore}; shared by every async engine.
+_MODEL_SEMAPHORES = weakref.WeakKeyDictionary()
+
+def _get_model_semaphore_(model, limit=None):
+    """
+    @func_ _get_model_semaphore_
+    @params model : (str) Model identifier the semaphore guards.
+    @params limit : (int, optional) Max in-flight calls for this model.
+    @returns (asyncio.Semaphore) The semaphore for the model on the running loop.
+    @desc_ Lazily creates one semaphore per model so all engines targeting the same
+           model share a single concurrency budget.
+    """
+    loop = asyncio.get_running_loop()
+    per_loop = _MODEL_SEMAPHORES.setdefault(loop, {})
+    if model not in per_loop:
+        per_loop[model] = asyncio.Semaphore(limit or FrameworkConfig._ASYNC_MAX_CONCURRENCY_PER_MODEL)
+    return per_loop[model]
+
+async def _post_with_retry_(engine, payload, timeout, context, trace=None):
+    """
+    @func_ _post_with_retry_
+    @params engine : (LLMRequestEngine | RerankEngine) Caller providing url, headers and error mapping;
+            a sync engine (e.g. a hedge fallback) uses the shared transport and default concurrency.
+    @params payload : (dict) The JSON request payload.
+    @params timeout : (int) Request timeout in seconds.
+    @params context : (str) Description of the operation for error messages.
+    @params trace : (CallTrace, optional) Receives queue wait, retries and timings.
+    @returns (dict) Parsed JSON response from the API.
+    @desc_ Async mirror of the sync `_call_api_` loop: retries timeouts and connection
+           failures with exponential backoff (asyncio.sleep), re-queues 429s through the
+           shared rate limiter, fails fast on other HTTP errors.
+    """
+    headers = engine._build_headers_()
+    timeout = timeout or FrameworkConfig._REQUEST_TIMEOUT
+    retries = FrameworkConfig._RETRY_COUNT
+    backoff = FrameworkConfig._RETRY_BACKOFF
+    transport = getattr(engine, "_async_transport", None) or AsyncHTTPTransport._get_shared_()
+    semaphore = _get_model_semaphore_(engine._model, getattr(engine, "_max_concurrency", None))
+    limiter = engine._limiter
+    requeues = 0
+    attempt = 0
+
+    ## @iter_ while : Retrying the API call based on backoff logic (429 re-queues do not count)
+    while True:
+        started = None
+        permit = None
+        timing = {}
+        try:
+            waited = await limiter._acquire_async_(engine._api_key, engine._model) if limiter is not None else 0.0
+            async with semaphore:
+                ## @logic_ Admitted only once a slot is free, so a half-open probe slot is not held while queued
+                permit = engine._check_circuit_()
+                started = time.monotonic()
+                status, body, response_headers = await transport._post_(engine._url, headers=headers, json=payload, timeout=timeout, timing=timing)
+            if trace is not None:
+                trace.queue_wait += waited
+                trace.retries = attempt + requeues
+                trace.connect = timing.get("connect")
+                trace.ttfb = timing.get("ttfb")
+            engine._record_response_(permit, started, status)
+            if status < 400 and getattr(engine, "_latency", None) is not None:
+                engine._latency._record_(engine._model, "call", time.monotonic() - started)
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError) as e:
+            engine._record_outcome_(permit, started, failed=True)
+            if attempt < retries:
+                wait_time = backoff * (2 ** attempt)
+                attempt += 1
+                logger.warning(f"{context} attempt {attempt} failed ({type(e).__name__}). Retrying in {wait_time:.1f}s...")
+                await asyncio.sleep(wait_time)
+                continue
+            if isinstance(e, asyncio.TimeoutError):
+                raise APIConnectionError(
+                    f"{context} timed out after {timeout} seconds. Details: {str(e)}"
+                ) from e
+            raise APIConnectionError(
+                f"{context} failed: Could not connect to OpenRouter API. Check your internet connection. Details: {str(e)}"
+            ) from e
+        except aiohttp.ClientError as e:
+            engine._record_outcome_(permit, started, failed=True)
+            raise APIConnectionError(f"{context} failed unexpectedly: {str(e)}") from e
+        finally:
+            ## @logic_ Cancellation (hedge loser, client disconnect) settles the permit without a sample
+            engine._release_circuit_(permit)
+
+        if (limiter is not None
+                and limiter._record_(engine._api_key, engine._model, status, response_headers)
+                and requeues < FrameworkConfig._RATE_LIMIT_MAX_REQUEUES):
+            requeues += 1
+            continue
+
+        ## @logic_ Non-retryable errors (auth, model not found, etc.) — fail immediately
+        if status >= 400:
+            engine._raise_http_error_(status, body)
+        try:
+            return json.loads(body)
+        except json.JSONDecodeError as e:
+            raise APIResponseError(f"Failed to decode API response JSON. Details: {str(e)}") from e
+
+
+class AsyncLLMRequestEngine(LLMRequestEngine):
+    """
+    @class AsyncLLMRequestEngine
+    @desc_ asyncio counterpart of LLMRequestEngine. Reuses the same validation, payload
+           building, `_parse_response_` semantics and exception mapping; only the I/O differs.
+           `_get_completion_` and `_get_chat_completion_` are coroutines here.
+    @attr_ _max_concurrency : (int) In-flight cap for this engine's model (shared per model).
+    @attr_ _async_transport : (AsyncHTTPTransport | None) Explicit transport, else per-loop shared.
+    """
+    def __init__(self, api_key=None, model=None, temperature=None, max_tokens=None, use_system_role=None, include_reasoning=None, reasoning_effort=None, max_concurrency=None, transport=None, cache=None, limiter=None, breaker=None, hedge=None, coalesce=False, stage=None, route=None):
+        super().__init__(
+            api_key=api_key,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            use_system_role=use_system_role,
+            include_reasoning=include_reasoning,
+            reasoning_effort=reasoning_effort,
+            cache=cache,
+            limiter=limiter,
+            breaker=breaker,
+            hedge=hedge,
+            coalesce=coalesce,
+            stage=stage,
+            route=route
+        )
+        self._max_concurrency = max_concurrency
+        self._async_transport = transport
+
+    async def _call_api_(self, payload, timeout=None):
+        """
+        @func_ _call_api_
+        @params payload : (dict) The JSON request payload.
+        @params timeout : (int) Request timeout in seconds.
+        @returns (dict) Parsed JSON response from the API.
+        @desc_ Non-blocking API call with bounded per-model concurrency and retry logic.
+               With a hedge policy the duplicate goes to the policy's engine (the same model
+               unless HEDGE_USE_FALLBACK); the loser is cancelled.
+        """
+        request_key = None
+        if self._cache is not None or self._single_flight is not None:
+            request_key = ResponseCache._make_key_(self._url, payload)
+        trace = self._begin_trace_()
+
+        try:
+            if self._cache is not None:
+                cached = self._cache._get_(request_key)
+                if cached is not None and self._is_cacheable_(cached):
+                    if trace is not None:
+                        trace.cache_hit = True
+                    return cached
+
+            if self._single_flight is not None:
+                response_json = await self._single_flight._do_async_(request_key, lambda: self._dispatch_request_async_(payload, timeout, trace))
+            else:
+                response_json = await self._dispatch_request_async_(payload, timeout, trace)
+            if self._cache is not None and self._is_cacheable_(response_json):
+                self._cache._put_(request_key, response_json)
+            self._trace_usage_(trace, response_json)
+            return response_json
+        except BaseException as e:
+            if trace is not None:
+                trace._fail_(e)
+            raise
+        finally:
+            if trace is not None:
+                self._telemetry._emit_(trace)
+
+    async def _dispatch_request_async_(self, payload, timeout=None, trace=None):
+        """
+        @func_ _dispatch_request_async_
+        @desc_ Async counterpart of _dispatch_request_.
+        """
+        if self._hedge is None:
+            return await _post_with_retry_(self, payload, timeout, context="Completion", trace=trace)
+        return await self._hedge._run_async_(
+            self,
+            lambda engine, attempt_trace: _post_with_retry_(engine, self._retarget_payload_(payload, engine), timeout, context="Completion", trace=attempt_trace),
+            kind="call",
+            trace=trace
+        )
+
+    async def _get_completion_(self, prompt, sys_message, images=None):
+        """
+        @func_ _get_completion_
+        @params prompt : (str) The user's input prompt.
+        @params sys_message : (str) System instruction (role).
+        @params images : (list) Optional list of image paths/URLs.
+        @returns (str) The AI's response text.
+        @raises AuthenticationError, ModelNotFoundError, APIConnectionError, APIResponseError
+        @desc_ Async single-turn completion.
+        """
+        payload = self._build_completion_payload_(prompt, sys_message, images=images)
+        response_json = await self._call_api_(payload)
+        return self._parse_response_(response_json)
+
+    async def _get_chat_completion_(self, messages: list) -> str:
+        """
+        @func_ _get_chat_completion_
+        @params messages : (list) List of message dicts (role, content).
+        @returns (str) The AI's response text.
+        @desc_ Async multi-turn completion.
+        """
+        payload = self._build_chat_payload_(messages)
+        response_json = await self._call_api_(payload)
+        return self._parse_response_(response_json)
+
+
+class AsyncRerankEngine(RerankEngine):
+    """
+    @class AsyncRerankEngine
+    @desc_ asyncio counterpart of RerankEngine with the same payload, parsing and error mapping.
+    @attr_ _max_concurrency : (int) In-flight cap for this reranker model (shared per model).
+    @attr_ _async_transport : (AsyncHTTPTransport | None) Explicit transport, else per-loop shared.
+    """
+    def __init__(self, api_key=None, model=None, max_concurrency=None, transport=None, limiter=None, breaker=None, coalesce=None):
+        super().__init__(api_key=api_key, model=model, limiter=limiter, breaker=breaker, coalesce=coalesce)
+        self._max_concurrency = max_concurrency
+        self._async_transport = transport
+
+    async def _call_rerank_api_(self, payload, timeout=None):
+        """
+        @func_ _call_rerank_api_
+        @params payload : (dict) The JSON request payload.
+        @params timeout : (int) Request timeout in seconds.
+        @returns (dict) Parsed JSON response from the API.
+        @desc_ Non-blocking rerank call with bounded per-model concurrency and retry logic.
+               Identical concurrent rerank payloads share one request when coalescing is on.
+        """
+        trace = self._begin_trace_()
+        try:
+            if self._single_flight is None:
+                response_json = await _post_with_retry_(self, payload, timeout, context="Rerank", trace=trace)
+            else:
+                response_json = await self._single_flight._do_async_(
+                    ResponseCache._make_key_(self._url, payload),
+                    lambda: _post_with_retry_(self, payload, timeout, context="Rerank", trace=trace)
+                )
+            self._trace_usage_(trace, response_json)
+            return response_json
+        except BaseException as e:
+            if trace is not None:
+                trace._fail_(e)
+            raise
+        finally:
+            if trace is not None:
+                self._telemetry._emit_(trace)
+
+    async def _rerank_(self, query, documents, top_n=None):
+        """
+        @func_ _rerank_
+        @params query : (str) The search query to rerank documents against.
+        @params documents : (list[str]) Document texts to rerank.
+        @params top_n : (int, optional) Number of most relevant documents to return.
+        @returns (list[dict]) Sorted results, each containing 'index', 'relevance_score', 'text'.
+        @desc_ Async rerank call.
+        """
+        payload = self._build_rerank_payload_(query, documents, top_n=top_n)
+        response_json = await self._call_rerank_api_(payload)
+        return self._parse_rerank_response_(response_json)
@@ -0,0 +1,190 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/core/cache.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Opt-in response cache for deterministic engine calls (router, triage, audit).
+##        Two tiers: in-memory LRU and an optional SQLite store, both with TTL and size eviction.
+## @deps json, hashlib, sqlite3, threading, time, logging, collections, src.adaptive_routing.config
+
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+import logging
+from collections import OrderedDict
+from src.adaptive_routing.config import FrameworkConfig
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    @class ResponseCache
+    @desc_ Maps a canonical hash of (endpoint, model, messages, temperature, max_tokens,
+           reasoning settings) to the raw API response JSON.
+    @attr_ _max_entries : (int) Memory-tier capacity before LRU eviction.
+    @attr_ _ttl : (float) Seconds an entry stays valid (0 disables expiry).
+    @attr_ _db_path : (str | None) SQLite file for the disk tier, or None for memory only.
+    @attr_ _max_disk_entries : (int) Disk-tier capacity before least-recently-used rows are dropped.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries=None, ttl=None, db_path=None, max_disk_entries=None):
+        self._max_entries = max_entries if max_entries is not None else FrameworkConfig._RESPONSE_CACHE_MAX_ENTRIES
+        self._ttl = ttl if ttl is not None else FrameworkConfig._RESPONSE_CACHE_TTL
+        self._db_path = db_path if db_path is not None else FrameworkConfig._RESPONSE_CACHE_PATH
+        self._max_disk_entries = max_disk_entries if max_disk_entries is not None else FrameworkConfig._RESPONSE_CACHE_MAX_DISK_ENTRIES
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._disk_hits = 0
+        self._evictions = 0
+
+        self._db = None
+        if self._db_path:
+            self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+            self._db.commit()
+
+    @classmethod
+    def _get_shared_(cls):
+        """
+        @func_ _get_shared_
+        @returns (ResponseCache) The process-wide cache built from FrameworkConfig.
+        @desc_ Lazily creates the shared cache on first use (thread-safe).
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def _for_config_(cls):
+        """
+        @func_ _for_config_
+        @returns (ResponseCache | None) The shared cache if enabled in config, else None.
+        @desc_ Convenience used by modules when wiring their deterministic engines.
+        """
+        return cls._get_shared_() if FrameworkConfig._RESPONSE_CACHE_ENABLED else None
+
+    @staticmethod
+    def _make_key_(url, payload):
+        """
+        @func_ _make_key_
+        @params url : (str) Endpoint the payload is sent to.
+        @params payload : (dict) The JSON request payload.
+        @returns (str) SHA-256 hex digest of the canonical request.
+        @desc_ Sorted keys and compact separators make logically equal payloads hash equally.
+        """
+        canonical = json.dumps({"url": url, "payload": payload}, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _get_(self, key):
+        """
+        @func_ _get_
+        @params key : (str) Cache key from _make_key_.
+        @returns (dict | None) The cached response JSON, or None on miss/expiry.
+        @desc_ Checks the memory tier first, then the disk tier (promoting hits to memory).
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if not self._ttl or now - created <= self._ttl:
+                    self._memory.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value_json, created = row
+                    if not self._ttl or now - created <= self._ttl:
+                        self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        value = json.loads(value_json)
+                        self._store_memory_(key, created, value)
+                        self._hits += 1
+                        self._disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self._misses += 1
+            return None
+
+    def _put_(self, key, value):
+        """
+        @func_ _put_
+        @params key : (str) Cache key from _make_key_.
+        @params value : (dict) Response JSON to store.
+        @desc_ Writes through to both tiers and evicts beyond capacity.
+        """
+        now = time.time()
+        with self._lock:
+            self._store_memory_(key, now, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, now)
+                )
+                ## @logic_ Trim the least recently accessed rows once the disk tier overflows
+                count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self._max_disk_entries:
+                    self._db.execute(
+                        "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)",
+                        (count - self._max_disk_entries,)
+                    )
+                    self._evictions += count - self._max_disk_entries
+                self._db.commit()
+
+    def _store_memory_(self, key, created, value):
+        """
+        @func_ _store_memory_
+        @desc_ Inserts into the LRU tier; caller must hold the lock.
+        """
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+            self._evictions += 1
+
+    def _clear_(self):
+        """
+        @func_ _clear_
+        @desc_ Drops every entry from both tiers and resets the counters.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+            self._hits = self._misses = self._disk_hits = self._evictions = 0
+
+    def _stats_(self):
+        """
+        @func_ _stats_
+        @returns (dict) Hit/miss counters and tier sizes.
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "disk_hits": self._disk_hits,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_enabled": self._db is not None
+            }
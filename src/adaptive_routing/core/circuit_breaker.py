@@ -0,0 +1,328 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/core/circuit_breaker.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Per-model circuit breakers (closed / open / half-open) driven by a rolling window
+##        of error rate and slow-call rate, so a degraded model fails fast instead of
+##        burning the full timeout-and-retry budget on every request.
+## @deps threading, time, logging, collections, src.adaptive_routing.config, src.adaptive_routing.core.exceptions
+
+import threading
+import time
+import logging
+from collections import deque
+from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.exceptions import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+class ModelCircuit:
+    """
+    @class ModelCircuit
+    @desc_ State machine for one model.
+           CLOSED    -> calls flow; trips to OPEN when the rolling error or slow-call rate
+                        crosses its threshold (after at least _min_calls samples).
+           OPEN      -> calls are rejected until _cooldown elapses, then HALF_OPEN.
+           HALF_OPEN -> up to _half_open_probes calls are let through; one healthy probe
+                        closes the circuit, a failed or slow probe re-opens it. Results of
+                        calls admitted before this probing round are ignored.
+    @attr_ _samples : (deque) (timestamp, failed, slow) within the rolling window.
+    @attr_ _epoch : (int) Incremented on every entry into HALF_OPEN, so a probe released late
+                    never frees a slot of a later probing round.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, model, window=None, min_calls=None, error_rate=None, slow_call_sec=None, slow_call_rate=None, cooldown=None, half_open_probes=None):
+        self._model = model
+        self._window = window if window is not None else FrameworkConfig._CIRCUIT_WINDOW_SEC
+        self._min_calls = min_calls if min_calls is not None else FrameworkConfig._CIRCUIT_MIN_CALLS
+        self._error_rate = error_rate if error_rate is not None else FrameworkConfig._CIRCUIT_ERROR_RATE
+        self._slow_call_sec = slow_call_sec if slow_call_sec is not None else FrameworkConfig._CIRCUIT_SLOW_CALL_SEC
+        self._slow_call_rate = slow_call_rate if slow_call_rate is not None else FrameworkConfig._CIRCUIT_SLOW_CALL_RATE
+        self._cooldown = cooldown if cooldown is not None else FrameworkConfig._CIRCUIT_COOLDOWN_SEC
+        self._half_open_probes = half_open_probes if half_open_probes is not None else FrameworkConfig._CIRCUIT_HALF_OPEN_PROBES
+
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._epoch = 0
+        self._samples = deque()
+        self._lock = threading.Lock()
+
+        self._rejected = 0
+        self._trips = 0
+
+    def _trim_(self, now):
+        """
+        @func_ _trim_
+        @desc_ Drops samples older than the rolling window; caller must hold the lock.
+        """
+        while self._samples and now - self._samples[0][0] > self._window:
+            self._samples.popleft()
+
+    def _open_(self, now, reason):
+        """
+        @func_ _open_
+        @desc_ Transitions to OPEN; caller must hold the lock.
+        """
+        self._state = self.OPEN
+        self._opened_at = now
+        self._probes_in_flight = 0
+        self._trips += 1
+        logger.warning(f"Circuit OPEN for '{self._model}' ({reason}). Failing fast for {self._cooldown:.0f}s.")
+
+    def _acquire_(self):
+        """
+        @func_ _acquire_
+        @returns (CircuitPermit | None) A permit for one attempt, or None when the call is rejected.
+        @desc_ While HALF_OPEN the permit holds one of the probe slots until it is settled.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._state == self.OPEN:
+                if now - self._opened_at < self._cooldown:
+                    self._rejected += 1
+                    return None
+                self._state = self.HALF_OPEN
+                self._probes_in_flight = 0
+                self._epoch += 1
+                logger.info(f"Circuit HALF-OPEN for '{self._model}'. Probing.")
+
+            probe = None
+            if self._state == self.HALF_OPEN:
+                if self._probes_in_flight >= self._half_open_probes:
+                    self._rejected += 1
+                    return None
+                self._probes_in_flight += 1
+                probe = self._epoch
+            return CircuitPermit(self, probe)
+
+    def _release_(self, probe):
+        """
+        @func_ _release_
+        @params probe : (int) Epoch of the probe slot taken by _acquire_.
+        @desc_ Frees a probe slot without a sample (the attempt was cancelled or abandoned).
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN and probe == self._epoch:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _retry_in_(self):
+        """
+        @func_ _retry_in_
+        @returns (float) Seconds until the circuit admits a probe (0 if not open).
+        """
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._cooldown - (time.monotonic() - self._opened_at))
+
+    def _record_(self, failed, latency, slow_call_sec=None, probe=None):
+        """
+        @func_ _record_
+        @params failed : (bool) True for timeouts, connection errors and 5xx responses.
+        @params latency : (float) Seconds the attempt took.
+        @params slow_call_sec : (float, optional) Slow threshold for this call (route/stage specific); default _slow_call_sec.
+        @params probe : (int, optional) Epoch of the probe slot the attempt held.
+        @desc_ Adds a sample and re-evaluates the state. While HALF_OPEN only a probe of the
+               current round decides; a late call admitted while CLOSED (or by an earlier
+               round) neither closes nor re-opens the circuit.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slow_call_sec = self._slow_call_sec if slow_call_sec is None else slow_call_sec
+            slow = bool(slow_call_sec) and latency >= slow_call_sec
+
+            if self._state == self.HALF_OPEN:
+                if probe != self._epoch:
+                    return
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._open_(now, "half-open probe " + ("failed" if failed else f"took {latency:.1f}s"))
+                else:
+                    self._state = self.CLOSED
+                    self._samples.clear()
+                    logger.info(f"Circuit CLOSED for '{self._model}'. Model recovered.")
+                return
+
+            self._samples.append((now, failed, slow))
+            self._trim_(now)
+            if self._state != self.CLOSED or len(self._samples) < self._min_calls:
+                return
+
+            total = len(self._samples)
+            failures = sum(1 for _, f, _ in self._samples if f)
+            slow_calls = sum(1 for _, _, s in self._samples if s)
+            if failures / total >= self._error_rate:
+                self._open_(now, f"error rate {failures}/{total}")
+            elif slow_calls and slow_calls / total >= self._slow_call_rate:
+                self._open_(now, f"slow calls {slow_calls}/{total}")
+
+    def _stats_(self):
+        """
+        @func_ _stats_
+        @returns (dict) State, window counts and trip/rejection counters.
+        """
+        with self._lock:
+            self._trim_(time.monotonic())
+            total = len(self._samples)
+            failures = sum(1 for _, f, _ in self._samples if f)
+            return {
+                "state": self._state,
+                "window_calls": total,
+                "window_error_rate": round(failures / total, 3) if total else 0.0,
+                "trips": self._trips,
+                "rejected": self._rejected
+            }
+
+
+class CircuitPermit:
+    """
+    @class CircuitPermit
+    @desc_ One attempt admitted by a ModelCircuit. It is settled exactly once: _record_ feeds
+           the outcome to the circuit, _release_ only gives back a half-open probe slot.
+           Settling again is a no-op, so callers record on the normal paths and release in a
+           finally; a cancelled or abandoned attempt can then never hold a probe slot forever.
+    @attr_ _probe : (int | None) Epoch of the probe slot held, None when admitted while CLOSED.
+    """
+    __slots__ = ("_circuit", "_probe", "_settled")
+
+    def __init__(self, circuit, probe=None):
+        self._circuit = circuit
+        self._probe = probe
+        self._settled = False
+
+    def _record_(self, failed, latency, slow_call_sec=None):
+        """
+        @func_ _record_
+        @params failed : (bool) Whether the attempt counts as a failure.
+        @params latency : (float) Seconds the attempt took.
+        @params slow_call_sec : (float, optional) Slow threshold for this call.
+        """
+        if self._settled:
+            return
+        self._settled = True
+        self._circuit._record_(failed, latency, slow_call_sec, probe=self._probe)
+
+    def _release_(self):
+        """
+        @func_ _release_
+        @desc_ Settles the permit without a sample.
+        """
+        if self._settled:
+            return
+        self._settled = True
+        if self._probe is not None:
+            self._circuit._release_(self._probe)
+
+
+class CircuitBreaker:
+    """
+    @class CircuitBreaker
+    @desc_ Registry of ModelCircuits shared by every engine, so all modules calling the same
+           model see the same health state.
+    @attr_ _circuits : (dict) model -> ModelCircuit.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _get_shared_(cls):
+        """
+        @func_ _get_shared_
+        @returns (CircuitBreaker) The process-wide registry.
+        @desc_ Lazily creates the shared registry on first use (thread-safe).
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def _for_config_(cls):
+        """
+        @func_ _for_config_
+        @returns (CircuitBreaker | None) The shared registry if enabled in config, else None.
+        """
+        return cls._get_shared_() if FrameworkConfig._CIRCUIT_BREAKER_ENABLED else None
+
+    def _circuit_(self, model):
+        """
+        @func_ _circuit_
+        @params model : (str) Model identifier.
+        @returns (ModelCircuit) The circuit for this model, created on first use.
+        """
+        circuit = self._circuits.get(model)
+        if circuit is None:
+            with self._lock:
+                circuit = self._circuits.setdefault(model, ModelCircuit(model))
+        return circuit
+
+    def _before_call_(self, model):
+        """
+        @func_ _before_call_
+        @params model : (str) Model about to be called.
+        @returns (CircuitPermit) Permit the caller must settle (_record_ or _release_) on every exit.
+        @raises CircuitOpenError if the model's circuit rejects the call.
+        """
+        circuit = self._circuit_(model)
+        permit = circuit._acquire_()
+        if permit is None:
+            retry_in = circuit._retry_in_()
+            raise CircuitOpenError(
+                f"Circuit open for model '{model}'. Retry in {retry_in:.0f}s or use a fallback model.",
+                model=model,
+                retry_in=retry_in
+            )
+        return permit
+
+    def _record_(self, model, failed, latency, slow_call_sec=None):
+        """
+        @func_ _record_
+        @params model : (str) Model that was called.
+        @params failed : (bool) Whether the attempt counts as a failure.
+        @params latency : (float) Seconds the attempt took.
+        @params slow_call_sec : (float, optional) Slow threshold for this call.
+        @desc_ Records an outcome without a permit: counted while CLOSED, ignored while HALF_OPEN.
+        """
+        self._circuit_(model)._record_(failed, latency, slow_call_sec)
+
+    @staticmethod
+    def _slow_call_sec_(model, route=None, stage=None):
+        """
+        @func_ _slow_call_sec_
+        @params model : (str) Model being called.
+        @params route : (str, optional) Generation route (e.g. 'Reasoning-LLM').
+        @params stage : (str, optional) Pipeline stage (e.g. 'audit').
+        @returns (float) Slow-call threshold from _CIRCUIT_SLOW_CALL_SEC_BY (model, then route,
+                 then stage), else _CIRCUIT_SLOW_CALL_SEC. Long reasoning/audit generations get
+                 their own budget instead of tripping the shared default.
+        """
+        overrides = FrameworkConfig._CIRCUIT_SLOW_CALL_SEC_BY
+        for key in (model, route, stage):
+            if key and key in overrides:
+                return overrides[key]
+        return FrameworkConfig._CIRCUIT_SLOW_CALL_SEC
+
+    def _state_(self, model):
+        """
+        @func_ _state_
+        @returns (str) "closed", "open" or "half_open".
+        """
+        return self._circuit_(model)._state
+
+    def _stats_(self):
+        """
+        @func_ _stats_
+        @returns (dict) model -> circuit stats.
+        """
+        with self._lock:
+            items = list(self._circuits.items())
+        return {model: circuit._stats_() for model, circuit in items}
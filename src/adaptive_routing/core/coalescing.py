@@ -0,0 +1,127 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/core/coalescing.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Single-flight request coalescing: concurrent calls with the same canonical payload
+##        share one upstream request and all receive its result (or its error).
+## @deps asyncio, threading, weakref
+
+import asyncio
+import threading
+import weakref
+
+class _Flight:
+    """
+    @class _Flight
+    @desc_ One in-flight sync call and the outcome its followers wait for.
+    """
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    @class SingleFlight
+    @desc_ The first caller for a key (the leader) performs the request; callers arriving
+           while it is in flight block until it finishes and share the outcome. Nothing is
+           kept after completion, so this never serves stale data (see ResponseCache for that).
+           Shared results are the same object for every caller and must be treated as read-only.
+    @attr_ _flights : (dict) key -> _Flight for sync callers.
+    @attr_ _tasks : (WeakKeyDictionary) loop -> {key: asyncio.Task} for async callers.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._flights = {}
+        self._tasks = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._coalesced = 0
+
+    @classmethod
+    def _get_shared_(cls):
+        """
+        @func_ _get_shared_
+        @returns (SingleFlight) The process-wide coalescer.
+        @desc_ Lazily creates the shared coalescer on first use (thread-safe).
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    def _do_(self, key, fn):
+        """
+        @func_ _do_
+        @params key : (str) Canonical request key (see ResponseCache._make_key_).
+        @params fn : (callable) Performs the request; only the leader calls it.
+        @returns (any) The leader's result.
+        @raises The leader's exception, re-raised in every follower.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    async def _do_async_(self, key, coro_fn):
+        """
+        @func_ _do_async_
+        @params key : (str) Canonical request key.
+        @params coro_fn : (callable) Returns the coroutine performing the request.
+        @returns (any) The shared task's result.
+        @desc_ The request runs as its own task and every caller awaits it through
+               asyncio.shield, so one caller being cancelled does not cancel the others.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                task = asyncio.ensure_future(coro_fn())
+                tasks[key] = task
+                task.add_done_callback(lambda done: tasks.pop(key, None) if tasks.get(key) is done else None)
+                self._executed += 1
+            else:
+                self._coalesced += 1
+        return await asyncio.shield(task)
+
+    def _stats_(self):
+        """
+        @func_ _stats_
+        @returns (dict) Upstream requests executed vs. callers served by a shared flight.
+        """
+        with self._lock:
+            total = self._executed + self._coalesced
+            return {
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._flights),
+                "coalesce_rate": round(self._coalesced / total, 4) if total else 0.0
+            }
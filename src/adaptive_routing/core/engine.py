@@ -3,13 +3,20 @@
 ## @file src/adaptive_routing/core/engine.py
 ## @project_ LLM Legal Adaptive Routing Framework
 ## @desc_ Handler for OpenRouter API requests with robust error management.
-## @deps requests, json, time, logging, src.adaptive_routing.config, src.adaptive_routing.core.exceptions
+## @deps requests, json, time, logging, src.adaptive_routing.config, src.adaptive_routing.core.api_client, src.adaptive_routing.core.rate_limiter, src.adaptive_routing.core.circuit_breaker, src.adaptive_routing.core.hedging, src.adaptive_routing.core.coalescing, src.adaptive_routing.core.cache, src.adaptive_routing.core.telemetry, src.adaptive_routing.core.exceptions
 
 import requests
 import json
 import time
 import logging
 from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.api_client import APIClientMixin
+from src.adaptive_routing.core.rate_limiter import RateLimiter
+from src.adaptive_routing.core.circuit_breaker import CircuitBreaker
+from src.adaptive_routing.core.hedging import LatencyTracker
+from src.adaptive_routing.core.coalescing import SingleFlight
+from src.adaptive_routing.core.cache import ResponseCache
+from src.adaptive_routing.core.telemetry import Telemetry
 from src.adaptive_routing.core.exceptions import (
     AuthenticationError,
     ModelNotFoundError,
@@ -20,19 +27,41 @@ from src.adaptive_routing.core.exceptions import (
 
 logger = logging.getLogger(__name__)
 
-class LLMRequestEngine:
+class LLMRequestEngine(APIClientMixin):
     """
     @class LLMRequestEngine
-    @desc_ Provides a unified interface for OpenRouter completions.
+    @desc_ Provides a unified interface for OpenRouter completions. Retries, rate limiting,
+           circuit breaking and traces come from APIClientMixin.
     @attr_ _api_key : (str) Credential for the OpenRouter API.
     @attr_ _model : (str) The specific LLM model to target.
     @attr_ _temperature : (float) Controls randomness of output.
     @attr_ _max_tokens : (int) Limit on response length.
     @attr_ _use_system_role : (bool) Toggle for system prompt support.
     @attr_ _reasoning_effort : (str) The reasoning effort level (e.g., 'low', 'medium', 'high').
+    @attr_ _transport : (HTTPTransport | None) Pooled keep-alive transport; None until _get_transport_
+                        resolves the process-wide one.
+    @attr_ _cache : (ResponseCache | None) Optional response cache; None disables caching.
+    @attr_ _limiter : (RateLimiter | None) Shared adaptive rate limiter; None disables queueing.
+    @attr_ _breaker : (CircuitBreaker | None) Shared per-model circuit breaker; None disables it.
+    @attr_ _hedge : (HedgePolicy | None) Optional hedging policy; None sends a single request.
+    @attr_ _latency : (LatencyTracker) Shared per-model latency histograms fed by every attempt.
+    @attr_ _single_flight : (SingleFlight | None) Coalescer for identical concurrent calls (opt-in).
+    @attr_ _telemetry : (Telemetry | None) Shared per-call telemetry hub; None disables records.
+    @attr_ _stage : (str) Pipeline stage tag on telemetry records (e.g. 'triage', 'router').
+    @attr_ _route : (str | None) Generation route tag on telemetry records.
     """
-    def __init__(self, api_key=None, model=None, temperature=None, max_tokens=None, use_system_role=None, include_reasoning=None, reasoning_effort=None):
-        self._url = "https://openrouter.ai/api/v1/chat/completions"
+    def __init__(self, api_key=None, model=None, temperature=None, max_tokens=None, use_system_role=None, include_reasoning=None, reasoning_effort=None, transport=None, cache=None, limiter=None, breaker=None, hedge=None, coalesce=False, stage=None, route=None):
+        self._url = f"{FrameworkConfig._API_BASE_URL}/chat/completions"
+        self._transport = transport
+        self._cache = cache
+        self._limiter = limiter or RateLimiter._for_config_()
+        self._breaker = breaker or CircuitBreaker._for_config_()
+        self._hedge = hedge
+        self._latency = LatencyTracker._get_shared_()
+        self._single_flight = SingleFlight._get_shared_() if coalesce else None
+        self._telemetry = Telemetry._for_config_()
+        self._stage = stage or "completion"
+        self._route = route
         
         ## @logic_ Determine system role usage: Argument > Config > Default(True)
         if use_system_role is not None:
@@ -70,19 +99,6 @@ class LLMRequestEngine:
         if self._max_tokens <= 0:
             raise InvalidInputError(f"max_tokens must be positive, got {self._max_tokens}")
 
-    def _build_headers_(self):
-        """
-        @func_ _build_headers_
-        @returns (dict) HTTP headers for OpenRouter API requests.
-        @desc_ Centralized header construction used by all API methods.
-        """
-        return {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/404FoundUs", 
-            "X-Title": "LLM Legal Adaptive Routing Framework" 
-        }
-
     def _parse_response_(self, response_json):
         """
         @func_ _parse_response_
@@ -95,94 +111,104 @@ class LLMRequestEngine:
             
             # Extract content, ensuring it's at least an empty string if null
             content = message.get('content') or ""
-            
-            # Extract reasoning from multiple possible fields (OpenRouter / OpenAI / O1)
-            reasoning = message.get('reasoning') or message.get('reasoning_content')
-            
-            # Check for reasoning_details (list of dicts) used by some providers
-            if not reasoning and 'reasoning_details' in message:
-                details = message['reasoning_details']
-                if isinstance(details, list) and len(details) > 0:
-                    # Collect all summary/text parts from reasoning details
-                    parts = []
-                    for part in details:
-                        if isinstance(part, dict) and 'summary' in part:
-                            parts.append(part['summary'])
-                        elif isinstance(part, dict) and 'text' in part:
-                            parts.append(part['text'])
-                        elif isinstance(part, dict) and 'data' in part and not part.get('type') == 'reasoning.encrypted':
-                             parts.append(part['data'])
-                    if parts:
-                        reasoning = "\n".join(parts)
-
-            # If user wants reasoning and we found some, prepend it
-            if self._include_reasoning and reasoning:
-                return f"<think>\n{reasoning}\n</think>\n\n{content}"
-            
-            # Fallback if content is null but we have reasoning (indicates reasoning took all tokens)
-            if not content and reasoning:
-                return f"[REASONING ONLY - NO CONTENT GENERATED]\n\n{reasoning}"
-            
-            # Final fallback if absolutely nothing was generated
-            if not content:
-                content = "The model returned an empty response (and no reasoning could be extracted). Please try increasing the MAX_TOKENS setting or check your API credits."
-            
-            return content
+            reasoning = self._extract_reasoning_(message)
+            return self._format_output_(content, reasoning)
         else:
             raise APIResponseError(
                 "Invalid response format from API: 'choices' field missing or empty.", 
                 response_body=response_json
             )
 
-    def _handle_request_error_(self, error, context="API request"):
-        """
-        @func_ _handle_request_error_
-        @params error : (Exception) The caught exception.
-        @params context : (str) Description of the operation for error messages.
-        @desc_ Unified error handler that maps HTTP status codes to framework exceptions.
-        """
-        if isinstance(error, requests.exceptions.HTTPError):
-            status_code = error.response.status_code
-            detail = error.response.text
-            if status_code == 401:
-                raise AuthenticationError(
-                    f"Invalid API Key provided. Details: {detail}"
-                ) from error
-            elif status_code == 404:
-                raise ModelNotFoundError(
-                    f"Model '{self._model}' not found or API endpoint invalid. Details: {detail}"
-                ) from error
-            elif status_code == 402:
-                raise APIResponseError(
-                    f"Insufficient credits. Details: {detail}", 
-                    status_code=402
-                ) from error
-            else:
-                raise APIResponseError(
-                    f"HTTP Error {status_code}: {detail}", 
-                    status_code=status_code, 
-                    response_body=detail
-                ) from error
+    @staticmethod
+    def _is_cacheable_(response_json):
+        """
+        @func_ _is_cacheable_
+        @params response_json : (dict) A response about to be cached or served from the cache.
+        @returns (bool) True when _parse_response_ would accept it (no "error", a first choice with a message).
+        @desc_ Keeps 200 responses carrying an error body, empty choices or malformed JSON
+               out of the cache, so a retry reaches the API instead of replaying the failure.
+        """
+        if not isinstance(response_json, dict) or "error" in response_json:
+            return False
+        choices = response_json.get("choices")
+        return isinstance(choices, list) and len(choices) > 0 and isinstance(choices[0], dict) and isinstance(choices[0].get("message"), dict)
+
+    def _extract_reasoning_(self, message):
+        """
+        @func_ _extract_reasoning_
+        @params message : (dict) A response message or a streaming delta.
+        @returns (str | None) The reasoning text, if any.
+        @desc_ Reads reasoning from the provider-specific fields (OpenRouter / OpenAI / O1).
+        """
+        reasoning = message.get('reasoning') or message.get('reasoning_content')
+        
+        # Check for reasoning_details (list of dicts) used by some providers
+        if not reasoning and 'reasoning_details' in message:
+            details = message['reasoning_details']
+            if isinstance(details, list) and len(details) > 0:
+                # Collect all summary/text parts from reasoning details
+                parts = []
+                for part in details:
+                    if isinstance(part, dict) and 'summary' in part:
+                        parts.append(part['summary'])
+                    elif isinstance(part, dict) and 'text' in part:
+                        parts.append(part['text'])
+                    elif isinstance(part, dict) and 'data' in part and not part.get('type') == 'reasoning.encrypted':
+                         parts.append(part['data'])
+                if parts:
+                    reasoning = "\n".join(parts)
+        return reasoning
+
+    def _format_output_(self, content, reasoning):
+        """
+        @func_ _format_output_
+        @params content : (str) The final answer text.
+        @params reasoning : (str | None) The extracted reasoning text.
+        @returns (str) The response text returned to modules.
+        @desc_ Applies the <think> prefix and empty-response fallbacks.
+        """
+        # If user wants reasoning and we found some, prepend it
+        if self._include_reasoning and reasoning:
+            return f"<think>\n{reasoning}\n</think>\n\n{content}"
         
-        elif isinstance(error, requests.exceptions.ConnectionError):
-            raise APIConnectionError(
-                f"{context} failed: Could not connect to OpenRouter API. Check your internet connection. Details: {str(error)}"
-            ) from error
+        # Fallback if content is null but we have reasoning (indicates reasoning took all tokens)
+        if not content and reasoning:
+            return f"[REASONING ONLY - NO CONTENT GENERATED]\n\n{reasoning}"
         
-        elif isinstance(error, requests.exceptions.Timeout):
-            raise APIConnectionError(
-                f"{context} timed out after {FrameworkConfig._REQUEST_TIMEOUT} seconds. Details: {str(error)}"
-            ) from error
-             
-        elif isinstance(error, requests.exceptions.RequestException):
-            raise APIConnectionError(
-                f"{context} failed unexpectedly: {str(error)}"
-            ) from error
+        # Final fallback if absolutely nothing was generated
+        if not content:
+            content = "The model returned an empty response (and no reasoning could be extracted). Please try increasing the MAX_TOKENS setting or check your API credits."
+        
+        return content
 
-        elif isinstance(error, json.JSONDecodeError):
+    def _raise_http_error_(self, status_code, detail, cause=None):
+        """
+        @func_ _raise_http_error_
+        @params status_code : (int) HTTP status code of the failed response.
+        @params detail : (str) Raw response body for diagnostics.
+        @params cause : (Exception, optional) Underlying transport exception.
+        @desc_ Maps an HTTP status code to the matching framework exception.
+               Shared by the sync and async engines.
+        """
+        if status_code == 401:
+            raise AuthenticationError(
+                f"Invalid API Key provided. Details: {detail}"
+            ) from cause
+        elif status_code == 404:
+            raise ModelNotFoundError(
+                f"Model '{self._model}' not found or API endpoint invalid. Details: {detail}"
+            ) from cause
+        elif status_code == 402:
+            raise APIResponseError(
+                f"Insufficient credits. Details: {detail}", 
+                status_code=402
+            ) from cause
+        else:
             raise APIResponseError(
-                f"Failed to decode API response JSON. Details: {str(error)}"
-            ) from error
+                f"HTTP Error {status_code}: {detail}", 
+                status_code=status_code, 
+                response_body=detail
+            ) from cause
 
     def _call_api_(self, payload, timeout=None):
         """
@@ -191,33 +217,185 @@ class LLMRequestEngine:
         @params timeout : (int) Request timeout in seconds.
         @returns (dict) Parsed JSON response from the API.
         @desc_ Executes an API call with retry logic and unified error handling.
+               When a cache is attached, identical payloads are served without a round trip;
+               with coalescing, identical concurrent payloads share one round trip.
+        """
+        request_key = None
+        if self._cache is not None or self._single_flight is not None:
+            request_key = ResponseCache._make_key_(self._url, payload)
+        trace = self._begin_trace_()
+
+        try:
+            if self._cache is not None:
+                cached = self._cache._get_(request_key)
+                if cached is not None and self._is_cacheable_(cached):
+                    if trace is not None:
+                        trace.cache_hit = True
+                    return cached
+
+            if self._single_flight is not None:
+                response_json = self._single_flight._do_(request_key, lambda: self._dispatch_request_(payload, timeout, trace))
+            else:
+                response_json = self._dispatch_request_(payload, timeout, trace)
+            if self._cache is not None and self._is_cacheable_(response_json):
+                self._cache._put_(request_key, response_json)
+            self._trace_usage_(trace, response_json)
+            return response_json
+        except Exception as e:
+            if trace is not None:
+                trace._fail_(e)
+            raise
+        finally:
+            if trace is not None:
+                self._telemetry._emit_(trace)
+
+    def _dispatch_request_(self, payload, timeout=None, trace=None):
+        """
+        @func_ _dispatch_request_
+        @params payload : (dict) The JSON request payload.
+        @params timeout : (int) Request timeout in seconds.
+        @params trace : (CallTrace, optional) Telemetry trace filled in by the attempts.
+        @returns (dict) Parsed JSON response from the API.
+        @desc_ Sends the request directly, or through the hedge policy when one is attached.
+        """
+        if self._hedge is None:
+            return self._send_request_(payload, timeout=timeout, trace=trace)
+        return self._hedge._run_(
+            self,
+            lambda engine, attempt_trace: engine._send_request_(self._retarget_payload_(payload, engine), timeout=timeout, trace=attempt_trace),
+            kind="call",
+            trace=trace
+        )
+
+    def _retarget_payload_(self, payload, engine):
+        """
+        @func_ _retarget_payload_
+        @params payload : (dict) Payload built for this engine.
+        @params engine : (LLMRequestEngine) Engine that will actually send it.
+        @returns (dict) The payload with the model swapped when a hedge goes to another engine.
+        """
+        if engine is self:
+            return payload
+        return dict(payload, model=engine._model)
+
+    def _send_request_(self, payload, timeout=None, trace=None):
+        """
+        @func_ _send_request_
+        @params payload : (dict) The JSON request payload.
+        @params timeout : (int) Request timeout in seconds.
+        @params trace : (CallTrace, optional) Receives queue wait, retries and timings.
+        @returns (dict) Parsed JSON response from the API.
+        @desc_ Performs the HTTP round trip with retry logic (no caching); the target of a hedge.
+        """
+        return self._send_with_retry_(payload, timeout=timeout, trace=trace, context="Completion")
+
+    def _open_stream_(self, payload, timeout=None, trace=None):
+        """
+        @func_ _open_stream_
+        @params payload : (dict) The JSON request payload (with "stream": true).
+        @params timeout : (int) Connect/read timeout in seconds.
+        @params trace : (CallTrace, optional) Receives queue wait, retries and connect time.
+        @returns (requests.Response) An open response whose body is an SSE stream.
+        @desc_ Establishes a streaming request. Retries only happen before the first byte,
+               so no partial output is ever duplicated.
+        """
+        return self._send_with_retry_(payload, timeout=timeout, trace=trace, context="Streaming completion", stream=True)
+
+    def _stream_events_(self, payload):
         """
-        headers = self._build_headers_()
-        timeout = timeout or FrameworkConfig._REQUEST_TIMEOUT
-        retries = FrameworkConfig._RETRY_COUNT
-        backoff = FrameworkConfig._RETRY_BACKOFF
-
-        last_error = None
-        ## @iter_ range : Retrying the API call based on backoff logic
-        for attempt in range(1 + retries):
-            try:
-                response = requests.post(self._url, headers=headers, json=payload, timeout=timeout)
-                response.raise_for_status()
-                return response.json()
-            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-                last_error = e
-                if attempt < retries:
-                    wait_time = backoff * (2 ** attempt)
-                    logger.warning(f"API request attempt {attempt + 1} failed ({type(e).__name__}). Retrying in {wait_time:.1f}s...")
-                    time.sleep(wait_time)
+        @func_ _stream_events_
+        @params payload : (dict) The JSON request payload.
+        @returns (generator[dict]) Events {'type': 'reasoning'|'content', 'delta': str},
+                 followed by one {'type': 'done', 'content': str} with the formatted full text.
+        @desc_ Consumes OpenRouter SSE chunks and separates reasoning deltas from content deltas.
+               The final 'done' text matches what _parse_response_ would have returned.
+        """
+        payload = dict(payload, stream=True)
+        trace = self._begin_trace_(streamed=True)
+        try:
+            if self._hedge is not None:
+                response = self._hedge._run_(
+                    self,
+                    lambda engine, attempt_trace: engine._open_stream_(self._retarget_payload_(payload, engine), trace=attempt_trace),
+                    kind="ttfb",
+                    on_discard=lambda loser: loser.close(),
+                    trace=trace
+                )
+            else:
+                response = self._open_stream_(payload, trace=trace)
+        except Exception as e:
+            if trace is not None:
+                trace._fail_(e)
+                self._telemetry._emit_(trace)
+            raise
+        content_parts = []
+        reasoning_parts = []
+        headers_at = time.monotonic()
+        first_token = True
+
+        ## @logic_ SSE is UTF-8 by spec; without a charset requests would decode as ISO-8859-1
+        response.encoding = "utf-8"
+        try:
+            ## @iter_ iter_lines : One SSE line per iteration; comments (": ...") are keep-alives
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
                     continue
-                self._handle_request_error_(e, context="Completion")
-            except (requests.exceptions.HTTPError, requests.exceptions.RequestException, json.JSONDecodeError) as e:
-                ## @logic_ Non-retryable errors (auth, model not found, etc.) — fail immediately
-                self._handle_request_error_(e, context="Completion")
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed stream chunk: {data[:100]}")
+                    continue
+
+                if trace is not None and chunk.get("usage"):
+                    trace._add_usage_(chunk["usage"])
+
+                if "error" in chunk:
+                    error = chunk["error"]
+                    raise APIResponseError(
+                        f"Stream error: {error.get('message', error) if isinstance(error, dict) else error}",
+                        status_code=error.get("code") if isinstance(error, dict) else None,
+                        response_body=chunk
+                    )
+
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                delta = choices[0].get("delta") or {}
+
+                reasoning = self._extract_reasoning_(delta)
+                content = delta.get("content")
+                if first_token and (reasoning or content):
+                    ## @logic_ TTFB for streams = send -> headers + headers -> first token
+                    first_token = False
+                    if trace is not None:
+                        trace.ttfb = (trace.ttfb or 0.0) + time.monotonic() - headers_at
+
+                if reasoning:
+                    reasoning_parts.append(reasoning)
+                    yield {"type": "reasoning", "delta": reasoning}
 
-        if last_error:
-            self._handle_request_error_(last_error, context="Completion")
+                if content:
+                    content_parts.append(content)
+                    yield {"type": "content", "delta": content}
+        except requests.exceptions.RequestException as e:
+            if trace is not None:
+                trace._fail_(e)
+            self._handle_request_error_(e, context="Streaming completion")
+        except BaseException as e:
+            ## @logic_ GeneratorExit means the consumer stopped reading early
+            if trace is not None:
+                trace._fail_(e)
+            raise
+        finally:
+            response.close()
+            if trace is not None:
+                self._telemetry._emit_(trace)
+
+        reasoning_text = "".join(reasoning_parts) or None
+        yield {"type": "done", "content": self._format_output_("".join(content_parts), reasoning_text)}
 
     def _encode_image_(self, image_source):
         """
@@ -251,15 +429,14 @@ class LLMRequestEngine:
             }
         }
 
-    def _get_completion_(self, prompt, sys_message, images=None):
+    def _build_completion_payload_(self, prompt, sys_message, images=None):
         """
-        @func_ _get_completion_
+        @func_ _build_completion_payload_
         @params prompt : (str) The user's input prompt.
         @params sys_message : (str) System instruction (role).
         @params images : (list) Optional list of image paths/URLs.
-        @returns (str) The AI's response text.
-        @raises AuthenticationError, ModelNotFoundError, APIConnectionError, APIResponseError
-        @desc_ Standard completion request for a single turn.
+        @returns (dict) The JSON request payload for a single-turn completion.
+        @desc_ Builds the message list, honouring system-role support and images.
         """
         user_content = prompt
 
@@ -282,28 +459,14 @@ class LLMRequestEngine:
         
         messages.append({"role": "user", "content": user_content})
 
-        payload = {
-            "model": self._model,
-            "messages": messages,
-            "temperature": self._temperature,
-            "max_tokens": self._max_tokens
-        }
-        
-        if self._include_reasoning:
-            payload["reasoning"] = {
-                "enabled": True,
-                "effort": self._reasoning_effort
-            }
-
-        response_json = self._call_api_(payload)
-        return self._parse_response_(response_json)
+        return self._build_payload_(messages)
 
-    def _get_chat_completion_(self, messages: list) -> str:
+    def _build_chat_payload_(self, messages: list) -> dict:
         """
-        @func_ _get_chat_completion_
+        @func_ _build_chat_payload_
         @params messages : (list) List of message dicts (role, content).
-        @returns (str) The AI's response text.
-        @desc_ Direct interface for passing full conversation history.
+        @returns (dict) The JSON request payload for a multi-turn completion.
+        @desc_ Applies system-role merging to the history and builds the payload.
         """
         final_messages = []
         if not self._use_system_role:
@@ -324,9 +487,18 @@ class LLMRequestEngine:
         else:
             final_messages = messages
 
+        return self._build_payload_(final_messages)
+
+    def _build_payload_(self, messages: list) -> dict:
+        """
+        @func_ _build_payload_
+        @params messages : (list) Final message list to send.
+        @returns (dict) The JSON request payload with sampling and reasoning settings.
+        @desc_ Common payload tail shared by single-turn and multi-turn requests.
+        """
         payload = {
             "model": self._model,
-            "messages": final_messages,
+            "messages": messages,
             "temperature": self._temperature,
             "max_tokens": self._max_tokens
         }
@@ -336,6 +508,51 @@ class LLMRequestEngine:
                 "enabled": True,
                 "effort": self._reasoning_effort
             }
+        return payload
 
+    def _get_completion_(self, prompt, sys_message, images=None):
+        """
+        @func_ _get_completion_
+        @params prompt : (str) The user's input prompt.
+        @params sys_message : (str) System instruction (role).
+        @params images : (list) Optional list of image paths/URLs.
+        @returns (str) The AI's response text.
+        @raises AuthenticationError, ModelNotFoundError, APIConnectionError, APIResponseError
+        @desc_ Standard completion request for a single turn.
+        """
+        payload = self._build_completion_payload_(prompt, sys_message, images=images)
         response_json = self._call_api_(payload)
         return self._parse_response_(response_json)
+
+    def _get_chat_completion_(self, messages: list) -> str:
+        """
+        @func_ _get_chat_completion_
+        @params messages : (list) List of message dicts (role, content).
+        @returns (str) The AI's response text.
+        @desc_ Direct interface for passing full conversation history.
+        """
+        payload = self._build_chat_payload_(messages)
+        response_json = self._call_api_(payload)
+        return self._parse_response_(response_json)
+
+    def _stream_completion_(self, prompt, sys_message, images=None):
+        """
+        @func_ _stream_completion_
+        @params prompt : (str) The user's input prompt.
+        @params sys_message : (str) System instruction (role).
+        @params images : (list) Optional list of image paths/URLs.
+        @returns (generator[dict]) Delta events, then a final 'done' event (see _stream_events_).
+        @desc_ Streaming variant of _get_completion_.
+        """
+        payload = self._build_completion_payload_(prompt, sys_message, images=images)
+        return self._stream_events_(payload)
+
+    def _stream_chat_completion_(self, messages: list):
+        """
+        @func_ _stream_chat_completion_
+        @params messages : (list) List of message dicts (role, content).
+        @returns (generator[dict]) Delta events, then a final 'done' event (see _stream_events_).
+        @desc_ Streaming variant of _get_chat_completion_.
+        """
+        payload = self._build_chat_payload_(messages)
+        return self._stream_events_(payload)
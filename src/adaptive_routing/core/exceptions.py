@@ -57,3 +57,15 @@ class APIResponseError(AdaptiveRoutingError):
         super().__init__(message)
         self.status_code = status_code
         self.response_body = response_body
+
+class CircuitOpenError(APIConnectionError):
+    """
+    @class CircuitOpenError
+    @desc_ Raised without a network call when a model's circuit breaker is open.
+    @attr_ model : (str) The model whose circuit is open.
+    @attr_ retry_in : (float) Seconds until the circuit admits a half-open probe.
+    """
+    def __init__(self, message, model=None, retry_in=None):
+        super().__init__(message)
+        self.model = model
+        self.retry_in = retry_in
@@ -0,0 +1,408 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/core/hedging.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Per-model latency histograms maintained by the engines, and an optional hedging
+##        policy that fires a duplicate request once a call outlives a latency percentile.
+## @deps asyncio, bisect, math, threading, logging, concurrent.futures, src.adaptive_routing.config
+
+import asyncio
+import bisect
+import math
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.adaptive_routing.config import FrameworkConfig
+
+logger = logging.getLogger(__name__)
+
+class LatencyHistogram:
+    """
+    @class LatencyHistogram
+    @desc_ Log-spaced latency buckets (10ms .. ~10min, ~12% resolution). Counts are halved
+           every _decay_every samples so percentiles follow the model's recent behaviour.
+    @attr_ _bounds : (list[float]) Upper bound of each bucket in seconds.
+    @attr_ _counts : (list[float]) Samples per bucket.
+    """
+    _BOUNDS = [0.01 * (1.12 ** i) for i in range(int(math.log(60000) / math.log(1.12)) + 1)]
+
+    def __init__(self, decay_every=1000):
+        self._bounds = self._BOUNDS
+        self._counts = [0.0] * (len(self._bounds) + 1)
+        self._total = 0.0
+        self._since_decay = 0
+        self._decay_every = decay_every
+        self._lock = threading.Lock()
+
+    def _record_(self, seconds):
+        """
+        @func_ _record_
+        @params seconds : (float) Observed latency.
+        """
+        with self._lock:
+            self._counts[bisect.bisect_left(self._bounds, seconds)] += 1
+            self._total += 1
+            self._since_decay += 1
+            if self._since_decay >= self._decay_every:
+                self._counts = [c / 2 for c in self._counts]
+                self._total /= 2
+                self._since_decay = 0
+
+    def _count_(self):
+        """
+        @func_ _count_
+        @returns (float) Effective number of samples (after decay).
+        """
+        return self._total
+
+    def _percentile_(self, p):
+        """
+        @func_ _percentile_
+        @params p : (float) Percentile in [0, 100].
+        @returns (float | None) Upper bound of the bucket holding the p-th percentile.
+        """
+        with self._lock:
+            if not self._total:
+                return None
+            target = self._total * p / 100.0
+            running = 0.0
+            for index, count in enumerate(self._counts):
+                running += count
+                if running >= target:
+                    return self._bounds[min(index, len(self._bounds) - 1)]
+            return self._bounds[-1]
+
+
+class LatencyTracker:
+    """
+    @class LatencyTracker
+    @desc_ Process-wide registry of histograms keyed by (model, kind). Kinds are "call"
+           (full non-streaming round trip) and "ttfb" (time to first streamed byte).
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _get_shared_(cls):
+        """
+        @func_ _get_shared_
+        @returns (LatencyTracker) The process-wide tracker.
+        @desc_ Lazily creates the shared tracker on first use (thread-safe).
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    def _histogram_(self, model, kind):
+        """
+        @func_ _histogram_
+        @returns (LatencyHistogram) The histogram for (model, kind), created on first use.
+        """
+        key = (model, kind)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, LatencyHistogram())
+        return histogram
+
+    def _record_(self, model, kind, seconds):
+        """
+        @func_ _record_
+        @params model : (str) Model that answered.
+        @params kind : (str) "call" or "ttfb".
+        @params seconds : (float) Observed latency.
+        """
+        self._histogram_(model, kind)._record_(seconds)
+
+    def _stats_(self):
+        """
+        @func_ _stats_
+        @returns (dict) "model/kind" -> {samples, p50, p95, p99}.
+        """
+        with self._lock:
+            items = list(self._histograms.items())
+        return {
+            f"{model}/{kind}": {
+                "samples": int(h._count_()),
+                "p50": h._percentile_(50),
+                "p95": h._percentile_(95),
+                "p99": h._percentile_(99)
+            }
+            for (model, kind), h in items
+        }
+
+
+## @const_ _HEDGE_EXECUTOR : Worker threads for sync hedge attempts (created on first use).
+_HEDGE_EXECUTOR = None
+## @const_ _PRIMARY_EXECUTOR : Worker threads for sync primary attempts, with one slot per worker.
+_PRIMARY_EXECUTOR = None
+_PRIMARY_SLOTS = None
+_HEDGE_EXECUTOR_LOCK = threading.Lock()
+
+def _get_hedge_executor_():
+    """
+    @func_ _get_hedge_executor_
+    @returns (ThreadPoolExecutor) Shared pool running hedge attempts. Primaries never queue
+             here, so a busy pool can only delay a duplicate, never trigger one.
+    """
+    global _HEDGE_EXECUTOR
+    if _HEDGE_EXECUTOR is None:
+        with _HEDGE_EXECUTOR_LOCK:
+            if _HEDGE_EXECUTOR is None:
+                _HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=FrameworkConfig._HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+    return _HEDGE_EXECUTOR
+
+def _start_primary_(fn, *args):
+    """
+    @func_ _start_primary_
+    @params fn : (callable) fn(*args) performs one request.
+    @returns (Future | None) Resolves with the primary attempt's result; None when every
+             primary worker is busy.
+    @desc_ A primary only starts when a worker is free, so it runs immediately and the hedge
+           delay measures the request itself rather than time spent queued. The pool is
+           bounded by _HEDGE_MAX_PRIMARY_WORKERS; callers run the attempt unhedged on their
+           own thread when it is full.
+    """
+    global _PRIMARY_EXECUTOR, _PRIMARY_SLOTS
+    if _PRIMARY_EXECUTOR is None:
+        with _HEDGE_EXECUTOR_LOCK:
+            if _PRIMARY_EXECUTOR is None:
+                workers = max(1, FrameworkConfig._HEDGE_MAX_PRIMARY_WORKERS)
+                _PRIMARY_SLOTS = threading.BoundedSemaphore(workers)
+                _PRIMARY_EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hedge-primary")
+    if not _PRIMARY_SLOTS.acquire(blocking=False):
+        return None
+    try:
+        future = _PRIMARY_EXECUTOR.submit(fn, *args)
+    except BaseException:
+        _PRIMARY_SLOTS.release()
+        raise
+    future.add_done_callback(lambda _: _PRIMARY_SLOTS.release())
+    return future
+
+
+class HedgePolicy:
+    """
+    @class HedgePolicy
+    @desc_ Per-route hedging policy. Each call earns `_budget` credits (capped at `_burst`);
+           a hedge spends one, so at most ~budget x 100% of calls are duplicated.
+    @attr_ _budget : (float) Fraction of calls that may be hedged.
+    @attr_ _percentile : (float) Latency percentile after which the hedge fires.
+    @attr_ _engine : (LLMRequestEngine | None) Engine for the duplicate; None hedges on the same model.
+    """
+    def __init__(self, budget, percentile=None, min_samples=None, min_delay=None, burst=None, engine=None):
+        self._budget = budget
+        self._percentile = percentile if percentile is not None else FrameworkConfig._HEDGE_PERCENTILE
+        self._min_samples = min_samples if min_samples is not None else FrameworkConfig._HEDGE_MIN_SAMPLES
+        self._min_delay = min_delay if min_delay is not None else FrameworkConfig._HEDGE_MIN_DELAY_SEC
+        self._burst = burst if burst is not None else FrameworkConfig._HEDGE_BURST
+        self._engine = engine
+
+        self._credits = 0.0
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    @classmethod
+    def _for_route_(cls, route):
+        """
+        @func_ _for_route_
+        @params route : (str) "General-LLM", "Reasoning-LLM" or "Casual-LLM".
+        @returns (HedgePolicy | None) A policy when hedging is enabled and the route has budget.
+        """
+        if not FrameworkConfig._HEDGE_ENABLED:
+            return None
+        if route == "Casual-LLM":
+            budget = FrameworkConfig._CASUAL_HEDGE_BUDGET
+        elif route == "Reasoning-LLM":
+            budget = FrameworkConfig._REASONING_HEDGE_BUDGET
+        else:
+            budget = FrameworkConfig._GENERAL_HEDGE_BUDGET
+        return cls(budget) if budget > 0 else None
+
+    def _delay_(self, model, kind):
+        """
+        @func_ _delay_
+        @returns (float | None) Seconds to wait before hedging, or None while the histogram
+                 has too few samples to be trusted.
+        """
+        histogram = LatencyTracker._get_shared_()._histogram_(model, kind)
+        if histogram._count_() < self._min_samples:
+            return None
+        return max(self._min_delay, histogram._percentile_(self._percentile))
+
+    def _earn_(self):
+        """
+        @func_ _earn_
+        @desc_ Credits the budget for one call.
+        """
+        with self._lock:
+            self._calls += 1
+            self._credits = min(self._burst, self._credits + self._budget)
+
+    def _try_spend_(self):
+        """
+        @func_ _try_spend_
+        @returns (bool) True if a hedge may be fired now.
+        """
+        with self._lock:
+            if self._credits < 1.0:
+                return False
+            self._credits -= 1.0
+            self._hedges += 1
+            return True
+
+    def _hedge_engine_(self, engine):
+        """
+        @func_ _hedge_engine_
+        @returns (LLMRequestEngine) The engine the duplicate request is sent through.
+        """
+        return self._engine or engine
+
+    def _run_(self, engine, fn, kind, on_discard=None, trace=None):
+        """
+        @func_ _run_
+        @params engine : (LLMRequestEngine) Primary engine.
+        @params fn : (callable) fn(engine, trace) performs one request and returns its result.
+        @params kind : (str) Histogram kind the delay is derived from ("call" / "ttfb").
+        @params on_discard : (callable, optional) Receives the loser's result (e.g. to close a stream).
+        @params trace : (CallTrace, optional) Trace of the call; each attempt fills a fork of it.
+        @returns (any) The first successful result.
+        @desc_ Sync hedging. The primary runs on the bounded primary pool and the duplicate on
+               the hedge pool; when the primary pool is full the call runs unhedged on the
+               caller's thread. requests cannot abort a call in flight, so a losing
+               non-streaming call is abandoned and its result dropped; losing streams are
+               closed via on_discard as soon as they connect. Only the winner's fork is
+               copied into the call's trace, so a loser finishing late cannot overwrite it.
+        """
+        self._earn_()
+        delay = self._delay_(engine._model, kind)
+        if delay is None:
+            return fn(engine, trace)
+
+        forks = {}
+        primary_trace = trace._fork_() if trace is not None else None
+        primary = _start_primary_(fn, engine, primary_trace)
+        if primary is None:
+            return fn(engine, trace)
+        forks[primary] = primary_trace
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._try_spend_():
+            return self._adopt_(trace, forks, primary)
+
+        hedge_engine = self._hedge_engine_(engine)
+        logger.info(f"Hedging '{engine._model}' after {delay:.2f}s (p{self._percentile:.0f}) via '{hedge_engine._model}'.")
+        hedge_trace = trace._fork_() if trace is not None else None
+        hedge = _get_hedge_executor_().submit(fn, hedge_engine, hedge_trace)
+        forks[hedge] = hedge_trace
+        labels = {primary: "primary", hedge: "hedge"}
+        pending = set(labels)
+        first_error = None
+        ## @iter_ while : Taking the first successful attempt; the other is discarded
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._settle_(labels[future], pending, on_discard)
+                    return self._adopt_(trace, forks, future)
+                first_error = first_error or future
+        return self._adopt_(trace, forks, first_error)
+
+    @staticmethod
+    def _adopt_(trace, forks, future):
+        """
+        @func_ _adopt_
+        @params trace : (CallTrace | None) Trace of the call.
+        @params forks : (dict) Attempt (future or task) -> its forked trace.
+        @params future : (Future | asyncio.Task) The attempt whose outcome the call returns.
+        @returns (any) The attempt's result (raises its exception).
+        @desc_ Copies that attempt's timings into the call's trace.
+        """
+        if trace is not None and forks.get(future) is not None:
+            trace._adopt_(forks[future])
+        return future.result()
+
+    def _settle_(self, winner, pending, on_discard):
+        """
+        @func_ _settle_
+        @desc_ Records the winner and cancels (or discards on completion) the losing attempt.
+        """
+        if winner == "hedge":
+            with self._lock:
+                self._hedge_wins += 1
+        for future in pending:
+            if future.cancel() or on_discard is None:
+                continue
+            future.add_done_callback(lambda f: f.exception() is None and on_discard(f.result()))
+
+    async def _run_async_(self, engine, fn, kind, trace=None):
+        """
+        @func_ _run_async_
+        @params engine : (AsyncLLMRequestEngine) Primary engine.
+        @params fn : (callable) fn(engine, trace) returning a coroutine for one request.
+        @params kind : (str) Histogram kind the delay is derived from.
+        @params trace : (CallTrace, optional) Trace of the call; each attempt fills a fork of it.
+        @returns (any) The first successful result.
+        @desc_ asyncio hedging: the duplicate goes through _hedge_engine_ as in _run_, and the
+               losing task is cancelled, which closes its connection. If the caller is
+               cancelled (e.g. a client disconnect), every unfinished attempt is cancelled too,
+               releasing its connection, semaphore slot and circuit permit.
+        """
+        self._earn_()
+        delay = self._delay_(engine._model, kind)
+        if delay is None:
+            return await fn(engine, trace)
+
+        forks = {}
+        primary_trace = trace._fork_() if trace is not None else None
+        primary = asyncio.ensure_future(fn(engine, primary_trace))
+        forks[primary] = primary_trace
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self._try_spend_():
+                await asyncio.wait({primary})
+                return self._adopt_(trace, forks, primary)
+
+            hedge_engine = self._hedge_engine_(engine)
+            logger.info(f"Hedging '{engine._model}' after {delay:.2f}s (p{self._percentile:.0f}) via '{hedge_engine._model}'.")
+            hedge_trace = trace._fork_() if trace is not None else None
+            hedge = asyncio.ensure_future(fn(hedge_engine, hedge_trace))
+            forks[hedge] = hedge_trace
+            labels = {primary: "primary", hedge: "hedge"}
+            pending = set(labels)
+            first_error = None
+            ## @iter_ while : Taking the first successful task; the other is cancelled in finally
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if labels[task] == "hedge":
+                            with self._lock:
+                                self._hedge_wins += 1
+                        return self._adopt_(trace, forks, task)
+                    first_error = first_error or task
+            return self._adopt_(trace, forks, first_error)
+        finally:
+            for task in forks:
+                if not task.done():
+                    task.cancel()
+
+    def _stats_(self):
+        """
+        @func_ _stats_
+        @returns (dict) Calls, hedges fired and hedges that won.
+        """
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "hedges": self._hedges,
+                "hedge_wins": self._hedge_wins,
+                "hedge_rate": round(self._hedges / self._calls, 4) if self._calls else 0.0
+            }
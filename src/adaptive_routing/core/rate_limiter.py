@@ -0,0 +1,325 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/core/rate_limiter.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Adaptive token-bucket rate limiter keyed per (API key, model). Learns the provider
+##        ceiling from 429 responses and Retry-After / X-RateLimit-* headers, and queues
+##        callers instead of letting them fail into retry storms.
+## @deps asyncio, hashlib, threading, time, logging, email.utils, src.adaptive_routing.config, src.adaptive_routing.core.exceptions
+
+import asyncio
+import hashlib
+import threading
+import time
+import logging
+from email.utils import parsedate_to_datetime
+from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.exceptions import APIResponseError
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    @class TokenBucket
+    @desc_ Reservation-style token bucket with AIMD rate adaptation. Callers reserve a token
+           and are told how long to wait, so the same bucket serves sync and async engines.
+    @attr_ _rate : (float) Current refill rate in requests per second.
+    @attr_ _capacity : (float) Maximum burst size.
+    @attr_ _tokens : (float) Available tokens; negative while reservations are queued.
+    @attr_ _blocked_until : (float) Monotonic time before which no token is granted.
+    """
+    def __init__(self, rate=None, capacity=None, min_rate=None, max_rate=None):
+        self._rate = rate if rate is not None else FrameworkConfig._RATE_LIMIT_INITIAL_RPS
+        self._capacity = float(capacity if capacity is not None else FrameworkConfig._RATE_LIMIT_BURST)
+        self._min_rate = min_rate if min_rate is not None else FrameworkConfig._RATE_LIMIT_MIN_RPS
+        self._max_rate = max_rate if max_rate is not None else FrameworkConfig._RATE_LIMIT_MAX_RPS
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        self._acquired = 0
+        self._queued = 0
+        self._throttled = 0
+        self._total_wait = 0.0
+
+    def _refill_(self, now):
+        """
+        @func_ _refill_
+        @desc_ Adds tokens for the time elapsed since the last update; caller must hold the lock.
+               Time spent inside a Retry-After block does not earn tokens.
+        """
+        start = max(self._updated, self._blocked_until)
+        if now > start:
+            self._tokens = min(self._capacity, self._tokens + (now - start) * self._rate)
+        self._updated = max(self._updated, now)
+
+    def _reserve_(self, max_wait=None):
+        """
+        @func_ _reserve_
+        @params max_wait : (float, optional) Longest acceptable queueing delay in seconds.
+        @returns (float | None) Seconds to wait before sending, or None if it would exceed max_wait.
+        @desc_ Takes one token (possibly going negative) and returns the caller's place in the queue.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill_(now)
+            self._tokens -= 1
+            wait = max(0.0, self._blocked_until - now)
+            if self._tokens < 0:
+                wait += -self._tokens / self._rate
+            if max_wait is not None and wait > max_wait:
+                self._tokens += 1
+                return None
+            self._acquired += 1
+            if wait > 0:
+                self._queued += 1
+                self._total_wait += wait
+            return wait
+
+    def _on_throttled_(self, retry_after=None):
+        """
+        @func_ _on_throttled_
+        @params retry_after : (float, optional) Server-provided delay in seconds.
+        @desc_ Multiplicative decrease: halves the rate and blocks the bucket for Retry-After
+               (or one refill interval when the server gives no hint).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill_(now)
+            self._rate = max(self._min_rate, self._rate * FrameworkConfig._RATE_LIMIT_DECREASE_FACTOR)
+            ## @logic_ Keep queued reservations, but let the next caller go as soon as the block lifts
+            self._tokens = min(self._tokens, 1.0)
+            delay = retry_after if retry_after is not None else 1.0 / self._rate
+            self._blocked_until = max(self._blocked_until, now + delay)
+            self._throttled += 1
+
+    def _on_success_(self):
+        """
+        @func_ _on_success_
+        @desc_ Additive increase: probes back toward the provider ceiling after each success.
+        """
+        with self._lock:
+            self._rate = min(self._max_rate, self._rate + FrameworkConfig._RATE_LIMIT_INCREASE_STEP)
+
+    def _apply_quota_(self, remaining, reset_in):
+        """
+        @func_ _apply_quota_
+        @params remaining : (float) Requests left in the provider's current window.
+        @params reset_in : (float) Seconds until the window resets.
+        @desc_ Spreads the remaining quota evenly over the window; blocks when it is exhausted.
+        """
+        if reset_in <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill_(now)
+            if remaining <= 0:
+                self._tokens = min(self._tokens, 0.0)
+                self._blocked_until = max(self._blocked_until, now + reset_in)
+            else:
+                self._rate = max(self._min_rate, min(self._max_rate, remaining / reset_in))
+
+    def _stats_(self):
+        """
+        @func_ _stats_
+        @returns (dict) Current rate and queueing counters.
+        """
+        with self._lock:
+            return {
+                "rate_per_sec": round(self._rate, 3),
+                "acquired": self._acquired,
+                "queued": self._queued,
+                "throttled": self._throttled,
+                "total_wait_sec": round(self._total_wait, 3),
+                "avg_wait_sec": round(self._total_wait / self._queued, 3) if self._queued else 0.0
+            }
+
+
+class RateLimiter:
+    """
+    @class RateLimiter
+    @desc_ Registry of TokenBuckets shared by every engine in the process, so triage, router,
+           generation, audit, embeddings and rerank calls against the same (key, model) pair
+           draw from one budget.
+    @attr_ _buckets : (dict) (key fingerprint, model) -> TokenBucket.
+    @attr_ _max_wait : (float) Longest a caller may be queued before the call is rejected.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+    _thread_wait = threading.local()
+
+    def __init__(self, max_wait=None):
+        self._max_wait = max_wait if max_wait is not None else FrameworkConfig._RATE_LIMIT_MAX_WAIT
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _get_shared_(cls):
+        """
+        @func_ _get_shared_
+        @returns (RateLimiter) The process-wide limiter.
+        @desc_ Lazily creates the shared limiter on first use (thread-safe).
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def _for_config_(cls):
+        """
+        @func_ _for_config_
+        @returns (RateLimiter | None) The shared limiter if enabled in config, else None.
+        """
+        return cls._get_shared_() if FrameworkConfig._RATE_LIMIT_ENABLED else None
+
+    @classmethod
+    def _pop_thread_wait_(cls):
+        """
+        @func_ _pop_thread_wait_
+        @returns (float) Seconds the current thread spent queued since the last call.
+        @desc_ Lets request handlers report rate-limit waits without touching the engines.
+        """
+        waited = getattr(cls._thread_wait, "seconds", 0.0)
+        cls._thread_wait.seconds = 0.0
+        return waited
+
+    def _bucket_(self, api_key, model):
+        """
+        @func_ _bucket_
+        @params api_key : (str) Credential the call is billed to (only a fingerprint is kept).
+        @params model : (str) Target model identifier.
+        @returns (TokenBucket) The bucket for this pair, created on first use.
+        """
+        fingerprint = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+        key = (fingerprint, model)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.setdefault(key, TokenBucket())
+        return bucket
+
+    def _reserve_or_raise_(self, api_key, model):
+        """
+        @func_ _reserve_or_raise_
+        @returns (float) Seconds to wait before sending.
+        @raises APIResponseError (429) if the queue is longer than _max_wait.
+        """
+        wait = self._bucket_(api_key, model)._reserve_(self._max_wait)
+        if wait is None:
+            raise APIResponseError(
+                f"Rate limit queue for '{model}' exceeds {self._max_wait:.0f}s. Try again later.",
+                status_code=429
+            )
+        if wait > 0:
+            logger.info(f"Rate limiter queued '{model}' call for {wait:.2f}s.")
+            self._thread_wait.seconds = getattr(self._thread_wait, "seconds", 0.0) + wait
+        return wait
+
+    def _acquire_(self, api_key, model):
+        """
+        @func_ _acquire_
+        @params api_key : (str) Credential the call is billed to.
+        @params model : (str) Target model identifier.
+        @returns (float) Seconds spent waiting.
+        @desc_ Blocks the calling thread until the bucket grants a token.
+        """
+        wait = self._reserve_or_raise_(api_key, model)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def _acquire_async_(self, api_key, model):
+        """
+        @func_ _acquire_async_
+        @desc_ Non-blocking counterpart of _acquire_ for the asyncio engines.
+        """
+        wait = self._reserve_or_raise_(api_key, model)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def _record_(self, api_key, model, status_code, headers=None):
+        """
+        @func_ _record_
+        @params status_code : (int) HTTP status of the response.
+        @params headers : (Mapping, optional) Response headers.
+        @returns (bool) True if the response was a 429 and the call should be re-queued.
+        @desc_ Feeds the outcome back into the bucket: quota headers adjust the rate,
+               429 triggers multiplicative decrease, success triggers additive increase.
+        """
+        bucket = self._bucket_(api_key, model)
+        headers = headers or {}
+
+        remaining = _parse_float_(headers.get("X-RateLimit-Remaining"))
+        reset_in = _parse_reset_(headers.get("X-RateLimit-Reset"))
+        if remaining is not None and reset_in is not None:
+            bucket._apply_quota_(remaining, reset_in)
+
+        if status_code == 429:
+            retry_after = _parse_retry_after_(headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = reset_in
+            bucket._on_throttled_(retry_after)
+            logger.warning(
+                f"Rate limited on '{model}' (429). Rate lowered to {bucket._rate:.2f} req/s"
+                + (f", retry after {retry_after:.1f}s." if retry_after is not None else ".")
+            )
+            return True
+        if status_code < 400:
+            bucket._on_success_()
+        return False
+
+    def _stats_(self):
+        """
+        @func_ _stats_
+        @returns (dict) model -> bucket stats (keys are never exposed).
+        """
+        with self._lock:
+            items = list(self._buckets.items())
+        return {f"{model}#{fingerprint[:6]}": bucket._stats_() for (fingerprint, model), bucket in items}
+
+
+def _parse_float_(value):
+    """
+    @func_ _parse_float_
+    @returns (float | None) The header value as a float, or None if absent/malformed.
+    """
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _parse_retry_after_(value):
+    """
+    @func_ _parse_retry_after_
+    @params value : (str) Retry-After header (delta-seconds or HTTP-date).
+    @returns (float | None) Seconds to wait.
+    """
+    seconds = _parse_float_(value)
+    if seconds is not None:
+        return max(0.0, seconds)
+    if not value:
+        return None
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def _parse_reset_(value):
+    """
+    @func_ _parse_reset_
+    @params value : (str) X-RateLimit-Reset header.
+    @returns (float | None) Seconds until the window resets.
+    @desc_ Accepts epoch milliseconds (OpenRouter), epoch seconds, or a relative delay.
+    """
+    reset = _parse_float_(value)
+    if reset is None:
+        return None
+    if reset > 1e12:
+        reset /= 1000.0
+    if reset > 1e9:
+        return max(0.0, reset - time.time())
+    return reset
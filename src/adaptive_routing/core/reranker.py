@@ -2,33 +2,54 @@
 ## Team 404FoundUs
 ## @file src/adaptive_routing/core/reranker.py
 ## @project_ LLM Legal Adaptive Routing Framework
-## @desc_ API client for OpenRouter /api/v1/rerank endpoint with retry logic.
-## @deps requests, json, time, logging, src.adaptive_routing.config, src.adaptive_routing.core.exceptions
+## @desc_ API client for OpenRouter /api/v1/rerank endpoint; retries and circuit handling come from APIClientMixin.
+## @deps logging, src.adaptive_routing.config, src.adaptive_routing.core.api_client, src.adaptive_routing.core.rate_limiter, src.adaptive_routing.core.circuit_breaker, src.adaptive_routing.core.coalescing, src.adaptive_routing.core.cache, src.adaptive_routing.core.telemetry, src.adaptive_routing.core.exceptions
 
-import requests
-import json
-import time
 import logging
 from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.api_client import APIClientMixin
+from src.adaptive_routing.core.rate_limiter import RateLimiter
+from src.adaptive_routing.core.circuit_breaker import CircuitBreaker
+from src.adaptive_routing.core.coalescing import SingleFlight
+from src.adaptive_routing.core.cache import ResponseCache
+from src.adaptive_routing.core.telemetry import Telemetry
 from src.adaptive_routing.core.exceptions import (
     AuthenticationError,
-    APIConnectionError,
     APIResponseError,
     InvalidInputError
 )
 
 logger = logging.getLogger(__name__)
 
-class RerankEngine:
+class RerankEngine(APIClientMixin):
     """
     @class RerankEngine
     @desc_ Provides a unified interface for OpenRouter /api/v1/rerank calls.
            Mirrors the LLMRequestEngine pattern but targets the rerank endpoint.
     @attr_ _api_key : (str) Credential for the OpenRouter API.
     @attr_ _model : (str) The reranker model identifier (e.g., 'cohere/rerank-4-pro').
+    @attr_ _transport : (HTTPTransport | None) Pooled keep-alive transport; None until _get_transport_
+                        resolves the process-wide one.
+    @attr_ _limiter : (RateLimiter | None) Shared adaptive rate limiter; None disables queueing.
+    @attr_ _breaker : (CircuitBreaker | None) Shared per-model circuit breaker; None disables it.
+    @attr_ _single_flight : (SingleFlight | None) Coalescer for identical concurrent rerank calls.
+    @attr_ _telemetry : (Telemetry | None) Shared per-call telemetry hub; None disables records.
+    @attr_ _stage : (str) Always 'rerank'; tags telemetry records and picks the slow-call threshold.
+    @attr_ _route : (None) Rerank calls have no generation route.
+    @attr_ _latency : (None) Rerank latencies do not feed the hedge histograms.
     """
-    def __init__(self, api_key=None, model=None):
-        self._url = "https://openrouter.ai/api/v1/rerank"
+    def __init__(self, api_key=None, model=None, transport=None, limiter=None, breaker=None, coalesce=None):
+        self._url = f"{FrameworkConfig._API_BASE_URL}/rerank"
+        self._transport = transport
+        self._limiter = limiter or RateLimiter._for_config_()
+        self._breaker = breaker or CircuitBreaker._for_config_()
+        if coalesce is None:
+            coalesce = FrameworkConfig._COALESCE_DETERMINISTIC
+        self._single_flight = SingleFlight._get_shared_() if coalesce else None
+        self._telemetry = Telemetry._for_config_()
+        self._stage = "rerank"
+        self._route = None
+        self._latency = None
         
         ## @logic_ API Key Validation from argument or config
         self._api_key = api_key or FrameworkConfig._API_KEY
@@ -42,19 +63,6 @@ class RerankEngine:
         if not self._model or not isinstance(self._model, str):
             raise InvalidInputError(f"Invalid rerank model specified: {self._model}")
 
-    def _build_headers_(self):
-        """
-        @func_ _build_headers_
-        @returns (dict) HTTP headers for OpenRouter API requests.
-        @desc_ Centralized header construction matching LLMRequestEngine pattern.
-        """
-        return {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/404FoundUs",
-            "X-Title": "LLM Legal Adaptive Routing Framework"
-        }
-
     def _call_rerank_api_(self, payload, timeout=None):
         """
         @func_ _call_rerank_api_
@@ -62,84 +70,63 @@ class RerankEngine:
         @params timeout : (int) Request timeout in seconds.
         @returns (dict) Parsed JSON response from the API.
         @desc_ Executes a rerank API call with retry logic and unified error handling.
+               429 responses are re-queued through the shared rate limiter, and identical
+               concurrent payloads share one request when coalescing is on.
         """
-        headers = self._build_headers_()
-        timeout = timeout or FrameworkConfig._REQUEST_TIMEOUT
-        retries = FrameworkConfig._RETRY_COUNT
-        backoff = FrameworkConfig._RETRY_BACKOFF
-
-        last_error = None
-        ## @iter_ range : Retrying the API call based on backoff logic
-        for attempt in range(1 + retries):
-            try:
-                response = requests.post(self._url, headers=headers, json=payload, timeout=timeout)
-                response.raise_for_status()
-                return response.json()
-            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-                last_error = e
-                if attempt < retries:
-                    wait_time = backoff * (2 ** attempt)
-                    logger.warning(
-                        f"Rerank API attempt {attempt + 1} failed ({type(e).__name__}). "
-                        f"Retrying in {wait_time:.1f}s..."
-                    )
-                    time.sleep(wait_time)
-                    continue
-                self._handle_error_(e, context="Rerank")
-            except (requests.exceptions.HTTPError, requests.exceptions.RequestException, json.JSONDecodeError) as e:
-                ## @logic_ Non-retryable errors — fail immediately
-                self._handle_error_(e, context="Rerank")
-
-        if last_error:
-            self._handle_error_(last_error, context="Rerank")
-
-    def _handle_error_(self, error, context="Rerank API request"):
+        trace = self._begin_trace_()
+        try:
+            if self._single_flight is not None:
+                response_json = self._single_flight._do_(
+                    ResponseCache._make_key_(self._url, payload),
+                    lambda: self._send_rerank_request_(payload, timeout=timeout, trace=trace)
+                )
+            else:
+                response_json = self._send_rerank_request_(payload, timeout=timeout, trace=trace)
+            self._trace_usage_(trace, response_json)
+            return response_json
+        except Exception as e:
+            if trace is not None:
+                trace._fail_(e)
+            raise
+        finally:
+            if trace is not None:
+                self._telemetry._emit_(trace)
+
+    def _send_rerank_request_(self, payload, timeout=None, trace=None):
         """
-        @func_ _handle_error_
-        @params error : (Exception) The caught exception.
-        @params context : (str) Description of the operation for error messages.
-        @desc_ Maps HTTP status codes to framework exceptions, mirroring LLMRequestEngine.
+        @func_ _send_rerank_request_
+        @params payload : (dict) The JSON request payload.
+        @params timeout : (int) Request timeout in seconds.
+        @params trace : (CallTrace, optional) Receives queue wait, retries and timings.
+        @returns (dict) Parsed JSON response from the API.
+        @desc_ Performs the HTTP round trip with retry logic (no coalescing).
         """
-        if isinstance(error, requests.exceptions.HTTPError):
-            status_code = error.response.status_code
-            detail = error.response.text
-            if status_code == 401:
-                raise AuthenticationError(
-                    f"Invalid API Key provided. Details: {detail}"
-                ) from error
-            elif status_code == 402:
-                raise APIResponseError(
-                    f"Insufficient credits for reranking. Details: {detail}",
-                    status_code=402
-                ) from error
-            else:
-                raise APIResponseError(
-                    f"HTTP Error {status_code}: {detail}",
-                    status_code=status_code,
-                    response_body=detail
-                ) from error
-
-        elif isinstance(error, requests.exceptions.ConnectionError):
-            raise APIConnectionError(
-                f"{context} failed: Could not connect to OpenRouter API. "
-                f"Check your internet connection. Details: {str(error)}"
-            ) from error
-
-        elif isinstance(error, requests.exceptions.Timeout):
-            raise APIConnectionError(
-                f"{context} timed out after {FrameworkConfig._REQUEST_TIMEOUT} seconds. "
-                f"Details: {str(error)}"
-            ) from error
-
-        elif isinstance(error, requests.exceptions.RequestException):
-            raise APIConnectionError(
-                f"{context} failed unexpectedly: {str(error)}"
-            ) from error
+        return self._send_with_retry_(payload, timeout=timeout, trace=trace, context="Rerank")
 
-        elif isinstance(error, json.JSONDecodeError):
+    def _raise_http_error_(self, status_code, detail, cause=None):
+        """
+        @func_ _raise_http_error_
+        @params status_code : (int) HTTP status code of the failed response.
+        @params detail : (str) Raw response body for diagnostics.
+        @params cause : (Exception, optional) Underlying transport exception.
+        @desc_ Maps an HTTP status code to the matching framework exception.
+               Shared by the sync and async rerank engines.
+        """
+        if status_code == 401:
+            raise AuthenticationError(
+                f"Invalid API Key provided. Details: {detail}"
+            ) from cause
+        elif status_code == 402:
+            raise APIResponseError(
+                f"Insufficient credits for reranking. Details: {detail}",
+                status_code=402
+            ) from cause
+        else:
             raise APIResponseError(
-                f"Failed to decode rerank API response JSON. Details: {str(error)}"
-            ) from error
+                f"HTTP Error {status_code}: {detail}",
+                status_code=status_code,
+                response_body=detail
+            ) from cause
 
     def _rerank_(self, query, documents, top_n=None):
         """
@@ -150,6 +137,19 @@ class RerankEngine:
         @returns (list[dict]) Sorted results, each containing 'index', 'relevance_score', 'text'.
         @desc_ Calls the OpenRouter /api/v1/rerank endpoint and parses the response.
         """
+        payload = self._build_rerank_payload_(query, documents, top_n=top_n)
+        response_json = self._call_rerank_api_(payload)
+        return self._parse_rerank_response_(response_json)
+
+    def _build_rerank_payload_(self, query, documents, top_n=None):
+        """
+        @func_ _build_rerank_payload_
+        @params query : (str) The search query.
+        @params documents : (list[str]) Document texts to rerank.
+        @params top_n : (int, optional) Number of most relevant documents to return.
+        @returns (dict) The JSON request payload.
+        @desc_ Validates input and builds the rerank request body.
+        """
         if not documents:
             raise InvalidInputError("Cannot rerank an empty document list.")
 
@@ -160,9 +160,15 @@ class RerankEngine:
         }
         if top_n is not None:
             payload["top_n"] = top_n
+        return payload
 
-        response_json = self._call_rerank_api_(payload)
-
+    def _parse_rerank_response_(self, response_json):
+        """
+        @func_ _parse_rerank_response_
+        @params response_json : (dict) The parsed JSON from the API response.
+        @returns (list[dict]) Sorted results, each containing 'index', 'relevance_score', 'text'.
+        @desc_ Normalizes the rerank response into the framework's result format.
+        """
         ## @logic_ Parse rerank response into standardized format
         if "results" not in response_json or len(response_json["results"]) == 0:
             logger.warning("Rerank API returned empty results.")
@@ -0,0 +1,345 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/core/telemetry.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Per-call telemetry: every engine call emits one structured record (stage, route, model,
+##        queue wait, connect/TTFB/total time, token usage, cost, retries, cache hit) to
+##        pluggable sinks, with aggregations per stage, route, model and session.
+## @deps asyncio, contextvars, json, math, os, threading, time, uuid, logging, collections, src.adaptive_routing.config
+
+import asyncio
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+import uuid
+import logging
+from collections import deque
+from src.adaptive_routing.config import FrameworkConfig
+
+logger = logging.getLogger(__name__)
+
+## @const_ _SESSION : Session id attached to records emitted from the current context.
+_SESSION = contextvars.ContextVar("telemetry_session", default=None)
+
+class CallTrace:
+    """
+    @class CallTrace
+    @desc_ Mutable record of one logical engine call, filled in as the call progresses.
+           Times are in seconds; token fields stay None when the provider sent no usage.
+    @attr_ queue_wait : (float) Time spent queued by the rate limiter across all attempts.
+    @attr_ connect : (float | None) TCP+TLS setup time of the final attempt (0 on a reused connection).
+    @attr_ ttfb : (float | None) Send -> response headers (or first streamed token).
+    @attr_ total : (float | None) Whole call including retries, set when the trace is emitted.
+    @attr_ retries : (int) Backoff retries plus 429 re-queues.
+    """
+    __slots__ = (
+        "call_id", "timestamp", "session", "stage", "route", "model", "endpoint", "streamed",
+        "queue_wait", "connect", "ttfb", "total", "prompt_tokens", "completion_tokens",
+        "reasoning_tokens", "cost", "retries", "cache_hit", "coalesced", "status", "error", "_started"
+    )
+
+    def __init__(self, stage, model, route=None, endpoint="chat", streamed=False):
+        self.call_id = uuid.uuid4().hex[:12]
+        self.timestamp = time.time()
+        self.session = _SESSION.get()
+        self.stage = stage
+        self.route = route
+        self.model = model
+        self.endpoint = endpoint
+        self.streamed = streamed
+        self.queue_wait = 0.0
+        self.connect = None
+        self.ttfb = None
+        self.total = None
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.reasoning_tokens = None
+        self.cost = None
+        self.retries = 0
+        self.cache_hit = False
+        self.coalesced = False
+        self.status = "ok"
+        self.error = None
+        self._started = time.monotonic()
+
+    def _add_usage_(self, usage):
+        """
+        @func_ _add_usage_
+        @params usage : (dict | None) OpenRouter `usage` block (chat, embeddings or rerank).
+        """
+        if not isinstance(usage, dict):
+            return
+        self.prompt_tokens = usage.get("prompt_tokens", usage.get("total_tokens"))
+        self.completion_tokens = usage.get("completion_tokens")
+        details = usage.get("completion_tokens_details") or {}
+        self.reasoning_tokens = details.get("reasoning_tokens", usage.get("reasoning_tokens"))
+        if usage.get("cost") is not None:
+            self.cost = usage.get("cost")
+
+    def _fork_(self):
+        """
+        @func_ _fork_
+        @returns (CallTrace) Scratch trace for one attempt of this call (e.g. a hedge); never emitted.
+        """
+        return CallTrace(self.stage, self.model, route=self.route, endpoint=self.endpoint, streamed=self.streamed)
+
+    def _adopt_(self, attempt):
+        """
+        @func_ _adopt_
+        @params attempt : (CallTrace) Fork whose attempt produced the call's result.
+        @desc_ Copies the attempt's model and timings; its queue wait adds to the call's.
+        """
+        self.queue_wait += attempt.queue_wait
+        self.retries = attempt.retries
+        self.connect = attempt.connect
+        self.ttfb = attempt.ttfb
+        self.model = attempt.model
+
+    def _fail_(self, error):
+        """
+        @func_ _fail_
+        @params error : (BaseException) Exception that ended the call.
+        @desc_ A stream abandoned by its consumer or a cancelled task is recorded as "cancelled".
+        """
+        self.status = "cancelled" if isinstance(error, (GeneratorExit, asyncio.CancelledError)) else "error"
+        self.error = type(error).__name__
+
+    def _to_dict_(self):
+        """
+        @func_ _to_dict_
+        @returns (dict) JSON-serializable record (times rounded to milliseconds).
+        """
+        record = {name: getattr(self, name) for name in self.__slots__ if not name.startswith("_")}
+        for name in ("queue_wait", "connect", "ttfb", "total"):
+            if record[name] is not None:
+                record[name] = round(record[name], 4)
+        return record
+
+
+class RingBufferSink:
+    """
+    @class RingBufferSink
+    @desc_ Keeps the most recent records in memory; backs the aggregation queries.
+    @attr_ _records : (deque) Bounded record buffer.
+    """
+    def __init__(self, capacity=None):
+        self._records = deque(maxlen=capacity or FrameworkConfig._TELEMETRY_BUFFER_SIZE)
+        self._lock = threading.Lock()
+
+    def _write_(self, record):
+        with self._lock:
+            self._records.append(record)
+
+    def _records_(self):
+        """
+        @func_ _records_
+        @returns (list[dict]) Snapshot of the buffered records, oldest first.
+        """
+        with self._lock:
+            return list(self._records)
+
+    def _clear_(self):
+        with self._lock:
+            self._records.clear()
+
+    def _close_(self):
+        pass
+
+
+class JSONLSink:
+    """
+    @class JSONLSink
+    @desc_ Appends one JSON line per record, for offline analysis across runs.
+    @attr_ _path : (str) Output file (parent directories are created).
+    """
+    def __init__(self, path):
+        self._path = path
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def _write_(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def _close_(self):
+        with self._lock:
+            self._file.close()
+
+
+class Telemetry:
+    """
+    @class Telemetry
+    @desc_ Process-wide telemetry hub. Engines open a CallTrace per call and emit it when the
+           call ends; each record is fanned out to every sink. A sink is any object with
+           `_write_(record)` and `_close_()`.
+    @attr_ _sinks : (list) Active sinks.
+    @attr_ _buffer : (RingBufferSink | None) In-memory sink used by the aggregation queries.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, sinks=None):
+        self._sinks = list(sinks or [])
+        self._buffer = next((s for s in self._sinks if isinstance(s, RingBufferSink)), None)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def _get_shared_(cls):
+        """
+        @func_ _get_shared_
+        @returns (Telemetry) The process-wide hub with sinks from config.
+        @desc_ Lazily creates the shared hub on first use (thread-safe).
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    sinks = [RingBufferSink()]
+                    if FrameworkConfig._TELEMETRY_JSONL_PATH:
+                        sinks.append(JSONLSink(FrameworkConfig._TELEMETRY_JSONL_PATH))
+                    cls._shared = cls(sinks)
+        return cls._shared
+
+    @classmethod
+    def _for_config_(cls):
+        """
+        @func_ _for_config_
+        @returns (Telemetry | None) The shared hub if enabled in config, else None.
+        """
+        return cls._get_shared_() if FrameworkConfig._TELEMETRY_ENABLED else None
+
+    @classmethod
+    def _bind_session_(cls, session_id):
+        """
+        @func_ _bind_session_
+        @params session_id : (str | None) Conversation the following calls belong to.
+        @desc_ Applies to the current thread / asyncio task and everything it starts.
+        """
+        _SESSION.set(session_id)
+
+    def _add_sink_(self, sink):
+        with self._lock:
+            self._sinks.append(sink)
+            if self._buffer is None and isinstance(sink, RingBufferSink):
+                self._buffer = sink
+
+    def _remove_sink_(self, sink):
+        with self._lock:
+            if sink in self._sinks:
+                self._sinks.remove(sink)
+            if sink is self._buffer:
+                self._buffer = None
+        sink._close_()
+
+    def _begin_(self, stage, model, route=None, endpoint="chat", streamed=False):
+        """
+        @func_ _begin_
+        @returns (CallTrace) A new trace whose clock starts now.
+        """
+        return CallTrace(stage, model, route=route, endpoint=endpoint, streamed=streamed)
+
+    def _emit_(self, trace):
+        """
+        @func_ _emit_
+        @params trace : (CallTrace) Finished call.
+        @desc_ Stamps the total duration and writes the record to every sink. A failing sink
+               is logged and skipped so telemetry can never break a request.
+        """
+        trace.total = time.monotonic() - trace._started
+        record = trace._to_dict_()
+        with self._lock:
+            sinks = list(self._sinks)
+        for sink in sinks:
+            try:
+                sink._write_(record)
+            except Exception as e:
+                logger.warning(f"Telemetry sink {type(sink).__name__} failed: {e}")
+
+    def _records_(self, **filters):
+        """
+        @func_ _records_
+        @params filters : Field equality filters, e.g. session="...", stage="router".
+        @returns (list[dict]) Buffered records matching every filter.
+        """
+        if self._buffer is None:
+            return []
+        records = self._buffer._records_()
+        if filters:
+            records = [r for r in records if all(r.get(k) == v for k, v in filters.items())]
+        return records
+
+    def _aggregate_(self, by="stage", records=None, **filters):
+        """
+        @func_ _aggregate_
+        @params by : (str) Grouping field: "stage", "route", "model" or "session".
+        @params records : (list[dict], optional) Records to aggregate (defaults to the buffer).
+        @returns (dict) group -> {calls, errors, cache_hits, coalesced, retries, token sums,
+                 cost, avg queue wait, p50/p95 TTFB and total}.
+        """
+        if records is None:
+            records = self._records_(**filters)
+        groups = {}
+        for record in records:
+            groups.setdefault(record.get(by) or "unknown", []).append(record)
+        return {key: _summarize_(items) for key, items in groups.items()}
+
+    def _stats_(self, **filters):
+        """
+        @func_ _stats_
+        @returns (dict) Aggregations by stage and by route for the buffered records.
+        """
+        records = self._records_(**filters)
+        routed = [r for r in records if r.get("route")]
+        return {
+            "records": len(records),
+            "by_stage": self._aggregate_("stage", records),
+            "by_route": self._aggregate_("route", routed)
+        }
+
+
+def _percentile_(values, p):
+    """
+    @func_ _percentile_
+    @returns (float | None) Nearest-rank percentile of the values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[max(0, math.ceil(len(ordered) * p / 100.0) - 1)], 4)
+
+def _summarize_(records):
+    """
+    @func_ _summarize_
+    @params records : (list[dict]) Records of one group.
+    @returns (dict) Counters, token totals and latency percentiles.
+    """
+    def total(field):
+        return sum(r.get(field) or 0 for r in records)
+
+    ## @logic_ Cache hits and coalesced followers sent nothing, so they are excluded from latency
+    sent = [r for r in records if not r.get("cache_hit") and not r.get("coalesced")]
+    ttfb = [r["ttfb"] for r in sent if r.get("ttfb") is not None]
+    totals = [r["total"] for r in sent if r.get("total") is not None]
+    calls = len(records)
+    return {
+        "calls": calls,
+        "errors": sum(1 for r in records if r.get("status") != "ok"),
+        "cache_hits": sum(1 for r in records if r.get("cache_hit")),
+        "coalesced": sum(1 for r in records if r.get("coalesced")),
+        "retries": total("retries"),
+        "prompt_tokens": total("prompt_tokens"),
+        "completion_tokens": total("completion_tokens"),
+        "reasoning_tokens": total("reasoning_tokens"),
+        "cost": round(total("cost"), 6),
+        "avg_queue_wait": round(total("queue_wait") / calls, 4) if calls else 0.0,
+        "ttfb_p50": _percentile_(ttfb, 50),
+        "ttfb_p95": _percentile_(ttfb, 95),
+        "total_p50": _percentile_(totals, 50),
+        "total_p95": _percentile_(totals, 95)
+    }
@@ -0,0 +1,155 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/core/transport.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Process-wide pooled HTTP transport with keep-alive shared by all API engines.
+## @deps requests, urllib3, threading, time, logging, urllib.parse, src.adaptive_routing.config
+
+import threading
+import time
+import logging
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from src.adaptive_routing.config import FrameworkConfig
+
+logger = logging.getLogger(__name__)
+
+## @const_ _CONNECT_TIME : Thread-local TCP+TLS setup time of the last new connection.
+_CONNECT_TIME = threading.local()
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        started = time.monotonic()
+        super().connect()
+        _CONNECT_TIME.seconds = getattr(_CONNECT_TIME, "seconds", 0.0) + time.monotonic() - started
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        started = time.monotonic()
+        super().connect()
+        _CONNECT_TIME.seconds = getattr(_CONNECT_TIME, "seconds", 0.0) + time.monotonic() - started
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class HTTPTransport:
+    """
+    @class HTTPTransport
+    @desc_ Wraps a single requests.Session with per-host connection pools so that every
+           engine (triage, router, embeddings, rerank, generation, audit) reuses open
+           TCP+TLS connections instead of handshaking on every call.
+    @attr_ _session : (requests.Session) Keep-alive session holding the connection pools.
+    @attr_ _pool_connections : (int) Number of per-host pools to cache.
+    @attr_ _pool_maxsize : (int) Max idle connections kept alive per host.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, pool_connections=None, pool_maxsize=None):
+        self._pool_connections = pool_connections if pool_connections is not None else FrameworkConfig._HTTP_POOL_CONNECTIONS
+        self._pool_maxsize = pool_maxsize if pool_maxsize is not None else FrameworkConfig._HTTP_POOL_MAXSIZE
+
+        ## @logic_ Retries are handled by the engines themselves, so the adapter never retries
+        adapter = HTTPAdapter(
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            max_retries=0,
+            pool_block=False
+        )
+        ## @logic_ Timed connection classes report handshake cost to per-call telemetry
+        adapter.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update({"Connection": "keep-alive"})
+
+    @classmethod
+    def _get_shared_(cls):
+        """
+        @func_ _get_shared_
+        @returns (HTTPTransport) The process-wide transport instance.
+        @desc_ Lazily creates the shared transport on first use (thread-safe).
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def _reset_shared_(cls):
+        """
+        @func_ _reset_shared_
+        @desc_ Closes the shared transport so the next call rebuilds it with current config.
+               Engines holding the old instance keep working until they are re-created.
+        """
+        with cls._shared_lock:
+            old = cls._shared
+            cls._shared = None
+        if old is not None:
+            old._close_()
+
+    @staticmethod
+    def _pop_connect_time_():
+        """
+        @func_ _pop_connect_time_
+        @returns (float) Seconds the current thread spent opening connections since the last call
+                 (0.0 when the request reused a pooled connection).
+        """
+        seconds = getattr(_CONNECT_TIME, "seconds", 0.0)
+        _CONNECT_TIME.seconds = 0.0
+        return seconds
+
+    def _post_(self, url, headers=None, json=None, timeout=None, stream=False):
+        """
+        @func_ _post_
+        @params url : (str) Target endpoint.
+        @params headers : (dict) HTTP headers.
+        @params json : (dict) JSON request body.
+        @params timeout : (int) Request timeout in seconds.
+        @params stream : (bool) Whether to defer reading the response body.
+        @returns (requests.Response) The raw HTTP response.
+        @desc_ Issues a POST through the pooled session.
+        """
+        return self._session.post(url, headers=headers, json=json, timeout=timeout, stream=stream)
+
+    def _preconnect_(self, urls=None, timeout=5):
+        """
+        @func_ _preconnect_
+        @params urls : (list[str], optional) Endpoints whose hosts should be warmed up.
+        @params timeout : (int) Per-host connect timeout in seconds.
+        @returns (int) Number of hosts successfully warmed.
+        @desc_ Opens a keep-alive connection to each distinct host so the first pipeline
+               call of a session does not pay the TCP+TLS handshake.
+        """
+        urls = urls or [FrameworkConfig._API_BASE_URL]
+        hosts = []
+        for url in urls:
+            parts = urlsplit(url)
+            origin = f"{parts.scheme}://{parts.netloc}"
+            if origin not in hosts:
+                hosts.append(origin)
+
+        warmed = 0
+        ## @iter_ hosts : Issuing a lightweight HEAD per origin to populate the pool
+        for origin in hosts:
+            try:
+                self._session.head(origin, timeout=timeout, allow_redirects=False)
+                warmed += 1
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Pre-connect to {origin} failed: {e}")
+        logger.info(f"HTTP transport pre-connected to {warmed}/{len(hosts)} host(s).")
+        return warmed
+
+    def _close_(self):
+        """
+        @func_ _close_
+        @desc_ Releases all pooled connections.
+        """
+        self._session.close()
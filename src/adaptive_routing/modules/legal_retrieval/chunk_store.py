@@ -0,0 +1,227 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/modules/legal_retrieval/chunk_store.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Deduplicated, memory-mapped chunk store replacing the combined_index.json array.
+##        Parent texts and metadata are stored once; child records reference them by id and
+##        point into the parent text when the chunk is a slice of it. Records are decoded only
+##        when accessed, so resident memory follows what queries touch.
+## @deps json, os, logging, numpy, src.adaptive_routing.modules.legal_retrieval.mapped_file
+
+import json
+import os
+import logging
+import numpy as np
+from src.adaptive_routing.modules.legal_retrieval.mapped_file import read_mapped, write_mapped
+
+logger = logging.getLogger(__name__)
+
+## @const_ _MAGIC : File header identifying a chunk store.
+_MAGIC = b"LARFCHK1"
+## @const_ _FORMAT_VERSION : Bumped whenever the record layout changes.
+_FORMAT_VERSION = 1
+## @const_ CHUNK_STORE_EXT : Extension of chunk store files; legacy stores use ".json".
+CHUNK_STORE_EXT = ".chunks"
+
+def resolve_chunks_path(path):
+    """
+    @func_ resolve_chunks_path
+    @params path : (str) Configured chunk store path.
+    @returns (str) The path itself if it exists, else an existing sibling in the other format
+             (legacy "<stem>.json" for "<stem>.chunks" and vice versa), else the path unchanged.
+    """
+    if not path or os.path.exists(path):
+        return path
+    stem, ext = os.path.splitext(path)
+    sibling = stem + (".json" if ext == CHUNK_STORE_EXT else CHUNK_STORE_EXT)
+    return sibling if os.path.exists(sibling) else path
+
+def load_chunks(path):
+    """
+    @func_ load_chunks
+    @params path : (str) Chunk store or legacy JSON array.
+    @returns (ChunkStore | list) A mapped store, or the parsed records of a legacy JSON file.
+    """
+    with open(path, "rb") as f:
+        head = f.read(len(_MAGIC))
+    if head == _MAGIC:
+        return ChunkStore(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def count_chunks(path):
+    """
+    @func_ count_chunks
+    @params path : (str) Chunk store or legacy JSON array.
+    @returns (int) Number of records, read from the header for a chunk store (no record is
+             decoded); a legacy JSON array has to be parsed.
+    """
+    with open(path, "rb") as f:
+        head = f.read(len(_MAGIC))
+    if head == _MAGIC:
+        header, _ = read_mapped(path, _MAGIC)
+        return int(header["count"])
+    return len(load_chunks(path))
+
+def _locate_(parent, text, span=None):
+    """
+    @func_ _locate_
+    @returns (int) Character offset of text in parent, or -1. A chunker span is checked in place
+             instead of searching the whole parent.
+    """
+    if span is not None and parent.startswith(text, span[0]) and span[1] - span[0] == len(text):
+        return span[0]
+    return parent.find(text)
+
+
+class ChunkStore:
+    """
+    @class ChunkStore
+    @desc_ Read-only sequence of chunk records {"id", "text", "metadata"} backed by a mapped
+           file. Layout (see mapped_file): one UTF-8 blob holding parent texts, child texts
+           that are not slices of their parent, and distinct metadata JSON strings; per-child
+           arrays give the stable id, the text's byte span in the blob, the parent id and the
+           metadata id. metadata["parent_context"] is re-attached from the parent table on access.
+    @attr_ _ids : (np.ndarray) int64 stable chunk ids, in index order.
+    @attr_ _fingerprint : (str | None) corpus_fingerprint of the child texts recorded at write time.
+    """
+    def __init__(self, path):
+        self._path = path
+        header, arrays = read_mapped(path, _MAGIC)
+        if header.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"{path} has unsupported chunk store version {header.get('version')}")
+        self._fingerprint = header.get("fingerprint")
+        self._ids = arrays["ids"]
+        self._text_start, self._text_end = arrays["text_start"], arrays["text_end"]
+        self._parent_of, self._meta_of = arrays["parent_of"], arrays["meta_of"]
+        self._parent_start, self._parent_end = arrays["parent_start"], arrays["parent_end"]
+        self._meta_start, self._meta_end = arrays["meta_start"], arrays["meta_end"]
+        self._blob = arrays["blob"]
+        self._meta_cache = {}
+        logger.info(f"Chunk store mapped: {len(self._ids)} chunks, {len(self._parent_start)} parents from {path}")
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, pos):
+        if pos < 0:
+            pos += len(self._ids)
+        meta = self._metadata_(pos)
+        parent = int(self._parent_of[pos])
+        if parent >= 0:
+            meta["parent_context"] = self._decode_(self._parent_start[parent], self._parent_end[parent])
+        return {"id": int(self._ids[pos]), "text": self._text_(pos), "metadata": meta}
+
+    def __iter__(self):
+        for pos in range(len(self._ids)):
+            yield self[pos]
+
+    def _decode_(self, start, end):
+        return self._blob[int(start):int(end)].tobytes().decode("utf-8")
+
+    def _text_(self, pos):
+        """
+        @func_ _text_
+        @returns (str) Text of the chunk at a position (without decoding its parent).
+        """
+        return self._decode_(self._text_start[pos], self._text_end[pos])
+
+    def _metadata_(self, pos):
+        """
+        @func_ _metadata_
+        @returns (dict) Copy of the chunk's metadata without "parent_context".
+        @desc_ Each distinct metadata entry is parsed once and cached.
+        """
+        return dict(self._metadata_entry_(int(self._meta_of[pos])))
+
+    def _distinct_metadata_(self):
+        """
+        @func_ _distinct_metadata_
+        @returns (tuple) (list of distinct metadata dicts, int32 per-chunk index into that list).
+        """
+        count = len(self._meta_start)
+        return [self._metadata_entry_(i) for i in range(count)], self._meta_of
+
+    def _metadata_entry_(self, meta_id):
+        meta = self._meta_cache.get(meta_id)
+        if meta is None:
+            meta = self._meta_cache[meta_id] = json.loads(self._decode_(self._meta_start[meta_id], self._meta_end[meta_id]))
+        return meta
+
+    def _texts_(self):
+        """
+        @func_ _texts_
+        @returns (generator) Chunk texts in index order.
+        """
+        return (self._text_(pos) for pos in range(len(self._ids)))
+
+    @staticmethod
+    def _write_(path, records, fingerprint=None):
+        """
+        @func_ _write_
+        @params path : (str) Destination file.
+        @params records : (iterable[dict]) Chunk records {"id", "text", "metadata"}, optionally with
+                "span" (character offsets of the text in metadata["parent_context"]).
+        @params fingerprint : (str, optional) corpus_fingerprint of the record texts.
+        @returns (dict) {"chunks", "parents", "metadata", "bytes"} written.
+        """
+        blob = bytearray()
+        parents, parent_spans = {}, []
+        metas, meta_spans = {}, []
+        ids, text_spans, parent_of, meta_of = [], [], [], []
+        cursors = {}
+
+        def append(data):
+            start = len(blob)
+            blob.extend(data)
+            return start, len(blob)
+
+        ## @iter_ records : Interning parents and metadata, locating each text in its parent
+        for record in records:
+            meta = dict(record.get("metadata") or {})
+            parent = meta.pop("parent_context", None)
+            text = record.get("text", "")
+            key = json.dumps(meta, ensure_ascii=False)
+            if key not in metas:
+                metas[key] = len(metas)
+                meta_spans.append(append(key.encode("utf-8")))
+            meta_of.append(metas[key])
+            ids.append(record["id"])
+
+            span = None
+            if isinstance(parent, str):
+                if parent not in parents:
+                    parents[parent] = len(parents)
+                    parent_spans.append(append(parent.encode("utf-8")))
+                parent_id = parents[parent]
+                at = _locate_(parent, text, record.get("span"))
+                if at >= 0:
+                    ## @logic_ Chunks of a parent arrive in order; encode only the gap since the previous one
+                    char_at, byte_at = cursors.get(parent_id, (0, 0))
+                    if at < char_at:
+                        char_at, byte_at = 0, 0
+                    byte_at += len(parent[char_at:at].encode("utf-8"))
+                    cursors[parent_id] = (at, byte_at)
+                    start = parent_spans[parent_id][0] + byte_at
+                    span = (start, start + len(text.encode("utf-8")))
+            else:
+                parent_id = -1
+            parent_of.append(parent_id)
+            text_spans.append(span or append(text.encode("utf-8")))
+
+        text_spans = np.asarray(text_spans, dtype=np.int64).reshape(-1, 2)
+        parent_spans = np.asarray(parent_spans, dtype=np.int64).reshape(-1, 2)
+        meta_spans = np.asarray(meta_spans, dtype=np.int64).reshape(-1, 2)
+        write_mapped(path, _MAGIC, {"version": _FORMAT_VERSION, "count": len(ids), "fingerprint": fingerprint}, {
+            "ids": np.asarray(ids, dtype=np.int64),
+            "text_start": text_spans[:, 0].copy(),
+            "text_end": text_spans[:, 1].copy(),
+            "parent_of": np.asarray(parent_of, dtype=np.int32),
+            "meta_of": np.asarray(meta_of, dtype=np.int32),
+            "parent_start": parent_spans[:, 0].copy(),
+            "parent_end": parent_spans[:, 1].copy(),
+            "meta_start": meta_spans[:, 0].copy(),
+            "meta_end": meta_spans[:, 1].copy(),
+            "blob": np.frombuffer(bytes(blob), dtype=np.uint8)
+        })
+        return {"chunks": len(ids), "parents": len(parent_spans), "metadata": len(metas), "bytes": len(blob)}
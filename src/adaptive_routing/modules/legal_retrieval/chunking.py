@@ -0,0 +1,77 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/modules/legal_retrieval/chunking.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Streaming text chunker. Yields (start, end) character spans into the source text,
+##        cut at the last sentence or section boundary that fits the chunk size, so a
+##        document is scanned once and no intermediate strings are built. Size and overlap
+##        are explicit arguments; nothing is read from or written to shared state.
+## @deps re, src.adaptive_routing.core.exceptions
+
+import re
+from src.adaptive_routing.core.exceptions import InvalidInputError
+
+## @const_ _BOUNDARY : Whitespace after sentence punctuation, or a blank line between sections.
+_BOUNDARY = re.compile(r'(?<=[.!?;])\s+|\n\s*\n')
+## @const_ _NON_SPACE : First non-whitespace character at or after a position.
+_NON_SPACE = re.compile(r'\S')
+
+def _skip_space_(text, pos, stop):
+    match = _NON_SPACE.search(text, pos, stop)
+    return match.start() if match else stop
+
+def iter_chunk_spans(text, chunk_size, chunk_overlap=0):
+    """
+    @func_ iter_chunk_spans
+    @params text : (str) Document text.
+    @params chunk_size : (int) Max characters per chunk.
+    @params chunk_overlap : (int) Characters of the previous chunk repeated at the start of the next.
+    @returns (generator) (start, end) offsets into text; text[start:end] is the chunk, with no
+             leading or trailing whitespace.
+    @desc_ Each chunk ends at the furthest boundary within chunk_size of its start; a stretch
+           without any boundary is cut at chunk_size. Boundaries come from one lazy finditer
+           over the text, so the cost is linear in its length.
+    """
+    if not text or not text.strip():
+        raise InvalidInputError("Cannot chunk empty text.")
+    chunk_size = max(1, int(chunk_size))
+    chunk_overlap = max(0, min(int(chunk_overlap), chunk_size - 1))
+
+    stop = len(text.rstrip())
+    start = _skip_space_(text, 0, stop)
+    boundaries = _BOUNDARY.finditer(text, 0, stop)
+    pending = next(boundaries, None)
+    last, end = None, start
+
+    ## @iter_ chunks : Advancing the window once per emitted span
+    while start < stop:
+        limit = start + chunk_size
+        if limit >= stop:
+            yield start, stop
+            return
+
+        ## @logic_ Consume boundaries inside the window; the last one is the cut unless the previous chunk already ended there
+        while pending is not None and pending.start() <= limit:
+            last = pending
+            pending = next(boundaries, None)
+        cut = last if last is not None and last.start() > max(start, end) else None
+
+        end = cut.start() if cut is not None else limit
+        ## @logic_ A hard cut (or a blank line after trailing spaces) can end on whitespace; text[start] never is
+        while text[end - 1].isspace():
+            end -= 1
+        yield start, end
+        if chunk_overlap:
+            start = _skip_space_(text, max(end - chunk_overlap, start + 1), stop)
+        else:
+            start = _skip_space_(text, cut.end() if cut is not None else end, stop)
+
+def chunk_text(text, chunk_size, chunk_overlap=0):
+    """
+    @func_ chunk_text
+    @params text : (str) Document text.
+    @params chunk_size : (int) Max characters per chunk.
+    @params chunk_overlap : (int) Overlap between consecutive chunks.
+    @returns (list[str]) The chunk strings of iter_chunk_spans.
+    """
+    return [text[start:end] for start, end in iter_chunk_spans(text, chunk_size, chunk_overlap)]
@@ -3,16 +3,29 @@
 ## @file src/adaptive_routing/modules/legal_retrieval/embedding.py
 ## @project_ LLM Legal Adaptive Routing Framework
 ## @desc_ Manages document embeddings via OpenRouter and FAISS vector index for legal RAG.
-## @deps requests, json, numpy, faiss, re, logging, rank_bm25, src.adaptive_routing.config, src.adaptive_routing.core.exceptions
+## @deps requests, json, hashlib, math, os, numpy, faiss, re, time, logging, concurrent.futures, src.adaptive_routing.config, src.adaptive_routing.core.exceptions,
+##       src.adaptive_routing.modules.legal_retrieval.embedding_cache, src.adaptive_routing.modules.legal_retrieval.bm25,
+##       src.adaptive_routing.modules.legal_retrieval.chunk_store, src.adaptive_routing.modules.legal_retrieval.metadata_columns,
+##       src.adaptive_routing.modules.legal_retrieval.fusion, src.adaptive_routing.modules.legal_retrieval.chunking
 
 import json
+import hashlib
+import math
+import os
 import re
+import time
 import numpy as np
 import faiss
 import logging
-from rank_bm25 import BM25Okapi
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.adaptive_routing.core.engine import LLMRequestEngine
 from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.modules.legal_retrieval.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from src.adaptive_routing.modules.legal_retrieval.bm25 import BM25Index, corpus_fingerprint, tokenize
+from src.adaptive_routing.modules.legal_retrieval.chunk_store import ChunkStore, load_chunks
+from src.adaptive_routing.modules.legal_retrieval.metadata_columns import MetadataColumns
+from src.adaptive_routing.modules.legal_retrieval.fusion import ScoreFusion, ranks_from_order
+from src.adaptive_routing.modules.legal_retrieval.chunking import chunk_text, iter_chunk_spans
 from src.adaptive_routing.core.exceptions import (
     AuthenticationError,
     APIConnectionError,
@@ -22,6 +35,26 @@ from src.adaptive_routing.core.exceptions import (
 
 logger = logging.getLogger(__name__)
 
+def stable_id(doc_id: str, chunk_no: int = 0) -> int:
+    """
+    @func_ stable_id
+    @params doc_id : (str) Stable document key (see legal_indexing.document_key).
+    @params chunk_no : (int) Position of the chunk within its document.
+    @returns (int) Non-negative 63-bit FAISS id derived from the key, identical across rebuilds.
+    """
+    digest = hashlib.sha256(f"{doc_id}#{chunk_no}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") & 0x7FFFFFFFFFFFFFFF
+
+def resolve_index_factory(factory: str, num_vectors: int) -> str:
+    """
+    @func_ resolve_index_factory
+    @params factory : (str) FAISS index_factory string, optionally with a bare "IVF" component.
+    @params num_vectors : (int) Training set size.
+    @returns (str) Factory string with the inverted-list count filled in (~4*sqrt(N), at least 1).
+    """
+    nlist = max(1, min(num_vectors, int(4 * math.sqrt(max(num_vectors, 1)))))
+    return re.sub(r"\bIVF(?=,|$)", f"IVF{nlist}", factory or "Flat")
+
 class EmbeddingManager:
     """
     @class EmbeddingManager
@@ -30,10 +63,19 @@ class EmbeddingManager:
     @attr_ _model : (str) Embedding model identifier.
     @attr_ _chunk_size : (int) Max characters per chunk.
     @attr_ _chunk_overlap : (int) Overlap between chunks.
-    @attr_ _index : (faiss.IndexFlatL2) The FAISS vector index.
-    @attr_ _chunks : (list) Stored text chunks and metadata.
+    @attr_ _index : (faiss.IndexIDMap2) Inner-product FAISS index over L2-normalized vectors (cosine), keyed by stable chunk ids.
+    @attr_ _chunks : (list | ChunkStore) Chunk records {"id", "text", "metadata"}; metadata carries "doc_id".
+           A loaded index serves them lazily from the mapped store until the first write copies them into a list.
+    @attr_ _positions : (dict) Stable chunk id -> position in _chunks (and in the BM25 corpus).
+    @attr_ _ids : (np.ndarray) int64 stable chunk ids by position (maps filter masks to FAISS ids).
+    @attr_ _columns : (MetadataColumns) Columnar jurisdiction / category / source_file / section_id used for pre-filtering.
+    @attr_ _ef_search : (int) HNSW efSearch used per query (ignored by other index types).
+    @attr_ _nprobe : (int) IVF lists probed per query (ignored by other index types).
+    @attr_ _embedding_cache : (EmbeddingCache | None) Persistent text -> vector store consulted before the API.
+    @attr_ _query_cache : (QueryEmbeddingCache | None) LRU of search-query embeddings used by _search_.
+    @attr_ _fusion : (ScoreFusion | None) Fixed fusion settings; None builds one from FrameworkConfig per search.
     """
-    def __init__(self, api_key=None, model=None, chunk_size=None, chunk_overlap=None):
+    def __init__(self, api_key=None, model=None, chunk_size=None, chunk_overlap=None, transport=None, embedding_cache=None, query_cache=None, fusion=None):
         ## @logic_ Resolve API key and configuration
         self._api_key = api_key or FrameworkConfig._API_KEY
         if not self._api_key:
@@ -43,77 +85,246 @@ class EmbeddingManager:
         self._chunk_size = chunk_size if chunk_size is not None else FrameworkConfig._RETRIEVAL_CHUNK_SIZE
         self._chunk_overlap = chunk_overlap if chunk_overlap is not None else FrameworkConfig._RETRIEVAL_CHUNK_OVERLAP
         
-        self._engine = LLMRequestEngine(api_key=self._api_key, model=self._model)
-        self._engine._url = "https://openrouter.ai/api/v1/embeddings"
+        ## @logic_ Embedding calls share the process-wide pooled transport with every other engine
+        self._engine = LLMRequestEngine(api_key=self._api_key, model=self._model, transport=transport, coalesce=FrameworkConfig._COALESCE_DETERMINISTIC, stage="embedding")
+        self._engine._url = f"{FrameworkConfig._API_BASE_URL}/embeddings"
+        self._async_engine = None
+        self._embedding_cache = embedding_cache if embedding_cache is not None else EmbeddingCache._for_config_()
+        self._query_cache = query_cache if query_cache is not None else QueryEmbeddingCache._for_config_()
+        self._fusion = fusion
 
         self._index = None
         self._chunks = []
+        self._positions = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._columns = MetadataColumns([])
         self._dimension = None
+        self._ef_search = FrameworkConfig._RETRIEVAL_EF_SEARCH
+        self._nprobe = FrameworkConfig._RETRIEVAL_NPROBE
         self._bm25 = None
 
-    def _chunk_text_(self, text: str) -> list:
+    def _chunk_text_(self, text: str, chunk_size: int = None, chunk_overlap: int = None) -> list:
         """
         @func_ _chunk_text_
         @params text : (str) Raw document text.
+        @params chunk_size : (int, optional) Max characters per chunk (default _chunk_size).
+        @params chunk_overlap : (int, optional) Overlap between chunks (default _chunk_overlap).
         @returns (list) List of text chunks split at sentence boundaries.
-        @desc_ Splits a document into overlapping chunks at sentence boundaries.
+        @desc_ Splits a document into overlapping chunks at sentence or section boundaries.
         """
-        if not text or not text.strip():
-            raise InvalidInputError("Cannot chunk empty text.")
-
-        ## @logic_ Split text into sentences
-        sentences = re.split(r'(?<=[.!?;])\s+', text)
-        
-        if len(sentences) <= 1 and len(text) > self._chunk_size:
-            sentences = re.split(r'\n\s*\n', text)
-        
-        if len(sentences) <= 1 and len(text) > self._chunk_size:
-            sentences = [text[i:i+500] for i in range(0, len(text), 500)]
-
-        chunks = []
-        current_chunk = ""
-
-        ## @iter_ sentences : Building chunks from tokenized sentences
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) > self._chunk_size and current_chunk:
-                chunks.append(current_chunk.strip())
-                if self._chunk_overlap > 0:
-                    current_chunk = current_chunk[-self._chunk_overlap:] + " " + sentence
-                else:
-                    current_chunk = sentence
-            else:
-                current_chunk = (current_chunk + " " + sentence) if current_chunk else sentence
-
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-
-        return chunks
+        return chunk_text(
+            text,
+            chunk_size if chunk_size is not None else self._chunk_size,
+            chunk_overlap if chunk_overlap is not None else self._chunk_overlap
+        )
 
-    def _get_embeddings_(self, texts: list) -> np.ndarray:
+    def _get_embeddings_(self, texts: list, persist: bool = True) -> np.ndarray:
         """
         @func_ _get_embeddings_
         @params texts : (list) Strings to embed.
+        @params persist : (bool) Whether freshly fetched vectors are written to the embedding cache.
         @returns (np.ndarray) Matrix of embeddings.
-        @desc_ Calls OpenRouter /embeddings endpoint.
+        @desc_ Calls OpenRouter /embeddings endpoint for texts not already in the embedding cache.
+        """
+        cached, keys, missing = self._lookup_cached_(texts)
+        if not missing:
+            return self._merge_cached_(cached, keys, missing, None, persist)
+        return self._merge_cached_(cached, keys, missing, self._fetch_embeddings_(list(missing.values())), persist)
+
+    def _fetch_embeddings_(self, texts: list) -> np.ndarray:
+        """
+        @func_ _fetch_embeddings_
+        @params texts : (list) Strings to embed (no cache lookup).
+        @returns (np.ndarray) Matrix of embeddings.
+        @desc_ One synchronous /embeddings request.
         """
         payload = {"model": self._model, "input": texts}
         response_json = self._engine._call_api_(payload=payload, timeout=FrameworkConfig._EMBEDDING_TIMEOUT)
+        return self._parse_embeddings_(response_json)
 
+    async def _get_embeddings_async_(self, texts: list, persist: bool = True) -> np.ndarray:
+        """
+        @func_ _get_embeddings_async_
+        @params texts : (list) Strings to embed.
+        @params persist : (bool) Whether freshly fetched vectors are written to the embedding cache.
+        @returns (np.ndarray) Matrix of embeddings.
+        @desc_ Non-blocking variant of _get_embeddings_ backed by AsyncLLMRequestEngine.
+        """
+        cached, keys, missing = self._lookup_cached_(texts)
+        if not missing:
+            return self._merge_cached_(cached, keys, missing, None, persist)
+
+        if self._async_engine is None:
+            from src.adaptive_routing.core.async_engine import AsyncLLMRequestEngine
+            self._async_engine = AsyncLLMRequestEngine(api_key=self._api_key, model=self._model, coalesce=FrameworkConfig._COALESCE_DETERMINISTIC, stage="embedding")
+            self._async_engine._url = self._engine._url
+
+        payload = {"model": self._model, "input": list(missing.values())}
+        response_json = await self._async_engine._call_api_(payload=payload, timeout=FrameworkConfig._EMBEDDING_TIMEOUT)
+        return self._merge_cached_(cached, keys, missing, self._parse_embeddings_(response_json), persist)
+
+    def _lookup_cached_(self, texts: list):
+        """
+        @func_ _lookup_cached_
+        @params texts : (list) Strings to embed.
+        @returns (tuple) (cached vectors | None, content keys | None, dict of key -> text still to fetch).
+        @desc_ Texts that normalize to the same content are fetched once per call.
+        """
+        if self._embedding_cache is None:
+            return None, None, dict(enumerate(texts))
+
+        cached, keys = self._embedding_cache._get_many_(self._model, texts)
+        missing = {}
+        for text, key, vector in zip(texts, keys, cached):
+            if vector is None and key not in missing:
+                missing[key] = text
+        return cached, keys, missing
+
+    def _merge_cached_(self, cached, keys, missing, fetched, persist) -> np.ndarray:
+        """
+        @func_ _merge_cached_
+        @params cached : (list | None) Vectors found in the cache, None where absent.
+        @params keys : (list | None) Content keys aligned with the requested texts.
+        @params missing : (dict) key -> text that was sent to the API, in request order.
+        @params fetched : (np.ndarray | None) Embeddings returned for the missing texts.
+        @params persist : (bool) Whether to store the fetched vectors.
+        @returns (np.ndarray) Embeddings aligned with the originally requested texts.
+        """
+        if cached is None:
+            return fetched
+        if fetched is not None and len(fetched) != len(missing):
+            raise APIResponseError(f"Embedding response returned {len(fetched)} vectors for {len(missing)} inputs.")
+
+        fresh = dict(zip(missing.keys(), fetched)) if fetched is not None else {}
+        if persist and fresh:
+            self._embedding_cache._put_many_(list(fresh.keys()), fetched)
+        return np.vstack([vector if vector is not None else fresh[key] for key, vector in zip(keys, cached)]).astype(np.float32, copy=False)
+
+    def _parse_embeddings_(self, response_json) -> np.ndarray:
+        """
+        @func_ _parse_embeddings_
+        @params response_json : (dict) The parsed JSON from the /embeddings response.
+        @returns (np.ndarray) Matrix of embeddings ordered by input index.
+        @desc_ Shared parser for the sync and async embedding paths.
+        """
         if "data" not in response_json or len(response_json["data"]) == 0:
             raise APIResponseError("Invalid embedding response.")
 
         sorted_data = sorted(response_json["data"], key=lambda x: x["index"])
         return np.array([item["embedding"] for item in sorted_data], dtype=np.float32)
 
-    def _add_documents_(self, documents: list, bypass_chunking: bool = False):
+    def _plan_batches_(self, texts: list) -> list:
+        """
+        @func_ _plan_batches_
+        @params texts : (list) Strings to embed, in order.
+        @returns (list[tuple]) Contiguous (start, end) spans over texts.
+        @desc_ Greedily packs texts until either the item cap or the character budget would be
+               exceeded, so short statutes share a request and long ones do not blow the
+               provider's per-request token limit. An oversized text gets a batch of its own.
+        """
+        max_items = max(1, FrameworkConfig._EMBEDDING_BATCH_MAX_ITEMS)
+        max_chars = max(1, FrameworkConfig._EMBEDDING_BATCH_MAX_CHARS)
+        spans = []
+        start, chars = 0, 0
+        ## @iter_ texts : Closing a batch when the next text would overflow it
+        for i, text in enumerate(texts):
+            size = len(text)
+            if i > start and (i - start >= max_items or chars + size > max_chars):
+                spans.append((start, i))
+                start, chars = i, 0
+            chars += size
+        if start < len(texts):
+            spans.append((start, len(texts)))
+        return spans
+
+    def _embed_batch_(self, batch: list, number: int) -> np.ndarray:
+        """
+        @func_ _embed_batch_
+        @params batch : (list) Strings of one batch.
+        @params number : (int) Batch number, for logging.
+        @returns (np.ndarray) Embeddings of the batch.
+        @desc_ Retries a failed batch on its own (on top of the engine's per-request retries)
+               so one transient failure does not restart the whole ingestion.
+        """
+        retries = max(0, FrameworkConfig._EMBEDDING_BATCH_RETRIES)
+        ## @iter_ attempts : Re-sending only this batch after connection or response errors
+        for attempt in range(retries + 1):
+            try:
+                return self._fetch_embeddings_(batch)
+            except (APIConnectionError, APIResponseError) as e:
+                if attempt >= retries:
+                    raise
+                delay = FrameworkConfig._RETRY_BACKOFF * (2 ** attempt)
+                logger.warning(f"Embedding batch {number} failed ({e}); retrying in {delay:.1f}s ({attempt + 1}/{retries}).")
+                time.sleep(delay)
+
+    def _embed_corpus_(self, texts: list, progress_callback=None) -> np.ndarray:
+        """
+        @func_ _embed_corpus_
+        @params texts : (list) All chunk texts of an ingestion, in order.
+        @params progress_callback : (callable, optional) Called as (embedded, total) after each batch,
+                counting only texts that needed an API call.
+        @returns (np.ndarray) Embeddings aligned with texts.
+        @desc_ Cached texts are resolved up front; the rest are packed into batches and
+               pipelined through a bounded thread pool. Results are reassembled by batch
+               position, so output order never depends on completion order, and each batch is
+               written to the embedding cache as soon as it lands so an aborted build resumes.
+        """
+        cached, keys, missing = self._lookup_cached_(texts)
+        pending = list(missing.values())
+        pending_keys = list(missing.keys())
+        if not pending:
+            return self._merge_cached_(cached, keys, missing, None, False)
+
+        spans = self._plan_batches_(pending)
+        workers = max(1, min(FrameworkConfig._EMBEDDING_MAX_WORKERS, len(spans)))
+        logger.info(f"Embedding {len(pending)} texts ({len(texts) - len(pending)} cached) in {len(spans)} batches with {workers} workers.")
+
+        results = [None] * len(spans)
+        embedded = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embed") as pool:
+            futures = {pool.submit(self._embed_batch_, pending[s:e], n): n for n, (s, e) in enumerate(spans, 1)}
+            try:
+                ## @iter_ futures : Collecting batches in completion order, storing by position
+                for future in as_completed(futures):
+                    n = futures[future]
+                    start, end = spans[n - 1]
+                    results[n - 1] = future.result()
+                    if self._embedding_cache is not None:
+                        self._embedding_cache._put_many_(pending_keys[start:end], results[n - 1])
+                    embedded += end - start
+                    logger.info(f"Embedded batch {n}/{len(spans)} ({embedded}/{len(pending)} texts).")
+                    if progress_callback is not None:
+                        progress_callback(embedded, len(pending))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return self._merge_cached_(cached, keys, missing, np.vstack(results), False)
+
+    def _add_documents_(self, documents: list, bypass_chunking: bool = False, progress_callback=None):
         """
         @func_ _add_documents_
         @params documents : (list) Raw document texts or dicts.
         @params bypass_chunking : (bool) Whether to skip splitting.
-        @desc_ Embeds and indexes documents into FAISS.
+        @params progress_callback : (callable, optional) Receives (embedded, total) after each batch.
+        @desc_ Embeds and indexes documents into FAISS. A document whose doc_id is already
+               indexed replaces its previous chunks (see _upsert_documents_).
         """
-        all_chunks = []
-        chunk_metadatas = []
+        self._upsert_documents_(documents, bypass_chunking=bypass_chunking, progress_callback=progress_callback)
+
+    def _prepare_chunks_(self, documents: list, bypass_chunking: bool) -> list:
+        """
+        @func_ _prepare_chunks_
+        @params documents : (list) Raw document texts or dicts.
+        @params bypass_chunking : (bool) Whether to skip splitting.
+        @returns (list) Chunk records {"id", "text", "metadata", "span"} with stable ids.
+        @desc_ Documents without a "doc_id" in their metadata are keyed by a hash of their text.
+               Chunk size and overlap are passed to the chunker, never set on the shared manager.
+               A doc_id given more than once keeps only the chunks of its last version.
+        """
+        by_document = {}
         ## @iter_ documents : Processing each document for indexing
         for doc in documents:
             if isinstance(doc, dict):
@@ -125,137 +336,510 @@ class EmbeddingManager:
                 
             meta_copy = meta.copy()
             meta_copy["parent_context"] = text
+            doc_id = meta_copy.get("doc_id") or hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+            meta_copy["doc_id"] = doc_id
                 
             if bypass_chunking:
-                chunks = [text]
+                spans = [(0, len(text))]
             else:
-                original_size = self._chunk_size
-                original_overlap = self._chunk_overlap
-                self._chunk_size = min(self._chunk_size, 1500)
-                self._chunk_overlap = min(self._chunk_overlap, 150)
-                chunks = self._chunk_text_(text)
-                self._chunk_size = original_size
-                self._chunk_overlap = original_overlap
-                
-            all_chunks.extend(chunks)
-            chunk_metadatas.extend([meta_copy] * len(chunks))
+                spans = iter_chunk_spans(text, min(self._chunk_size, 1500), min(self._chunk_overlap, 150))
+
+            ## @logic_ A repeated doc_id replaces the whole earlier record set (it may have had more chunks); "span" locates the chunk in its parent
+            by_document.pop(doc_id, None)
+            by_document[doc_id] = [
+                {"id": stable_id(doc_id, chunk_no), "text": text[start:end], "metadata": meta_copy, "span": (start, end)}
+                for chunk_no, (start, end) in enumerate(spans)
+            ]
 
-        if not all_chunks:
+        return [record for records in by_document.values() for record in records]
+
+    def _upsert_documents_(self, documents: list, bypass_chunking: bool = False, progress_callback=None) -> int:
+        """
+        @func_ _upsert_documents_
+        @params documents : (list) Raw document texts or dicts (metadata "doc_id" identifies a document).
+        @params bypass_chunking : (bool) Whether to skip splitting.
+        @params progress_callback : (callable, optional) Receives (embedded, total) after each batch.
+        @returns (int) Number of chunks written.
+        @desc_ Adds new documents and replaces existing ones in FAISS, BM25 and the chunk store
+               together. Embedding happens first, so a failed call leaves the index untouched.
+               Only the written chunks are tokenized; the BM25 postings of the rest are kept.
+               The first change after a load copies a mapped chunk store into memory (one
+               decoding pass, see _materialize_chunks_); it is written back in full on save.
+        """
+        records = self._prepare_chunks_(documents, bypass_chunking)
+        if not records:
             raise InvalidInputError("No chunks generated.")
 
-        ## @logic_ Batch requests to avoid API limits
-        batch_size = 100
-        all_embeddings = []
-        for i in range(0, len(all_chunks), batch_size):
-            batch = all_chunks[i:i + batch_size]
-            batch_emb = self._get_embeddings_(batch)
-            all_embeddings.append(batch_emb)
-            
-        embeddings = np.vstack(all_embeddings)
+        ## @logic_ Size-bounded batches embedded concurrently to stay within API limits
+        embeddings = self._normalize_(self._embed_corpus_([r["text"] for r in records], progress_callback=progress_callback))
 
         if self._index is None:
             self._dimension = embeddings.shape[1]
-            self._index = faiss.IndexFlatL2(self._dimension)
+            self._index = self._create_index_(embeddings)
+
+        self._drop_documents_({r["metadata"]["doc_id"] for r in records})
+        self._index.add_with_ids(embeddings, np.array([r["id"] for r in records], dtype=np.int64))
+        self._materialize_chunks_()
+        self._chunks.extend(records)
+        self._reindex_positions_()
+        self._update_bm25_(added_texts=[r["text"] for r in records])
+        return len(records)
+
+    def _delete_documents_(self, doc_ids) -> int:
+        """
+        @func_ _delete_documents_
+        @params doc_ids : (iterable[str]) Document keys to remove.
+        @returns (int) Number of chunks removed.
+        @desc_ Removes every chunk of the given documents from FAISS, BM25 and the chunk store.
+        """
+        return self._drop_documents_(set(doc_ids))
+
+    def _drop_documents_(self, doc_ids: set) -> int:
+        """
+        @func_ _drop_documents_
+        @params doc_ids : (set[str]) Document keys to remove.
+        @returns (int) Number of chunks removed from the vector index, BM25 and the chunk store.
+        """
+        chunk_ids = self._chunk_ids_()
+        keep = np.array([meta.get("doc_id") not in doc_ids for meta in self._chunk_metadata_()], dtype=bool)
+        if keep.all():
+            return 0
+        doomed_ids = np.array(chunk_ids, dtype=np.int64)[~keep]
+        doomed = set(doomed_ids.tolist())
+        self._materialize_chunks_()
+        try:
+            self._index.remove_ids(faiss.IDSelectorBatch(doomed_ids))
+        except RuntimeError:
+            ## @logic_ Graph indexes (HNSW) cannot delete in place; re-add the surviving vectors
+            survivors = np.array(chunk_ids, dtype=np.int64)[keep]
+            vectors = np.vstack([self._index.reconstruct(int(i)) for i in survivors]) if len(survivors) else None
+            self._index = self._create_index_(vectors, train=False)
+            if vectors is not None:
+                self._index.add_with_ids(vectors, survivors)
+        self._chunks = [c for c in self._chunks if c["id"] not in doomed]
+        self._reindex_positions_()
+        self._update_bm25_(keep=keep)
+        return len(doomed)
+
+    def _create_index_(self, vectors: np.ndarray, train: bool = True):
+        """
+        @func_ _create_index_
+        @params vectors : (np.ndarray | None) Training sample (the full corpus on a rebuild).
+        @params train : (bool) Whether to train; False reuses the current index's quantizer state.
+        @returns (faiss.IndexIDMap2) Empty, trained index built from _RETRIEVAL_INDEX_FACTORY.
+        @desc_ Falls back to a flat index when the corpus is too small to train the requested
+               structure (e.g. fewer vectors than IVF lists).
+        """
+        factory = FrameworkConfig._RETRIEVAL_INDEX_FACTORY or "Flat"
+        if not train and self._index is not None:
+            ## @logic_ Rebuilding in place: clone the trained structure and empty it
+            index = faiss.clone_index(self._index)
+            index.reset()
+            return index
+
+        n = len(vectors) if vectors is not None else 0
+        resolved = resolve_index_factory(factory, n)
+        index = faiss.index_factory(self._dimension, f"IDMap2,{resolved}", faiss.METRIC_INNER_PRODUCT)
+        if not index.is_trained:
+            try:
+                index.train(vectors)
+            except RuntimeError as e:
+                logger.warning(f"Cannot train '{resolved}' on {n} vectors ({str(e).splitlines()[0]}); using a flat index.")
+                index = faiss.index_factory(self._dimension, "IDMap2,Flat", faiss.METRIC_INNER_PRODUCT)
+        logger.info(f"Created FAISS index '{resolved}' (d={self._dimension}).")
+        return index
+
+    @staticmethod
+    def _normalize_(vectors: np.ndarray) -> np.ndarray:
+        """
+        @func_ _normalize_
+        @params vectors : (np.ndarray) (n, dim) embeddings.
+        @returns (np.ndarray) Unit-length float32 copy, so inner product equals cosine similarity.
+        """
+        vectors = np.array(vectors, dtype=np.float32, copy=True, order="C")
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def _to_cosine_(self, similarities: np.ndarray) -> np.ndarray:
+        """
+        @func_ _to_cosine_
+        @params similarities : (np.ndarray) Raw FAISS scores for a unit-length query.
+        @returns (np.ndarray) Cosine similarities; squared L2 distances of un-migrated indexes are converted.
+        """
+        if self._index.metric_type == faiss.METRIC_L2:
+            return 1.0 - similarities / 2.0
+        return similarities
+
+    def _search_params_(self, selector=None):
+        """
+        @func_ _search_params_
+        @params selector : (faiss.IDSelector, optional) Restricts the search to these chunk ids.
+        @returns (faiss.SearchParameters | None) Per-query efSearch / nprobe for the index type.
+        """
+        inner = faiss.downcast_index(self._index.index) if isinstance(self._index, faiss.IndexIDMap2) else self._index
+        if isinstance(inner, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(efSearch=self._ef_search, sel=selector)
+        if faiss.try_extract_index_ivf(inner) is not None:
+            return faiss.SearchParametersIVF(nprobe=self._nprobe, sel=selector)
+        return faiss.SearchParameters(sel=selector) if selector is not None else None
+
+    def _set_search_params_(self, ef_search: int = None, nprobe: int = None):
+        """
+        @func_ _set_search_params_
+        @params ef_search : (int, optional) HNSW candidate list size (higher = better recall, slower).
+        @params nprobe : (int, optional) IVF lists visited per query (higher = better recall, slower).
+        @desc_ Takes effect on the next query; no rebuild needed.
+        """
+        if ef_search is not None:
+            self._ef_search = int(ef_search)
+        if nprobe is not None:
+            self._nprobe = int(nprobe)
 
-        self._index.add(embeddings)
-        self._chunks.extend([{"text": c, "metadata": m} for c, m in zip(all_chunks, chunk_metadatas)])
-        self._init_bm25_()
+    def _reindex_positions_(self):
+        """
+        @func_ _reindex_positions_
+        @desc_ Rebuilds the stable id -> chunk position lookup and the metadata columns.
+        """
+        ids = self._chunk_ids_()
+        self._positions = {chunk_id: pos for pos, chunk_id in enumerate(ids)}
+        self._ids = np.array(ids, dtype=np.int64)
+        if isinstance(self._chunks, ChunkStore):
+            self._columns = MetadataColumns(*self._chunks._distinct_metadata_())
+        else:
+            self._columns = MetadataColumns(self._chunk_metadata_())
+
+    def _chunk_ids_(self) -> list:
+        """
+        @func_ _chunk_ids_
+        @returns (list[int]) Stable chunk ids in position order (read from the id column of a mapped store).
+        """
+        if isinstance(self._chunks, ChunkStore):
+            return self._chunks._ids.tolist()
+        return [c["id"] for c in self._chunks]
+
+    def _chunk_texts_(self):
+        """
+        @func_ _chunk_texts_
+        @returns (iterable[str]) Chunk texts in position order, without decoding parent contexts.
+        """
+        if isinstance(self._chunks, ChunkStore):
+            return self._chunks._texts_()
+        return (c.get("text", "") if isinstance(c, dict) else str(c) for c in self._chunks)
+
+    def _chunk_metadata_(self):
+        """
+        @func_ _chunk_metadata_
+        @returns (iterable[dict]) Chunk metadata in position order ("parent_context" omitted for a mapped store).
+        """
+        if isinstance(self._chunks, ChunkStore):
+            return (self._chunks._metadata_(pos) for pos in range(len(self._chunks)))
+        return (c.get("metadata", {}) if isinstance(c, dict) else {} for c in self._chunks)
+
+    def _materialize_chunks_(self):
+        """
+        @func_ _materialize_chunks_
+        @desc_ Copy-on-write: turns a mapped ChunkStore into an in-memory list before it is modified.
+        """
+        if isinstance(self._chunks, ChunkStore):
+            self._chunks = list(self._chunks)
+
+    def _document_hashes_(self) -> dict:
+        """
+        @func_ _document_hashes_
+        @returns (dict) doc_id -> content hash recorded at ingestion (None when unknown).
+        @desc_ Lets callers diff the index against the corpus and upsert only what changed.
+        """
+        return {meta["doc_id"]: meta.get("doc_hash") for meta in self._chunk_metadata_() if "doc_id" in meta}
 
     def _init_bm25_(self):
         """
         @func_ _init_bm25_
-        @desc_ Initializes the BM25 model for hybrid search.
+        @desc_ Builds the inverted-index BM25 model for hybrid search.
         """
         if not self._chunks:
             self._bm25 = None
             return
             
-        tokenized_corpus = []
-        for chunk_data in self._chunks:
-            text = chunk_data.get("text", "") if isinstance(chunk_data, dict) else str(chunk_data)
-            tokenized_corpus.append(text.lower().split(" "))
-            
-        self._bm25 = BM25Okapi(tokenized_corpus)
+        tokenized_corpus = [tokenize(text) for text in self._chunk_texts_()]
+        self._bm25 = BM25Index(tokenized_corpus)
+
+    def _update_bm25_(self, keep=None, added_texts=()):
+        """
+        @func_ _update_bm25_
+        @params keep : (np.ndarray, optional) Boolean mask over the previous chunk positions.
+        @params added_texts : (list[str]) Texts of the chunks appended at the end.
+        @desc_ Edits the BM25 postings for the changed chunks only; builds the index when
+               there is none yet and drops it when no chunks are left.
+        """
+        if not self._chunks or self._bm25 is None:
+            self._init_bm25_()
+            return
+        self._bm25._update_(keep, [tokenize(text) for text in added_texts])
 
-    def _search_(self, query: str, top_k: int = None) -> list:
+    def _search_(self, query: str, top_k: int = None, filters: dict = None, query_vector: np.ndarray = None) -> list:
         """
         @func_ _search_
         @params query : (str) The search query.
         @params top_k : (int, optional) Number of results.
-        @returns (list) Ranked results using RRF.
-        @desc_ Hybrid vector + BM25 search.
+        @params filters : (dict, optional) Metadata filters, e.g. {"jurisdiction": "HK", "category": ["benefits"]}.
+        @params query_vector : (np.ndarray, optional) (1, dim) embedding of the query, when the caller already has it
+                (a sharded search embeds once for every shard).
+        @returns (list) Ranked results {"chunk", "metadata", "score", "rank", "scores"}; "score" is the
+                 fused score in [0, 1] and "scores" holds the calibrated per-signal values.
+        @desc_ Hybrid vector + BM25 search. Cosine similarity comes from the inner-product index,
+               BM25 is divided by the query's attainable ceiling (sum of idf * (k1 + 1)), and the
+               two are fused per _RETRIEVAL_FUSION, so scores are comparable across queries and
+               a fixed threshold is meaningful. Filters are applied before scoring: FAISS only
+               visits the allowed ids and BM25 only ranks allowed documents, so a filtered query
+               still returns top_k matches when that many exist.
+        """
+        return self._search_batch_([query], top_k=top_k, filters=filters, query_vectors=query_vector)[0]
+
+    def _search_batch_(self, queries: list, top_k: int = None, filters: dict = None, query_vectors: np.ndarray = None) -> list:
+        """
+        @func_ _search_batch_
+        @params queries : (list[str]) Search queries.
+        @params top_k : (int, optional) Number of results per query.
+        @params filters : (dict, optional) Metadata filters shared by every query.
+        @params query_vectors : (np.ndarray, optional) (len(queries), dim) embeddings, when the caller already has them.
+        @returns (list[list]) One _search_ result list per query.
+        @desc_ Queries are embedded in one request and searched in one FAISS call. Every signal
+               becomes a (queries, pool) score and rank array over the union of candidates, and
+               ScoreFusion fuses and selects the top_k of all queries at once.
         """
         if self._index is None or self._index.ntotal == 0:
-            return []
+            return [[] for _ in queries]
+
+        ## @logic_ Metadata pre-filter: column mask -> FAISS id selector + BM25 candidate mask
+        mask = self._columns._mask_(filters)
+        selector = None
+        available = self._index.ntotal
+        if mask is not None:
+            allowed = self._ids[mask]
+            if len(allowed) == 0:
+                return [[] for _ in queries]
+            selector = faiss.IDSelectorBatch(allowed)
+            available = len(allowed)
 
         top_k = top_k if top_k is not None else FrameworkConfig._RETRIEVAL_TOP_K
-        top_k = min(top_k, self._index.ntotal)
+        top_k = min(top_k, available)
+        candidates = top_k * 2
 
-        ## @logic_ Vector Search
-        query_embedding = self._get_embeddings_([query])
-        distances, indices = self._index.search(query_embedding, top_k * 2)
-        
-        vector_results = {}
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self._chunks):
-                vector_results[idx] = 1.0 / (1.0 + float(distances[0][i]))
-
-        ## @logic_ BM25 Search
-        bm25_results = {}
-        if self._bm25:
-            tokenized_query = query.lower().split(" ")
-            bm25_scores = self._bm25.get_scores(tokenized_query)
-            top_bm25_idx = np.argsort(bm25_scores)[::-1][:top_k * 2]
-            for idx in top_bm25_idx:
-                if bm25_scores[idx] > 0:
-                    bm25_results[idx] = float(bm25_scores[idx])
-
-        ## @logic_ Reciprocal Rank Fusion
-        ranked_vector = {idx: r for r, (idx, _) in enumerate(sorted(vector_results.items(), key=lambda x: x[1], reverse=True), 1)}
-        ranked_bm25 = {idx: r for r, (idx, _) in enumerate(sorted(bm25_results.items(), key=lambda x: x[1], reverse=True), 1)}
-        
-        combined_scores = {}
-        all_indices = set(ranked_vector.keys()).union(set(ranked_bm25.keys()))
-        k_rrf = 60
-        for idx in all_indices:
-            score = 0.0
-            if idx in ranked_vector: score += 1.0 / (k_rrf + ranked_vector[idx])
-            if idx in ranked_bm25: score += 1.0 / (k_rrf + ranked_bm25[idx])
-            combined_scores[idx] = score
-
-        top_final_idx = sorted(combined_scores.keys(), key=lambda x: combined_scores[x], reverse=True)[:top_k]
-        results = []
-        for idx in top_final_idx:
-            chunk_data = self._chunks[idx]
-            results.append({
-                "chunk": chunk_data["text"] if isinstance(chunk_data, dict) else chunk_data,
-                "metadata": chunk_data.get("metadata", {}) if isinstance(chunk_data, dict) else {},
-                "score": combined_scores[idx]
-            })
-        return results
+        ## @logic_ Vector Search (unit queries against unit vectors: inner product = cosine)
+        query_embeddings = self._normalize_(query_vectors if query_vectors is not None else self._embed_queries_(queries))
+        params = self._search_params_(selector)
+        if params is not None:
+            similarities, indices = self._index.search(query_embeddings, candidates, params=params)
+        else:
+            similarities, indices = self._index.search(query_embeddings, candidates)
+        vector_hits = np.fromiter((self._positions.get(int(i), -1) for i in indices.ravel()), dtype=np.int64, count=indices.size).reshape(indices.shape)
+
+        ## @logic_ BM25 candidates per query (positions, best first)
+        tokenized = [tokenize(q) for q in queries] if self._bm25 is not None else []
+        bm25_hits = [self._bm25._top_k_(tokens, candidates, mask=mask)[0] for tokens in tokenized]
+
+        ## @logic_ One candidate pool for the batch; each signal fills (queries, pool) arrays
+        pool = np.unique(np.concatenate([vector_hits[vector_hits >= 0]] + bm25_hits))
+        shape = (len(queries), len(pool))
+        cosine = np.full(shape, np.nan)
+        vector_rank = np.zeros(shape, dtype=np.int32)
+        ## @iter_ queries : Scattering FAISS hits into the pool (FAISS returns them best first)
+        for q, (hits, sims) in enumerate(zip(vector_hits, similarities)):
+            found = hits >= 0
+            slots = np.searchsorted(pool, hits[found])
+            vector_rank[q] = ranks_from_order(slots, len(pool))
+            cosine[q, slots] = self._to_cosine_(sims[found])
+
+        ranks = {"vector": vector_rank}
+        scores = {"vector": cosine}
+        lexical = None
+        if self._bm25 is not None:
+            ## @logic_ BM25 calibrated against the best score each query could reach
+            lexical = np.zeros(shape)
+            bm25_rank = np.zeros(shape, dtype=np.int32)
+            for q, (tokens, hits) in enumerate(zip(tokenized, bm25_hits)):
+                bm25_rank[q] = ranks_from_order(np.searchsorted(pool, hits), len(pool))
+                ceiling = self._bm25._ceiling_(tokens)
+                if ceiling > 0:
+                    lexical[q] = np.minimum(self._bm25.get_batch_scores(tokens, pool) / ceiling, 1.0)
+            ranks["bm25"], scores["bm25"] = bm25_rank, lexical
+
+            ## @logic_ Lexical-only candidates get their exact cosine when the index can reconstruct vectors
+            missing = (bm25_rank > 0) & (vector_rank == 0)
+            slots = np.flatnonzero(missing.any(axis=0))
+            if len(slots):
+                try:
+                    vectors = self._index.reconstruct_batch(self._ids[pool[slots]])
+                    cosine[:, slots] = np.where(missing[:, slots], query_embeddings @ vectors.T, cosine[:, slots])
+                except RuntimeError:
+                    pass
+
+        fusion = self._fusion or ScoreFusion()
+        fused = fusion._fuse_(scores, ranks)
+        top_slots, top_scores = fusion._top_k_(fused, top_k)
+
+        batch = []
+        for q in range(len(queries)):
+            results = []
+            for slot, score in zip(top_slots[q], top_scores[q]):
+                if not np.isfinite(score):
+                    break
+                chunk_data = self._chunks[int(pool[slot])]
+                results.append({
+                    "chunk": chunk_data["text"] if isinstance(chunk_data, dict) else chunk_data,
+                    "metadata": chunk_data.get("metadata", {}) if isinstance(chunk_data, dict) else {},
+                    "score": float(score),
+                    "rank": len(results) + 1,
+                    "scores": {
+                        "cosine": None if np.isnan(cosine[q, slot]) else float(cosine[q, slot]),
+                        "bm25": None if lexical is None else float(lexical[q, slot]),
+                        "fused": float(score)
+                    }
+                })
+            batch.append(results)
+        return batch
+
+    def _embed_query_(self, query: str) -> np.ndarray:
+        """
+        @func_ _embed_query_
+        @params query : (str) The search query.
+        @returns (np.ndarray) (1, dim) query embedding.
+        """
+        return self._embed_queries_([query])
+
+    def _embed_queries_(self, queries: list) -> np.ndarray:
+        """
+        @func_ _embed_queries_
+        @params queries : (list[str]) Search queries.
+        @returns (np.ndarray) (len(queries), dim) query embeddings.
+        @desc_ Serves repeated queries from the query-embedding LRU; the misses are embedded
+               remotely in one request without growing the persistent document cache.
+        """
+        vectors = [self._query_cache._get_vector_(self._model, q) if self._query_cache is not None else None for q in queries]
+        misses = list(dict.fromkeys(q for q, v in zip(queries, vectors) if v is None))
+        if misses:
+            fetched = dict(zip(misses, self._get_embeddings_(misses, persist=False)))
+            if self._query_cache is not None:
+                for q, vector in fetched.items():
+                    self._query_cache._put_vector_(self._model, q, vector)
+            vectors = [fetched[q] if v is None else v for q, v in zip(queries, vectors)]
+        return np.vstack([np.asarray(v, dtype=np.float32).reshape(1, -1) for v in vectors])
 
     def _save_index_(self, index_path: str, chunks_path: str):
         """
         @func_ _save_index_
         @params index_path : (str) Path to FAISS file.
         @params chunks_path : (str) Path to JSON metadata.
-        @desc_ Persists index and chunks to disk.
+        @desc_ Persists index, chunks and the BM25 index (next to the FAISS file) to disk.
+               Chunks go to a binary ChunkStore, or to a legacy JSON array when chunks_path ends in ".json".
         """
         if self._index is None:
             raise InvalidInputError("No index to save.")
+        fingerprint = self._corpus_fingerprint_()
         faiss.write_index(self._index, index_path)
-        with open(chunks_path, "w", encoding="utf-8") as f:
-            json.dump(self._chunks, f, ensure_ascii=False)
+        if chunks_path.endswith(".json"):
+            with open(chunks_path, "w", encoding="utf-8") as f:
+                json.dump(list(self._chunks), f, ensure_ascii=False)
+        else:
+            stats = ChunkStore._write_(chunks_path, self._chunks, fingerprint)
+            logger.info(f"Chunk store saved: {stats['chunks']} chunks, {stats['parents']} parents, {stats['bytes']} bytes.")
+        if self._bm25 is not None:
+            self._bm25._save_(self._bm25_path_(index_path), fingerprint)
 
     def _load_index_(self, index_path: str, chunks_path: str):
         """
         @func_ _load_index_
         @params index_path : (str) Path of FAISS index.
-        @params chunks_path : (str) Path of metadata.
-        @desc_ Loads index and chunks from disk.
+        @params chunks_path : (str) Path of the chunk store (or legacy JSON array).
+        @desc_ Loads index and chunks from disk. A ChunkStore is memory-mapped and decoded per
+               record on access; legacy JSON is parsed into a list. The persisted BM25 index is memory-mapped
+               when it matches the chunks; otherwise it is rebuilt from the chunk texts.
         """
         self._index = faiss.read_index(index_path)
         self._dimension = self._index.d
-        with open(chunks_path, "r", encoding="utf-8") as f:
-            self._chunks = json.load(f)
-        self._init_bm25_()
+        self._chunks = load_chunks(chunks_path)
+        if not isinstance(self._index, faiss.IndexIDMap2):
+            self._migrate_positional_index_()
+        elif self._index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            self._migrate_metric_()
+        self._reindex_positions_()
+        self._bm25 = BM25Index._load_(self._bm25_path_(index_path), self._corpus_fingerprint_()) if self._chunks else None
+        if self._bm25 is None:
+            self._init_bm25_()
+
+    def _warm_up_(self) -> int:
+        """
+        @func_ _warm_up_
+        @returns (int) Bytes of memory-mapped BM25 / chunk store data touched.
+        @desc_ Faults in one element per page of the mapped arrays, so the first queries after a
+               load do not pay for disk reads (used before a snapshot starts serving).
+        """
+        arrays = []
+        if self._bm25 is not None:
+            arrays += [self._bm25._indptr, self._bm25._postings, self._bm25._impacts, self._bm25._idf]
+        if isinstance(self._chunks, ChunkStore):
+            arrays += [self._chunks._blob, self._chunks._text_start, self._chunks._text_end, self._chunks._meta_of, self._chunks._parent_of]
+        touched = 0
+        ## @iter_ arrays : Reading one value per 4 KiB page
+        for array in arrays:
+            if isinstance(array, np.memmap) and array.size:
+                int(array[::max(1, 4096 // array.itemsize)].sum())
+                touched += array.nbytes
+        return touched
+
+    @staticmethod
+    def _bm25_path_(index_path: str) -> str:
+        """
+        @func_ _bm25_path_
+        @params index_path : (str) Path of the FAISS index.
+        @returns (str) Path of the BM25 index saved alongside it (same stem, ".bm25").
+        """
+        return os.path.splitext(index_path)[0] + ".bm25"
+
+    def _corpus_fingerprint_(self) -> str:
+        """
+        @func_ _corpus_fingerprint_
+        @returns (str) Fingerprint of the chunk texts in BM25 position order (recorded in a mapped store's header).
+        """
+        if isinstance(self._chunks, ChunkStore) and self._chunks._fingerprint:
+            return self._chunks._fingerprint
+        return corpus_fingerprint(self._chunk_texts_())
+
+    def _migrate_positional_index_(self):
+        """
+        @func_ _migrate_positional_index_
+        @desc_ Upgrades an index saved before stable ids (positional IndexFlatL2 + id-less chunks)
+               by re-keying every chunk. Legacy chunks get a "legacy:<pos>" doc_id, so the next
+               corpus diff replaces them.
+        """
+        vectors = self._normalize_(self._index.reconstruct_n(0, self._index.ntotal))
+        self._materialize_chunks_()
+        ## @iter_ chunks : Assigning stable ids to legacy records
+        for pos, chunk in enumerate(self._chunks):
+            if not isinstance(chunk, dict):
+                chunk = self._chunks[pos] = {"text": str(chunk), "metadata": {}}
+            meta = chunk.setdefault("metadata", {})
+            meta.setdefault("doc_id", f"legacy:{pos}")
+            chunk["id"] = stable_id(meta["doc_id"], pos)
+        self._index = None
+        self._index = self._create_index_(vectors)
+        self._index.add_with_ids(vectors, np.array([c["id"] for c in self._chunks], dtype=np.int64))
+        logger.info(f"Migrated positional index to stable ids ({len(self._chunks)} chunks).")
+
+    def _migrate_metric_(self):
+        """
+        @func_ _migrate_metric_
+        @desc_ Converts an L2 index to the cosine (inner-product) space. Indexes that cannot
+               reconstruct their vectors (IVF-PQ) keep serving with L2 converted to cosine,
+               which is exact for unit vectors, until the next rebuild.
+        """
+        try:
+            ids = np.array(self._chunk_ids_(), dtype=np.int64)
+            vectors = self._normalize_(np.vstack([self._index.reconstruct(int(i)) for i in ids]))
+        except RuntimeError:
+            logger.warning("L2 index cannot reconstruct vectors; rebuild it to switch to cosine similarity.")
+            return
+        self._index = None
+        self._index = self._create_index_(vectors)
+        self._index.add_with_ids(vectors, ids)
+        logger.info(f"Migrated L2 index to cosine similarity ({len(ids)} vectors).")
@@ -0,0 +1,310 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/modules/legal_retrieval/embedding_cache.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Persistent content-addressed embedding cache: (embedding model, normalized text) hash
+##        -> float32 vector, stored in a compact append-only binary file so index rebuilds
+##        only pay for chunks whose text actually changed. The file is memory-mapped, compacted
+##        when superseded records pile up and bounded in size. Also hosts the query-embedding
+##        LRU used by hybrid search.
+## @deps hashlib, os, re, struct, threading, logging, unicodedata, numpy, src.adaptive_routing.config,
+##       src.adaptive_routing.core.cache
+
+import hashlib
+import os
+import re
+import struct
+import threading
+import logging
+import unicodedata
+import numpy as np
+from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+## @const_ _MAGIC : File header identifying the format version.
+_MAGIC = b"LARFEMB1"
+## @const_ _RECORD_HEADER : 32-byte content key followed by the uint32 vector dimension.
+_RECORD_HEADER = struct.Struct("<32sI")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text):
+    """
+    @func_ normalize_text
+    @params text : (str) Text about to be embedded.
+    @returns (str) NFC-normalized text with whitespace runs collapsed and ends stripped.
+    @desc_ Formatting-only edits (re-wrapped lines, trailing spaces) keep the same cache key.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+def content_key(model, text):
+    """
+    @func_ content_key
+    @params model : (str) Embedding model identifier.
+    @params text : (str) Text to embed.
+    @returns (bytes) 32-byte SHA-256 digest of the model and normalized text.
+    """
+    return hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    @class EmbeddingCache
+    @desc_ Append-only binary store. Layout: 8-byte magic, then records of
+           [32-byte key][uint32 dim][dim x float32]. Keys already include the model, so one
+           file serves any number of embedding models. A torn final record (crash mid-write)
+           is ignored and truncated on open. Later records for the same key win.
+           The file is memory-mapped: stored vectors are read-only views paged in on use and
+           shared between processes, and only entries added since opening live in RAM. When
+           more than half the file is superseded records, or it grows past max_bytes, it is
+           rewritten with the live entries (oldest dropped first to fit 3/4 of the bound) and
+           renamed into place; processes still mapping the old file keep a consistent view.
+           Assumes one writing process per file. Another process's appends are not seen
+           until it reopens, and a compaction drops entries other processes appended after
+           it mapped the file; both only cost a re-embedding, so run the CLI -reindex
+           against its own EMBEDDING_CACHE_PATH (or with the server stopped) to avoid them.
+    @attr_ _path : (str) Cache file location.
+    @attr_ _vectors : (dict) key -> np.ndarray (float32) for every stored entry.
+    @attr_ _max_bytes : (int) File size that triggers compaction with eviction (0 = unbounded).
+    """
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path, max_bytes=None):
+        self._path = path
+        self._vectors = {}
+        self._max_bytes = max_bytes if max_bytes is not None else FrameworkConfig._EMBEDDING_CACHE_MAX_BYTES
+        self._file_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._compactions = 0
+        self._load_()
+
+    @classmethod
+    def _get_shared_(cls, path=None):
+        """
+        @func_ _get_shared_
+        @params path : (str, optional) Cache file; defaults to FrameworkConfig._EMBEDDING_CACHE_PATH.
+        @returns (EmbeddingCache) One instance per file, shared by every EmbeddingManager.
+        """
+        path = os.path.abspath(path or FrameworkConfig._EMBEDDING_CACHE_PATH)
+        cache = cls._shared.get(path)
+        if cache is None:
+            with cls._shared_lock:
+                cache = cls._shared.get(path)
+                if cache is None:
+                    cache = cls._shared[path] = cls(path)
+        return cache
+
+    @classmethod
+    def _for_config_(cls):
+        """
+        @func_ _for_config_
+        @returns (EmbeddingCache | None) The shared cache if enabled in config, else None.
+        """
+        if not FrameworkConfig._EMBEDDING_CACHE_ENABLED or not FrameworkConfig._EMBEDDING_CACHE_PATH:
+            return None
+        return cls._get_shared_()
+
+    def _load_(self):
+        """
+        @func_ _load_
+        @desc_ Maps the file and indexes its records; creates the file if it does not exist and
+               compacts it when it is mostly superseded records or over the size bound.
+        """
+        parent = os.path.dirname(self._path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        if not os.path.exists(self._path) or os.path.getsize(self._path) == 0:
+            with open(self._path, "wb") as f:
+                f.write(_MAGIC)
+            self._file_bytes = len(_MAGIC)
+            return
+
+        data = np.memmap(self._path, dtype=np.uint8, mode="r")
+        if data[:len(_MAGIC)].tobytes() != _MAGIC:
+            raise ValueError(f"{self._path} is not an embedding cache file.")
+
+        self._vectors = {}
+        live_bytes = 0
+        offset = len(_MAGIC)
+        ## @iter_ while : Walking fixed-header, variable-length records (only headers are paged in)
+        while offset + _RECORD_HEADER.size <= len(data):
+            key, dim = _RECORD_HEADER.unpack_from(data, offset)
+            end = offset + _RECORD_HEADER.size + dim * 4
+            if end > len(data):
+                break
+            previous = self._vectors.get(key)
+            if previous is not None:
+                live_bytes -= _RECORD_HEADER.size + previous.nbytes
+            self._vectors[key] = data[offset + _RECORD_HEADER.size:end].view(np.float32, np.ndarray)
+            live_bytes += end - offset
+            offset = end
+
+        if offset < len(data):
+            logger.warning(f"Embedding cache {self._path}: dropping {len(data) - offset} trailing bytes of a torn record.")
+            with open(self._path, "r+b") as f:
+                f.truncate(offset)
+        self._file_bytes = offset
+        logger.info(f"Embedding cache mapped: {len(self._vectors)} vectors from {self._path}")
+
+        if live_bytes < (offset - len(_MAGIC)) / 2 or (self._max_bytes and offset > self._max_bytes):
+            self._compact_()
+
+    def _compact_(self):
+        """
+        @func_ _compact_
+        @desc_ Rewrites the file with one record per live key, evicting the oldest entries until
+               it fits in 3/4 of _max_bytes, then renames it into place and maps it again.
+               Callers hold _lock (or are still constructing the cache).
+        """
+        entries = list(self._vectors.items())
+        sizes = [_RECORD_HEADER.size + vector.nbytes for _, vector in entries]
+        total = len(_MAGIC) + sum(sizes)
+        skip = 0
+        if self._max_bytes:
+            budget = self._max_bytes * 3 // 4
+            ## @iter_ while : Dropping the oldest entries until the rest fit the budget
+            while skip < len(entries) and total > budget:
+                total -= sizes[skip]
+                skip += 1
+
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            for key, vector in entries[skip:]:
+                f.write(_RECORD_HEADER.pack(key, vector.shape[0]))
+                f.write(np.ascontiguousarray(vector, dtype=np.float32).tobytes())
+        before = self._file_bytes
+        os.replace(tmp_path, self._path)
+        self._compactions += 1
+        logger.info(f"Embedding cache {self._path} compacted: {before} -> {total} bytes, {skip} entries evicted.")
+        self._load_()
+
+    def _get_many_(self, model, texts):
+        """
+        @func_ _get_many_
+        @params model : (str) Embedding model identifier.
+        @params texts : (list[str]) Texts to look up.
+        @returns (tuple) (vectors: list[np.ndarray | None], keys: list[bytes]) aligned with texts.
+        """
+        keys = [content_key(model, text) for text in texts]
+        with self._lock:
+            vectors = [self._vectors.get(key) for key in keys]
+            found = sum(1 for v in vectors if v is not None)
+            self._hits += found
+            self._misses += len(keys) - found
+        return vectors, keys
+
+    def _put_many_(self, keys, vectors):
+        """
+        @func_ _put_many_
+        @params keys : (list[bytes]) Keys from _get_many_ / content_key.
+        @params vectors : (np.ndarray | list) One embedding per key.
+        @desc_ Appends new entries in a single write; keys already stored are skipped.
+        """
+        chunks = []
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                if key in self._vectors:
+                    continue
+                vector = np.ascontiguousarray(vector, dtype=np.float32)
+                self._vectors[key] = vector
+                chunks.append(_RECORD_HEADER.pack(key, vector.shape[0]) + vector.tobytes())
+            if not chunks:
+                return
+            blob = b"".join(chunks)
+            with open(self._path, "ab") as f:
+                f.write(blob)
+            self._writes += len(chunks)
+            self._file_bytes += len(blob)
+            if self._max_bytes and self._file_bytes > self._max_bytes:
+                self._compact_()
+
+    def _clear_(self):
+        """
+        @func_ _clear_
+        @desc_ Drops every entry by renaming an empty cache file into place, like _compact_.
+               Truncating the mapped file would fault (SIGBUS) on vectors still in use.
+        """
+        with self._lock:
+            tmp_path = f"{self._path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(_MAGIC)
+            os.replace(tmp_path, self._path)
+            self._vectors = {}
+            self._file_bytes = len(_MAGIC)
+            self._hits = self._misses = self._writes = 0
+
+    def _stats_(self):
+        """
+        @func_ _stats_
+        @returns (dict) Entry count, file size, hit/miss counters and compactions.
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "entries": len(self._vectors),
+                "file_bytes": os.path.getsize(self._path) if os.path.exists(self._path) else 0,
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "compactions": self._compactions,
+                "hit_rate": round(self._hits / total, 4) if total else 0.0
+            }
+
+
+class QueryEmbeddingCache(ResponseCache):
+    """
+    @class QueryEmbeddingCache
+    @desc_ Size-bounded LRU (plus optional SQLite tier) mapping (model, exact search query) to its
+           embedding, so repeated queries — follow-up turns, audit retries, FAQ questions —
+           skip the /embeddings round trip. Reuses the ResponseCache tiers and metrics; entries
+           never expire because the key already pins the embedding model.
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, max_entries=None, db_path=None, max_disk_entries=None):
+        super().__init__(
+            max_entries=max_entries if max_entries is not None else FrameworkConfig._QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+            ttl=0,
+            db_path=db_path if db_path is not None else (FrameworkConfig._QUERY_EMBEDDING_CACHE_PATH or ""),
+            max_disk_entries=max_disk_entries if max_disk_entries is not None else FrameworkConfig._QUERY_EMBEDDING_CACHE_MAX_DISK_ENTRIES
+        )
+
+    @classmethod
+    def _for_config_(cls):
+        """
+        @func_ _for_config_
+        @returns (QueryEmbeddingCache | None) The shared query cache if enabled in config, else None.
+        """
+        return cls._get_shared_() if FrameworkConfig._QUERY_EMBEDDING_CACHE_ENABLED else None
+
+    @staticmethod
+    def _query_key_(model, query):
+        """
+        @func_ _query_key_
+        @params model : (str) Embedding model identifier.
+        @params query : (str) Search query exactly as sent to the embedder (no normalization).
+        @returns (str) SHA-256 hex digest.
+        """
+        return hashlib.sha256(f"{model}\x00{query}".encode("utf-8")).hexdigest()
+
+    def _get_vector_(self, model, query):
+        """
+        @func_ _get_vector_
+        @returns (np.ndarray | None) The cached (dim,) float32 embedding, or None on miss.
+        """
+        value = self._get_(self._query_key_(model, query))
+        return None if value is None else np.asarray(value, dtype=np.float32)
+
+    def _put_vector_(self, model, query, vector):
+        """
+        @func_ _put_vector_
+        @params vector : (np.ndarray) The (dim,) query embedding.
+        """
+        self._put_(self._query_key_(model, query), np.asarray(vector, dtype=np.float32).tolist())
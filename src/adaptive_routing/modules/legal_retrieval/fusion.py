@@ -0,0 +1,102 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/modules/legal_retrieval/fusion.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Vectorized score fusion for hybrid search. Each signal (vector, bm25, a title field, ...)
+##        contributes a calibrated score array and a 1-based rank array over a shared candidate
+##        pool; fusion is a weighted sum over the signals and top-k is an argpartition.
+##        Arrays may carry a leading batch axis, so several queries fuse in one call.
+## @deps numpy, src.adaptive_routing.config, src.adaptive_routing.core.exceptions
+
+import numpy as np
+from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.exceptions import InvalidInputError
+
+## @const_ FUSION_METHODS : Supported fusion methods.
+FUSION_METHODS = ("convex", "rrf")
+
+def ranks_from_order(order, pool_size):
+    """
+    @func_ ranks_from_order
+    @params order : (np.ndarray) Pool slots of one signal's candidates, best first.
+    @params pool_size : (int) Size of the candidate pool.
+    @returns (np.ndarray) int32 (pool_size,) 1-based rank per slot; 0 where the signal did not return the slot.
+    """
+    ranks = np.zeros(pool_size, dtype=np.int32)
+    ranks[order] = np.arange(1, len(order) + 1, dtype=np.int32)
+    return ranks
+
+
+class ScoreFusion:
+    """
+    @class ScoreFusion
+    @desc_ Fuses any number of named signals. "convex": weighted mean of max(score, 0), with
+           unknown (NaN) scores counted as 0. "rrf": weighted sum of 1 / (k_rrf + rank) divided
+           by its maximum (rank 1 in every signal). Both land in [0, 1]. Only signals passed
+           to _fuse_ with a positive weight take part, so a missing BM25 index or an unweighted
+           signal drops out of the normalization instead of capping the score.
+    @attr_ _weights : (dict) signal name -> weight.
+    @attr_ _method : (str) "convex" or "rrf".
+    @attr_ _k_rrf : (int) RRF rank offset.
+    """
+    def __init__(self, weights=None, method=None, k_rrf=None):
+        self._weights = dict(weights if weights is not None else FrameworkConfig._RETRIEVAL_FUSION_WEIGHTS)
+        self._method = (method or FrameworkConfig._RETRIEVAL_FUSION).lower()
+        self._k_rrf = int(k_rrf if k_rrf is not None else FrameworkConfig._RETRIEVAL_RRF_K)
+        if self._method not in FUSION_METHODS:
+            raise InvalidInputError(f"Unsupported fusion method '{self._method}'. Expected one of {', '.join(FUSION_METHODS)}.")
+
+    def _active_(self, signals):
+        """
+        @func_ _active_
+        @params signals : (iterable[str]) Signal names available for this query.
+        @returns (tuple) (names, np.ndarray weights) of the signals with a positive weight.
+        """
+        names = [name for name in signals if self._weights.get(name, 0.0) > 0]
+        return names, np.array([self._weights[name] for name in names], dtype=np.float64)
+
+    def _fuse_(self, scores: dict, ranks: dict) -> np.ndarray:
+        """
+        @func_ _fuse_
+        @params scores : (dict) signal -> float array (..., n) of calibrated scores (NaN = unknown).
+        @params ranks : (dict) signal -> int array (..., n) of 1-based ranks (0 = not returned by that signal).
+        @returns (np.ndarray) float64 (..., n) fused scores in [0, 1]; -inf for slots no signal returned.
+        """
+        names, weights = self._active_(ranks)
+        returned = np.logical_or.reduce([np.asarray(ranks[name]) > 0 for name in ranks])
+        fused = np.zeros(returned.shape, dtype=np.float64)
+        ## @iter_ names : Accumulating weighted contributions signal by signal (fmax maps NaN to 0)
+        for name, weight in zip(names, weights / weights.sum() if names else weights):
+            if self._method == "rrf":
+                rank = np.asarray(ranks[name])
+                fused += np.where(rank > 0, weight * (self._k_rrf + 1) / (self._k_rrf + rank), 0.0)
+            else:
+                fused += weight * np.fmax(scores[name], 0.0)
+        fused[~returned] = -np.inf
+        return fused
+
+    @staticmethod
+    def _top_k_(fused: np.ndarray, k: int):
+        """
+        @func_ _top_k_
+        @params fused : (np.ndarray) (..., n) fused scores.
+        @params k : (int) Number of slots wanted per row.
+        @returns (tuple) (slots, scores), each (..., min(k, n)), best first. Rows with fewer
+                 candidates end in -inf entries, which callers skip.
+        """
+        k = min(int(k), fused.shape[-1])
+        if k <= 0:
+            empty = np.empty(fused.shape[:-1] + (0,))
+            return empty.astype(np.int64), empty
+        if k < fused.shape[-1]:
+            ## @logic_ Of a tie at the k-th score keep the lowest slots, so a row's result does not depend on its length
+            kth = -np.partition(-fused, k - 1, axis=-1)[..., k - 1:k]
+            above = fused > kth
+            tied = fused == kth
+            keep = above | (tied & (np.cumsum(tied, axis=-1) <= k - above.sum(axis=-1, keepdims=True)))
+            slots = np.argsort(~keep, axis=-1, kind="stable")[..., :k]
+        else:
+            slots = np.broadcast_to(np.arange(k), fused.shape)
+        values = np.take_along_axis(fused, slots, axis=-1)
+        order = np.argsort(-values, axis=-1, kind="stable")
+        return np.take_along_axis(slots, order, axis=-1), np.take_along_axis(values, order, axis=-1)
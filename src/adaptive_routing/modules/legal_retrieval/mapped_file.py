@@ -0,0 +1,79 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/modules/legal_retrieval/mapped_file.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Shared on-disk layout for the memory-mapped retrieval files (BM25 index, chunk store):
+##        8-byte magic, uint32 header length, JSON header with an array table, then 64-byte
+##        aligned numpy arrays. Readers get zero-copy views, so worker processes mapping the
+##        same file share its pages.
+## @deps json, os, struct, numpy
+
+import json
+import os
+import struct
+import numpy as np
+
+## @const_ _ALIGN : Array sections start on 64-byte boundaries so mapped views are aligned.
+_ALIGN = 64
+
+def _aligned_(offset):
+    return -(-offset // _ALIGN) * _ALIGN
+
+def write_mapped(path, magic, header, arrays):
+    """
+    @func_ write_mapped
+    @params path : (str) Destination file.
+    @params magic : (bytes) 8-byte format tag.
+    @params header : (dict) JSON-serializable fields; an "arrays" table is added.
+    @params arrays : (dict) name -> 1-D numpy array.
+    @desc_ Writes to a temporary file and renames it into place, so a reader never maps a
+           partial file and processes still mapping the old file keep a consistent view.
+    """
+    header = dict(header)
+
+    ## @logic_ The header stores the array offsets, which depend on the header's own length
+    def layout(header_len):
+        offset = _aligned_(len(magic) + 4 + header_len)
+        table = {}
+        for name, array in arrays.items():
+            table[name] = [offset, array.dtype.str, int(array.size)]
+            offset = _aligned_(offset + array.nbytes)
+        header["arrays"] = table
+        return json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+    encoded = layout(0)
+    while len(layout(len(encoded))) != len(encoded):
+        encoded = layout(len(encoded))
+    encoded = layout(len(encoded))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(magic + struct.pack("<I", len(encoded)) + encoded)
+        for name, array in arrays.items():
+            f.seek(header["arrays"][name][0])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+
+def read_mapped(path, magic):
+    """
+    @func_ read_mapped
+    @params path : (str) File written by write_mapped.
+    @params magic : (bytes) Expected 8-byte format tag.
+    @returns (tuple) (header: dict, arrays: dict name -> read-only view into the mapped file).
+    @desc_ Raises ValueError when the file is empty, truncated or of another format.
+    """
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    if data[:len(magic)].tobytes() != magic:
+        raise ValueError(f"{path} is not a {magic.decode('ascii', 'replace')} file")
+    (header_len,) = struct.unpack_from("<I", data, len(magic))
+    start = len(magic) + 4
+    header = json.loads(data[start:start + header_len].tobytes().decode("utf-8"))
+
+    arrays = {}
+    ## @iter_ arrays : Zero-copy views into the mapped file
+    for name, (offset, dtype, count) in header["arrays"].items():
+        end = offset + count * np.dtype(dtype).itemsize
+        if end > len(data):
+            raise ValueError(f"{path} is truncated")
+        arrays[name] = data[offset:end].view(dtype)
+    return header, arrays
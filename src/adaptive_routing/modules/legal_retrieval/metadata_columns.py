@@ -0,0 +1,70 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/modules/legal_retrieval/metadata_columns.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Columnar, dictionary-encoded chunk metadata (jurisdiction, category, source_file,
+##        section_id). Filters become boolean position masks, which hybrid search turns into
+##        FAISS ID selectors and BM25 candidate masks before any scoring happens.
+## @deps numpy, src.adaptive_routing.core.exceptions
+
+import numpy as np
+from src.adaptive_routing.core.exceptions import InvalidInputError
+
+## @const_ FILTER_FIELDS : Metadata keys stored as columns and accepted as search filters.
+FILTER_FIELDS = ("jurisdiction", "category", "source_file", "section_id")
+
+class MetadataColumns:
+    """
+    @class MetadataColumns
+    @desc_ One int32 code array per field plus its value dictionary. Code -1 marks a chunk
+           without the field. Matching is case-insensitive, like the jurisdiction filter it
+           replaces, and only touches the (small) dictionary before a vectorized np.isin.
+           Built from per-chunk metadata, or from distinct entries plus a per-chunk row index
+           (a ChunkStore's metadata table), so shared entries are encoded once.
+    @attr_ _codes : (dict) field -> np.ndarray int32 (n,) value codes.
+    @attr_ _values : (dict) field -> list[str] distinct values, indexed by code.
+    """
+    def __init__(self, metadata, rows=None):
+        metadata = list(metadata)
+        self._values = {}
+        self._codes = {}
+        ## @iter_ FILTER_FIELDS : Dictionary-encoding one column per field
+        for field in FILTER_FIELDS:
+            lookup = {}
+            codes = np.fromiter(
+                (-1 if meta.get(field) is None else lookup.setdefault(str(meta[field]), len(lookup)) for meta in metadata),
+                dtype=np.int32, count=len(metadata)
+            )
+            self._codes[field] = codes[rows] if rows is not None else codes
+            self._values[field] = list(lookup)
+        self._size = len(rows) if rows is not None else len(metadata)
+
+    def __len__(self):
+        return self._size
+
+    def _mask_(self, filters):
+        """
+        @func_ _mask_
+        @params filters : (dict | None) field -> value or list of accepted values.
+        @returns (np.ndarray | None) Boolean (n,) mask of matching positions; None when no filter applies.
+        @desc_ Fields are AND-ed; values within a field are OR-ed. Raises InvalidInputError on an unknown field.
+        """
+        active = {k: v for k, v in (filters or {}).items() if v not in (None, "", [], ())}
+        if not active:
+            return None
+        mask = np.ones(self._size, dtype=bool)
+        ## @iter_ active : Narrowing the mask one field at a time
+        for field, wanted in active.items():
+            if field not in self._codes:
+                raise InvalidInputError(f"Unsupported metadata filter '{field}'. Expected one of {', '.join(FILTER_FIELDS)}.")
+            wanted = {str(w).upper() for w in ([wanted] if isinstance(wanted, str) else wanted)}
+            codes = [code for code, value in enumerate(self._values[field]) if value.upper() in wanted]
+            mask &= np.isin(self._codes[field], codes)
+        return mask
+
+    def _distinct_(self, field):
+        """
+        @func_ _distinct_
+        @returns (list[str]) Values present in a column (e.g. the indexed jurisdictions).
+        """
+        return list(self._values[field])
@@ -15,42 +15,43 @@ class LegalRetriever:
     """
     @class LegalRetriever
     @desc_ Retrieves relevant legal text chunks from the vector index with quality filtering.
-    @attr_ _embedding_manager : (EmbeddingManager) Handles vector search over indexed documents.
+    @attr_ _embedding_manager : (EmbeddingManager | ShardedIndex) Handles vector search over indexed documents.
     """
     def __init__(self, embedding_manager: EmbeddingManager):
         self._embedding_manager = embedding_manager
 
-    def _retrieve_context_(self, query: str, top_k: int = None, score_threshold: float = None, jurisdiction: str = None) -> list:
+    def _retrieve_context_(self, query: str, top_k: int = None, score_threshold: float = None, jurisdiction: str = None, category: str = None) -> list:
         """
         @func_ _retrieve_context_
         @params query : (str) The user's legal question.
         @params top_k : (int, optional) Number of chunks to retrieve.
         @params score_threshold : (float, optional) Minimum similarity score.
-        @params jurisdiction : (str, optional) Jurisdiction filter.
+        @params jurisdiction : (str | list, optional) Jurisdiction filter.
+        @params category : (str | list, optional) Corpus category filter.
         @returns (list) Filtered list of context matches.
-        @desc_ Searches the FAISS index and applies relevance filtering.
+        @desc_ Searches the FAISS index and applies relevance filtering. Metadata filters are
+               pushed into the search, so they narrow the candidates before top_k is taken.
         """
-        search_results = self._embedding_manager._search_(query, top_k=top_k)
-        
-        ## @logic_ Apply relevance threshold filtering
+        search_results = self._embedding_manager._search_(query, top_k=top_k, filters={"jurisdiction": jurisdiction, "category": category})
+        return self._filter_results_(search_results, score_threshold)
+
+    def _filter_results_(self, search_results: list, score_threshold: float = None) -> list:
+        """
+        @func_ _filter_results_
+        @params search_results : (list) Ranked results from a hybrid search.
+        @params score_threshold : (float, optional) Minimum fused score.
+        @returns (list) Results above the threshold, one per parent context (the child chunk
+                 replaced by its parent text).
+        """
+        ## @logic_ Apply relevance threshold filtering (fused scores are calibrated to [0, 1])
         threshold = score_threshold if score_threshold is not None else FrameworkConfig._RETRIEVAL_SCORE_THRESHOLD
         
         if threshold > 0.0:
-            if search_results and max(r["score"] for r in search_results) < 0.1 and threshold >= 0.1:
-                logger.info("RRF scoring detected. Bypassing cosine threshold.")
-            else:
-                before_count = len(search_results)
-                search_results = [r for r in search_results if r["score"] >= threshold]
-                filtered_count = before_count - len(search_results)
-                if filtered_count > 0:
-                    logger.info(f"Filtered {filtered_count} results below threshold.")
-
-        ## @logic_ Apply jurisdiction metadata filter
-        if jurisdiction:
-            search_results = [
-                r for r in search_results 
-                if r.get("metadata", {}).get("jurisdiction", "").upper() == jurisdiction.upper()
-            ]
+            before_count = len(search_results)
+            search_results = [r for r in search_results if r["score"] >= threshold]
+            filtered_count = before_count - len(search_results)
+            if filtered_count > 0:
+                logger.info(f"Filtered {filtered_count} results below threshold.")
 
         ## @logic_ Deduplicate and inject parent context
         unique_parents = set()
@@ -0,0 +1,214 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/modules/legal_retrieval/shards.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Sharded retrieval: one FAISS+BM25 index per corpus directory (PH, HK, DMW, POEA, ...).
+##        A query is embedded once, fanned out to every shard on a thread pool and the per-shard
+##        rankings are merged with a vectorized top-k. Shards load and reload independently.
+## @deps os, threading, logging, concurrent.futures, numpy, src.adaptive_routing.config,
+##       src.adaptive_routing.core.exceptions, src.adaptive_routing.modules.legal_retrieval.embedding,
+##       src.adaptive_routing.modules.legal_retrieval.chunk_store
+
+import os
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.exceptions import InvalidInputError
+from src.adaptive_routing.modules.legal_retrieval.embedding import EmbeddingManager
+from src.adaptive_routing.modules.legal_retrieval.chunk_store import CHUNK_STORE_EXT, resolve_chunks_path
+
+logger = logging.getLogger(__name__)
+
+## @const_ SHARDS_DIRNAME : Sub-directory of the index directory holding one folder per shard.
+SHARDS_DIRNAME = "shards"
+
+def shard_paths(shards_dir, name, index_prefix="combined_index"):
+    """
+    @func_ shard_paths
+    @params shards_dir : (str) Directory holding the shard folders.
+    @params name : (str) Shard (corpus directory) name.
+    @params index_prefix : (str) Filename prefix inside the shard folder.
+    @returns (tuple) (index_path, chunks_path) of the shard; the chunk path falls back to a legacy JSON file.
+    """
+    shard_dir = os.path.join(shards_dir, name)
+    return (
+        os.path.join(shard_dir, f"{index_prefix}.faiss"),
+        resolve_chunks_path(os.path.join(shard_dir, f"{index_prefix}{CHUNK_STORE_EXT}"))
+    )
+
+
+class ShardedIndex:
+    """
+    @class ShardedIndex
+    @desc_ Drop-in for EmbeddingManager on the search path (_search_ has the same signature and
+           result shape, plus a "shard" key). Every shard is a regular EmbeddingManager; swapping
+           one in happens under a lock after it has fully loaded, so queries keep using the old
+           shard until the new one is ready and never see the other shards change.
+    @attr_ _embedder : (EmbeddingManager) Embeds each query once for all shards; its caches and settings are shared.
+    @attr_ _shards : (dict) shard name -> loaded EmbeddingManager.
+    @attr_ _paths : (dict) shard name -> (index_path, chunks_path) it was loaded from.
+    @attr_ _executor : (ThreadPoolExecutor) Runs the per-shard searches concurrently (FAISS releases the GIL).
+    """
+    def __init__(self, embedder: EmbeddingManager, max_workers: int = None):
+        self._embedder = embedder
+        self._shards = {}
+        self._paths = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or FrameworkConfig._RETRIEVAL_SHARD_WORKERS,
+            thread_name_prefix="shard"
+        )
+
+    def __len__(self):
+        return len(self._shards)
+
+    def _names_(self) -> list:
+        """
+        @func_ _names_
+        @returns (list[str]) Loaded shard names, sorted.
+        """
+        return sorted(self._shards)
+
+    def _stats_(self) -> dict:
+        """
+        @func_ _stats_
+        @returns (dict) shard name -> number of indexed chunks.
+        """
+        with self._lock:
+            shards = dict(self._shards)
+        return {name: (m._index.ntotal if m._index is not None else 0) for name, m in sorted(shards.items())}
+
+    def _load_shard_(self, name: str, index_path: str, chunks_path: str) -> int:
+        """
+        @func_ _load_shard_
+        @params name : (str) Shard name.
+        @params index_path : (str) FAISS file of the shard.
+        @params chunks_path : (str) Chunk store of the shard.
+        @returns (int) Number of chunks in the loaded shard.
+        @desc_ Loads into a fresh EmbeddingManager, then swaps it in; other shards are untouched.
+        """
+        manager = EmbeddingManager(
+            api_key=self._embedder._api_key,
+            model=self._embedder._model,
+            chunk_size=self._embedder._chunk_size,
+            chunk_overlap=self._embedder._chunk_overlap,
+            embedding_cache=self._embedder._embedding_cache,
+            query_cache=self._embedder._query_cache
+        )
+        manager._set_search_params_(ef_search=self._embedder._ef_search, nprobe=self._embedder._nprobe)
+        manager._load_index_(index_path, chunks_path)
+        with self._lock:
+            self._shards[name] = manager
+            self._paths[name] = (index_path, chunks_path)
+        count = manager._index.ntotal if manager._index is not None else 0
+        logger.info(f"Shard '{name}' loaded: {count} chunks.")
+        return count
+
+    def _load_dir_(self, shards_dir: str, index_prefix: str = "combined_index") -> dict:
+        """
+        @func_ _load_dir_
+        @params shards_dir : (str) Directory holding one folder per shard.
+        @params index_prefix : (str) Filename prefix inside each shard folder.
+        @returns (dict) shard name -> chunk count for every shard found.
+        """
+        loaded = {}
+        if not os.path.isdir(shards_dir):
+            return loaded
+        ## @iter_ shard folders : Loading every folder that holds a saved index
+        for name in sorted(os.listdir(shards_dir)):
+            index_path, chunks_path = shard_paths(shards_dir, name, index_prefix)
+            if os.path.exists(index_path) and os.path.exists(chunks_path):
+                loaded[name] = self._load_shard_(name, index_path, chunks_path)
+        return loaded
+
+    def _reload_shard_(self, name: str) -> int:
+        """
+        @func_ _reload_shard_
+        @params name : (str) Shard name.
+        @returns (int) Number of chunks after the reload.
+        @desc_ Re-reads a shard from the files it was loaded from (e.g. after update_shards rewrote them).
+        """
+        paths = self._paths.get(name)
+        if paths is None:
+            raise InvalidInputError(f"Unknown shard '{name}'. Loaded shards: {', '.join(self._names_()) or 'none'}.")
+        return self._load_shard_(name, *paths)
+
+    def _drop_shard_(self, name: str):
+        """
+        @func_ _drop_shard_
+        @params name : (str) Shard name.
+        @desc_ Stops serving a shard (e.g. its corpus directory was removed).
+        """
+        with self._lock:
+            self._shards.pop(name, None)
+            self._paths.pop(name, None)
+
+    def _search_by_shard_(self, query: str, top_k: int = None, filters: dict = None) -> dict:
+        """
+        @func_ _search_by_shard_
+        @params query : (str) The search query.
+        @params top_k : (int, optional) Results per shard.
+        @params filters : (dict, optional) Metadata filters applied inside every shard.
+        @returns (dict) shard name -> that shard's ranked results, each tagged with "shard".
+        @desc_ The query is embedded once and the shards are searched concurrently. A failing
+               shard is logged and contributes no results instead of failing the query.
+        """
+        with self._lock:
+            shards = dict(self._shards)
+        if not shards:
+            return {}
+
+        query_vector = self._embedder._embed_query_(query)
+        futures = {
+            name: self._executor.submit(manager._search_, query, top_k, filters, query_vector)
+            for name, manager in shards.items()
+        }
+
+        results = {}
+        ## @iter_ futures : Collecting the per-shard rankings
+        for name, future in sorted(futures.items()):
+            try:
+                hits = future.result()
+            except InvalidInputError:
+                raise
+            except Exception as e:
+                logger.warning(f"Shard '{name}' search failed: {e}")
+                hits = []
+            for hit in hits:
+                hit["shard"] = name
+            results[name] = hits
+        return results
+
+    @staticmethod
+    def _merge_(shard_results: dict, top_k: int = None) -> list:
+        """
+        @func_ _merge_
+        @params shard_results : (dict) shard name -> ranked results.
+        @params top_k : (int, optional) Number of merged results.
+        @returns (list) The top_k results across shards by fused score, re-ranked from 1.
+        @desc_ Fused scores are calibrated to [0, 1] in every shard, so they compare directly.
+               Selection is one argpartition over the concatenated scores.
+        """
+        hits = [hit for name in sorted(shard_results) for hit in shard_results[name]]
+        if not hits:
+            return []
+        top_k = top_k if top_k is not None else FrameworkConfig._RETRIEVAL_TOP_K
+        scores = np.fromiter((hit["score"] for hit in hits), dtype=np.float64, count=len(hits))
+        if len(hits) > top_k:
+            selected = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            selected = np.arange(len(hits))
+        order = selected[np.argsort(-scores[selected], kind="stable")]
+        return [dict(hits[i], rank=rank) for rank, i in enumerate(order, 1)]
+
+    def _search_(self, query: str, top_k: int = None, filters: dict = None) -> list:
+        """
+        @func_ _search_
+        @params query : (str) The search query.
+        @params top_k : (int, optional) Number of results.
+        @params filters : (dict, optional) Metadata filters.
+        @returns (list) Merged results across shards (same shape as EmbeddingManager._search_, plus "shard").
+        """
+        return self._merge_(self._search_by_shard_(query, top_k=top_k, filters=filters), top_k)
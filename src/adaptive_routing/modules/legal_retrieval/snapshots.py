@@ -0,0 +1,268 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file src/adaptive_routing/modules/legal_retrieval/snapshots.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Versioned, immutable index snapshots. Each update is built in a staging directory,
+##        described by a manifest, renamed into <index dir>/snapshots/<version>/ and published by
+##        atomically replacing the CURRENT pointer. Files of a published snapshot are never
+##        rewritten, so a process serving one keeps a consistent view while the next is built.
+##        SnapshotLoader loads new snapshots in the background and swaps a single reference.
+## @deps os, json, time, shutil, threading, logging, datetime, src.adaptive_routing.config,
+##       src.adaptive_routing.modules.legal_retrieval.shards
+
+import os
+import json
+import time
+import shutil
+import threading
+import logging
+from datetime import datetime
+from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.modules.legal_retrieval.shards import SHARDS_DIRNAME
+
+logger = logging.getLogger(__name__)
+
+## @const_ SNAPSHOTS_DIRNAME : Sub-directory of the index directory holding the snapshot versions.
+SNAPSHOTS_DIRNAME = "snapshots"
+## @const_ CURRENT_FILE : Pointer file naming the published version.
+CURRENT_FILE = "CURRENT"
+## @const_ MANIFEST_FILE : Per-snapshot description (version, files, build report).
+MANIFEST_FILE = "manifest.json"
+## @const_ _STAGING_PREFIX : Snapshot directories still being built; ignored by readers and pruning.
+_STAGING_PREFIX = ".staging-"
+
+def current_version(index_dir):
+    """
+    @func_ current_version
+    @params index_dir : (str) Index directory (e.g. localfiles/legal-basis).
+    @returns (str | None) Published snapshot version, or None when the directory has no snapshots.
+    """
+    try:
+        with open(os.path.join(index_dir, CURRENT_FILE), "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version if version and os.path.isdir(os.path.join(index_dir, SNAPSHOTS_DIRNAME, version)) else None
+
+def resolve_index_dir(index_dir):
+    """
+    @func_ resolve_index_dir
+    @params index_dir : (str) Index directory.
+    @returns (str) Directory of the published snapshot, or index_dir itself for a flat (pre-snapshot) layout.
+    """
+    version = current_version(index_dir)
+    return os.path.join(index_dir, SNAPSHOTS_DIRNAME, version) if version else index_dir
+
+def read_manifest(snapshot_dir):
+    """
+    @func_ read_manifest
+    @params snapshot_dir : (str) Snapshot directory.
+    @returns (dict) Its manifest, or {} when missing or unreadable.
+    """
+    try:
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _seed_(source_dir, staging_dir, index_prefix):
+    """
+    @func_ _seed_
+    @desc_ Copies the serving index files into the staging directory so an incremental update
+           starts from them. Files are copied, not linked: FAISS rewrites its file in place.
+    """
+    for name in os.listdir(source_dir):
+        path = os.path.join(source_dir, name)
+        if name in (SNAPSHOTS_DIRNAME, CURRENT_FILE, MANIFEST_FILE) or name.startswith("."):
+            continue
+        if os.path.isdir(path):
+            if name == SHARDS_DIRNAME:
+                shutil.copytree(path, os.path.join(staging_dir, name))
+        elif name.startswith(f"{index_prefix}.") and not name.endswith(".tmp"):
+            shutil.copy2(path, os.path.join(staging_dir, name))
+
+def _write_pointer_(index_dir, version):
+    tmp_path = os.path.join(index_dir, f"{CURRENT_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(index_dir, CURRENT_FILE))
+
+def publish_snapshot(index_dir, build, keep=None, index_prefix="combined_index"):
+    """
+    @func_ publish_snapshot
+    @params index_dir : (str) Index directory.
+    @params build : (callable) build(staging_dir, version) -> dict report; writes the new index files
+            into staging_dir (already seeded with the serving snapshot). A report with "changed": False
+            discards the staging copy.
+    @params keep : (int, optional) Published versions to keep (default _RETRIEVAL_SNAPSHOT_KEEP).
+    @params index_prefix : (str) Filename prefix of the index files carried into the new snapshot.
+    @returns (dict) The build report plus "version" and "snapshot_dir" of the serving snapshot.
+    @desc_ Readers only ever see complete snapshots: the directory is renamed into place after
+           its manifest is written, and CURRENT is replaced afterwards.
+    """
+    snapshots_dir = os.path.join(index_dir, SNAPSHOTS_DIRNAME)
+    os.makedirs(snapshots_dir, exist_ok=True)
+    version = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    staging_dir = os.path.join(snapshots_dir, _STAGING_PREFIX + version)
+    os.makedirs(staging_dir)
+    try:
+        _seed_(resolve_index_dir(index_dir), staging_dir, index_prefix)
+        report = dict(build(staging_dir, version) or {})
+        previous = current_version(index_dir)
+        if report.get("changed") is False and previous:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            report.update({"version": previous, "snapshot_dir": os.path.join(snapshots_dir, previous)})
+            return report
+
+        files = {}
+        for root, _, names in os.walk(staging_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, staging_dir).replace(os.sep, "/")] = os.path.getsize(path)
+        manifest = {"version": version, "created": datetime.now().isoformat(timespec="seconds"), "previous": previous, "files": files, "report": report}
+        with open(os.path.join(staging_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, default=str)
+
+        snapshot_dir = os.path.join(snapshots_dir, version)
+        os.rename(staging_dir, snapshot_dir)
+        _write_pointer_(index_dir, version)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    logger.info(f"Published index snapshot {version}.")
+    prune_snapshots(index_dir, keep)
+    report.update({"version": version, "snapshot_dir": snapshot_dir})
+    return report
+
+def prune_snapshots(index_dir, keep=None):
+    """
+    @func_ prune_snapshots
+    @params index_dir : (str) Index directory.
+    @params keep : (int, optional) Newest published versions to keep (default _RETRIEVAL_SNAPSHOT_KEEP).
+    @returns (list[str]) Removed versions.
+    @desc_ The published version is always kept. Processes still mapping a removed snapshot keep
+           their open files (POSIX); where removal fails the directory is left for the next prune.
+    """
+    keep = max(1, keep if keep is not None else FrameworkConfig._RETRIEVAL_SNAPSHOT_KEEP)
+    snapshots_dir = os.path.join(index_dir, SNAPSHOTS_DIRNAME)
+    if not os.path.isdir(snapshots_dir):
+        return []
+    current = current_version(index_dir)
+    versions = sorted((v for v in os.listdir(snapshots_dir) if not v.startswith(_STAGING_PREFIX)), reverse=True)
+    removed = []
+    for version in versions[keep:]:
+        if version != current:
+            shutil.rmtree(os.path.join(snapshots_dir, version), ignore_errors=True)
+            removed.append(version)
+    return removed
+
+
+class SnapshotLoader:
+    """
+    @class SnapshotLoader
+    @desc_ Holds the object serving the published snapshot behind one reference. Requests take
+           the reference once (_get_) and keep using it; a reload builds the replacement on a
+           background thread and swaps the reference only when it is fully loaded, so index
+           updates never block or slow a request. _get_ also notices snapshots published by
+           other processes (CLI -reindex) by checking CURRENT at most every poll interval.
+    @attr_ _index_dir : (str) Index directory.
+    @attr_ _load : (callable) load(snapshot_dir) -> serving object (e.g. a LegalRetrievalModule).
+    @attr_ _current : (tuple) (version, serving object); replaced as a whole on swap.
+    @attr_ _poll_interval : (float) Seconds between CURRENT checks; 0 disables polling.
+    """
+    def __init__(self, index_dir, load, poll_interval=None):
+        self._index_dir = index_dir
+        self._load = load
+        self._poll_interval = poll_interval if poll_interval is not None else FrameworkConfig._RETRIEVAL_SNAPSHOT_POLL_SECONDS
+        self._current = (None, None)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = False
+        self._checked = time.monotonic()
+        self._last_error = None
+        self._swapped_at = None
+
+    def _get_(self):
+        """
+        @func_ _get_
+        @returns (object | None) The serving object; starts a background reload when a newer snapshot was published.
+        """
+        version, current = self._current
+        if self._poll_interval and time.monotonic() - self._checked >= self._poll_interval:
+            self._checked = time.monotonic()
+            if current_version(self._index_dir) != version:
+                self._reload_async_()
+        return current
+
+    def _load_now_(self):
+        """
+        @func_ _load_now_
+        @returns (object) The freshly loaded serving object.
+        @desc_ Synchronous load of the published snapshot (startup). Raises on failure.
+        """
+        version = current_version(self._index_dir)
+        serving = self._load(resolve_index_dir(self._index_dir))
+        self._swap_(version, serving)
+        return serving
+
+    def _swap_(self, version, serving):
+        self._current = (version, serving)
+        self._swapped_at = datetime.now().isoformat(timespec="seconds")
+        logger.info(f"Serving index snapshot {version or '(flat layout)'}.")
+
+    def _reload_async_(self):
+        """
+        @func_ _reload_async_
+        @returns (bool) True when a new background load started; False when one is running
+                 (it is re-run once afterwards, so the latest snapshot and settings are picked up).
+        """
+        with self._lock:
+            if self._thread is not None:
+                self._pending = True
+                return False
+            self._thread = threading.Thread(target=self._run_, name="snapshot-loader", daemon=True)
+            self._thread.start()
+            return True
+
+    def _run_(self):
+        while True:
+            try:
+                version = current_version(self._index_dir)
+                serving = self._load(resolve_index_dir(self._index_dir))
+                self._swap_(version, serving)
+                self._last_error = None
+            except Exception as e:
+                ## @logic_ A failed load keeps the previous snapshot serving
+                self._last_error = str(e)
+                logger.error(f"Index snapshot reload failed; still serving {self._current[0] or '(flat layout)'}: {e}")
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+                self._pending = False
+
+    def _wait_(self, timeout=None):
+        """
+        @func_ _wait_
+        @params timeout : (float, optional) Seconds to wait.
+        @returns (bool) True when no background load is running anymore.
+        """
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _status_(self):
+        """
+        @func_ _status_
+        @returns (dict) {"version", "published", "loading", "swapped_at", "last_error"}.
+        """
+        return {
+            "version": self._current[0],
+            "published": current_version(self._index_dir),
+            "loading": self._thread is not None,
+            "swapped_at": self._swapped_at,
+            "last_error": self._last_error
+        }
@@ -3,18 +3,29 @@
 ## @file src/adaptive_routing/modules/legal_retrieval/utils/legal_indexing.py
 ## @project_ LLM Legal Adaptive Routing Framework
 ## @desc_ Developer utilities for managing legal corpus ingestion and indexing.
-## @deps os, json, glob, logging, src.adaptive_routing.modules.retrieval
+## @deps os, json, glob, shutil, hashlib, logging, datetime, src.adaptive_routing.modules.retrieval,
+##       src.adaptive_routing.modules.legal_retrieval.chunk_store, src.adaptive_routing.modules.legal_retrieval.shards,
+##       src.adaptive_routing.modules.legal_retrieval.snapshots
 
 import os
 import json
 import glob
+import shutil
+import hashlib
 import logging
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
+from src.adaptive_routing.modules.legal_retrieval.chunk_store import CHUNK_STORE_EXT, resolve_chunks_path
+from src.adaptive_routing.modules.legal_retrieval.shards import SHARDS_DIRNAME
+from src.adaptive_routing.modules.legal_retrieval.snapshots import SNAPSHOTS_DIRNAME, current_version, publish_snapshot, resolve_index_dir
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+## @const_ SOURCES_SUFFIX : Corpus manifest written next to each index (<index_prefix>.sources.json).
+SOURCES_SUFFIX = ".sources.json"
+
 def crawl_corpus(corpus_dir: str) -> List[str]:
     """
     @func_ crawl_corpus
@@ -44,12 +55,34 @@ def validate_legal_doc(data: Dict[str, Any]) -> bool:
         return False
     return True
 
-def format_doc_for_indexing(data: Dict[str, Any]) -> Dict[str, Any]:
+def document_key(data: Dict[str, Any], rel_path: Optional[str] = None) -> str:
+    """
+    @func_ document_key
+    @params data : (dict) Loaded JSON content.
+    @params rel_path : (str, optional) Path of the file relative to the corpus root.
+    @returns (str) Stable document id used to derive FAISS ids.
+    @desc_ Built from source_file and section_id. The corpus-relative path is appended when
+           known, because the same section is filed under several categories (and some
+           section ids repeat within a source), so source_file/section_id alone collide.
+    """
+    metadata = data.get("metadata", {}) if isinstance(data.get("metadata"), dict) else {}
+    source = metadata.get("source_file", "Direct Ingestion")
+    section = data.get("section_id") or metadata.get("section_id")
+    key = f"{source}#{section}" if section else source
+    if rel_path:
+        return f"{key}@{rel_path.replace(os.sep, '/')}"
+    if section:
+        return key
+    return f"{key}#{hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]}"
+
+def format_doc_for_indexing(data: Dict[str, Any], doc_id: Optional[str] = None) -> Dict[str, Any]:
     """
     @func_ format_doc_for_indexing
     @params data : (dict) Validated JSON content.
+    @params doc_id : (str, optional) Stable document id; derived from the content when omitted.
     @returns (dict) Formatted dictionary ready for ingestion.
-    @desc_ Prepares metadata and content with smart fallbacks.
+    @desc_ Prepares metadata and content with smart fallbacks. "doc_hash" fingerprints the
+           indexed content so an incremental reindex can tell changed documents apart.
     """
     content = data.get("content")
     if not content or not str(content).strip():
@@ -57,53 +90,172 @@ def format_doc_for_indexing(data: Dict[str, Any]) -> Dict[str, Any]:
     
     metadata = data.get("metadata", {})
     
-    return {
+    doc = {
         "content": content,
         "metadata": {
             "jurisdiction": data.get("jurisdiction", "Information/General"),
             "title": data.get("title", metadata.get("source_file", "Untitled Dataset")),
             "category": metadata.get("corpus_category", "Developer Resource"),
-            "source_file": metadata.get("source_file", "Direct Ingestion")
+            "source_file": metadata.get("source_file", "Direct Ingestion"),
+            "section_id": data.get("section_id") or metadata.get("section_id"),
+            "doc_id": doc_id or document_key(data)
         }
     }
+    doc["metadata"]["doc_hash"] = hashlib.sha256(
+        json.dumps(doc, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()[:16]
+    return doc
 
-def verify_index_integrity(corpus_dir: str, chunks_path: str) -> Dict[str, Any]:
+def load_corpus(corpus_dir: str, key_root: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
     """
-    @func_ verify_index_integrity
-    @params corpus_dir : (str) Path to raw JSON files.
-    @params chunks_path : (str) Path to indexed metadata.
-    @returns (dict) Statistics about sync status.
-    @desc_ Compares files on disk with vectors in the index.
+    @func_ load_corpus
+    @params corpus_dir : (str) Root of legal corpus.
+    @params key_root : (str, optional) Directory doc_ids are made relative to (defaults to corpus_dir), so a
+            shard built from legal-corpus/HK keeps the doc_ids the combined index gives its files.
+    @returns (dict) doc_id -> formatted document for every valid (non-repealed) file.
     """
-    corpus_files = crawl_corpus(corpus_dir)
-    valid_corpus_count = 0
-    
-    ## @iter_ corpus_files : Validation check for each file in corpus
-    for f_path in corpus_files:
+    documents = {}
+    ## @iter_ files : Loading docs for indexing
+    for f_path in crawl_corpus(corpus_dir):
         try:
             with open(f_path, "r", encoding="utf-8") as f:
                 data = json.load(f)
-                if validate_legal_doc(data):
-                    valid_corpus_count += 1
-        except:
+            if validate_legal_doc(data):
+                doc_id = document_key(data, os.path.relpath(f_path, key_root or corpus_dir))
+                documents[doc_id] = format_doc_for_indexing(data, doc_id)
+        except Exception as e:
+            logger.error(f"Error processing {f_path}: {e}")
+    return documents
+
+def diff_index(retrieval_module, documents: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    @func_ diff_index
+    @params retrieval_module : (LegalRetrievalModule) Module holding the current index.
+    @params documents : (dict) doc_id -> formatted document (from load_corpus).
+    @returns (dict) Lists of doc_ids: "added", "updated" and "removed" (repealed or deleted files).
+    """
+    indexed = retrieval_module._embedding_manager._document_hashes_()
+    return {
+        "added": [d for d in documents if d not in indexed],
+        "updated": [d for d, doc in documents.items() if d in indexed and indexed[d] != doc["metadata"]["doc_hash"]],
+        "removed": [d for d in indexed if d not in documents]
+    }
+
+def sources_path(index_dir: str, index_prefix: str = "combined_index") -> str:
+    """
+    @func_ sources_path
+    @params index_dir : (str) Directory holding the index files (a snapshot, shard or flat index directory).
+    @params index_prefix : (str) Filename prefix.
+    @returns (str) Path of the corpus manifest written with the index.
+    """
+    return os.path.join(index_dir, f"{index_prefix}{SOURCES_SUFFIX}")
+
+def scan_corpus(corpus_dir: str) -> Dict[str, List[int]]:
+    """
+    @func_ scan_corpus
+    @params corpus_dir : (str) Root of legal corpus.
+    @returns (dict) Corpus-relative path ("/"-separated) -> [size, mtime_ns] of every JSON file.
+    @desc_ Stat-only walk over the files crawl_corpus would index; nothing is opened.
+    """
+    files = {}
+    ## @iter_ corpus tree : Hidden files and directories are skipped, as glob does
+    for root, dirs, names in os.walk(corpus_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in names:
+            if name.endswith(".json") and not name.startswith("."):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[os.path.relpath(path, corpus_dir).replace(os.sep, "/")] = [stat.st_size, stat.st_mtime_ns]
+    return files
+
+def read_sources(index_dir: str, index_prefix: str = "combined_index") -> Dict[str, Any]:
+    """
+    @func_ read_sources
+    @params index_dir : (str) Directory holding the index files.
+    @params index_prefix : (str) Filename prefix.
+    @returns (dict) The corpus manifest, or {} when the index was built without one.
+    """
+    try:
+        with open(sources_path(index_dir, index_prefix), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_sources(corpus_dir: str, index_dir: str, index_prefix: str = "combined_index", indexed_count: int = 0, version: Optional[str] = None) -> bool:
+    """
+    @func_ write_sources
+    @params corpus_dir : (str) Corpus the index was built from.
+    @params index_dir : (str) Directory holding the index files.
+    @params index_prefix : (str) Filename prefix.
+    @params indexed_count : (int) Documents indexed from the corpus (valid, non-repealed files).
+    @params version : (str, optional) Index version (the snapshot version when published).
+    @returns (bool) True when the file list, sizes, mtimes or hashes differ from the previous manifest.
+    @desc_ Records path, size, mtime and SHA-256 of every source file. Hashes of files whose
+           size and mtime are unchanged are carried over, so only new or modified files are read.
+    """
+    previous = read_sources(index_dir, index_prefix).get("files", {})
+    files = {}
+    ## @iter_ scan : Hashing only the files the previous manifest does not already describe
+    for rel_path, (size, mtime_ns) in sorted(scan_corpus(corpus_dir).items()):
+        known = previous.get(rel_path)
+        if known and known["size"] == size and known["mtime_ns"] == mtime_ns:
+            files[rel_path] = known
             continue
-            
-    indexed_count = 0
-    if os.path.exists(chunks_path):
         try:
-            with open(chunks_path, "r", encoding="utf-8") as f:
-                chunks = json.load(f)
-                indexed_count = len(chunks)
-        except:
-            pass
-            
-    is_synced = valid_corpus_count == indexed_count
-    
-    return {
-        "corpus_count": valid_corpus_count,
+            with open(os.path.join(corpus_dir, rel_path), "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            continue
+        files[rel_path] = {"size": size, "mtime_ns": mtime_ns, "sha256": digest}
+
+    manifest = {
+        "version": version or datetime.now().strftime("%Y%m%dT%H%M%S%f"),
+        "created": datetime.now().isoformat(timespec="seconds"),
         "indexed_count": indexed_count,
-        "is_synced": is_synced,
-        "missing_count": max(0, valid_corpus_count - indexed_count)
+        "files": files
+    }
+    path = sources_path(index_dir, index_prefix)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+    return files != previous
+
+def verify_index_integrity(corpus_dir: str, index_dir: str, index_prefix: str = "combined_index") -> Dict[str, Any]:
+    """
+    @func_ verify_index_integrity
+    @params corpus_dir : (str) Path to raw JSON files.
+    @params index_dir : (str) Index directory; its published snapshot is checked when it has one.
+    @params index_prefix : (str) Filename prefix.
+    @returns (dict) Sync status: "is_synced", "added", "changed" and "removed" corpus paths,
+             "corpus_count", "indexed_count", "missing_count" (files out of sync) and "version".
+    @desc_ Stats the corpus and compares it with the manifest written by the last build; no
+           file is opened. An index without a manifest reports every file as added until the
+           next reindex writes one.
+    """
+    manifest = read_sources(resolve_index_dir(index_dir), index_prefix)
+    indexed = manifest.get("files", {})
+    on_disk = scan_corpus(corpus_dir) if os.path.isdir(corpus_dir) else {}
+
+    added = sorted(p for p in on_disk if p not in indexed)
+    removed = sorted(p for p in indexed if p not in on_disk)
+    changed = sorted(
+        p for p, (size, mtime_ns) in on_disk.items()
+        if p in indexed and (indexed[p]["size"] != size or indexed[p]["mtime_ns"] != mtime_ns)
+    )
+    missing_count = len(added) + len(changed) + len(removed)
+
+    return {
+        "corpus_count": len(on_disk),
+        "indexed_count": manifest.get("indexed_count", 0),
+        "is_synced": bool(manifest) and missing_count == 0,
+        "missing_count": missing_count,
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+        "version": manifest.get("version")
     }
 
 def ingest_custom_dataset(retrieval_module, raw_data_list: List[Dict[str, Any]]):
@@ -125,43 +277,167 @@ def ingest_custom_dataset(retrieval_module, raw_data_list: List[Dict[str, Any]])
     else:
         logger.warning("No valid documents found.")
 
-def rebuild_index(corpus_dir: str, output_dir: str, index_prefix: str = "combined_index"):
+def rebuild_index(corpus_dir: str, output_dir: str, index_prefix: str = "combined_index", progress_callback=None, key_root: Optional[str] = None, version: Optional[str] = None, documents: Optional[Dict[str, Dict[str, Any]]] = None):
     """
     @func_ rebuild_index
     @params corpus_dir : (str) Root of legal corpus.
     @params output_dir : (str) Target directory for FAISS save.
     @params index_prefix : (str) Filename prefix.
-    @desc_ Forces a full re-index of all datasets from scratch.
+    @params progress_callback : (callable, optional) Receives (embedded, total) after each embedding batch.
+    @params key_root : (str, optional) Directory doc_ids are made relative to (see load_corpus).
+    @params version : (str, optional) Index version recorded in the corpus manifest.
+    @params documents : (dict, optional) load_corpus result the caller already has; parsed here otherwise.
+    @desc_ Forces a full re-index of all datasets from scratch and writes the corpus manifest.
     """
     from src.adaptive_routing.modules.retrieval import LegalRetrievalModule
     
     logger.info(f"Rebuilding index from {corpus_dir}...")
     rm = LegalRetrievalModule(index_path="", chunks_path="")
     
-    files = crawl_corpus(corpus_dir)
-    docs_to_index = []
-    
-    ## @iter_ files : Loading docs for indexing
-    for f_path in files:
-        try:
-            with open(f_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if validate_legal_doc(data):
-                    docs_to_index.append(format_doc_for_indexing(data))
-        except Exception as e:
-            logger.error(f"Error processing {f_path}: {e}")
+    if documents is None:
+        documents = load_corpus(corpus_dir, key_root)
+    docs_to_index = list(documents.values())
             
     if not docs_to_index:
         logger.error("No valid documents found.")
         return None
         
-    rm._ingest_documents_(docs_to_index)
+    rm._ingest_documents_(docs_to_index, progress_callback=progress_callback)
     
     os.makedirs(output_dir, exist_ok=True)
     index_path = os.path.join(output_dir, f"{index_prefix}.faiss")
-    chunks_path = os.path.join(output_dir, f"{index_prefix}.json")
+    chunks_path = os.path.join(output_dir, f"{index_prefix}{CHUNK_STORE_EXT}")
     
     rm._save_index_(index_path, chunks_path)
+    write_sources(corpus_dir, output_dir, index_prefix, len(docs_to_index), version)
     logger.info(f"Rebuild complete: {index_path}")
     
     return index_path
+
+def update_index(corpus_dir: str, output_dir: str, index_prefix: str = "combined_index", progress_callback=None, key_root: Optional[str] = None, version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    @func_ update_index
+    @params corpus_dir : (str) Root of legal corpus.
+    @params output_dir : (str) Directory holding the saved index.
+    @params index_prefix : (str) Filename prefix.
+    @params progress_callback : (callable, optional) Receives (embedded, total) after each embedding batch.
+    @params key_root : (str, optional) Directory doc_ids are made relative to (see load_corpus).
+    @params version : (str, optional) Index version recorded in the corpus manifest.
+    @returns (dict) {"added", "updated", "removed"} counts, "sources_changed" (the corpus manifest
+             differs from the previous one) and "index_path".
+    @desc_ Applies only the diff between the corpus and the saved index: new and changed
+           documents are upserted, deleted or repealed ones removed. Falls back to a full
+           rebuild when no index exists yet. The corpus manifest is rewritten either way.
+    """
+    from src.adaptive_routing.modules.retrieval import LegalRetrievalModule
+
+    index_path = os.path.join(output_dir, f"{index_prefix}.faiss")
+    chunks_path = os.path.join(output_dir, f"{index_prefix}{CHUNK_STORE_EXT}")
+    legacy_path = resolve_chunks_path(chunks_path)
+    if not (os.path.exists(index_path) and os.path.exists(legacy_path)):
+        documents = load_corpus(corpus_dir, key_root)
+        rebuild_index(corpus_dir, output_dir, index_prefix, progress_callback=progress_callback, key_root=key_root, version=version, documents=documents)
+        return {"added": len(documents), "updated": 0, "removed": 0, "sources_changed": True, "index_path": index_path}
+
+    rm = LegalRetrievalModule(index_path=index_path, chunks_path=legacy_path)
+    documents = load_corpus(corpus_dir, key_root)
+    diff = diff_index(rm, documents)
+    logger.info(f"Index diff: {len(diff['added'])} added, {len(diff['updated'])} updated, {len(diff['removed'])} removed.")
+
+    changed = diff["added"] + diff["updated"]
+    if diff["removed"]:
+        rm.delete_documents(diff["removed"])
+    if changed:
+        rm.upsert_documents([documents[d] for d in changed], progress_callback=progress_callback)
+    ## @logic_ A legacy JSON chunk file is converted to the chunk store on first update
+    if changed or diff["removed"] or legacy_path != chunks_path:
+        rm._save_index_(index_path, chunks_path)
+    sources_changed = write_sources(corpus_dir, output_dir, index_prefix, len(documents), version)
+
+    return {"added": len(diff["added"]), "updated": len(diff["updated"]), "removed": len(diff["removed"]), "sources_changed": sources_changed, "index_path": index_path}
+
+def shard_names(corpus_dir: str) -> List[str]:
+    """
+    @func_ shard_names
+    @params corpus_dir : (str) Root of legal corpus.
+    @returns (list) Sorted names of the top-level corpus directories (PH, HK, ...) that contain JSON files.
+    """
+    if not os.path.isdir(corpus_dir):
+        return []
+    return [
+        name for name in sorted(os.listdir(corpus_dir))
+        if os.path.isdir(os.path.join(corpus_dir, name)) and crawl_corpus(os.path.join(corpus_dir, name))
+    ]
+
+def update_shards(corpus_dir: str, output_dir: str, index_prefix: str = "combined_index", shards: Optional[List[str]] = None, progress_callback=None, version: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    @func_ update_shards
+    @params corpus_dir : (str) Root of legal corpus; each top-level directory becomes one shard.
+    @params output_dir : (str) Index directory; shards are written to <output_dir>/shards/<name>/.
+    @params index_prefix : (str) Filename prefix inside each shard folder.
+    @params shards : (list, optional) Only update these shards (e.g. ["POEA"]); default is every corpus directory.
+    @params progress_callback : (callable, optional) Receives (embedded, total) after each embedding batch.
+    @params version : (str, optional) Index version recorded in each shard's corpus manifest.
+    @returns (dict) shard name -> update_index report; shards whose directory is gone report {"dropped": True}.
+    @desc_ Incremental per-shard update: a shard whose files did not change is left as is, so
+           updating POEA never rewrites HK. doc_ids stay relative to corpus_dir, matching the
+           combined index. Without an explicit shard list, folders of deleted directories are removed.
+    """
+    shards_dir = os.path.join(output_dir, SHARDS_DIRNAME)
+    names = list(shards) if shards else shard_names(corpus_dir)
+    report = {}
+    ## @iter_ names : Diffing and saving one shard at a time
+    for name in names:
+        shard_corpus = os.path.join(corpus_dir, name)
+        if not os.path.isdir(shard_corpus):
+            logger.warning(f"Corpus directory not found for shard '{name}': {shard_corpus}")
+            continue
+        report[name] = update_index(shard_corpus, os.path.join(shards_dir, name), index_prefix, progress_callback=progress_callback, key_root=corpus_dir, version=version)
+
+    if not shards and os.path.isdir(shards_dir):
+        ## @iter_ stale shards : Dropping shards whose corpus directory was deleted
+        for name in sorted(set(os.listdir(shards_dir)) - set(names)):
+            shutil.rmtree(os.path.join(shards_dir, name), ignore_errors=True)
+            report[name] = {"dropped": True}
+            logger.info(f"Removed shard '{name}' (corpus directory deleted).")
+    return report
+
+def publish_index(corpus_dir: str, index_dir: str, index_prefix: str = "combined_index", sharded: bool = False, progress_callback=None) -> Dict[str, Any]:
+    """
+    @func_ publish_index
+    @params corpus_dir : (str) Root of legal corpus.
+    @params index_dir : (str) Index directory; snapshots go to <index_dir>/snapshots/<version>/.
+    @params index_prefix : (str) Filename prefix.
+    @params sharded : (bool) Also update the per-corpus shards inside the snapshot.
+    @params progress_callback : (callable, optional) Receives (embedded, total) after each embedding batch.
+    @returns (dict) update_index counts plus "shards" (when sharded), "version" and "snapshot_dir".
+    @desc_ update_index applied to a copy of the serving snapshot, published atomically. The
+           serving files are never modified, so running servers keep answering from them until
+           their SnapshotLoader swaps to the new version. Nothing is published when the corpus
+           did not change: a clean verify_index_integrity returns before any file is parsed or
+           copied. A flat (pre-snapshot) index directory becomes the first snapshot.
+    """
+    serving_dir = resolve_index_dir(index_dir)
+    if current_version(index_dir) and (not sharded or os.path.isdir(os.path.join(serving_dir, SHARDS_DIRNAME))):
+        sync_info = verify_index_integrity(corpus_dir, index_dir, index_prefix)
+        if sync_info["is_synced"]:
+            logger.info(f"Corpus unchanged since snapshot {sync_info['version']}; nothing to publish.")
+            return {
+                "added": 0, "updated": 0, "removed": 0, "changed": False,
+                "version": current_version(index_dir), "snapshot_dir": serving_dir,
+                "index_path": os.path.join(serving_dir, f"{index_prefix}.faiss")
+            }
+
+    def build(staging_dir, version):
+        report = update_index(corpus_dir, staging_dir, index_prefix, progress_callback=progress_callback, version=version)
+        ## @logic_ Touched-but-identical files still publish, so the new manifest clears them from the sync check
+        changed = report["added"] + report["updated"] + report["removed"] > 0 or report["sources_changed"]
+        if sharded:
+            report["shards"] = update_shards(corpus_dir, staging_dir, index_prefix, progress_callback=progress_callback, version=version)
+            changed = changed or any(r.get("dropped") or r["added"] + r["updated"] + r["removed"] > 0 for r in report["shards"].values())
+        report["changed"] = changed
+        return report
+
+    report = publish_snapshot(index_dir, build, index_prefix=index_prefix)
+    report["index_path"] = os.path.join(report["snapshot_dir"], f"{index_prefix}.faiss")
+    return report
@@ -3,13 +3,18 @@
 ## @file src/adaptive_routing/modules/retrieval.py
 ## @project_ LLM Legal Adaptive Routing Framework
 ## @desc_ Orchestrator module that coordinates Legal RAG retrieval: embed, search, rerank.
-## @deps src.adaptive_routing.modules.legal_retrieval.embedding, src.adaptive_routing.modules.legal_retrieval.retriever, src.adaptive_routing.modules.legal_retrieval.ranker, src.adaptive_routing.config, logging
+## @deps src.adaptive_routing.modules.legal_retrieval.embedding, src.adaptive_routing.modules.legal_retrieval.retriever, src.adaptive_routing.modules.legal_retrieval.ranker, src.adaptive_routing.config, logging,
+##       src.adaptive_routing.modules.legal_retrieval.chunk_store, src.adaptive_routing.modules.legal_retrieval.shards,
+##       src.adaptive_routing.core.exceptions
 
 from src.adaptive_routing.modules.legal_retrieval.embedding import EmbeddingManager
 from src.adaptive_routing.modules.legal_retrieval.retriever import LegalRetriever
 from src.adaptive_routing.modules.legal_retrieval.ranker import LegalRanker
 from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.core.exceptions import InvalidInputError
 from src.adaptive_routing.modules.legal_retrieval.utils import legal_indexing
+from src.adaptive_routing.modules.legal_retrieval.chunk_store import resolve_chunks_path
+from src.adaptive_routing.modules.legal_retrieval.shards import ShardedIndex
 import os
 import json
 import logging
@@ -26,6 +31,7 @@ class LegalRetrievalModule:
     @attr_ _embedding_manager : (EmbeddingManager) Component for document indexing and vector search.
     @attr_ _retriever : (LegalRetriever) Component that queries the index for relevant context.
     @attr_ _ranker : (LegalRanker) Component that performs two-stage cascade reranking.
+    @attr_ _shards : (ShardedIndex | None) Per-corpus shards searched instead of the single index once loaded.
     """
     def __init__(self, api_key=None, embedding_manager=None, retriever=None, ranker=None, index_path=None, chunks_path=None):
         ## @logic_ Initialize embedding manager with Retrieval-specific configuration if not provided
@@ -41,10 +47,11 @@ class LegalRetrievalModule:
 
         ## @logic_ Initialize ranker for two-stage cascade reranking
         self._ranker = ranker or LegalRanker()
+        self._shards = None
         
         ## @logic_ Auto-load FAISS index if specified in settings
         target_index = index_path or FrameworkConfig._RETRIEVAL_INDEX_PATH
-        target_chunks = chunks_path or FrameworkConfig._RETRIEVAL_CHUNKS_PATH
+        target_chunks = resolve_chunks_path(chunks_path or FrameworkConfig._RETRIEVAL_CHUNKS_PATH)
         
         if target_index and target_chunks:
             if os.path.exists(target_index) and os.path.exists(target_chunks):
@@ -52,21 +59,42 @@ class LegalRetrievalModule:
             else:
                 logger.warning(f"Index or chunk file not found at {target_index} / {target_chunks}.")
 
-    def _ingest_documents_(self, documents: list):
+    def _ingest_documents_(self, documents: list, progress_callback=None):
         """
         @func_ _ingest_documents_
         @params documents : (list[str]) Raw legal document texts to add.
+        @params progress_callback : (callable, optional) Receives (embedded, total) after each embedding batch.
         @returns None
         @desc_ Embeds and indexes the provided documents into the FAISS vector store.
         """
-        self._embedding_manager._add_documents_(documents, bypass_chunking=True)
+        self._embedding_manager._add_documents_(documents, bypass_chunking=True, progress_callback=progress_callback)
 
-    def _process_retrieval_(self, query: str, signals: list = None, top_k: int = None) -> dict:
+    def upsert_documents(self, documents: list, progress_callback=None) -> int:
+        """
+        @func_ upsert_documents
+        @params documents : (list[dict]) Formatted documents; metadata "doc_id" identifies each one.
+        @params progress_callback : (callable, optional) Receives (embedded, total) after each embedding batch.
+        @returns (int) Number of chunks written.
+        @desc_ Adds new documents and replaces changed ones without rebuilding the index.
+        """
+        return self._embedding_manager._upsert_documents_(documents, bypass_chunking=True, progress_callback=progress_callback)
+
+    def delete_documents(self, doc_ids: list) -> int:
+        """
+        @func_ delete_documents
+        @params doc_ids : (list[str]) Document ids to remove (e.g. repealed sections).
+        @returns (int) Number of chunks removed.
+        """
+        return self._embedding_manager._delete_documents_(doc_ids)
+
+    def _process_retrieval_(self, query: str, signals: list = None, top_k: int = None, jurisdiction=None, category=None) -> dict:
         """
         @func_ _process_retrieval_
         @params query : (str) The user's legal question.
         @params signals : (list, optional) A list of keyword phrases from the Semantic Router.
         @params top_k : (int, optional) Number of context chunks to retrieve.
+        @params jurisdiction : (str | list, optional) Restrict retrieval to these jurisdictions.
+        @params category : (str | list, optional) Restrict retrieval to these corpus categories.
         @returns (dict) Contains 'query', 'retrieved_chunks', 'combined_query',
                  'dominant_corpus', and 'reranked_best'.
         @desc_ Main entry point — retrieves relevant context chunks from the index,
@@ -80,8 +108,16 @@ class LegalRetrievalModule:
             if valid_signals:
                 search_query = f"{query} {' '.join(valid_signals)}"
         
-        ## @logic_ Stage 1: Hybrid FAISS+BM25 search (existing pipeline)
-        retrieved_chunks = self._retriever._retrieve_context_(search_query, top_k=top_k)
+        ## @logic_ Stage 1: Hybrid FAISS+BM25 search. Sharded mode keeps every shard's top_k as
+        ##         ranker candidates, so each corpus is represented without extra searches.
+        if self._shards is not None:
+            shard_results = self._shards._search_by_shard_(search_query, top_k=top_k, filters={"jurisdiction": jurisdiction, "category": category})
+            shard_results = {name: self._retriever._filter_results_(hits) for name, hits in shard_results.items()}
+            retrieved_chunks = self._shards._merge_(shard_results, top_k)
+            candidates = [hit for hits in shard_results.values() for hit in hits]
+        else:
+            retrieved_chunks = self._retriever._retrieve_context_(search_query, top_k=top_k, jurisdiction=jurisdiction, category=category)
+            candidates = retrieved_chunks
         
         ## @logic_ Stage 2: Two-stage cascade reranking via LegalRanker
         dominant_corpus = None
@@ -90,7 +126,7 @@ class LegalRetrievalModule:
         if retrieved_chunks:
             try:
                 ## @logic_ Group retrieved chunks by corpus source for multi-corpus evaluation
-                faiss_results_dict = self._group_by_corpus_(retrieved_chunks)
+                faiss_results_dict = self._group_by_corpus_(candidates)
 
                 ## @logic_ Stage 2a: Soft-Boosting Coarse Ranker
                 boosted_pool, classifier_status = self._ranker._retrieval_classifier_(
@@ -112,7 +148,7 @@ class LegalRetrievalModule:
                         reranked_best = best_chunk
 
                     ## @logic_ Replace retrieved_chunks with reranked order, preserving metadata
-                    retrieved_chunks = self._merge_reranked_(retrieved_chunks, boosted_pool)
+                    retrieved_chunks = self._merge_reranked_(candidates, boosted_pool)[:len(retrieved_chunks)]
 
                 elif classifier_status == "DOMAIN_REFUSAL":
                     logger.info("Domain refusal from coarse ranker — returning raw FAISS results.")
@@ -134,14 +170,14 @@ class LegalRetrievalModule:
         @func_ _group_by_corpus_
         @params retrieved_chunks : (list[dict]) Results from LegalRetriever.
         @returns (dict) Mapping of corpus_name -> list of chunk texts.
-        @desc_ Groups retrieved chunks by their corpus origin using metadata jurisdiction.
-               Falls back to 'Unknown' if no jurisdiction metadata is present.
+        @desc_ Groups retrieved chunks by their corpus origin: the shard they came from, else
+               the metadata jurisdiction. Falls back to 'Unknown' if neither is present.
         """
         corpus_groups = {}
         for chunk_data in retrieved_chunks:
             metadata = chunk_data.get("metadata", {})
-            ## @logic_ Derive corpus name from jurisdiction metadata (set during indexing)
-            corpus_name = metadata.get("jurisdiction", "Unknown")
+            ## @logic_ Derive corpus name from the shard, or jurisdiction metadata (set during indexing)
+            corpus_name = chunk_data.get("shard") or metadata.get("jurisdiction", "Unknown")
             if corpus_name not in corpus_groups:
                 corpus_groups[corpus_name] = []
             corpus_groups[corpus_name].append(chunk_data.get("chunk", ""))
@@ -181,7 +217,7 @@ class LegalRetrievalModule:
         """
         @func_ _save_index_
         @params index_path : (str) File path for the FAISS index binary.
-        @params chunks_path : (str) File path for the chunk metadata JSON.
+        @params chunks_path : (str) File path for the chunk store (".json" writes the legacy JSON array).
         @desc_ Persists the current FAISS index and text chunks to disk.
         """
         self._embedding_manager._save_index_(index_path, chunks_path)
@@ -190,22 +226,63 @@ class LegalRetrievalModule:
         """
         @func_ _load_index_
         @params index_path : (str) File path of the saved FAISS index.
-        @params chunks_path : (str) File path of the saved chunk metadata JSON.
+        @params chunks_path : (str) File path of the saved chunk store or legacy JSON array.
         @desc_ Loads a previously persisted index and chunks from disk.
         """
         self._embedding_manager._load_index_(index_path, chunks_path)
 
-    def build_and_save_index(self, corpus_dir: str, output_dir: str, index_prefix: str) -> str:
+    def _load_shards_(self, shards_dir: str, index_prefix: str = "combined_index") -> dict:
+        """
+        @func_ _load_shards_
+        @params shards_dir : (str) Directory holding one folder per corpus shard (see update_shards).
+        @params index_prefix : (str) Filename prefix inside each shard folder.
+        @returns (dict) shard name -> chunk count; empty when no shard was found (single index kept).
+        @desc_ Switches retrieval to sharded mode. Queries are embedded by this module's
+               EmbeddingManager; ingestion and upserts still target the single index.
+        """
+        shards = ShardedIndex(self._embedding_manager)
+        loaded = shards._load_dir_(shards_dir, index_prefix)
+        if not loaded:
+            logger.warning(f"No shards found in {shards_dir}.")
+            return loaded
+        self._shards = shards
+        self._retriever._embedding_manager = shards
+        logger.info(f"Sharded retrieval enabled: {', '.join(f'{k} ({v})' for k, v in loaded.items())}.")
+        return loaded
+
+    def _reload_shard_(self, name: str) -> int:
+        """
+        @func_ _reload_shard_
+        @params name : (str) Shard name (corpus directory).
+        @returns (int) Number of chunks in the reloaded shard.
+        @desc_ Re-reads one shard from disk while the others keep serving.
+        """
+        if self._shards is None:
+            raise InvalidInputError("Sharded retrieval is not enabled.")
+        return self._shards._reload_shard_(name)
+
+    def _warm_up_(self) -> int:
+        """
+        @func_ _warm_up_
+        @returns (int) Bytes of mapped index data paged in.
+        @desc_ Pages in the single index and every shard before the module starts serving.
+        """
+        managers = [self._embedding_manager] + (list(self._shards._shards.values()) if self._shards is not None else [])
+        return sum(manager._warm_up_() for manager in managers)
+
+    def build_and_save_index(self, corpus_dir: str, output_dir: str, index_prefix: str, progress_callback=None) -> str:
         """
         @func_ build_and_save_index
         @params corpus_dir : (str) Path to the directory containing JSON corpus files.
         @params output_dir : (str) Directory where index will be saved.
         @params index_prefix : (str) Prefix for the output files.
+        @params progress_callback : (callable, optional) Receives (embedded, total) after each embedding batch.
         @returns (str) Path to the created FAISS index file.
         @desc_ Utility function that delegates to rebuild_index to crawl and persist a FAISS store.
         """
         return legal_indexing.rebuild_index(
             corpus_dir=corpus_dir,
             output_dir=output_dir,
-            index_prefix=index_prefix
+            index_prefix=index_prefix,
+            progress_callback=progress_callback
         )
@@ -112,6 +112,53 @@ class SemanticRouterModule:
                 "response_text": response_msg
             }
 
+        self._inject_context_(messages, context, route, is_follow_up=is_follow_up)
+        response_text = self._generator._dispatch_conversation_(messages, route, detected_language=detected_language)
+
+        return {
+            "classification": classification,
+            "accepted": True,
+            "response_text": response_text
+        }
+
+    def _generate_conversation_stream_(self, classification: dict, messages: list, context: str = None, is_follow_up: bool = False, detected_language: str = "Unknown"):
+        """
+        @func_ _generate_conversation_stream_
+        @params classification : (dict) Output from _process_routing_.
+        @params messages : (list[dict]) Full conversation history.
+        @params context : (str, optional) RAG-retrieved legal context.
+        @params is_follow_up : (bool) Whether this is a follow-up query.
+        @params detected_language : (str) Origin language detected by triage.
+        @returns (generator[dict]) 'reasoning'/'content' delta events, then a final
+                 {'type': 'done', 'classification', 'accepted', 'response_text'} event.
+        @desc_ Streaming variant of _generate_conversation_ with the same rejection rules.
+        """
+        route = classification.get("route")
+
+        ## @logic_ Reject if classification itself had an error
+        if classification.get("error"):
+            logger.warning(f"Classification error detected: {classification['error']}")
+            response_msg = classification["error"] if classification["error"] == "LLMEngine failed to acknowledge the input." else "I encountered a technical issue while processing your query."
+            yield {"type": "done", "classification": classification, "accepted": False, "response_text": response_msg}
+            return
+
+        self._inject_context_(messages, context, route, is_follow_up=is_follow_up)
+        ## @iter_ stream events : Forwarding deltas and re-shaping the terminal event
+        for event in self._generator._dispatch_conversation_stream_(messages, route, detected_language=detected_language):
+            if event["type"] == "done":
+                yield {"type": "done", "classification": classification, "accepted": True, "response_text": event["content"]}
+            else:
+                yield event
+
+    def _inject_context_(self, messages: list, context: str, route: str, is_follow_up: bool = False):
+        """
+        @func_ _inject_context_
+        @params messages : (list[dict]) Conversation history (mutated in place).
+        @params context : (str) RAG context.
+        @params route : (str) Target LLM route.
+        @params is_follow_up : (bool) Follow-up flag.
+        @desc_ Augments the last user message with legal context unless the route is Casual.
+        """
         ## @logic_ Inject context into the conversation if provided and route is not Casual
         if context and route != "Casual-LLM" and messages:
             last_user_msg = None
@@ -123,14 +170,6 @@ class SemanticRouterModule:
             if last_user_msg:
                 last_user_msg["content"] = self._build_augmented_query_(last_user_msg["content"], context, route, is_follow_up=is_follow_up)
 
-        response_text = self._generator._dispatch_conversation_(messages, route, detected_language=detected_language)
-
-        return {
-            "classification": classification,
-            "accepted": True,
-            "response_text": response_text
-        }
-
     def _build_augmented_query_(self, normalized_text: str, context: str, route: str, is_follow_up: bool = False) -> str:
         """
         @func_ _build_augmented_query_
@@ -5,12 +5,13 @@
 ## @desc_ Internal audit component. Handles the LLM call, <think> block stripping,
 ##        and JSON verdict parsing. Does NOT orchestrate routes, strictness labels,
 ##        or safeguard messages — those belong to the facade (SafetyAuditModule).
-## @deps src.adaptive_routing.core.engine, src.adaptive_routing.config, json, re, logging
+## @deps src.adaptive_routing.core.engine, src.adaptive_routing.core.cache, src.adaptive_routing.config, json, re, logging
 
 import json
 import re
 import logging
 from src.adaptive_routing.core.engine import LLMRequestEngine
+from src.adaptive_routing.core.cache import ResponseCache
 from src.adaptive_routing.config import FrameworkConfig
 
 logger = logging.getLogger(__name__)
@@ -38,7 +39,10 @@ class ResponseAuditor:
             max_tokens=FrameworkConfig._VERIFICATION_DEEP_AUDIT_MAX_TOKENS,
             use_system_role=True,
             include_reasoning=FrameworkConfig._VERIFICATION_REASONING,
-            reasoning_effort=FrameworkConfig._VERIFICATION_REASONING_EFFORT
+            reasoning_effort=FrameworkConfig._VERIFICATION_REASONING_EFFORT,
+            cache=ResponseCache._for_config_(),
+            coalesce=FrameworkConfig._COALESCE_DETERMINISTIC,
+            stage="audit"
         )
         self._system_prompt = system_prompt or FrameworkConfig._VERIFICATION_INSTRUCTIONS
 
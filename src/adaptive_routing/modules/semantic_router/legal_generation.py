@@ -3,10 +3,12 @@
 ## @file src/adaptive_routing/modules/semantic_router/legal_generation.py
 ## @project_ LLM Legal Adaptive Routing Framework
 ## @desc_ Generates responses using specific LLMs based on classification.
-## @deps src.adaptive_routing.core.engine, src.adaptive_routing.config, logging
+## @deps src.adaptive_routing.core.engine, src.adaptive_routing.core.hedging, src.adaptive_routing.core.exceptions, src.adaptive_routing.config, logging
 
 import logging
 from src.adaptive_routing.core.engine import LLMRequestEngine
+from src.adaptive_routing.core.hedging import HedgePolicy
+from src.adaptive_routing.core.exceptions import APIConnectionError, APIResponseError
 from src.adaptive_routing.config import FrameworkConfig
 
 logger = logging.getLogger(__name__)
@@ -15,6 +17,8 @@ class LegalGenerator:
     """
     @class LegalGenerator
     @desc_ Handles response generation by dispatching to the appropriate LLM engine.
+           If the route's model is down (open circuit, timeout, 5xx) the call fails over
+           along the route's configured fallback chain.
     @attr_ _general_engine : (LLMRequestEngine) Engine for General pathway.
     @attr_ _reasoning_engine : (LLMRequestEngine) Engine for Reasoning pathway.
     @attr_ _casual_engine : (LLMRequestEngine) Engine for Casual pathway.
@@ -29,7 +33,11 @@ class LegalGenerator:
             max_tokens=FrameworkConfig._GENERAL_MAX_TOKENS,
             use_system_role=FrameworkConfig._GENERAL_USE_SYSTEM,
             include_reasoning=FrameworkConfig._GENERAL_REASONING,
-            reasoning_effort=FrameworkConfig._GENERAL_REASONING_EFFORT
+            reasoning_effort=FrameworkConfig._GENERAL_REASONING_EFFORT,
+            coalesce=FrameworkConfig._COALESCE_GENERATION,
+            hedge=HedgePolicy._for_route_("General-LLM"),
+            stage="generation",
+            route="General-LLM"
         )
 
         self._reasoning_engine = reasoning_engine or LLMRequestEngine(
@@ -39,7 +47,11 @@ class LegalGenerator:
             max_tokens=FrameworkConfig._REASONING_MAX_TOKENS,
             use_system_role=FrameworkConfig._REASONING_USE_SYSTEM,
             include_reasoning=FrameworkConfig._REASONING_REASONING,
-            reasoning_effort=FrameworkConfig._REASONING_REASONING_EFFORT
+            reasoning_effort=FrameworkConfig._REASONING_REASONING_EFFORT,
+            coalesce=FrameworkConfig._COALESCE_GENERATION,
+            hedge=HedgePolicy._for_route_("Reasoning-LLM"),
+            stage="generation",
+            route="Reasoning-LLM"
         )
 
         self._casual_engine = casual_engine or LLMRequestEngine(
@@ -49,9 +61,20 @@ class LegalGenerator:
             max_tokens=FrameworkConfig._CASUAL_MAX_TOKENS,
             use_system_role=FrameworkConfig._CASUAL_USE_SYSTEM,
             include_reasoning=FrameworkConfig._CASUAL_REASONING,
-            reasoning_effort=FrameworkConfig._CASUAL_REASONING_EFFORT
+            reasoning_effort=FrameworkConfig._CASUAL_REASONING_EFFORT,
+            coalesce=FrameworkConfig._COALESCE_GENERATION,
+            hedge=HedgePolicy._for_route_("Casual-LLM"),
+            stage="generation",
+            route="Casual-LLM"
         )
 
+        ## @logic_ Optionally send hedges to the route's first fallback model instead of the same model
+        if FrameworkConfig._HEDGE_USE_FALLBACK:
+            for route in ("General-LLM", "Reasoning-LLM", "Casual-LLM"):
+                chain = self._engine_chain_(route)
+                if chain[0][1]._hedge is not None and len(chain) > 1:
+                    chain[0][1]._hedge._engine = chain[1][1]
+
     def _build_messages_with_system_(self, messages: list, system_prompt: str) -> list:
         """
         @func_ _build_messages_with_system_
@@ -64,6 +87,83 @@ class LegalGenerator:
             return [{"role": "system", "content": system_prompt}] + messages[1:]
         return [{"role": "system", "content": system_prompt}] + messages
 
+    def _resolve_route_(self, route: str, detected_language: str = "Unknown") -> tuple:
+        """
+        @func_ _resolve_route_
+        @params route : (str) Target route ("Casual-LLM", "General-LLM", "Reasoning-LLM").
+        @params detected_language : (str) Origin language detected by triage.
+        @returns (tuple) (engine: LLMRequestEngine, system_prompt: str)
+        @desc_ Selects the engine and system prompt (with language instruction) for a route.
+               Unknown routes fall back to the General pathway.
+        """
+        if route == "Casual-LLM":
+            engine, system_prompt = self._casual_engine, FrameworkConfig._CASUAL_INSTRUCTIONS
+        elif route == "Reasoning-LLM":
+            engine, system_prompt = self._reasoning_engine, FrameworkConfig._REASONING_INSTRUCTIONS
+        else:
+            engine, system_prompt = self._general_engine, FrameworkConfig._GENERAL_INSTRUCTIONS
+
+        if detected_language and detected_language.lower() != "unknown":
+            system_prompt += f"\n\n[MANDATORY LANGUAGE INSTRUCTION: You MUST output your final response entirely in {detected_language}, matching the user's original language. Preserve English legal terms if they do not translate cleanly.]"
+        return engine, system_prompt
+
+    def _engine_chain_(self, route: str) -> list:
+        """
+        @func_ _engine_chain_
+        @params route : (str) Target route.
+        @returns (list[tuple]) [(route, engine), ...] starting with the route itself,
+                 followed by its configured fallbacks (duplicates removed).
+        """
+        if route == "Casual-LLM":
+            fallbacks = FrameworkConfig._CASUAL_FALLBACK_ROUTES
+        elif route == "Reasoning-LLM":
+            fallbacks = FrameworkConfig._REASONING_FALLBACK_ROUTES
+        else:
+            route = "General-LLM"
+            fallbacks = FrameworkConfig._GENERAL_FALLBACK_ROUTES
+
+        chain = []
+        seen_models = set()
+        ## @iter_ routes : Primary route first, then fallbacks in configured order
+        for candidate in [route] + list(fallbacks):
+            engine, _ = self._resolve_route_(candidate)
+            if engine._model in seen_models:
+                continue
+            seen_models.add(engine._model)
+            chain.append((candidate, engine))
+        return chain
+
+    def _is_failover_error_(self, error) -> bool:
+        """
+        @func_ _is_failover_error_
+        @params error : (Exception) Error raised by an engine call.
+        @returns (bool) True if another model might succeed (open circuit, network, 429/5xx).
+        @desc_ Auth, credit and bad-request errors would fail on every model, so they are not retried.
+        """
+        if isinstance(error, APIConnectionError):
+            return True
+        if isinstance(error, APIResponseError):
+            return error.status_code is None or error.status_code == 429 or error.status_code >= 500
+        return False
+
+    def _call_with_failover_(self, route: str, call):
+        """
+        @func_ _call_with_failover_
+        @params route : (str) Target route.
+        @params call : (callable) Receives an engine and performs the request.
+        @returns (any) The first successful result along the fallback chain.
+        @raises The last engine's error if every model in the chain fails.
+        """
+        chain = self._engine_chain_(route)
+        ## @iter_ chain : Trying each model until one answers
+        for index, (candidate, engine) in enumerate(chain):
+            try:
+                return call(engine)
+            except Exception as e:
+                if index == len(chain) - 1 or not self._is_failover_error_(e):
+                    raise
+                logger.warning(f"{candidate} model '{engine._model}' unavailable ({type(e).__name__}). Failing over to {chain[index + 1][0]}.")
+
     def _dispatch_(self, query: str, route: str, detected_language: str = "Unknown") -> str:
         """
         @func_ _dispatch_
@@ -73,21 +173,8 @@ class LegalGenerator:
         @returns (str) The LLM response.
         @desc_ Single-turn generation dispatch.
         """
-        if route == "Casual-LLM":
-            system_prompt = FrameworkConfig._CASUAL_INSTRUCTIONS
-            if detected_language and detected_language.lower() != "unknown":
-                system_prompt += f"\n\n[MANDATORY LANGUAGE INSTRUCTION: You MUST output your final response entirely in {detected_language}, matching the user's original language. Preserve English legal terms if they do not translate cleanly.]"
-            return self._casual_engine._get_completion_(query, system_prompt)
-        elif route == "Reasoning-LLM":
-            system_prompt = FrameworkConfig._REASONING_INSTRUCTIONS
-            if detected_language and detected_language.lower() != "unknown":
-                system_prompt += f"\n\n[MANDATORY LANGUAGE INSTRUCTION: You MUST output your final response entirely in {detected_language}, matching the user's original language. Preserve English legal terms if they do not translate cleanly.]"
-            return self._reasoning_engine._get_completion_(query, system_prompt)
-        else:
-            system_prompt = FrameworkConfig._GENERAL_INSTRUCTIONS
-            if detected_language and detected_language.lower() != "unknown":
-                system_prompt += f"\n\n[MANDATORY LANGUAGE INSTRUCTION: You MUST output your final response entirely in {detected_language}, matching the user's original language. Preserve English legal terms if they do not translate cleanly.]"
-            return self._general_engine._get_completion_(query, system_prompt)
+        _, system_prompt = self._resolve_route_(route, detected_language)
+        return self._call_with_failover_(route, lambda engine: engine._get_completion_(query, system_prompt))
 
     def _dispatch_conversation_(self, messages: list, route: str, detected_language: str = "Unknown") -> str:
         """
@@ -101,21 +188,39 @@ class LegalGenerator:
         if not messages:
             return None
 
-        if route == "Casual-LLM":
-            system_prompt = FrameworkConfig._CASUAL_INSTRUCTIONS
-            if detected_language and detected_language.lower() != "unknown":
-                system_prompt += f"\n\n[MANDATORY LANGUAGE INSTRUCTION: You MUST output your final response entirely in {detected_language}, matching the user's original language. Preserve English legal terms if they do not translate cleanly.]"
-            full_messages = self._build_messages_with_system_(messages, system_prompt)
-            return self._casual_engine._get_chat_completion_(full_messages)
-        elif route == "Reasoning-LLM":
-            system_prompt = FrameworkConfig._REASONING_INSTRUCTIONS
-            if detected_language and detected_language.lower() != "unknown":
-                system_prompt += f"\n\n[MANDATORY LANGUAGE INSTRUCTION: You MUST output your final response entirely in {detected_language}, matching the user's original language. Preserve English legal terms if they do not translate cleanly.]"
-            full_messages = self._build_messages_with_system_(messages, system_prompt)
-            return self._reasoning_engine._get_chat_completion_(full_messages)
-        else:
-            system_prompt = FrameworkConfig._GENERAL_INSTRUCTIONS
-            if detected_language and detected_language.lower() != "unknown":
-                system_prompt += f"\n\n[MANDATORY LANGUAGE INSTRUCTION: You MUST output your final response entirely in {detected_language}, matching the user's original language. Preserve English legal terms if they do not translate cleanly.]"
-            full_messages = self._build_messages_with_system_(messages, system_prompt)
-            return self._general_engine._get_chat_completion_(full_messages)
+        _, system_prompt = self._resolve_route_(route, detected_language)
+        full_messages = self._build_messages_with_system_(messages, system_prompt)
+        return self._call_with_failover_(route, lambda engine: engine._get_chat_completion_(full_messages))
+
+    def _dispatch_conversation_stream_(self, messages: list, route: str, detected_language: str = "Unknown"):
+        """
+        @func_ _dispatch_conversation_stream_
+        @params messages : (list) Conversation history.
+        @params route : (str) Target route.
+        @params detected_language : (str) Origin language detected by triage.
+        @returns (generator[dict]) 'reasoning'/'content' delta events, then a 'done' event
+                 carrying the full response text.
+        @desc_ Streaming variant of _dispatch_conversation_. Failover is only possible before
+               the first event, so a partially streamed answer is never mixed across models.
+        """
+        if not messages:
+            return iter([{"type": "done", "content": None}])
+
+        _, system_prompt = self._resolve_route_(route, detected_language)
+        full_messages = self._build_messages_with_system_(messages, system_prompt)
+        return self._stream_with_failover_(route, full_messages)
+
+    def _stream_with_failover_(self, route: str, full_messages: list):
+        """
+        @func_ _stream_with_failover_
+        @params route : (str) Target route.
+        @params full_messages : (list) Messages with the system prompt already injected.
+        @returns (generator[dict]) Events from the first model that starts streaming.
+        """
+        def _open_(engine):
+            stream = engine._stream_chat_completion_(full_messages)
+            return stream, next(stream)
+
+        stream, first_event = self._call_with_failover_(route, _open_)
+        yield first_event
+        yield from stream
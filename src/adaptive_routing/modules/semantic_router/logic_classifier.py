@@ -3,12 +3,13 @@
 ## @file src/adaptive_routing/modules/semantic_router/logic_classifier.py
 ## @project_ LLM Legal Adaptive Routing Framework
 ## @desc_ Semantic router for classifying legal queries into Information or Advice pathways.
-## @deps src.adaptive_routing.core.engine, src.adaptive_routing.config, json, re, logging
+## @deps src.adaptive_routing.core.engine, src.adaptive_routing.core.cache, src.adaptive_routing.config, json, re, logging
 
 import json
 import re
 import logging
 from src.adaptive_routing.core.engine import LLMRequestEngine
+from src.adaptive_routing.core.cache import ResponseCache
 from src.adaptive_routing.config import FrameworkConfig
 from src.adaptive_routing.modules.semantic_router.utils.parser import parse_router_json
 
@@ -29,7 +30,10 @@ class RoutingClassifier:
             max_tokens=FrameworkConfig._ROUTER_MAX_TOKENS, 
             use_system_role=FrameworkConfig._ROUTER_USE_SYSTEM,
             include_reasoning=FrameworkConfig._ROUTER_REASONING,
-            reasoning_effort=FrameworkConfig._ROUTER_REASONING_EFFORT
+            reasoning_effort=FrameworkConfig._ROUTER_REASONING_EFFORT,
+            cache=ResponseCache._for_config_(),
+            coalesce=FrameworkConfig._COALESCE_DETERMINISTIC,
+            stage="router"
         )
 
         self._system_prompt = system_prompt or FrameworkConfig._ROUTER_INSTRUCTIONS
@@ -3,11 +3,12 @@
 ## @file src/adaptive_routing/modules/triage.py
 ## @project_ LLM Legal Adaptive Routing Framework
 ## @desc_ Facade module that orchestrates Linguistic Normalization and Language Detection.
-## @deps src.adaptive_routing.modules.multihead_classifier.linguistic, src.adaptive_routing.core.engine, logging
+## @deps src.adaptive_routing.modules.multihead_classifier.linguistic, src.adaptive_routing.core.engine, src.adaptive_routing.core.cache, logging
 
 from src.adaptive_routing.modules.multihead_classifier.linguistic import LinguisticNormalizer
 from src.adaptive_routing.modules.multihead_classifier.utils.cleaner import strip_llm_artifacts
 from src.adaptive_routing.core.engine import LLMRequestEngine
+from src.adaptive_routing.core.cache import ResponseCache
 from src.adaptive_routing.config import FrameworkConfig
 import re
 import logging
@@ -30,7 +31,10 @@ class TriageModule:
             max_tokens=FrameworkConfig._TRIAGE_MAX_TOKENS,
             use_system_role=FrameworkConfig._TRIAGE_USE_SYSTEM,
             include_reasoning=FrameworkConfig._TRIAGE_REASONING,
-            reasoning_effort=FrameworkConfig._TRIAGE_REASONING_EFFORT
+            reasoning_effort=FrameworkConfig._TRIAGE_REASONING_EFFORT,
+            cache=ResponseCache._for_config_(),
+            coalesce=FrameworkConfig._COALESCE_DETERMINISTIC,
+            stage="triage"
         )
         self._normalizer = normalizer or LinguisticNormalizer(self._engine)
 
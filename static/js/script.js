@@ -162,11 +162,11 @@ async function updateSyncStatus() {
         if (data.is_synced) {
             DOM.syncDot.className = 'sync-dot green';
             DOM.syncText.textContent = 'Index Synced';
-            DOM.syncStatus.title = `Index up to date with ${data.corpus_count} documents.`;
+            DOM.syncStatus.title = `Index up to date with ${data.indexed_count} documents (${data.corpus_count} corpus files, repealed ones excluded).`;
         } else {
             DOM.syncDot.className = 'sync-dot yellow';
             DOM.syncText.textContent = `Out of Sync (${data.missing_count})`;
-            DOM.syncStatus.title = `${data.missing_count} documents missing from index.`;
+            DOM.syncStatus.title = `Corpus changed since the last index build: ${data.added.length} added, ${data.changed.length} changed, ${data.removed.length} removed files.`;
         }
         console.log('[Sync] Status updated:', data.is_synced ? 'Synced' : 'Out of Sync');
     } catch (err) {
@@ -596,6 +596,26 @@ function handleStreamEvent(data, pipelineDiv, bubbleDiv) {
         pipelineDiv.appendChild(step);
         scrollToBottom();
     }
+    else if (data.type === 'delta') {
+        // Incremental tokens: content renders live in the bubble, reasoning shows as a thinking step
+        if (data.channel === 'content') {
+            bubbleDiv._streamText = (bubbleDiv._streamText || '') + data.content;
+            bubbleDiv.innerHTML = renderMarkdown(bubbleDiv._streamText);
+        } else if (!bubbleDiv._thinkingShown) {
+            bubbleDiv._thinkingShown = true;
+            markPreviousStepDone(pipelineDiv);
+            const thinkStep = document.createElement('div');
+            thinkStep.className = 'pipe-step active';
+            thinkStep.innerHTML = `<span class="step-icon"><div class="pipe-spinner"></div></span><span class="step-text">Reasoning...</span>`;
+            pipelineDiv.appendChild(thinkStep);
+        }
+        scrollToBottom();
+    }
+    else if (data.type === 'delta_reset') {
+        bubbleDiv._streamText = '';
+        bubbleDiv._thinkingShown = false;
+        bubbleDiv.innerHTML = '';
+    }
     else if (data.type === 'result') {
         markPreviousStepDone(pipelineDiv);
         
@@ -0,0 +1,133 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/bench_ann_index.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Recall-vs-latency benchmark for the FAISS index types selectable through
+##        RETRIEVAL_INDEX_FACTORY. Builds each index through EmbeddingManager (same training,
+##        fallback and efSearch/nprobe handling as production) and reports recall@k against the
+##        exact index, single-query QPS, build time and serialized size at several corpus sizes.
+##        Runs offline on synthetic clustered vectors, or on real vectors from the embedding cache.
+## @deps argparse, os, sys, time, numpy, faiss, src.adaptive_routing
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import faiss
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.adaptive_routing.config import FrameworkConfig
+from src.adaptive_routing.modules.legal_retrieval.embedding import EmbeddingManager
+from src.adaptive_routing.modules.legal_retrieval.embedding_cache import EmbeddingCache
+
+def synthetic_vectors(n, dim, clusters, seed):
+    """
+    @func synthetic_vectors
+    @returns (np.ndarray) n unit vectors drawn around `clusters` random topics, resembling
+             sentence embeddings of a corpus with a few dominant subjects.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    assignment = rng.integers(0, clusters, size=n)
+    x = centers[assignment] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+def cached_vectors(path):
+    """
+    @func cached_vectors
+    @returns (np.ndarray) Every vector stored in an embedding cache file (most common dimension).
+    """
+    vectors = list(EmbeddingCache(path)._vectors.values())
+    dims = np.bincount([len(v) for v in vectors])
+    return np.vstack([v for v in vectors if len(v) == dims.argmax()]).astype(np.float32)
+
+def build(manager, factory, x):
+    """
+    @func build
+    @returns (tuple) (index, build seconds) for the factory string, via EmbeddingManager._create_index_.
+    """
+    FrameworkConfig._RETRIEVAL_INDEX_FACTORY = factory
+    manager._index = None
+    manager._dimension = x.shape[1]
+    started = time.perf_counter()
+    index = manager._create_index_(x)
+    index.add_with_ids(x, np.arange(len(x), dtype=np.int64))
+    manager._index = index
+    return index, time.perf_counter() - started
+
+def measure(manager, queries, truth, k):
+    """
+    @func measure
+    @returns (tuple) (recall@k, queries per second) issuing one query at a time like _search_.
+    """
+    params = manager._search_params_()
+    found = np.empty((len(queries), k), dtype=np.int64)
+    started = time.perf_counter()
+    ## @iter_ queries : One search call per query, as in production
+    for i in range(len(queries)):
+        q = queries[i:i + 1]
+        _, ids = manager._index.search(q, k, params=params) if params is not None else manager._index.search(q, k)
+        found[i] = ids[0]
+    elapsed = time.perf_counter() - started
+    recall = np.mean([len(set(found[i]) & set(truth[i])) / k for i in range(len(queries))])
+    return recall, len(queries) / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index factories: recall@k vs flat, QPS and memory.")
+    parser.add_argument("--sizes", default="2000,20000,100000", help="Comma-separated corpus sizes.")
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clusters", type=int, default=64)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--factories", default="Flat;HNSW32;IVF,SQ8;IVF1024,PQ64", help="Semicolon-separated factory strings.")
+    parser.add_argument("--ef-search", default="16,64,256", help="HNSW efSearch values to sweep.")
+    parser.add_argument("--nprobe", default="1,8,32", help="IVF nprobe values to sweep.")
+    parser.add_argument("--from-cache", default=None, help="Embedding cache file to sample real vectors from.")
+    parser.add_argument("--threads", type=int, default=1, help="FAISS OpenMP threads while querying (training uses all cores).")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    build_threads = faiss.omp_get_max_threads()
+    manager = EmbeddingManager(api_key=FrameworkConfig._API_KEY or "offline-benchmark")
+    pool = cached_vectors(args.from_cache) if args.from_cache else None
+    factories = [f.strip() for f in args.factories.split(";") if f.strip()]
+
+    print(f"{'size':>8} {'factory':<18} {'param':<12} {'recall@' + str(args.k):>9} {'QPS':>9} {'build s':>8} {'MB':>8}")
+    ## @iter_ sizes : Each corpus size gets its own exact ground truth
+    for size in [int(s) for s in args.sizes.split(",")]:
+        if pool is not None:
+            rng = np.random.default_rng(args.seed)
+            picked = rng.choice(len(pool), size=min(size + args.queries, len(pool)), replace=False)
+            data = pool[picked]
+        else:
+            data = synthetic_vectors(size + args.queries, args.dim, args.clusters, args.seed)
+        x, queries = np.ascontiguousarray(data[:-args.queries]), np.ascontiguousarray(data[-args.queries:])
+
+        for factory in factories:
+            faiss.omp_set_num_threads(build_threads)
+            index, build_seconds = build(manager, factory, x)
+            exact = faiss.IndexFlat(x.shape[1], index.metric_type)
+            exact.add(x)
+            truth = exact.search(queries, args.k)[1]
+            megabytes = len(faiss.serialize_index(index)) / 1e6
+
+            inner = faiss.downcast_index(index.index)
+            if isinstance(inner, faiss.IndexHNSW):
+                sweep = [("efSearch", int(v)) for v in args.ef_search.split(",")]
+            elif faiss.try_extract_index_ivf(inner) is not None:
+                sweep = [("nprobe", int(v)) for v in args.nprobe.split(",")]
+            else:
+                sweep = [("-", None)]
+            faiss.omp_set_num_threads(args.threads)
+
+            ## @iter_ sweep : Query-time parameters need no rebuild
+            for name, value in sweep:
+                manager._set_search_params_(**({"ef_search": value} if name == "efSearch" else {"nprobe": value} if name == "nprobe" else {}))
+                recall, qps = measure(manager, queries, truth, args.k)
+                label = f"{name}={value}" if value is not None else "-"
+                print(f"{len(x):>8} {factory:<18} {label:<12} {recall:>9.3f} {qps:>9.0f} {build_seconds:>8.2f} {megabytes:>8.1f}")
+
+if __name__ == "__main__":
+    main()
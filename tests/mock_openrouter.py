@@ -0,0 +1,485 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/mock_openrouter.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Offline stand-in for the OpenRouter /chat/completions, /embeddings and /rerank
+##        endpoints. Synthetic, deterministic responses with configurable latency and
+##        error injection, plus record/replay cassettes of real traffic.
+##        Point the framework at it with OPENROUTER_BASE_URL=http://127.0.0.1:8765/api/v1
+## @deps argparse, hashlib, json, math, random, re, threading, time, http.server, numpy, requests
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import requests
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+def parse_latency(spec):
+    """
+    @func parse_latency
+    @params spec : (str) "fixed:S", "uniform:LO,HI", "normal:MU,SIGMA" or "lognormal:MEDIAN,SIGMA" (seconds).
+    @returns (callable) Zero-argument sampler returning a delay in seconds.
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(math.log(values[0]), values[1])
+    raise argparse.ArgumentTypeError(f"Unknown latency distribution: {spec}")
+
+def tokenize(text):
+    """
+    @func tokenize
+    @returns (list[str]) Lower-cased alphanumeric tokens.
+    """
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+def canonical_key(path, payload):
+    """
+    @func canonical_key
+    @returns (str) SHA-256 of the endpoint and payload with sorted keys (cassette lookup key).
+    """
+    canonical = json.dumps({"path": path, "payload": payload}, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SyntheticBackend:
+    """
+    @class SyntheticBackend
+    @desc_ Produces deterministic OpenRouter-shaped responses without any model.
+           Embeddings use signed feature hashing of word tokens, so texts sharing words
+           are close in cosine space; rerank scores are query/document token overlap.
+           Chat replies are shaped by the system prompt so triage, router and audit parse.
+    """
+    def __init__(self, embed_dim=768, completion_words=120):
+        self.embed_dim = embed_dim
+        self.completion_words = completion_words
+
+    def embed(self, text):
+        """
+        @func embed
+        @returns (list[float]) L2-normalized hashed bag-of-words vector.
+        """
+        vector = np.zeros(self.embed_dim, dtype=np.float32)
+        tokens = tokenize(text) or ["<empty>"]
+        for token in tokens:
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            index = int.from_bytes(digest[:4], "little") % self.embed_dim
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[index] += sign
+        vector /= np.linalg.norm(vector) or 1.0
+        return vector.tolist()
+
+    def embeddings(self, payload):
+        """
+        @func embeddings
+        @returns (dict) /embeddings response body.
+        """
+        inputs = payload.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        return {
+            "object": "list",
+            "model": payload.get("model"),
+            "data": [{"object": "embedding", "index": i, "embedding": self.embed(text)} for i, text in enumerate(inputs)],
+            "usage": {"prompt_tokens": sum(len(tokenize(t)) for t in inputs), "total_tokens": sum(len(tokenize(t)) for t in inputs)}
+        }
+
+    def rerank(self, payload):
+        """
+        @func rerank
+        @returns (dict) /rerank response body sorted by relevance.
+        """
+        query_tokens = set(tokenize(payload.get("query", "")))
+        results = []
+        for index, document in enumerate(payload.get("documents") or []):
+            text = document.get("text", "") if isinstance(document, dict) else str(document)
+            doc_tokens = set(tokenize(text))
+            overlap = len(query_tokens & doc_tokens) / (len(query_tokens) or 1)
+            ## @logic_ Tiny hash-based jitter breaks ties deterministically
+            jitter = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:4], 16) / 65535 * 1e-3
+            results.append({"index": index, "relevance_score": round(min(1.0, overlap + jitter), 6), "document": {"text": text}})
+        results.sort(key=lambda r: r["relevance_score"], reverse=True)
+        if payload.get("top_n"):
+            results = results[:payload["top_n"]]
+        return {"model": payload.get("model"), "results": results}
+
+    def chat_text(self, payload):
+        """
+        @func chat_text
+        @returns (tuple) (content: str, reasoning: str | None) for the request.
+        """
+        messages = payload.get("messages") or []
+        system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system" and isinstance(m.get("content"), str))
+        user_messages = [m for m in messages if m.get("role") == "user"]
+        user = user_messages[-1].get("content", "") if user_messages else ""
+        if isinstance(user, list):
+            user = " ".join(part.get("text", "") for part in user if part.get("type") == "text")
+
+        if "Linguistic Normalizer" in system or "Linguistic Normalizer" in user:
+            query = user.split("Input:")[-1].strip().strip('"') if "Input:" in user else user
+            content = f"The user asks: {query.strip()}\n<Detected Raw Language: English>"
+        elif "Legal Query Router" in system or "Legal Query Router" in user:
+            tokens = tokenize(user)
+            if set(tokens) & {"hi", "hello", "thanks", "thank", "kumusta"} and len(tokens) < 8:
+                route = "Casual-LLM"
+            elif set(tokens) & {"should", "can", "advice", "what", "how"}:
+                route = "Reasoning-LLM"
+            else:
+                route = "General-LLM"
+            signals = None if route == "Casual-LLM" else sorted(set(t for t in tokens if len(t) > 4))[:5]
+            content = json.dumps({"route": route, "confidence": 0.9, "search_signals": signals})
+        elif "Response Adherence Auditor" in system or "Response Adherence Auditor" in user:
+            content = json.dumps({"verdict": "PASS", "confidence": 0.95, "reason": "Synthetic audit."})
+        else:
+            words = tokenize(user) or ["legal", "information"]
+            limit = min(self.completion_words, payload.get("max_tokens") or self.completion_words)
+            rng = random.Random(canonical_key("chat", payload))
+            content = " ".join(rng.choice(words) for _ in range(limit)).capitalize() + "."
+
+        reasoning = None
+        if (payload.get("reasoning") or {}).get("enabled") or payload.get("include_reasoning"):
+            reasoning = f"Considering the request ({len(user)} chars)."
+        return content, reasoning
+
+    def usage(self, payload, content, reasoning):
+        """
+        @func usage
+        @returns (dict) OpenRouter-style usage block with approximate token counts.
+        """
+        prompt_tokens = sum(len(tokenize(m.get("content") if isinstance(m.get("content"), str) else json.dumps(m.get("content")))) for m in payload.get("messages") or [])
+        completion_tokens = len(tokenize(content))
+        reasoning_tokens = len(tokenize(reasoning)) if reasoning else 0
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens + reasoning_tokens,
+            "total_tokens": prompt_tokens + completion_tokens + reasoning_tokens,
+            "completion_tokens_details": {"reasoning_tokens": reasoning_tokens}
+        }
+
+    def chat(self, payload):
+        """
+        @func chat
+        @returns (dict) Non-streaming /chat/completions response body.
+        """
+        content, reasoning = self.chat_text(payload)
+        message = {"role": "assistant", "content": content}
+        if reasoning:
+            message["reasoning"] = reasoning
+        return {
+            "id": "gen-mock-" + canonical_key("id", payload)[:12],
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": self.usage(payload, content, reasoning)
+        }
+
+    def chat_chunks(self, payload):
+        """
+        @func chat_chunks
+        @returns (generator[str]) SSE data lines for a streamed completion.
+        """
+        content, reasoning = self.chat_text(payload)
+        if reasoning:
+            yield json.dumps({"choices": [{"index": 0, "delta": {"reasoning": reasoning}}]})
+        for i, word in enumerate(content.split(" ")):
+            yield json.dumps({"choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}}]})
+        yield json.dumps({"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": self.usage(payload, content, reasoning)})
+
+
+class Cassette:
+    """
+    @class Cassette
+    @desc_ JSONL file of recorded exchanges keyed by canonical request hash.
+           Each line: {"key", "path", "request", "status", "body", "stream"}.
+    """
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+        self.entries = {}
+        self.lock = threading.Lock()
+        if mode == "replay":
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+
+    def lookup(self, key):
+        return self.entries.get(key)
+
+    def record(self, entry):
+        with self.lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class MockOpenRouterHandler(BaseHTTPRequestHandler):
+    """
+    @class MockOpenRouterHandler
+    @desc_ Routes /chat/completions, /embeddings and /rerank (with or without the /api/v1 prefix).
+           Server-wide settings live on self.server (see build_server).
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self.send_json(200, self.server.stats)
+            return
+        self.send_json(404, {"error": {"message": "Not found", "code": 404}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self.send_json(400, {"error": {"message": "Invalid JSON", "code": 400}})
+            return
+
+        path = self.path.split("?")[0]
+        endpoint = path[len("/api/v1"):] if path.startswith("/api/v1") else path
+        if endpoint not in ("/chat/completions", "/embeddings", "/rerank"):
+            self.send_json(404, {"error": {"message": f"Unknown endpoint {endpoint}", "code": 404}})
+            return
+
+        server = self.server
+        server.count(endpoint)
+        key = canonical_key(endpoint, payload)
+
+        if server.cassette is not None and server.cassette.mode == "replay":
+            entry = server.cassette.lookup(key)
+            if entry is not None:
+                self.replay(entry)
+                return
+            if server.replay_strict:
+                self.send_json(404, {"error": {"message": "No cassette entry for request", "code": 404}})
+                return
+
+        if server.cassette is not None and server.cassette.mode == "record":
+            self.proxy_and_record(endpoint, payload, key)
+            return
+
+        if self.inject_error():
+            return
+        time.sleep(server.latency[endpoint]())
+
+        backend = server.backend
+        if endpoint == "/embeddings":
+            self.send_json(200, backend.embeddings(payload))
+        elif endpoint == "/rerank":
+            self.send_json(200, backend.rerank(payload))
+        elif payload.get("stream"):
+            self.send_stream(backend.chat_chunks(payload))
+        else:
+            self.send_json(200, backend.chat(payload))
+
+    def inject_error(self):
+        """
+        @func inject_error
+        @returns (bool) True if an error (429 / 5xx / timeout) was served instead of a response.
+        """
+        server = self.server
+        roll = random.random()
+        if roll < server.rate_429:
+            server.count("injected_429")
+            self.send_json(429, {"error": {"message": "Rate limit exceeded (mock)", "code": 429}}, headers={
+                "Retry-After": str(server.retry_after),
+                "X-RateLimit-Limit": "20",
+                "X-RateLimit-Remaining": "0",
+                "X-RateLimit-Reset": str(int((time.time() + server.retry_after) * 1000))
+            })
+            return True
+        roll -= server.rate_429
+        if roll < server.rate_5xx:
+            server.count("injected_5xx")
+            self.send_json(random.choice([500, 502, 503]), {"error": {"message": "Upstream error (mock)", "code": 503}})
+            return True
+        roll -= server.rate_5xx
+        if roll < server.rate_timeout:
+            server.count("injected_timeout")
+            time.sleep(server.timeout_sleep)
+            self.close_connection = True
+            return True
+        return False
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_stream(self, chunks, chunk_delay=None):
+        """
+        @func send_stream
+        @desc_ Writes an SSE body (chunked transfer) ending with [DONE].
+        """
+        delay = self.server.chunk_delay if chunk_delay is None else chunk_delay
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            self.write_chunk(f"data: {chunk}\n\n")
+            if delay:
+                time.sleep(delay)
+        self.write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def replay(self, entry):
+        """
+        @func replay
+        @desc_ Serves a recorded exchange (streams are replayed line by line).
+        """
+        self.server.count("replayed")
+        if entry.get("stream"):
+            lines = [line[len("data:"):].strip() for line in entry["body"].splitlines() if line.startswith("data:")]
+            self.send_stream([line for line in lines if line != "[DONE]"])
+        else:
+            self.send_json(entry["status"], entry["body"])
+
+    def proxy_and_record(self, endpoint, payload, key):
+        """
+        @func proxy_and_record
+        @desc_ Forwards the request to the real upstream with the caller's credentials and
+               appends the exchange to the cassette.
+        """
+        server = self.server
+        headers = {"Content-Type": "application/json"}
+        for name in ("Authorization", "HTTP-Referer", "X-Title"):
+            if self.headers.get(name):
+                headers[name] = self.headers[name]
+        stream = bool(payload.get("stream"))
+        try:
+            upstream = requests.post(f"{server.upstream}{endpoint}", headers=headers, json=payload, timeout=server.upstream_timeout)
+        except requests.exceptions.RequestException as e:
+            self.send_json(502, {"error": {"message": f"Upstream unreachable: {e}", "code": 502}})
+            return
+
+        server.count("recorded")
+        if stream and upstream.status_code == 200:
+            body = upstream.text
+            server.cassette.record({"key": key, "path": endpoint, "request": payload, "status": 200, "body": body, "stream": True})
+            self.replay({"stream": True, "body": body})
+            return
+        try:
+            body = upstream.json()
+        except ValueError:
+            body = {"error": {"message": upstream.text, "code": upstream.status_code}}
+        if upstream.status_code < 400:
+            server.cassette.record({"key": key, "path": endpoint, "request": payload, "status": upstream.status_code, "body": body, "stream": False})
+        self.send_json(upstream.status_code, body)
+
+
+def build_server(host="127.0.0.1", port=8765, chat_latency="lognormal:0.4,0.5", embed_latency="lognormal:0.05,0.3", rerank_latency="lognormal:0.1,0.3",
+                 chunk_delay=0.01, rate_429=0.0, rate_5xx=0.0, rate_timeout=0.0, retry_after=1.0, timeout_sleep=60.0,
+                 embed_dim=768, completion_words=120, record=None, replay=None, replay_strict=False,
+                 upstream="https://openrouter.ai/api/v1", upstream_timeout=120, seed=None, verbose=False):
+    """
+    @func build_server
+    @returns (ThreadingHTTPServer) A configured, not-yet-started mock server (port 0 picks a free port).
+    @desc_ Importable so scripts and notebooks can run the mock in a background thread.
+    """
+    if seed is not None:
+        random.seed(seed)
+    server = ThreadingHTTPServer((host, port), MockOpenRouterHandler)
+    server.daemon_threads = True
+    server.backend = SyntheticBackend(embed_dim=embed_dim, completion_words=completion_words)
+    server.latency = {
+        "/chat/completions": parse_latency(chat_latency),
+        "/embeddings": parse_latency(embed_latency),
+        "/rerank": parse_latency(rerank_latency)
+    }
+    server.chunk_delay = chunk_delay
+    server.rate_429 = rate_429
+    server.rate_5xx = rate_5xx
+    server.rate_timeout = rate_timeout
+    server.retry_after = retry_after
+    server.timeout_sleep = timeout_sleep
+    server.upstream = upstream.rstrip("/")
+    server.upstream_timeout = upstream_timeout
+    server.replay_strict = replay_strict
+    server.verbose = verbose
+    server.cassette = Cassette(record, "record") if record else (Cassette(replay, "replay") if replay else None)
+
+    server.stats = {}
+    stats_lock = threading.Lock()
+    def count(name):
+        with stats_lock:
+            server.stats[name] = server.stats.get(name, 0) + 1
+    server.count = count
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline OpenRouter stand-in for benchmarks and key-less tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--chat-latency", default="lognormal:0.4,0.5", help="fixed:S | uniform:LO,HI | normal:MU,SIGMA | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--embed-latency", default="lognormal:0.05,0.3")
+    parser.add_argument("--rerank-latency", default="lognormal:0.1,0.3")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Seconds between streamed chunks")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Fraction of requests answered with 500/502/503")
+    parser.add_argument("--rate-timeout", type=float, default=0.0, help="Fraction of requests that hang past the client timeout")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--timeout-sleep", type=float, default=60.0, help="How long a simulated timeout hangs")
+    parser.add_argument("--embed-dim", type=int, default=768)
+    parser.add_argument("--completion-words", type=int, default=120)
+    parser.add_argument("--record", metavar="CASSETTE", help="Proxy to --upstream and append exchanges to this JSONL file")
+    parser.add_argument("--replay", metavar="CASSETTE", help="Serve recorded exchanges from this JSONL file")
+    parser.add_argument("--replay-strict", action="store_true", help="404 on cassette misses instead of synthesizing")
+    parser.add_argument("--upstream", default="https://openrouter.ai/api/v1")
+    parser.add_argument("--seed", type=int, default=None, help="Seed latency/error sampling for reproducible runs")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = build_server(
+        host=args.host, port=args.port,
+        chat_latency=args.chat_latency, embed_latency=args.embed_latency, rerank_latency=args.rerank_latency,
+        chunk_delay=args.chunk_delay, rate_429=args.rate_429, rate_5xx=args.rate_5xx, rate_timeout=args.rate_timeout,
+        retry_after=args.retry_after, timeout_sleep=args.timeout_sleep,
+        embed_dim=args.embed_dim, completion_words=args.completion_words,
+        record=args.record, replay=args.replay, replay_strict=args.replay_strict,
+        upstream=args.upstream, seed=args.seed, verbose=args.verbose
+    )
+    mode = "record" if args.record else ("replay" if args.replay else "synthetic")
+    print(f"Mock OpenRouter ({mode}) listening on http://{args.host}:{server.server_port}/api/v1")
+    print(f"Set OPENROUTER_BASE_URL=http://{args.host}:{server.server_port}/api/v1 to use it.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
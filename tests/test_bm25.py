@@ -0,0 +1,144 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_bm25.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Parity test for the inverted-index BM25Index against a reference BM25Okapi (the
+##        rank_bm25 formulation, reimplemented below since the package is no longer a
+##        dependency): dense scores, scores of selected documents, masked top-k and the score
+##        ceiling, then a save / load round trip and the stale-fingerprint and format checks.
+## @deps math, os, sys, tempfile, numpy, src.adaptive_routing
+
+import math
+import os
+import sys
+import tempfile
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.adaptive_routing.modules.legal_retrieval import bm25
+from src.adaptive_routing.modules.legal_retrieval.bm25 import BM25Index, corpus_fingerprint, tokenize
+
+CORPUS = [
+    "The employer shall pay overtime wages to the employee.",
+    "An employee who works on a regular holiday shall be paid double wages.",
+    "The employer may terminate an employee for a just cause.",
+    "Termination  notice shall be served on the employee  and the department.",
+    "Wages wages wages: the employer shall pay wages at least once every two weeks.",
+    "Maternity leave benefits are paid by the employer.",
+    "The recruitment agency shall hold a valid license.",
+    "Ang employer ay magbabayad ng sahod sa empleyado. Überstunden sind zu vergüten.",
+    "Housing allowance is not part of the basic wage.",
+    "the the the the the"
+]
+QUERIES = [
+    "employer wages",
+    "the employer shall pay",
+    "wages wages overtime",
+    "termination  notice",
+    "vergüten sahod",
+    "unknownterm",
+    "the"
+]
+
+class ReferenceBM25Okapi:
+    """
+    @class ReferenceBM25Okapi
+    @desc_ Straight per-document BM25Okapi: idf = log(N - n + 0.5) - log(n + 0.5), with
+           negative idfs replaced by epsilon * average idf.
+    """
+    def __init__(self, corpus, k1=1.5, b=0.75, epsilon=0.25):
+        self.k1, self.b = k1, b
+        self.doc_freqs = [{} for _ in corpus]
+        document_frequency = {}
+        for freqs, document in zip(self.doc_freqs, corpus):
+            for word in document:
+                freqs[word] = freqs.get(word, 0) + 1
+            for word in freqs:
+                document_frequency[word] = document_frequency.get(word, 0) + 1
+        self.doc_len = np.array([len(document) for document in corpus], dtype=np.float64)
+        self.avgdl = self.doc_len.sum() / len(corpus)
+        self.idf = {word: math.log(len(corpus) - n + 0.5) - math.log(n + 0.5) for word, n in document_frequency.items()}
+        floor = epsilon * sum(self.idf.values()) / len(self.idf)
+        self.idf = {word: (floor if idf < 0 else idf) for word, idf in self.idf.items()}
+
+    def get_scores(self, query):
+        """
+        @func_ get_scores
+        @returns (np.ndarray) Dense scores, one term and one document at a time.
+        """
+        scores = np.zeros(len(self.doc_freqs))
+        for word in query:
+            tf = np.array([freqs.get(word, 0) for freqs in self.doc_freqs], dtype=np.float64)
+            scores += self.idf.get(word, 0.0) * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * self.doc_len / self.avgdl))
+        return scores
+
+def expect(label, ok, detail=""):
+    """
+    @func expect
+    @returns (int) 1 and prints FAIL when not ok, else 0.
+    """
+    print(f"{'OK  ' if ok else 'FAIL'} {label}" + (f": {detail}" if detail else ""))
+    return 0 if ok else 1
+
+def parity(index, reference, label):
+    """
+    @func parity
+    @returns (int) Number of queries whose scores, top-k or ceiling disagree with the reference.
+    """
+    failures = 0
+    mask = np.arange(index.corpus_size) % 2 == 0
+    for query in QUERIES:
+        tokens = tokenize(query)
+        expected = reference.get_scores(tokens)
+        problems = []
+        if not np.allclose(index.get_scores(tokens), expected, rtol=1e-5, atol=1e-6):
+            problems.append("get_scores")
+        if not np.allclose(index.get_batch_scores(tokens, [9, 0, 4]), expected[[9, 0, 4]], rtol=1e-5, atol=1e-6):
+            problems.append("get_batch_scores")
+        for k, candidates in ((3, None), (len(CORPUS), None), (3, mask)):
+            positions, scores = index._top_k_(tokens, k, mask=candidates)
+            allowed = expected if candidates is None else np.where(candidates, expected, 0.0)
+            best = np.sort(allowed[allowed > 0])[::-1][:k]
+            if len(scores) != len(best) or not np.allclose(scores, best, rtol=1e-5) or not np.allclose(expected[positions], scores, rtol=1e-5):
+                problems.append(f"_top_k_(k={k}, mask={candidates is not None})")
+        if index._ceiling_(tokens) + 1e-6 < expected.max():
+            problems.append("_ceiling_ below the best score")
+        failures += expect(f"{label} {query!r}", not problems, ", ".join(problems))
+    return failures
+
+def main():
+    """
+    @func_ main
+    @desc_ Compares a fresh and a reloaded index with the reference, then checks stale files are refused.
+    """
+    tokenized = [tokenize(text) for text in CORPUS]
+    reference = ReferenceBM25Okapi(tokenized)
+    index = BM25Index(tokenized)
+    failures = expect("vocabulary matches", set(index._vocab) == set(reference.idf))
+    df_the = sum("the" in document for document in tokenized)
+    failures += expect("negative idf is floored", math.log(len(CORPUS) - df_the + 0.5) < math.log(df_the + 0.5)
+                       and np.isclose(index._idf[index._vocab["the"]], reference.idf["the"], rtol=1e-5))
+    failures += parity(index, reference, "fresh")
+
+    path = os.path.join(tempfile.mkdtemp(), "combined_index.bm25")
+    fingerprint = corpus_fingerprint(CORPUS)
+    index._save_(path, fingerprint)
+    loaded = BM25Index._load_(path, fingerprint)
+    failures += expect("saved index loads with its fingerprint", loaded is not None)
+    if loaded is not None:
+        failures += parity(loaded, reference, "loaded")
+    failures += expect("changed chunks make the file stale", BM25Index._load_(path, corpus_fingerprint(CORPUS[:-1])) is None)
+    failures += expect("missing file loads as None", BM25Index._load_(path + ".missing") is None)
+    bm25._FORMAT_VERSION += 1
+    try:
+        failures += expect("older format version is rebuilt", BM25Index._load_(path, fingerprint) is None)
+    finally:
+        bm25._FORMAT_VERSION -= 1
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
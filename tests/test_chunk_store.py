@@ -0,0 +1,98 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_chunk_store.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Round-trip test for ChunkStore: records written with _write_ read back identical,
+##        including chunks that are slices of a parent with multibyte UTF-8 before them,
+##        overlapping and out-of-order slices, texts that are not slices of their parent,
+##        records without a parent, and parent_context re-attached on access. Also checks
+##        count_chunks, the legacy JSON fallback and resolve_chunks_path.
+## @deps json, os, sys, tempfile, src.adaptive_routing
+
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.adaptive_routing.modules.legal_retrieval.chunk_store import ChunkStore, count_chunks, load_chunks, resolve_chunks_path
+from src.adaptive_routing.modules.legal_retrieval.bm25 import corpus_fingerprint
+
+PARENT_A = "Sección 1. El empleador pagará ₱500 — «horas extra» 日本語. Überstunden sind zu vergüten. Ende."
+PARENT_B = "Section 2. Wages shall be paid at least once every two weeks."
+
+def build_records():
+    """
+    @func build_records
+    @returns (list[dict]) Chunk records covering every way a text can relate to its parent.
+    """
+    first = PARENT_A[:PARENT_A.index(" Überstunden")]
+    second = PARENT_A[PARENT_A.index("«"):PARENT_A.index(" Ende")]
+    last = PARENT_A[PARENT_A.index("Überstunden"):]
+    records = [
+        {"text": first, "metadata": {"doc_id": "A", "jurisdiction": "PH", "parent_context": PARENT_A}},
+        {"text": second, "metadata": {"doc_id": "A", "jurisdiction": "PH", "parent_context": PARENT_A},
+         "span": [PARENT_A.index("«"), PARENT_A.index(" Ende")]},
+        {"text": last, "metadata": {"doc_id": "A", "jurisdiction": "PH", "parent_context": PARENT_A}},
+        {"text": first, "metadata": {"doc_id": "A", "jurisdiction": "PH", "parent_context": PARENT_A}},
+        {"text": "Title: Section 2\n" + PARENT_B, "metadata": {"doc_id": "B", "jurisdiction": "HK", "parent_context": PARENT_B}},
+        {"text": PARENT_B, "metadata": {"doc_id": "B", "jurisdiction": "HK", "parent_context": PARENT_B}},
+        {"text": "A standalone note — no parent.", "metadata": {"doc_id": "C", "jurisdiction": "HK"}},
+        {"text": "", "metadata": {}}
+    ]
+    for i, record in enumerate(records):
+        record["id"] = 1000 + 7 * i
+    return records
+
+def expect(label, ok, detail=""):
+    """
+    @func expect
+    @returns (int) 1 and prints FAIL when not ok, else 0.
+    """
+    print(f"{'OK  ' if ok else 'FAIL'} {label}" + (f": {detail}" if detail else ""))
+    return 0 if ok else 1
+
+def main():
+    """
+    @func_ main
+    @desc_ Writes the records, reads them back through every accessor and compares.
+    """
+    workdir = tempfile.mkdtemp()
+    records = build_records()
+    expected = [{"id": r["id"], "text": r["text"], "metadata": r["metadata"]} for r in records]
+    texts = [r["text"] for r in records]
+    failures = 0
+
+    path = os.path.join(workdir, "combined_index.chunks")
+    stats = ChunkStore._write_(path, records, corpus_fingerprint(texts))
+    failures += expect("parents and metadata are stored once", stats["parents"] == 2 and stats["metadata"] == 4, str(stats))
+
+    store = load_chunks(path)
+    failures += expect("load_chunks maps a chunk store", isinstance(store, ChunkStore))
+    failures += expect("length", len(store) == len(records))
+    mismatched = [pos for pos, record in enumerate(expected) if store[pos] != record]
+    failures += expect("every record round-trips", not mismatched, f"positions {mismatched}")
+    failures += expect("iteration matches indexing", list(store) == expected)
+    failures += expect("negative index", store[-2] == expected[-2])
+    failures += expect("texts without decoding parents", list(store._texts_()) == texts)
+    failures += expect("metadata without parent_context", all("parent_context" not in store._metadata_(pos) for pos in range(len(store))))
+    distinct, meta_of = store._distinct_metadata_()
+    failures += expect("distinct metadata per chunk", [distinct[m] for m in meta_of] == [{k: v for k, v in r["metadata"].items() if k != "parent_context"} for r in records])
+    failures += expect("fingerprint recorded", store._fingerprint == corpus_fingerprint(texts))
+    failures += expect("count_chunks reads the header", count_chunks(path) == len(records))
+
+    legacy = os.path.join(workdir, "legacy.json")
+    with open(legacy, "w", encoding="utf-8") as f:
+        json.dump(expected, f, ensure_ascii=False)
+    failures += expect("legacy JSON loads as a list", load_chunks(legacy) == expected)
+    failures += expect("count_chunks on legacy JSON", count_chunks(legacy) == len(records))
+    failures += expect("resolve_chunks_path falls back to the legacy sibling", resolve_chunks_path(os.path.join(workdir, "legacy.chunks")) == legacy)
+    failures += expect("resolve_chunks_path keeps an existing path", resolve_chunks_path(path) == path)
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_chunking.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Behavioral test for the streaming chunker: every span is a trimmed slice within
+##        chunk_size, spans move forward and cover every non-space character, cuts fall on
+##        sentence or section boundaries when one fits, overlap repeats the tail of the
+##        previous chunk, and a large document is chunked in linear time.
+## @deps os, sys, time, src.adaptive_routing
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.adaptive_routing.modules.legal_retrieval.chunking import chunk_text, iter_chunk_spans
+from src.adaptive_routing.core.exceptions import InvalidInputError
+
+DOCUMENTS = {
+    "sentences": "Section 1. The employer shall pay overtime. Wages are due every two weeks! Is holiday pay due? Yes; at double rate.",
+    "sections": "ARTICLE 82  Coverage\n\n   ARTICLE 83 Normal hours of work  \n\nARTICLE 84 Hours worked\n\n\nARTICLE 85 Meal periods   ",
+    "no boundary": "x" * 95 + " " + "y" * 40,
+    "unicode": "Sección 1. El empleador pagará ₱500 — «horas extra». 日本語の条文。Überstunden sind zu vergüten. Ende.",
+    "long sentence": "Short. " + "This sentence is far longer than any chunk size used in this test and must be cut hard. " + "Tail."
+}
+
+def check(text, chunk_size, chunk_overlap):
+    """
+    @func check
+    @returns (list[str]) Invariants the chunking of `text` violates.
+    """
+    spans = list(iter_chunk_spans(text, chunk_size, chunk_overlap))
+    problems = []
+    if [text[s:e] for s, e in spans] != chunk_text(text, chunk_size, chunk_overlap):
+        problems.append("chunk_text differs from the spans")
+    for start, end in spans:
+        chunk = text[start:end]
+        if not chunk or chunk != chunk.strip():
+            problems.append(f"untrimmed span {start}:{end}")
+        if end - start > chunk_size:
+            problems.append(f"span {start}:{end} exceeds {chunk_size}")
+    if any(b[0] <= a[0] or b[1] < a[1] for a, b in zip(spans, spans[1:])):
+        problems.append("spans move backwards")
+    covered = set()
+    for start, end in spans:
+        covered.update(range(start, end))
+    if any(not ch.isspace() and pos not in covered for pos, ch in enumerate(text)):
+        problems.append("non-space text not covered")
+    if not chunk_overlap and any(b[0] < a[1] for a, b in zip(spans, spans[1:])):
+        problems.append("spans overlap without chunk_overlap")
+    return problems
+
+def expect(label, ok, detail=""):
+    """
+    @func expect
+    @returns (int) 1 and prints FAIL when not ok, else 0.
+    """
+    print(f"{'OK  ' if ok else 'FAIL'} {label}" + (f": {detail}" if detail else ""))
+    return 0 if ok else 1
+
+def main():
+    """
+    @func_ main
+    @desc_ Checks the invariants over a grid of sizes, then specific cut positions and timing.
+    """
+    failures = 0
+    for name, text in DOCUMENTS.items():
+        problems = []
+        for chunk_size in (1, 7, 20, 45, 100, 1000):
+            for chunk_overlap in (0, 5, chunk_size):
+                problems += [f"size={chunk_size} overlap={chunk_overlap}: {p}" for p in check(text, chunk_size, chunk_overlap)]
+        failures += expect(f"invariants hold for {name!r}", not problems, "; ".join(problems[:3]))
+
+    chunks = chunk_text(DOCUMENTS["sentences"], 50)
+    failures += expect("cuts fall after sentence punctuation", all(c[-1] in ".!?;" for c in chunks), str(chunks))
+    chunks = chunk_text(DOCUMENTS["sections"], 40)
+    failures += expect("blank lines separate sections", chunks == ["ARTICLE 82  Coverage", "ARTICLE 83 Normal hours of work", "ARTICLE 84 Hours worked", "ARTICLE 85 Meal periods"], str(chunks))
+    chunks = chunk_text(DOCUMENTS["no boundary"], 50)
+    failures += expect("text without a boundary is cut at chunk_size", chunks[:2] == ["x" * 50, "x" * 45 + " yyyy"], str([len(c) for c in chunks]))
+    chunks = chunk_text(DOCUMENTS["sentences"], 50, 10)
+    failures += expect("overlap repeats the end of the previous chunk", all(prev[-5:] in nxt for prev, nxt in zip(chunks, chunks[1:])), str(chunks))
+    failures += expect("a document shorter than chunk_size is one chunk", chunk_text("  Short text.  ", 100) == ["Short text."])
+
+    for blank in ("", "   \n\t "):
+        try:
+            chunk_text(blank, 10)
+            raised = False
+        except InvalidInputError:
+            raised = True
+        failures += expect(f"blank text {blank!r} is rejected", raised)
+
+    sentence = "The employer shall pay the wages of the employee in legal tender. "
+    timings = []
+    for repeats in (2000, 20000):
+        started = time.perf_counter()
+        count = sum(1 for _ in iter_chunk_spans(sentence * repeats, 1000, 100))
+        timings.append(time.perf_counter() - started)
+    failures += expect("chunking time grows linearly", count > 0 and timings[1] < 30 * max(timings[0], 1e-3), f"{timings[0]:.3f}s -> {timings[1]:.3f}s")
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_circuit_breaker.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Behavioral test for ModelCircuit: tripping on the rolling error rate, fail-fast while
+##        OPEN, probe-only decisions while HALF_OPEN (late calls admitted while CLOSED must not
+##        close or re-open it), probe slots given back by released permits, and a 429 answer
+##        not counting as a healthy probe. The 429 case runs offline against the mock
+##        OpenRouter server in a background thread.
+## @deps os, sys, threading, time, tests.mock_openrouter, src.adaptive_routing
+
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from mock_openrouter import build_server
+
+server = build_server(port=0, chat_latency="fixed:0", rate_429=1.0, retry_after=0.01, seed=1)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/api/v1"
+os.environ["OPENROUTER_API_KEY"] = os.getenv("OPENROUTER_API_KEY") or "offline-test"
+os.environ["RATE_LIMIT_MAX_REQUEUES"] = "1"
+
+from src.adaptive_routing.core.circuit_breaker import CircuitBreaker, ModelCircuit
+from src.adaptive_routing.core.engine import LLMRequestEngine
+from src.adaptive_routing.core.exceptions import APIResponseError
+
+def half_open(circuit):
+    """
+    @func half_open
+    @returns (CircuitPermit) A probe permit; trips the circuit and lets the cooldown elapse first.
+    """
+    for _ in range(circuit._min_calls):
+        circuit._acquire_()._record_(True, 0.01)
+    circuit._opened_at -= circuit._cooldown
+    return circuit._acquire_()
+
+def expect(label, actual, expected):
+    """
+    @func expect
+    @returns (int) 1 and prints FAIL when actual != expected, else 0.
+    """
+    ok = actual == expected
+    print(f"{'OK  ' if ok else 'FAIL'} {label}: {actual!r}" + ("" if ok else f" (expected {expected!r})"))
+    return 0 if ok else 1
+
+def main():
+    """
+    @func_ main
+    @desc_ Drives single circuits through their transitions, then an engine against a 429-only server.
+    """
+    failures = 0
+
+    circuit = ModelCircuit("m", window=60, min_calls=4, error_rate=0.5, slow_call_sec=1.0, cooldown=30, half_open_probes=1)
+    for _ in range(3):
+        circuit._acquire_()._record_(True, 0.01)
+    failures += expect("below min_calls stays closed", circuit._state, ModelCircuit.CLOSED)
+    circuit._acquire_()._record_(True, 0.01)
+    failures += expect("error rate trips the circuit", circuit._state, ModelCircuit.OPEN)
+    failures += expect("open circuit rejects", circuit._acquire_(), None)
+
+    circuit = ModelCircuit("m", window=60, min_calls=4, error_rate=0.5, slow_call_sec=1.0, cooldown=30, half_open_probes=1)
+    late = circuit._acquire_()
+    probe = half_open(circuit)
+    failures += expect("cooldown elapsed -> half-open", circuit._state, ModelCircuit.HALF_OPEN)
+    failures += expect("second probe rejected", circuit._acquire_(), None)
+    late._record_(False, 0.01)
+    failures += expect("late success admitted while closed does not close", circuit._state, ModelCircuit.HALF_OPEN)
+    probe._record_(False, 0.01)
+    failures += expect("healthy probe closes", circuit._state, ModelCircuit.CLOSED)
+
+    circuit = ModelCircuit("m", window=60, min_calls=4, error_rate=0.5, slow_call_sec=1.0, cooldown=30, half_open_probes=1)
+    late = circuit._acquire_()
+    probe = half_open(circuit)
+    late._record_(True, 0.01)
+    failures += expect("late failure admitted while closed does not re-open", circuit._state, ModelCircuit.HALF_OPEN)
+    probe._release_()
+    failures += expect("released probe frees its slot", circuit._probes_in_flight, 0)
+    probe = circuit._acquire_()
+    probe._record_(False, 5.0)
+    failures += expect("slow probe re-opens", circuit._state, ModelCircuit.OPEN)
+
+    breaker = CircuitBreaker()
+    engine = LLMRequestEngine(api_key=os.environ["OPENROUTER_API_KEY"], model="mock/model", breaker=breaker)
+    circuit = breaker._circuit_("mock/model")
+    half_open(circuit)._release_()
+    started = time.monotonic()
+    try:
+        engine._get_completion_("What is overtime pay?", "You are a legal assistant.")
+        failures += expect("429-only server raises", False, True)
+    except APIResponseError as e:
+        failures += expect("429-only server raises", e.status_code, 429)
+    failures += expect("429 probe leaves the circuit half-open", circuit._state, ModelCircuit.HALF_OPEN)
+    failures += expect("429 probe gives its slot back", circuit._probes_in_flight, 0)
+    failures += expect("429 run stayed fast", time.monotonic() - started < 5, True)
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
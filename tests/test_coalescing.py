@@ -0,0 +1,128 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_coalescing.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Behavioral test for SingleFlight: concurrent sync callers share one execution and
+##        one error, later callers run again, an async flight survives one caller being
+##        cancelled, and engines built with coalesce=True send one request for concurrent
+##        identical completions. Runs offline against the mock OpenRouter server.
+## @deps asyncio, os, sys, threading, time, tests.mock_openrouter, src.adaptive_routing
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from mock_openrouter import build_server
+
+server = build_server(port=0, chat_latency="fixed:0.3", seed=1)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/api/v1"
+os.environ["OPENROUTER_API_KEY"] = os.getenv("OPENROUTER_API_KEY") or "offline-test"
+
+from src.adaptive_routing.core.coalescing import SingleFlight
+from src.adaptive_routing.core.engine import LLMRequestEngine
+
+CALLERS = 8
+
+def run_concurrently(fn):
+    """
+    @func run_concurrently
+    @params fn : (callable) Called with the caller's index from each of CALLERS threads.
+    @returns (list) Each caller's result, or the exception it raised.
+    """
+    outcomes = [None] * CALLERS
+    barrier = threading.Barrier(CALLERS)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            outcomes[i] = fn(i)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+def expect(label, ok, detail=""):
+    """
+    @func expect
+    @returns (int) 1 and prints FAIL when not ok, else 0.
+    """
+    print(f"{'OK  ' if ok else 'FAIL'} {label}" + (f": {detail}" if detail else ""))
+    return 0 if ok else 1
+
+async def cancelled_caller(flight):
+    """
+    @func cancelled_caller
+    @params flight : (SingleFlight) Coalescer under test.
+    @returns (tuple) (surviving caller's result, executions).
+    @desc_ Two callers share one flight; the first is cancelled before the flight completes.
+    """
+    executions = []
+
+    async def slow():
+        executions.append(1)
+        await asyncio.sleep(0.2)
+        return "answer"
+
+    first = asyncio.ensure_future(flight._do_async_("k", slow))
+    second = asyncio.ensure_future(flight._do_async_("k", slow))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    return await second, len(executions)
+
+def main():
+    """
+    @func_ main
+    @desc_ Runs the coalescer directly, then behind two engines against the mock server.
+    """
+    failures = 0
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"answer": len(calls)}
+
+    outcomes = run_concurrently(lambda i: flight._do_("k", slow))
+    failures += expect("concurrent callers execute once", len(calls) == 1, f"{len(calls)} executions")
+    failures += expect("every caller gets the shared result", all(o is outcomes[0] for o in outcomes) and outcomes[0] == {"answer": 1})
+    stats = flight._stats_()
+    failures += expect("stats count leader and followers", stats["executed"] == 1 and stats["coalesced"] == CALLERS - 1 and stats["in_flight"] == 0, str(stats))
+    flight._do_("k", slow)
+    failures += expect("a later call executes again", len(calls) == 2)
+
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("upstream")
+
+    outcomes = run_concurrently(lambda i: flight._do_("e", failing))
+    failures += expect("the leader's error reaches every follower", all(isinstance(o, ValueError) for o in outcomes))
+    failures += expect("distinct keys do not coalesce", flight._do_("a", lambda: 1) == 1 and flight._do_("b", lambda: 2) == 2)
+
+    result, executions = asyncio.run(cancelled_caller(SingleFlight()))
+    failures += expect("async flight survives a cancelled caller", result == "answer" and executions == 1)
+
+    engines = [LLMRequestEngine(api_key=os.environ["OPENROUTER_API_KEY"], model="mock/model", coalesce=True) for _ in range(2)]
+    before = server.stats.get("/chat/completions", 0)
+    outcomes = run_concurrently(lambda i: engines[i % 2]._get_completion_("What is overtime pay?", "You are a legal assistant."))
+    sent = server.stats.get("/chat/completions", 0) - before
+    failures += expect("coalescing engines send one request", sent == 1 and all(o == outcomes[0] for o in outcomes) and isinstance(outcomes[0], str),
+                       f"{sent} request(s)")
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
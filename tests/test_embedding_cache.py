@@ -0,0 +1,109 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_embedding_cache.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Behavioral test for the memory-mapped EmbeddingCache: lookups after a reopen, a torn
+##        final record, compaction of superseded records, eviction under max_bytes, and
+##        _clear_ / compaction while vectors handed out earlier are still being read.
+## @deps os, sys, tempfile, zlib, numpy, src.adaptive_routing
+
+import os
+import sys
+import tempfile
+import zlib
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.adaptive_routing.modules.legal_retrieval.embedding_cache import EmbeddingCache, content_key
+
+MODEL = "mock/embed"
+DIM = 16
+## @const_ RECORD : Bytes per stored vector (32-byte key, uint32 dim, float32 values).
+RECORD = 32 + 4 + DIM * 4
+
+def vectors_for(texts):
+    """
+    @func vectors_for
+    @returns (np.ndarray) float32 (len(texts), DIM) vectors derived from each text.
+    """
+    return np.stack([np.random.default_rng(zlib.crc32(t.encode())).random(DIM, dtype=np.float32) for t in texts])
+
+def put(cache, texts):
+    """
+    @func put
+    @returns (np.ndarray) The vectors stored for `texts`.
+    """
+    vectors = vectors_for(texts)
+    cache._put_many_([content_key(MODEL, t) for t in texts], vectors)
+    return vectors
+
+def expect(label, ok, detail=""):
+    """
+    @func expect
+    @returns (int) 1 and prints FAIL when not ok, else 0.
+    """
+    print(f"{'OK  ' if ok else 'FAIL'} {label}" + (f": {detail}" if detail else ""))
+    return 0 if ok else 1
+
+def main():
+    """
+    @func_ main
+    @desc_ Runs each scenario against its own cache file in a temporary directory.
+    """
+    workdir = tempfile.mkdtemp()
+    failures = 0
+    texts = [f"Section {i}. The employer shall pay overtime." for i in range(20)]
+
+    path = os.path.join(workdir, "reopen.bin")
+    stored = put(EmbeddingCache(path, max_bytes=0), texts)
+    found, _ = EmbeddingCache(path, max_bytes=0)._get_many_(MODEL, texts + ["never stored"])
+    failures += expect("reopened cache serves every stored vector", all(np.array_equal(f, v) for f, v in zip(found, stored)))
+    failures += expect("unknown text misses", found[-1] is None)
+    found, _ = EmbeddingCache(path, max_bytes=0)._get_many_(MODEL, ["  Section 0.   The employer shall pay overtime. "])
+    failures += expect("whitespace-normalized text hits", found[0] is not None and np.array_equal(found[0], stored[0]))
+
+    with open(path, "ab") as f:
+        f.write(b"\x01" * 40)
+    cache = EmbeddingCache(path, max_bytes=0)
+    failures += expect("torn final record is dropped", len(cache._vectors) == len(texts) and cache._file_bytes == os.path.getsize(path))
+
+    path = os.path.join(workdir, "superseded.bin")
+    cache = EmbeddingCache(path, max_bytes=0)
+    put(cache, texts)
+    with open(path, "ab") as f:
+        ## @iter_ rewrites : Appending superseded copies of every record, as a second writer would
+        for _ in range(2):
+            for text, vector in zip(texts, vectors_for(texts)):
+                f.write(content_key(MODEL, text) + np.uint32(DIM).tobytes() + vector.tobytes())
+    size_before = os.path.getsize(path)
+    cache = EmbeddingCache(path, max_bytes=0)
+    failures += expect("mostly superseded file is compacted on open", cache._compactions == 1 and os.path.getsize(path) < size_before,
+                       f"{size_before} -> {os.path.getsize(path)} bytes")
+
+    path = os.path.join(workdir, "bounded.bin")
+    cache = EmbeddingCache(path, max_bytes=8 + 10 * RECORD)
+    put(cache, texts[:10])
+    held = cache._get_many_(MODEL, texts[:1])[0][0]
+    put(cache, texts[10:12])
+    found, _ = cache._get_many_(MODEL, texts[:12])
+    failures += expect("over max_bytes evicts the oldest entries", found[0] is None and found[11] is not None and os.path.getsize(path) <= 8 + 10 * RECORD,
+                       f"{sum(f is not None for f in found)} of 12 kept")
+    failures += expect("vector held across a compaction stays readable", np.array_equal(held, vectors_for(texts[:1])[0]))
+
+    path = os.path.join(workdir, "clear.bin")
+    put(EmbeddingCache(path, max_bytes=0), texts)
+    cache = EmbeddingCache(path, max_bytes=0)
+    held = cache._get_many_(MODEL, texts)[0]
+    cache._clear_()
+    failures += expect("vectors held across _clear_ stay readable", all(np.array_equal(h, v) for h, v in zip(held, vectors_for(texts))))
+    failures += expect("cleared cache misses", cache._get_many_(MODEL, texts[:1])[0][0] is None)
+    put(cache, texts[:2])
+    failures += expect("cleared file reopens with only the new entries", len(EmbeddingCache(path, max_bytes=0)._vectors) == 2)
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_rate_limiter.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Behavioral test for the adaptive rate limiter: burst then queueing, max_wait
+##        rejection, AIMD on 429 / success, Retry-After and X-RateLimit-* parsing, quota
+##        exhaustion, per-(key, model) buckets, and an engine that re-queues injected 429s
+##        instead of raising them. Runs offline against the mock OpenRouter server.
+## @deps os, sys, threading, time, email.utils, tests.mock_openrouter, src.adaptive_routing
+
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from mock_openrouter import build_server
+
+server = build_server(port=0, chat_latency="fixed:0", rate_429=0.3, retry_after=0.05, seed=1)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/api/v1"
+os.environ["OPENROUTER_API_KEY"] = os.getenv("OPENROUTER_API_KEY") or "offline-test"
+
+from src.adaptive_routing.core.rate_limiter import RateLimiter, TokenBucket, _parse_reset_, _parse_retry_after_
+from src.adaptive_routing.core.engine import LLMRequestEngine
+from src.adaptive_routing.core.exceptions import APIResponseError
+
+def expect(label, ok, detail=""):
+    """
+    @func expect
+    @returns (int) 1 and prints FAIL when not ok, else 0.
+    """
+    print(f"{'OK  ' if ok else 'FAIL'} {label}" + (f": {detail}" if detail else ""))
+    return 0 if ok else 1
+
+def main():
+    """
+    @func_ main
+    @desc_ Drives buckets directly, then an engine through a mock server that injects 429s.
+    """
+    failures = 0
+    bucket = TokenBucket(rate=10.0, capacity=3, min_rate=1.0, max_rate=20.0)
+    waits = [bucket._reserve_() for _ in range(5)]
+    failures += expect("burst is granted without waiting", waits[:3] == [0.0, 0.0, 0.0])
+    failures += expect("later callers queue one refill interval apart", abs(waits[3] - 0.1) < 0.01 and abs(waits[4] - 0.2) < 0.01, str(waits))
+    failures += expect("a wait beyond max_wait is refused", bucket._reserve_(max_wait=0.05) is None)
+    failures += expect("a refused reservation gives its token back", abs(bucket._reserve_() - 0.3) < 0.01)
+
+    bucket = TokenBucket(rate=8.0, capacity=2, min_rate=1.0, max_rate=20.0)
+    bucket._on_throttled_(retry_after=0.5)
+    wait = bucket._reserve_()
+    failures += expect("429 halves the rate", bucket._stats_()["rate_per_sec"] == 4.0)
+    failures += expect("Retry-After blocks the bucket", 0.45 < wait <= 0.5, f"{wait:.3f}s")
+    bucket._on_success_()
+    failures += expect("success adds one step", bucket._stats_()["rate_per_sec"] == 4.25)
+    for _ in range(10):
+        bucket._on_throttled_(retry_after=0)
+    failures += expect("rate never drops below min_rate", bucket._stats_()["rate_per_sec"] == 1.0)
+
+    bucket = TokenBucket(rate=8.0, capacity=2, min_rate=1.0, max_rate=20.0)
+    bucket._apply_quota_(remaining=30, reset_in=2)
+    failures += expect("quota headers spread the remaining requests", bucket._stats_()["rate_per_sec"] == 15.0)
+    bucket._apply_quota_(remaining=0, reset_in=0.3)
+    wait = bucket._reserve_()
+    failures += expect("an exhausted quota blocks until the reset", 0.25 < wait <= 0.4, f"{wait:.3f}s")
+
+    failures += expect("Retry-After seconds", _parse_retry_after_("2.5") == 2.5 and _parse_retry_after_(None) is None and _parse_retry_after_("soon") is None)
+    http_date = _parse_retry_after_(formatdate(time.time() + 30, usegmt=True))
+    failures += expect("Retry-After HTTP-date", http_date is not None and 28 <= http_date <= 30, str(http_date))
+    epoch_ms = _parse_reset_(str(int((time.time() + 10) * 1000)))
+    failures += expect("X-RateLimit-Reset in epoch ms, epoch s and delta", 9 <= epoch_ms <= 10 and 9 <= _parse_reset_(str(int(time.time() + 10))) <= 10 and _parse_reset_("4") == 4.0)
+
+    limiter = RateLimiter(max_wait=0.5)
+    failures += expect("buckets are per key and model", limiter._bucket_("k1", "m") is limiter._bucket_("k1", "m")
+                       and limiter._bucket_("k1", "m") is not limiter._bucket_("k2", "m") and limiter._bucket_("k1", "m") is not limiter._bucket_("k1", "n"))
+    failures += expect("429 is reported for re-queueing", limiter._record_("k1", "m", 429, {"Retry-After": "0"}) is True and limiter._record_("k1", "m", 200, {}) is False)
+    failures += expect("stats never expose the key", all("k1" not in name.split("#")[1] for name in limiter._stats_()))
+    bucket = limiter._bucket_("k3", "m")
+    bucket._on_throttled_(retry_after=5)
+    try:
+        limiter._acquire_("k3", "m")
+        rejected = False
+    except APIResponseError as e:
+        rejected = e.status_code == 429
+    failures += expect("a queue longer than max_wait raises 429", rejected)
+
+    limiter = RateLimiter()
+    engine = LLMRequestEngine(api_key=os.environ["OPENROUTER_API_KEY"], model="mock/model", limiter=limiter)
+    try:
+        answers = [engine._get_completion_(f"Question {i} about overtime pay?", "You are a legal assistant.") for i in range(6)]
+        raised = None
+    except APIResponseError as e:
+        answers, raised = [], e
+    injected = server.stats.get("injected_429", 0)
+    stats = next(iter(limiter._stats_().values()))
+    failures += expect("injected 429s are re-queued, not raised", raised is None and len(answers) == 6 and injected > 0, f"{injected} injected, {raised}")
+    failures += expect("every 429 is fed to the bucket", stats["throttled"] == injected, str(stats))
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_response_cache.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Behavioral test for ResponseCache: canonical keys, LRU eviction, TTL expiry, the
+##        SQLite tier (persistence, promotion, trimming) and _clear_, then an engine with a
+##        cache attached: a repeated completion is served without a request and an error
+##        body is never cached. Runs offline against the mock OpenRouter server.
+## @deps os, sys, tempfile, threading, time, tests.mock_openrouter, src.adaptive_routing
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from mock_openrouter import build_server
+
+server = build_server(port=0, chat_latency="fixed:0", seed=1)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/api/v1"
+os.environ["OPENROUTER_API_KEY"] = os.getenv("OPENROUTER_API_KEY") or "offline-test"
+
+from src.adaptive_routing.core.cache import ResponseCache
+from src.adaptive_routing.core.engine import LLMRequestEngine
+
+URL = "https://openrouter.ai/api/v1/chat/completions"
+
+def payload(text, **extra):
+    """
+    @func payload
+    @returns (dict) A chat payload asking `text`.
+    """
+    return dict({"model": "mock/model", "messages": [{"role": "user", "content": text}], "temperature": 0}, **extra)
+
+def expect(label, ok, detail=""):
+    """
+    @func expect
+    @returns (int) 1 and prints FAIL when not ok, else 0.
+    """
+    print(f"{'OK  ' if ok else 'FAIL'} {label}" + (f": {detail}" if detail else ""))
+    return 0 if ok else 1
+
+def main():
+    """
+    @func_ main
+    @desc_ Exercises the memory tier, the disk tier, then the cache behind an engine.
+    """
+    failures = 0
+    reordered = {"temperature": 0, "messages": [{"content": "overtime", "role": "user"}], "model": "mock/model"}
+    failures += expect("key ignores dict order", ResponseCache._make_key_(URL, payload("overtime")) == ResponseCache._make_key_(URL, reordered))
+    failures += expect("key covers the payload", ResponseCache._make_key_(URL, payload("overtime")) != ResponseCache._make_key_(URL, payload("overtime", temperature=0.7)))
+    failures += expect("key covers the endpoint", ResponseCache._make_key_(URL, payload("overtime")) != ResponseCache._make_key_(URL + "x", payload("overtime")))
+
+    cache = ResponseCache(max_entries=2, ttl=0, db_path="")
+    keys = [ResponseCache._make_key_(URL, payload(f"q{i}")) for i in range(3)]
+    cache._put_(keys[0], {"n": 0})
+    cache._put_(keys[1], {"n": 1})
+    cache._get_(keys[0])
+    cache._put_(keys[2], {"n": 2})
+    failures += expect("least recently used entry is evicted", cache._get_(keys[1]) is None and cache._get_(keys[0]) == {"n": 0} and cache._get_(keys[2]) == {"n": 2})
+
+    cache = ResponseCache(max_entries=8, ttl=0.2, db_path="")
+    cache._put_(keys[0], {"n": 0})
+    fresh = cache._get_(keys[0])
+    time.sleep(0.3)
+    failures += expect("entries expire after the TTL", fresh == {"n": 0} and cache._get_(keys[0]) is None)
+
+    db_path = os.path.join(tempfile.mkdtemp(), "responses.sqlite")
+    cache = ResponseCache(max_entries=8, ttl=0, db_path=db_path, max_disk_entries=2)
+    for i, key in enumerate(keys):
+        cache._put_(key, {"n": i, "text": "₱500 «horas extra»"})
+    reopened = ResponseCache(max_entries=8, ttl=0, db_path=db_path, max_disk_entries=2)
+    hit = reopened._get_(keys[2])
+    failures += expect("disk tier survives a restart", hit == {"n": 2, "text": "₱500 «horas extra»"} and reopened._stats_()["disk_hits"] == 1)
+    reopened._get_(keys[2])
+    failures += expect("disk hits are promoted to memory", reopened._stats_()["disk_hits"] == 1 and reopened._stats_()["hits"] == 2)
+    failures += expect("disk tier is trimmed to max_disk_entries", reopened._get_(keys[0]) is None and reopened._get_(keys[1]) == {"n": 1, "text": "₱500 «horas extra»"})
+    reopened._clear_()
+    failures += expect("_clear_ empties both tiers", reopened._get_(keys[1]) is None and ResponseCache(ttl=0, db_path=db_path)._get_(keys[2]) is None)
+
+    engine = LLMRequestEngine(api_key=os.environ["OPENROUTER_API_KEY"], model="mock/model", cache=ResponseCache(max_entries=8, ttl=0, db_path=""))
+    before = server.stats.get("/chat/completions", 0)
+    first = engine._get_completion_("What is overtime pay?", "You are a legal assistant.")
+    second = engine._get_completion_("What is overtime pay?", "You are a legal assistant.")
+    sent = server.stats.get("/chat/completions", 0) - before
+    failures += expect("repeated completion is served from the cache", first == second and sent == 1, f"{sent} request(s)")
+    failures += expect("error bodies are not cacheable", not LLMRequestEngine._is_cacheable_({"error": {"message": "upstream"}})
+                       and not LLMRequestEngine._is_cacheable_({"choices": []}) and LLMRequestEngine._is_cacheable_({"choices": [{"message": {"content": "ok"}}]}))
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_search_batch.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Regression test for EmbeddingManager._search_batch_: every query of a batch must get
+##        exactly the results _search_ gives it alone, including when a chunk is a BM25-only
+##        candidate for one query and a FAISS hit for another. Runs offline against the mock
+##        OpenRouter server in a background thread.
+## @deps os, sys, threading, numpy, tests.mock_openrouter, src.adaptive_routing
+
+import os
+import sys
+import threading
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from mock_openrouter import build_server
+
+server = build_server(port=0, embed_latency="fixed:0", seed=1)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/api/v1"
+os.environ["OPENROUTER_API_KEY"] = os.getenv("OPENROUTER_API_KEY") or "offline-test"
+os.environ["EMBEDDING_CACHE_ENABLED"] = "False"
+os.environ["QUERY_EMBEDDING_CACHE_ENABLED"] = "False"
+
+from src.adaptive_routing.modules.legal_retrieval.embedding import EmbeddingManager
+from src.adaptive_routing.modules.legal_retrieval.bm25 import tokenize
+
+TOPICS = ["overtime", "holiday", "termination", "maternity", "severance", "recruitment", "license", "housing"]
+QUERIES = [
+    "wages overtime holiday",
+    "wages termination severance",
+    "wages maternity holiday",
+    "license recruitment wages",
+    "housing overtime termination"
+]
+
+def build_documents(count=48):
+    """
+    @func build_documents
+    @returns (list[dict]) Short documents that all mention wages and mix two or three topics,
+             so the queries' lexical and vector candidates overlap.
+    """
+    rng = np.random.default_rng(7)
+    documents = []
+    for i in range(count):
+        words = rng.choice(TOPICS, size=int(rng.integers(2, 4)), replace=False)
+        documents.append({
+            "content": f"Section {i}. The employer shall pay wages for {' and '.join(words)} under this Part.",
+            "metadata": {"doc_id": f"sec_{i}", "jurisdiction": "PH" if i % 2 else "HK"}
+        })
+    return documents
+
+def shared_lexical_candidates(manager, top_k):
+    """
+    @func shared_lexical_candidates
+    @returns (int) Chunks that are a BM25-only candidate for one query and a FAISS hit for another;
+             the case the batch path used to get wrong.
+    """
+    candidates = top_k * 2
+    vectors = manager._normalize_(manager._embed_queries_(QUERIES))
+    _, indices = manager._index.search(vectors, candidates)
+    vector_hits = [set(manager._positions.get(int(i), -1) for i in row) for row in indices]
+    lexical_hits = [set(manager._bm25._top_k_(tokenize(q), candidates)[0].tolist()) for q in QUERIES]
+    shared = set()
+    for q in range(len(QUERIES)):
+        others = set().union(*(vector_hits[o] for o in range(len(QUERIES)) if o != q))
+        shared |= (lexical_hits[q] - vector_hits[q]) & others
+    return len(shared)
+
+def main():
+    """
+    @func_ main
+    @desc_ Compares batched and single-query results with and without a metadata filter.
+    """
+    manager = EmbeddingManager(api_key=os.environ["OPENROUTER_API_KEY"])
+    manager._add_documents_(build_documents(), bypass_chunking=True)
+
+    top_k = 3
+    shared = shared_lexical_candidates(manager, top_k)
+    print(f"Chunks lexical-only for one query and vector hits for another: {shared}")
+    assert shared > 0, "Corpus does not exercise shared lexical candidates."
+
+    failures = 0
+    for filters in (None, {"jurisdiction": "PH"}):
+        batch = manager._search_batch_(QUERIES, top_k=top_k, filters=filters)
+        ## @iter_ queries : Each batched result list must equal the query searched alone
+        for query, batched in zip(QUERIES, batch):
+            single = manager._search_(query, top_k=top_k, filters=filters)
+            same = [(r["chunk"], round(r["score"], 9), r["scores"]) for r in batched] == [(r["chunk"], round(r["score"], 9), r["scores"]) for r in single]
+            failures += not same
+            print(f"{'OK  ' if same else 'FAIL'} filters={filters} query={query!r}")
+
+    print(f"{failures} mismatches")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
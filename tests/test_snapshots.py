@@ -0,0 +1,180 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_snapshots.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Behavioral test for index snapshots and the corpus manifest: publish seeds from the
+##        serving snapshot and writes a manifest, unchanged and failed builds publish nothing,
+##        pruning keeps the newest versions and never the serving one, SnapshotLoader swaps in
+##        new versions and survives a failed load, and verify_index_integrity reports added,
+##        changed and removed corpus files (publish_index returns early when nothing changed).
+## @deps json, os, sys, tempfile, time, src.adaptive_routing
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.adaptive_routing.modules.legal_retrieval.snapshots import (
+    SNAPSHOTS_DIRNAME,
+    SnapshotLoader,
+    current_version,
+    prune_snapshots,
+    publish_snapshot,
+    read_manifest,
+    resolve_index_dir
+)
+from src.adaptive_routing.modules.legal_retrieval.utils.legal_indexing import publish_index, verify_index_integrity, write_sources
+
+def writer(content, changed=None):
+    """
+    @func writer
+    @params content : (str) Written to combined_index.chunks in the staging directory.
+    @params changed : (bool, optional) Reported as "changed" when given.
+    @returns (callable) A publish_snapshot build that also records what it was seeded with.
+    """
+    def build(staging_dir, version):
+        path = os.path.join(staging_dir, "combined_index.chunks")
+        seeded = open(path, encoding="utf-8").read() if os.path.exists(path) else None
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        report = {"seeded": seeded}
+        if changed is not None:
+            report["changed"] = changed
+        return report
+    return build
+
+def failing_build(staging_dir, version):
+    """
+    @func failing_build
+    @desc_ A build that fails halfway through writing its files.
+    """
+    with open(os.path.join(staging_dir, "combined_index.chunks"), "w", encoding="utf-8") as f:
+        f.write("partial")
+    raise RuntimeError("embedding service unavailable")
+
+def write_doc(corpus_dir, rel_path, text):
+    """
+    @func write_doc
+    @desc_ Writes one corpus JSON document.
+    """
+    path = os.path.join(corpus_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"title": rel_path, "text": text}, f)
+
+def expect(label, ok, detail=""):
+    """
+    @func expect
+    @returns (int) 1 and prints FAIL when not ok, else 0.
+    """
+    print(f"{'OK  ' if ok else 'FAIL'} {label}" + (f": {detail}" if detail else ""))
+    return 0 if ok else 1
+
+def main():
+    """
+    @func_ main
+    @desc_ Publishes, prunes and reloads snapshots in a temporary index directory, then diffs a corpus.
+    """
+    failures = 0
+    index_dir = tempfile.mkdtemp()
+    with open(os.path.join(index_dir, "combined_index.chunks"), "w", encoding="utf-8") as f:
+        f.write("flat")
+
+    first = publish_snapshot(index_dir, writer("v1"), keep=2)
+    failures += expect("a flat index seeds the first snapshot", first["seeded"] == "flat")
+    failures += expect("CURRENT names the published version", current_version(index_dir) == first["version"] and resolve_index_dir(index_dir) == first["snapshot_dir"])
+    manifest = read_manifest(first["snapshot_dir"])
+    failures += expect("manifest lists files and the report", manifest.get("version") == first["version"] and manifest.get("previous") is None
+                       and manifest.get("files") == {"combined_index.chunks": 2} and manifest.get("report", {}).get("seeded") == "flat", str(manifest))
+
+    time.sleep(0.01)
+    second = publish_snapshot(index_dir, writer("v2"), keep=2)
+    failures += expect("the next snapshot is seeded from the serving one", second["seeded"] == "v1" and read_manifest(second["snapshot_dir"])["previous"] == first["version"])
+    failures += expect("published files are never rewritten", open(os.path.join(first["snapshot_dir"], "combined_index.chunks")).read() == "v1")
+
+    unchanged = publish_snapshot(index_dir, writer("v3", changed=False), keep=2)
+    failures += expect("an unchanged build keeps the serving version", unchanged["version"] == second["version"] and current_version(index_dir) == second["version"])
+    try:
+        publish_snapshot(index_dir, failing_build, keep=2)
+        raised = False
+    except RuntimeError:
+        raised = True
+    listing = sorted(os.listdir(os.path.join(index_dir, SNAPSHOTS_DIRNAME)))
+    failures += expect("a failed build publishes nothing and leaves no staging copy", raised and current_version(index_dir) == second["version"]
+                       and listing == sorted([first["version"], second["version"]]), str(listing))
+
+    time.sleep(0.01)
+    third = publish_snapshot(index_dir, writer("v3"), keep=2)
+    listing = sorted(os.listdir(os.path.join(index_dir, SNAPSHOTS_DIRNAME)))
+    failures += expect("publishing prunes to the newest versions", listing == sorted([second["version"], third["version"]]), str(listing))
+    with open(os.path.join(index_dir, "CURRENT"), "w", encoding="utf-8") as f:
+        f.write(second["version"])
+    failures += expect("pruning never removes the serving version", prune_snapshots(index_dir, keep=1) == [] and os.path.isdir(second["snapshot_dir"]))
+    with open(os.path.join(index_dir, "CURRENT"), "w", encoding="utf-8") as f:
+        f.write(third["version"])
+    failures += expect("pruning removes older versions", prune_snapshots(index_dir, keep=1) == [second["version"]])
+
+    def load(snapshot_dir):
+        content = open(os.path.join(snapshot_dir, "combined_index.chunks"), encoding="utf-8").read()
+        if content == "broken":
+            raise ValueError("corrupt chunk store")
+        return content
+
+    loader = SnapshotLoader(index_dir, load, poll_interval=0.01)
+    failures += expect("startup load serves the published snapshot", loader._load_now_() == "v3" and loader._status_()["version"] == third["version"])
+    time.sleep(0.01)
+    fourth = publish_snapshot(index_dir, writer("v4"), keep=2)
+    time.sleep(0.02)
+    served = loader._get_()
+    loader._wait_(5)
+    failures += expect("requests keep the old snapshot while the new one loads", served == "v3")
+    failures += expect("a newer snapshot is swapped in", loader._get_() == "v4" and loader._status_()["version"] == fourth["version"])
+    time.sleep(0.01)
+    publish_snapshot(index_dir, writer("broken"), keep=2)
+    time.sleep(0.02)
+    loader._get_()
+    loader._wait_(5)
+    status = loader._status_()
+    failures += expect("a failed reload keeps serving the previous snapshot", loader._get_() == "v4" and status["version"] == fourth["version"]
+                       and "corrupt" in (status["last_error"] or ""), str(status))
+
+    corpus_dir = tempfile.mkdtemp()
+    for rel_path in ("PH/labor_code.json", "PH/poea_rules.json", "HK/employment.json"):
+        write_doc(corpus_dir, rel_path, f"Text of {rel_path}.")
+    index_dir = tempfile.mkdtemp()
+    failures += expect("an index without a manifest reports every file as added", verify_index_integrity(corpus_dir, index_dir)["added"] == ["HK/employment.json", "PH/labor_code.json", "PH/poea_rules.json"])
+
+    def build(staging_dir, version):
+        write_sources(corpus_dir, staging_dir, indexed_count=3, version=version)
+        return {}
+
+    published = publish_snapshot(index_dir, build)
+    sync = verify_index_integrity(corpus_dir, index_dir)
+    failures += expect("the published manifest is in sync", sync["is_synced"] and sync["missing_count"] == 0 and sync["version"] == published["version"], str(sync))
+    early = publish_index(corpus_dir, index_dir)
+    failures += expect("publish_index returns early when nothing changed", early["changed"] is False and early["version"] == published["version"]
+                       and len(os.listdir(os.path.join(index_dir, SNAPSHOTS_DIRNAME))) == 1)
+
+    write_doc(corpus_dir, "PH/dole_order.json", "New department order.")
+    write_doc(corpus_dir, "PH/labor_code.json", "Amended text of the labor code, now longer.")
+    touched = os.path.join(corpus_dir, "PH/poea_rules.json")
+    stat = os.stat(touched)
+    os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    os.remove(os.path.join(corpus_dir, "HK/employment.json"))
+    sync = verify_index_integrity(corpus_dir, index_dir)
+    failures += expect("diff reports added, changed and removed files", sync["added"] == ["PH/dole_order.json"] and sync["changed"] == ["PH/labor_code.json", "PH/poea_rules.json"]
+                       and sync["removed"] == ["HK/employment.json"] and sync["missing_count"] == 4 and not sync["is_synced"], str(sync))
+    time.sleep(0.01)
+    republished = publish_snapshot(index_dir, build)
+    failures += expect("rewriting the manifest clears the diff", verify_index_integrity(corpus_dir, index_dir)["is_synced"]
+                       and read_manifest(republished["snapshot_dir"])["previous"] == published["version"])
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+## Saint Louis University
+## Team 404FoundUs
+## @file tests/test_upsert_documents.py
+## @project_ LLM Legal Adaptive Routing Framework
+## @desc_ Regression test for EmbeddingManager._upsert_documents_ / _delete_documents_: a doc_id
+##        repeated in one upsert keeps only its last version's chunks, and after any sequence of
+##        upserts and deletes FAISS, the chunk list and the incrementally updated BM25 index
+##        agree with each other and with a BM25 index built from scratch. Runs offline against
+##        the mock OpenRouter server in a background thread.
+## @deps os, sys, threading, numpy, tests.mock_openrouter, src.adaptive_routing
+
+import os
+import sys
+import threading
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+from mock_openrouter import build_server
+
+server = build_server(port=0, embed_latency="fixed:0", seed=1)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/api/v1"
+os.environ["OPENROUTER_API_KEY"] = os.getenv("OPENROUTER_API_KEY") or "offline-test"
+os.environ["EMBEDDING_CACHE_ENABLED"] = "False"
+os.environ["QUERY_EMBEDDING_CACHE_ENABLED"] = "False"
+
+from src.adaptive_routing.modules.legal_retrieval.embedding import EmbeddingManager
+from src.adaptive_routing.modules.legal_retrieval.bm25 import BM25Index, tokenize
+
+QUERIES = ["wages overtime", "section notice termination", "employer shall pay", "unknownterm"]
+
+def document(doc_id, sentences, topic):
+    """
+    @func document
+    @returns (dict) A document of `sentences` sentences about `topic`.
+    """
+    text = " ".join(f"Sentence {i} of {doc_id} covers {topic} and the wages payable." for i in range(sentences))
+    return {"content": text, "metadata": {"doc_id": doc_id}}
+
+def check(manager, label):
+    """
+    @func check
+    @returns (int) 1 when FAISS, the chunk list and BM25 disagree (or BM25 differs from a fresh build), else 0.
+    """
+    texts = list(manager._chunk_texts_())
+    fresh = BM25Index([tokenize(t) for t in texts])
+    problems = []
+    if manager._index.ntotal != len(texts):
+        problems.append(f"FAISS holds {manager._index.ntotal} vectors for {len(texts)} chunks")
+    if manager._bm25.corpus_size != len(texts):
+        problems.append(f"BM25 holds {manager._bm25.corpus_size} documents for {len(texts)} chunks")
+    if set(manager._bm25._vocab) != set(fresh._vocab):
+        problems.append("BM25 vocabulary differs from a fresh build")
+    for query in QUERIES:
+        tokens = tokenize(query)
+        if not np.allclose(manager._bm25.get_scores(tokens), fresh.get_scores(tokens), rtol=1e-5, atol=1e-6):
+            problems.append(f"BM25 scores differ from a fresh build for {query!r}")
+        if not np.isclose(manager._bm25._ceiling_(tokens), fresh._ceiling_(tokens), rtol=1e-5):
+            problems.append(f"BM25 ceiling differs from a fresh build for {query!r}")
+    print(f"{'OK  ' if not problems else 'FAIL'} {label}: {len(texts)} chunks")
+    for problem in problems:
+        print(f"     {problem}")
+    return 1 if problems else 0
+
+def main():
+    """
+    @func_ main
+    @desc_ Repeated doc_id in one upsert, then replace / delete / re-add cycles.
+    """
+    manager = EmbeddingManager(api_key=os.environ["OPENROUTER_API_KEY"], chunk_size=80, chunk_overlap=0)
+    failures = 0
+
+    ## @logic_ Same doc_id twice: a long version, then a one-chunk version
+    long_version, short_version = document("A", 9, "overtime"), document("A", 1, "holiday")
+    records = manager._prepare_chunks_([long_version, short_version], bypass_chunking=False)
+    stale = [r for r in records if r["metadata"]["parent_context"] != short_version["content"]]
+    print(f"{'OK  ' if len(records) == 1 and not stale else 'FAIL'} repeated doc_id: {len(records)} records, {len(stale)} stale")
+    failures += len(records) != 1 or bool(stale)
+
+    manager._upsert_documents_([document("B", 4, "termination notice"), long_version, short_version, document("C", 6, "overtime")])
+    a_chunks = [m for m in manager._chunk_metadata_() if m["doc_id"] == "A"]
+    print(f"{'OK  ' if len(a_chunks) == 1 else 'FAIL'} upsert with repeated doc_id indexes {len(a_chunks)} chunk(s) of A")
+    failures += len(a_chunks) != 1
+    failures += check(manager, "initial upsert")
+
+    manager._upsert_documents_([document("B", 1, "severance"), document("D", 3, "maternity")])
+    failures += check(manager, "replace B with fewer chunks, add D")
+    manager._delete_documents_(["C"])
+    failures += check(manager, "delete C (last document with 'overtime')")
+    manager._delete_documents_(["missing"])
+    failures += check(manager, "delete unknown doc_id")
+    manager._upsert_documents_([document("C", 2, "overtime pay")])
+    failures += check(manager, "re-add C")
+
+    print(f"{failures} failures")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())